@@ -17,6 +17,7 @@ from strands.models import BedrockModel
 
 from prompts import get_speaker_analysis_prompt, format_speaker_utterances
 from models import SpeakerAnalysisResult
+from agent_runtime import AdmissionController, AdmissionRejectedError, admission_rejected_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +28,9 @@ AWS_REGION = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', '
 
 app = FastAPI(title="Audio Analysis Agent", version="1.0.0")
 
+# Bedrock呼び出しをスレッドプールにオフロードし、同時受付数を制限する
+admission = AdmissionController.from_env('audio-analysis', max_workers=2, max_queue=4, queue_timeout=120.0)
+
 s3_client = boto3.client('s3', region_name=AWS_REGION)
 _strands_agent = None
 
@@ -211,8 +215,10 @@ async def invoke_agent(request: Request):
         else:
             payload = {}
         
-        result = handle_invocation(payload)
+        result = await admission.run(handle_invocation, payload)
         return {"output": result}
+    except AdmissionRejectedError as e:
+        return admission_rejected_response(e)
     except Exception as e:
         logger.error(f"Invocation error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -221,7 +227,7 @@ async def invoke_agent(request: Request):
 @app.get("/ping")
 async def ping():
     """ヘルスチェックエンドポイント"""
-    return {"status": "healthy"}
+    return {"status": "healthy", "runtime": admission.stats()}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""
+AgentCore Runtimeエージェント共通のアドミッション制御
+
+各エージェントの handle_invocation は同期・ブロッキング（Bedrock呼び出し）のため、
+async def のエンドポイント内で直接呼ぶとイベントループが停止し、
+/ping や他のリクエストまで処理されなくなる。
+
+AdmissionController は処理を固定サイズのスレッドプールにオフロードし、
+同時受付数（実行中 + 待機中）を上限で制限する。
+  - 上限超過時: 即座に 429 + Retry-After
+  - 待機中に queue_timeout を超過した場合: 処理を開始せず 503 + Retry-After
+実行数・待機数・レイテンシは stats() で取得し、/ping で公開する。
+
+各エージェントのDockerイメージには common/ 配下がアプリケーションディレクトリにコピーされる。
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# レイテンシ統計に使う直近リクエスト数
+LATENCY_WINDOW = 200
+
+
+class AdmissionRejectedError(Exception):
+    """アドミッション制御でリクエストを拒否した"""
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """スレッドプールへのオフロードと同時受付数の制限
+
+    Args:
+        name: ログ・統計用の名前
+        max_workers: 同時実行数（スレッドプールサイズ）
+        max_queue: 実行待ちで受け付ける最大数
+        queue_timeout: 実行待ちの最大秒数（超過時は503）
+        retry_after: 拒否時に返すRetry-After秒数
+    """
+
+    def __init__(self, name: str, max_workers: int = 4, max_queue: int = 8,
+                 queue_timeout: float = 30.0, retry_after: int = 2):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._latencies: "deque[float]" = deque(maxlen=LATENCY_WINDOW)
+        self._queue_waits: "deque[float]" = deque(maxlen=LATENCY_WINDOW)
+
+    @classmethod
+    def from_env(cls, name: str, **defaults) -> "AdmissionController":
+        """環境変数（AGENT_MAX_WORKERS 等）で上書き可能なコントローラーを生成"""
+        return cls(
+            name=name,
+            max_workers=int(os.environ.get('AGENT_MAX_WORKERS', defaults.get('max_workers', 4))),
+            max_queue=int(os.environ.get('AGENT_MAX_QUEUE', defaults.get('max_queue', 8))),
+            queue_timeout=float(os.environ.get('AGENT_QUEUE_TIMEOUT_SECONDS', defaults.get('queue_timeout', 30.0))),
+            retry_after=int(os.environ.get('AGENT_RETRY_AFTER_SECONDS', defaults.get('retry_after', 2))),
+        )
+
+    def admit(self) -> None:
+        """受付枠を1つ確保（上限超過時は AdmissionRejectedError(429)）
+
+        run() を使わずに処理する場合（ストリーミング等）は、完了時に release() を呼ぶこと。
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise AdmissionRejectedError(429, self.retry_after, 'too many in-flight requests')
+            self._in_flight += 1
+
+    def release(self, duration: float = None) -> None:
+        """受付枠を解放し、処理時間を記録"""
+        with self._lock:
+            self._in_flight -= 1
+            if duration is not None:
+                self._latencies.append(duration)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """fn(*args) をスレッドプールで実行して結果を返す
+
+        Raises:
+            AdmissionRejectedError: 受付上限超過（429）または待機タイムアウト（503）
+        """
+        self.admit()
+        enqueued_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._execute, enqueued_at, fn, args)
+        finally:
+            self.release(time.monotonic() - enqueued_at)
+
+    def _execute(self, enqueued_at: float, fn: Callable[..., Any], args: tuple) -> Any:
+        waited = time.monotonic() - enqueued_at
+        with self._lock:
+            self._queue_waits.append(waited)
+            if waited > self.queue_timeout:
+                self._timed_out += 1
+                raise AdmissionRejectedError(503, self.retry_after, f'queued for {waited:.1f}s')
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """実行数・待機数・拒否数・レイテンシ（ミリ秒）を取得"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            waits = list(self._queue_waits)
+            return {
+                'inFlight': self._in_flight,
+                'running': self._running,
+                'queueDepth': max(0, self._in_flight - self._running),
+                'maxWorkers': self.max_workers,
+                'maxQueue': self.max_queue,
+                'rejected': self._rejected,
+                'queueTimeouts': self._timed_out,
+                'latencyP50Ms': _percentile_ms(latencies, 0.5),
+                'latencyP95Ms': _percentile_ms(latencies, 0.95),
+                'queueWaitAvgMs': round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            }
+
+
+def admission_rejected_response(error: AdmissionRejectedError) -> JSONResponse:
+    """拒否時のレスポンス（Retry-Afterヘッダー付き）"""
+    logger.warning(f"Request rejected by admission control: {error.status_code} {error.reason}")
+    return JSONResponse(
+        status_code=error.status_code,
+        content={'output': {'success': False, 'error': 'AGENT_BUSY', 'message': error.reason}},
+        headers={'Retry-After': str(error.retry_after)},
+    )
+
+
+def _percentile_ms(sorted_values, ratio: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * ratio))
+    return round(sorted_values[index] * 1000, 1)
@@ -0,0 +1,176 @@
+"""
+/invocations の冪等性キーとリクエスト合流（coalescing）
+
+フロントエンドがタイムアウト後に同じターンを再送すると、Bedrock呼び出しが二重に走り、
+npc-conversation ではAgentCore Memoryに同じ発言が重複して記録される。
+
+ペイロードの idempotencyKey（省略時は messageId）を sessionId と組み合わせたキーで、
+  - 処理中の重複リクエストは同じ Future の結果を待つ（処理は1回のみ）
+  - 完了済みのリクエストは短いTTLのキャッシュから同じ結果を返す（リプレイ）
+IDEMPOTENCY_TABLE を設定した場合は完了結果をDynamoDBにも保存し、コンテナをまたいだ再送でもリプレイする
+（テーブルはパーティションキー idempotencyKey（S）、TTL属性 expiresAt）。
+
+同じキーで内容の異なるペイロードはリプレイせず、通常どおり処理する。
+失敗レスポンス（success: False）と例外はキャッシュしないため、再送で再実行される。
+状態はイベントループのスレッドからのみ操作するためロックは使わない。
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotentInvoker:
+    """冪等性キー単位で処理を1回に合流させ、完了結果をリプレイする
+
+    Args:
+        name: キーの名前空間（エージェント名）
+        ttl_seconds: 完了結果をリプレイする秒数
+        max_entries: ローカルに保持する完了結果の最大数
+        table_name: 完了結果を共有するDynamoDBテーブル名（省略時はコンテナ内のみ）
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 300.0, max_entries: int = 1024,
+                 table_name: Optional[str] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.table_name = table_name
+        self._table = None
+        # key -> (fingerprint, result, expires_at)
+        self._completed: "OrderedDict[str, Tuple[str, Any, float]]" = OrderedDict()
+        # key -> (fingerprint, future)
+        self._in_flight: Dict[str, Tuple[str, "asyncio.Future[Any]"]] = {}
+        self._counts = {'executed': 0, 'coalesced': 0, 'replayed': 0, 'replayedFromTable': 0, 'mismatched': 0}
+
+    @classmethod
+    def from_env(cls, name: str) -> "IdempotentInvoker":
+        """環境変数（IDEMPOTENCY_TTL_SECONDS 等）で設定した Invoker を生成"""
+        return cls(
+            name=name,
+            ttl_seconds=float(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '300')),
+            max_entries=int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '1024')),
+            table_name=os.environ.get('IDEMPOTENCY_TABLE') or None,
+        )
+
+    def key_for(self, payload: Dict[str, Any]) -> Optional[str]:
+        """ペイロードから冪等性キーを取得（キーなしはNone）"""
+        key = payload.get('idempotencyKey') or payload.get('messageId')
+        if not key:
+            return None
+        return f"{self.name}:{payload.get('sessionId', '')}:{key}"
+
+    async def run(self, payload: Dict[str, Any], fn: Callable[[], Awaitable[Any]]) -> Any:
+        """fn() を冪等性キー単位で1回だけ実行して結果を返す"""
+        key = self.key_for(payload)
+        if key is None:
+            return await fn()
+        fingerprint = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        ).hexdigest()
+
+        completed = self._get_completed(key)
+        in_flight = self._in_flight.get(key)
+        if completed is not None or in_flight is not None:
+            stored_fingerprint = completed[0] if completed is not None else in_flight[0]
+            if stored_fingerprint != fingerprint:
+                self._counts['mismatched'] += 1
+                logger.warning(f"Idempotency key reused with a different payload, processing normally: {key}")
+                return await fn()
+            if completed is not None:
+                self._counts['replayed'] += 1
+                logger.info(f"Replaying completed result for idempotency key: {key}")
+                return copy.deepcopy(completed[1])
+            self._counts['coalesced'] += 1
+            logger.info(f"Coalescing duplicate in-flight request: {key}")
+            return copy.deepcopy(await asyncio.shield(in_flight[1]))
+
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Any]" = loop.create_future()
+        self._in_flight[key] = (fingerprint, future)
+        try:
+            result = await self._load_from_table(key, fingerprint) if self.table_name else None
+            if result is not None:
+                self._counts['replayedFromTable'] += 1
+                logger.info(f"Replaying result from idempotency table: {key}")
+            else:
+                self._counts['executed'] += 1
+                result = await fn()
+                if self._is_cacheable(result) and self.table_name:
+                    loop.run_in_executor(None, self._save_to_table, key, fingerprint, result)
+            if self._is_cacheable(result):
+                self._put_completed(key, fingerprint, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # 待機者がいない場合に "exception was never retrieved" を出さない
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """実行・合流・リプレイ件数を取得"""
+        return {**self._counts, 'inFlight': len(self._in_flight), 'cached': len(self._completed)}
+
+    @staticmethod
+    def _is_cacheable(result: Any) -> bool:
+        return isinstance(result, dict) and result.get('success') is not False
+
+    def _get_completed(self, key: str) -> Optional[Tuple[str, Any, float]]:
+        entry = self._completed.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            del self._completed[key]
+            return None
+        self._completed.move_to_end(key)
+        return entry
+
+    def _put_completed(self, key: str, fingerprint: str, result: Any) -> None:
+        self._completed[key] = (fingerprint, copy.deepcopy(result), time.monotonic() + self.ttl_seconds)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_entries:
+            self._completed.popitem(last=False)
+
+    def _get_table(self):
+        if self._table is None:
+            import boto3
+            region = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', 'us-west-2'))
+            self._table = boto3.resource('dynamodb', region_name=region).Table(self.table_name)
+        return self._table
+
+    async def _load_from_table(self, key: str, fingerprint: str) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                None, lambda: self._get_table().get_item(Key={'idempotencyKey': key})
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read idempotency table, processing normally: {e}")
+            return None
+        item = response.get('Item')
+        # DynamoDBのTTL削除は遅延するため期限も確認する
+        if not item or int(item.get('expiresAt', 0)) <= time.time() or item.get('fingerprint') != fingerprint:
+            return None
+        return json.loads(item['result'])
+
+    def _save_to_table(self, key: str, fingerprint: str, result: Any) -> None:
+        try:
+            self._get_table().put_item(Item={
+                'idempotencyKey': key,
+                'fingerprint': fingerprint,
+                'result': json.dumps(result, ensure_ascii=False, default=str),
+                'expiresAt': int(time.time() + self.ttl_seconds),
+            })
+        except Exception as e:
+            logger.warning(f"Failed to save idempotency result: {e}")
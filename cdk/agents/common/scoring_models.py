@@ -1,8 +1,10 @@
 """
-リアルタイムスコアリングエージェント用Pydanticモデル定義
+リアルタイムスコアリング用Pydanticモデル定義
 
 Strands Agentsのstructured output機能で使用する
 出力スキーマを定義。
+realtime-scoring エージェントと、NPC応答とスコアリングを1回で生成する
+npc-conversation エージェントの統合モードで共通に使用する。
 """
 
 from typing import List, Optional
@@ -0,0 +1,174 @@
+"""
+リアルタイムスコアリング用プロンプト部品
+
+realtime-scoring エージェントのスコアリングプロンプトと、
+npc-conversation エージェントの統合モード（NPC応答 + スコアリングを1回で生成）で
+同じ評価ルール・ゴール表記を使うための共通モジュール。
+
+ゴールは達成済みを除外し、最新発言との語彙的な関連度順に上位のみをプロンプトに含める。
+goalUpdates は状態が変化したゴールのみ（差分）を返させ、呼び出し側で現在の状態にマージする。
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set
+
+
+def build_scoring_rules(language: str = 'ja') -> str:
+    """ゴール判定・analysis・NPC感情/ジェスチャー・サジェストの出力ルールを取得"""
+    if language == 'en':
+        return """Goal evaluation rules:
+- For goalUpdates, use the exact goalId shown in [ID: xxx] above
+- Do NOT invent your own IDs. Always use the provided IDs exactly as shown
+- Include in goalUpdates ONLY goals newly achieved by the latest message (omit unchanged goals; use an empty list if none)
+
+Rules for "analysis" field:
+- Write 1-2 SHORT sentences only (max 120 characters)
+- Format: "[Score change reason]. [One actionable tip]."
+- Example: "Good rapport building, trust +1. Try mentioning specific product benefits next."
+- Do NOT write long explanations, bullet points, or section headers
+- Do NOT repeat the scores or goal list in the analysis
+
+NPC Emotion Estimation:
+- Estimate the NPC's current emotional state based on the conversation context
+- npcEmotion: one of "happy", "angry", "sad", "relaxed", "neutral"
+- npcEmotionIntensity: 0.0 (very weak) to 1.0 (very strong)
+- Consider: NPC personality, conversation flow, user's attitude, and score changes
+
+NPC Gesture Estimation:
+- Estimate the appropriate gesture for the NPC based on the conversation context
+- gesture: "nod" (nodding), "headTilt" (head tilt), "none" (no gesture)
+- Nod: Use when NPC shows agreement, understanding, or empathy
+- Head tilt: Use when NPC shows doubt, confusion, or is thinking
+- None: Default when no gesture is needed
+- Do not add a gesture every time. Use them at a natural frequency.
+
+Reply Suggestions:
+- Generate suggested replies that the SALES rep (the user) could say next
+- Base them on the NPC's latest message and the conversation flow
+- IMPORTANT: Consider the scenario context and goal hints when generating suggestions
+- Prioritize suggestions that help achieve unachieved goals
+- suggestions: an array of about 3 SHORT reply candidates (each max 40 characters)
+- Give them DIFFERENT directions (e.g., assertive / empathetic / question) so the choice changes the metrics
+- Write them as natural first-person utterances the sales rep would say
+- Do NOT include quotation marks or numbering"""
+    return """ゴール判定ルール:
+- goalUpdatesのgoalIdには、上記ゴール一覧の[ID: xxx]に記載されたIDをそのまま使用すること
+- 自分でIDを作成しないこと。必ず提供されたIDを使用すること
+- goalUpdatesには今回の発言で新たに達成されたゴールのみを含めること（変化のないゴールは含めず、なければ空配列）
+
+「analysis」フィールドのルール:
+- 1〜2文の短文のみ（最大120文字）
+- 形式: 「[スコア変動理由]。[次の一手のアドバイス]。」
+- 例: 「丁寧な挨拶で好印象。次は訪問目的を簡潔に伝えましょう。」
+- 長文の説明、箇条書き、見出しは禁止
+- スコアやゴール一覧をanalysisに繰り返さないこと
+
+NPC感情推定:
+- 会話の文脈からNPCの現在の感情状態を推定してください
+- npcEmotion: "happy", "angry", "sad", "relaxed", "neutral" のいずれか
+- npcEmotionIntensity: 0.0（非常に弱い）〜 1.0（非常に強い）
+- 考慮要素: NPCの性格、会話の流れ、ユーザーの態度、スコアの変化
+
+NPCジェスチャー推定:
+- 会話の文脈からNPCの適切なジェスチャーを推定してください
+- gesture: "nod"（うなずき）, "headTilt"（首かしげ）, "none"（なし） のいずれか
+- うなずき(nod): NPCが同意・理解・共感を示す場面で使用
+- 首かしげ(headTilt): NPCが疑問・困惑・考え中の場面で使用
+- なし(none): 特にジェスチャーが不要な場面（デフォルト）
+- 毎回ジェスチャーを付ける必要はありません。自然な頻度で使用してください
+
+返答候補（サジェスト）:
+- 営業担当者（ユーザー）が次に発言する返答候補を生成してください
+- NPCの直前の発言と会話の流れを踏まえること
+- 重要: シナリオの背景とゴールのヒントを考慮して提案を生成すること
+- 未達成のゴールの達成を助ける提案を優先すること
+- suggestions: 3件程度の短い返答候補の配列（各候補は最大40文字）
+- 各候補は異なる方向性（例: 強気 / 共感 / 質問）を持たせ、選択によってメトリクスが変化するようにすること
+- 営業担当者が実際に話す一人称の自然な発言として記述すること
+- 引用符や番号は付けないこと"""
+
+
+def format_goals(goals: List[Dict], language: str = 'ja') -> str:
+    """ゴールをフォーマット（IDを含めてLLMが正確なgoalIdを返せるようにする）"""
+    if not goals:
+        return "（ゴールなし）" if language == 'ja' else "(No goals)"
+    
+    achieved_label = '達成' if language == 'ja' else 'Achieved'
+    not_achieved_label = '未達成' if language == 'ja' else 'Not achieved'
+    hints_label = 'ヒント' if language == 'ja' else 'Hints'
+    criteria_label = '達成基準' if language == 'ja' else 'Criteria'
+    
+    lines = []
+    for goal in goals:
+        goal_id = goal.get('id', '')
+        description = goal.get('description', '')
+        achieved = goal.get('achieved', False)
+        status = achieved_label if achieved else not_achieved_label
+        lines.append(f"- [ID: {goal_id}] {description}: {status}")
+        
+        # 達成基準を含める（未達成ゴールのみ、サジェスト品質向上のため）
+        criteria = goal.get('criteria', [])
+        if criteria and not achieved:
+            lines.append(f"  {criteria_label}: {'; '.join(criteria)}")
+        
+        # ヒントを含める（未達成ゴールのみ、サジェスト品質向上のため）
+        hints = goal.get('hints', [])
+        if hints and not achieved:
+            lines.append(f"  {hints_label}: {'; '.join(hints)}")
+    
+    return "\n".join(lines)
+
+
+def apply_goal_statuses(goals: List[Dict], goal_statuses: List[Dict]) -> List[Dict]:
+    """goalsにgoalStatusesの達成状態をマージ（LLMが現在の状態を正確に把握できるようにする）"""
+    if goal_statuses:
+        status_map = {s.get('goalId', ''): s for s in goal_statuses}
+        for goal in goals:
+            status = status_map.get(goal.get('id', ''))
+            if status:
+                goal['achieved'] = status.get('achieved', False)
+    return goals
+
+
+# ASCII単語（2文字以上）と、日本語などは文字bigramで照合する
+_ASCII_TOKEN_PATTERN = re.compile(r'[a-z0-9]{2,}')
+_NON_ASCII_RUN_PATTERN = re.compile(r'[^\x00-\x7f\s、。！？「」（）・,.!?()]+')
+
+
+def _lexical_tokens(text: str) -> Set[str]:
+    lowered = (text or '').lower()
+    tokens = set(_ASCII_TOKEN_PATTERN.findall(lowered))
+    for run in _NON_ASCII_RUN_PATTERN.findall(lowered):
+        tokens.update(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+    return tokens
+
+
+def select_goals_for_prompt(goals: List[Dict], message: str, max_goals: Optional[int] = None) -> List[Dict]:
+    """プロンプトに含めるゴールを選択
+
+    達成済みのゴールは除外し、未達成のゴールを最新発言との語彙的な関連度
+    （説明・達成基準・ヒントとの共通トークン数）順に並べて上位 max_goals 件を返す。
+    関連度が同じ場合は必須ゴール、元の定義順を優先する。
+    """
+    message_tokens = _lexical_tokens(message)
+    ranked = []
+    for index, goal in enumerate(goals):
+        if goal.get('achieved', False):
+            continue
+        goal_text = ' '.join(
+            [goal.get('description', '')] + list(goal.get('criteria', [])) + list(goal.get('hints', []))
+        )
+        relevance = len(message_tokens & _lexical_tokens(goal_text))
+        ranked.append((-relevance, not goal.get('isRequired', False), index, goal))
+    ranked.sort(key=lambda entry: entry[:3])
+    selected = [entry[3] for entry in ranked]
+    return selected[:max_goals] if max_goals else selected
+
+
+def filter_goal_updates(goal_updates: List[Dict[str, Any]], goals: List[Dict]) -> List[Dict[str, Any]]:
+    """goalUpdatesから状態が変化したゴールのみを抽出（未知のIDと変化なしは除外）"""
+    current = {goal.get('id', ''): goal.get('achieved', False) for goal in goals}
+    return [
+        update for update in goal_updates
+        if update.get('goalId') in current and update.get('achieved', False) != current[update.get('goalId')]
+    ]
@@ -0,0 +1,111 @@
+"""
+統合モードのスコアリング結果の署名
+
+npc-conversation の統合モードで生成したスコアリング結果は、フロントエンドを経由して
+realtime-scoring に precomputedScoring として渡され、LLMスコアリングを省略する。
+クライアントが任意のスコアやゴール達成を送り込めないよう、npc-conversation が
+(sessionId, messageId, actorId, スコアリング結果) に HMAC-SHA256 署名を付け、
+realtime-scoring は署名が一致した結果だけを受け入れる（不一致・署名なしはLLMスコアリング）。
+
+署名鍵は JOINT_SCORING_SECRET_ARN のシークレットで、未設定の場合は署名も検証もしない
+（npc-conversation はscoringを返さず、realtime-scoring は常にLLMでスコアリングする）。
+
+スコアリング結果は ScoringResult で検証・正規化してから署名するため、JSONの往復で
+フィールドの順序や既定値の有無が変わっても同じ署名になる。
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from scoring_models import ScoringResult
+
+logger = logging.getLogger(__name__)
+
+JOINT_SCORING_SECRET_ARN = os.environ.get('JOINT_SCORING_SECRET_ARN', '')
+
+# precomputedScoring 内の署名フィールド名
+SIGNATURE_FIELD = 'signature'
+
+_signing_key: Optional[bytes] = None
+_signing_key_lock = threading.Lock()
+
+
+def get_signing_key() -> bytes:
+    """
+    署名鍵を取得（Secrets Managerから1回だけ読み込む）
+
+    Raises:
+        RuntimeError: JOINT_SCORING_SECRET_ARN が設定されていない場合
+    """
+    global _signing_key
+    if _signing_key is None:
+        with _signing_key_lock:
+            if _signing_key is None:
+                if not JOINT_SCORING_SECRET_ARN:
+                    raise RuntimeError("JOINT_SCORING_SECRET_ARN環境変数が設定されていません")
+                import boto3
+                region = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', 'us-west-2'))
+                secret = boto3.client('secretsmanager', region_name=region).get_secret_value(
+                    SecretId=JOINT_SCORING_SECRET_ARN
+                )['SecretString']
+                _signing_key = secret.encode('utf-8')
+    return _signing_key
+
+
+def _signature(session_id: str, message_id: str, actor_id: str, scoring: Dict[str, Any]) -> str:
+    message = json.dumps(
+        {'sessionId': session_id, 'messageId': message_id, 'actorId': actor_id, 'scoring': scoring},
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    ).encode('utf-8')
+    return hmac.new(get_signing_key(), message, hashlib.sha256).hexdigest()
+
+
+def sign_scoring(session_id: str, message_id: str, actor_id: str,
+                 scoring: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    スコアリング結果に署名を付ける（npc-conversation 用）
+
+    Returns:
+        署名付きのスコアリング結果。messageId がない、または署名鍵を取得できない場合はNone
+    """
+    if not session_id or not message_id:
+        return None
+    try:
+        normalized = ScoringResult.model_validate(scoring).model_dump()
+        return {**normalized, SIGNATURE_FIELD: _signature(session_id, message_id, actor_id, normalized)}
+    except Exception as e:
+        logger.warning(f"Failed to sign joint scoring result, omitting it: {e}")
+        return None
+
+
+def verify_scoring(session_id: str, message_id: str, actor_id: str,
+                   precomputed: Any) -> Optional[Dict[str, Any]]:
+    """
+    署名を検証してスコアリング結果を取得（realtime-scoring 用）
+
+    Returns:
+        検証済みのスコアリング結果。署名なし・不一致・形式不正・署名鍵なしの場合はNone
+    """
+    if not isinstance(precomputed, dict) or not precomputed:
+        return None
+    signature = precomputed.get(SIGNATURE_FIELD)
+    if not isinstance(signature, str) or not session_id or not message_id:
+        logger.warning("Unsigned precomputed scoring, falling back to LLM scoring")
+        return None
+    try:
+        normalized = ScoringResult.model_validate(
+            {key: value for key, value in precomputed.items() if key != SIGNATURE_FIELD}
+        ).model_dump()
+        expected = _signature(session_id, message_id, actor_id, normalized)
+    except Exception as e:
+        logger.warning(f"Invalid precomputed scoring, falling back to LLM scoring: {e}")
+        return None
+    if not hmac.compare_digest(signature, expected):
+        logger.warning(f"Precomputed scoring signature mismatch, falling back to LLM scoring (session={session_id})")
+        return None
+    return normalized
@@ -17,6 +17,7 @@ from strands.models import BedrockModel
 
 from prompts import build_feedback_prompt, create_default_feedback
 from models import FeedbackAnalysisResult
+from agent_runtime import AdmissionController, AdmissionRejectedError, admission_rejected_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +28,9 @@ AGENTCORE_MEMORY_ID = os.environ.get('AGENTCORE_MEMORY_ID', '')
 
 app = FastAPI(title="Feedback Analysis Agent", version="1.0.0")
 
+# Bedrock呼び出しをスレッドプールにオフロードし、同時受付数を制限する
+admission = AdmissionController.from_env('feedback-analysis', max_workers=2, max_queue=4, queue_timeout=120.0)
+
 _strands_agent = None
 _memory_client = None
 
@@ -251,8 +255,10 @@ async def invoke_agent(request: Request):
         else:
             payload = {}
         
-        result = handle_invocation(payload)
+        result = await admission.run(handle_invocation, payload)
         return {"output": result}
+    except AdmissionRejectedError as e:
+        return admission_rejected_response(e)
     except Exception as e:
         logger.error(f"Invocation error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -261,7 +267,11 @@ async def invoke_agent(request: Request):
 @app.get("/ping")
 async def ping():
     """ヘルスチェックエンドポイント"""
-    return {"status": "healthy", "memoryId": AGENTCORE_MEMORY_ID or "not_configured"}
+    return {
+        "status": "healthy",
+        "memoryId": AGENTCORE_MEMORY_ID or "not_configured",
+        "runtime": admission.stats(),
+    }
 
 
 if __name__ == "__main__":
@@ -8,20 +8,48 @@ Strands AgentsとBedrock Claude 4.5 Haikuを使用して応答を生成する。
 Session Managerはマルチモーダルメッセージを保存できないため使用しない。
 スライド画像はS3から取得してマルチモーダルで送信し、
 Memoryにはテキスト+スライドメタデータのみ保存する。
+
+ペイロードに "stream": true（またはAccept: text/event-stream）を指定すると、
+NPC応答のテキスト差分をSSEで逐次返すストリーミングモードで動作する。
+
+ペイロードに "jointScoring"（goals / goalStatuses / scenarioDescription）を指定すると、
+NPC応答とリアルタイムスコアリング結果を1回のstructured output呼び出しで生成する統合モードで動作する。
+構造化出力に失敗した場合は通常の応答生成にフォールバックし、scoringを返さない。
+scoring には realtime-scoring が検証する署名を付ける（scoring_signature.py 参照）。
+
+同じ messageId（または idempotencyKey）で再送された非ストリーミングのリクエストは、
+処理中なら同じ結果を待ち、完了済みならキャッシュから同じ応答を返す（Memoryへの二重記録を防ぐ）。
+ストリーミングモードは応答を逐次返すためリプレイの対象外。
 """
 
+import asyncio
+import copy
 import json
 import os
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 import boto3
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, AsyncIterator
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 from strands import Agent
 from strands.models import BedrockModel
 
-from prompts import build_npc_system_prompt, get_default_npc_info, get_default_emotion_params
+from prompts import (
+    build_npc_system_prompt_parts, build_history_summary_prompt, build_joint_scoring_section,
+    build_turn_context, get_default_npc_info, get_default_emotion_params,
+)
+from models import JointTurnResult
+from history_cache import ConversationHistoryCache
+from memory_writer import MemoryWriteBehind
+from slide_cache import SlideImageCache
+from model_pool import BedrockModelPool
+from history_window import HistoryPolicy, RollingSummarizer, SummaryCache, estimate_tokens
+from agent_runtime import AdmissionController, AdmissionRejectedError, admission_rejected_response
+from idempotency import IdempotentInvoker
+from scoring_signature import sign_scoring
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,45 +58,199 @@ AWS_REGION = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', '
 BEDROCK_MODEL = os.environ.get('BEDROCK_MODEL_CONVERSATION', 'global.anthropic.claude-haiku-4-5-20251001-v1:0')
 AGENTCORE_MEMORY_ID = os.environ.get('AGENTCORE_MEMORY_ID', '')
 SLIDE_BUCKET = os.environ.get('SLIDE_BUCKET', '')
+HISTORY_CACHE_MAX_SESSIONS = int(os.environ.get('HISTORY_CACHE_MAX_SESSIONS', '256'))
+HISTORY_CACHE_TTL_SECONDS = int(os.environ.get('HISTORY_CACHE_TTL_SECONDS', '1800'))
+MEMORY_WRITE_BEHIND = os.environ.get('MEMORY_WRITE_BEHIND', 'true').lower() == 'true'
+MEMORY_WRITE_QUEUE_SIZE = int(os.environ.get('MEMORY_WRITE_QUEUE_SIZE', '1000'))
+MEMORY_WRITE_WORKERS = int(os.environ.get('MEMORY_WRITE_WORKERS', '4'))
+MEMORY_WRITE_MAX_RETRIES = int(os.environ.get('MEMORY_WRITE_MAX_RETRIES', '3'))
+# キャッシュミス時、Memory読み込み前に未保存イベントの書き込み完了を待つ最大秒数
+MEMORY_WRITE_WAIT_SECONDS = float(os.environ.get('MEMORY_WRITE_WAIT_SECONDS', '5'))
+SLIDE_CACHE_MAX_BYTES = int(os.environ.get('SLIDE_CACHE_MAX_BYTES', str(100 * 1024 * 1024)))
+SLIDE_CACHE_REVALIDATE_SECONDS = int(os.environ.get('SLIDE_CACHE_REVALIDATE_SECONDS', '300'))
+# BedrockModelプールのサイズ（同時に処理できるターン数の上限）と空き待ちタイムアウト
+NPC_MODEL_POOL_SIZE = int(os.environ.get('NPC_MODEL_POOL_SIZE', '4'))
+NPC_MODEL_POOL_ACQUIRE_TIMEOUT = float(os.environ.get('NPC_MODEL_POOL_ACQUIRE_TIMEOUT', '30'))
+# 履歴ウィンドウ（直近ターンのみ原文で渡し、古いターンはローリング要約に畳み込む）
+HISTORY_WINDOW_ENABLED = os.environ.get('HISTORY_WINDOW_ENABLED', 'true').lower() == 'true'
+HISTORY_TOKEN_BUDGET = int(os.environ.get('HISTORY_TOKEN_BUDGET', '4000'))
+HISTORY_KEEP_TURNS = int(os.environ.get('HISTORY_KEEP_TURNS', '10'))
+HISTORY_SUMMARY_BATCH_TURNS = int(os.environ.get('HISTORY_SUMMARY_BATCH_TURNS', '4'))
+# ローリング要約の生成（応答返却後にバックグラウンドで実行）に使うモデルとワーカー数
+HISTORY_SUMMARY_MODEL = os.environ.get('HISTORY_SUMMARY_MODEL', BEDROCK_MODEL)
+HISTORY_SUMMARY_WORKERS = int(os.environ.get('HISTORY_SUMMARY_WORKERS', '2'))
+# Bedrockプロンプトキャッシュ（システムプロンプトと履歴プレフィックスの後にcachePointを置く）
+PROMPT_CACHE_ENABLED = os.environ.get('PROMPT_CACHE_ENABLED', 'true').lower() == 'true'
+# キャッシュ可能な最小トークン数の上書き（未設定の場合は BEDROCK_MODEL から判定する）。
+# ペルソナ部分がこれに満たない場合はシステムプロンプト直後のcachePointを置かない
+PROMPT_CACHE_MIN_TOKENS_OVERRIDE = os.environ.get('PROMPT_CACHE_MIN_TOKENS', '')
+# NPC応答とスコアリングの統合モード（シナリオ側でjointScoringEnabledを有効にした場合のみ使われる）
+JOINT_SCORING_ENABLED = os.environ.get('JOINT_SCORING_ENABLED', 'true').lower() == 'true'
+# 統合モードのプロンプトに含める未達成ゴールの最大件数（最新発言との関連度順）
+GOAL_PROMPT_MAX_GOALS = int(os.environ.get('GOAL_PROMPT_MAX_GOALS', '5'))
 
 app = FastAPI(title="NPC Conversation Agent", version="1.0.0")
 
+# Bedrock呼び出しをスレッドプールにオフロードし、同時受付数を制限する
+# （同時実行数はBedrockModelプールのサイズに合わせる）
+admission = AdmissionController.from_env('npc-conversation', max_workers=NPC_MODEL_POOL_SIZE, max_queue=8, queue_timeout=20.0)
+# 再送されたターン（同じmessageId）は処理中なら合流、完了済みならリプレイする
+idempotency = IdempotentInvoker.from_env('npc-conversation')
+
 # AgentCore Memoryクライアント（起動時に1回だけ初期化）
 ac_client = boto3.client('bedrock-agentcore', region_name=AWS_REGION) if AGENTCORE_MEMORY_ID else None
 s3_client = boto3.client('s3') if SLIDE_BUCKET else None
 
+# 会話履歴キャッシュ（同一コンテナでの連続ターンはMemoryを読み直さない）
+history_cache = ConversationHistoryCache(
+    max_sessions=HISTORY_CACHE_MAX_SESSIONS,
+    ttl_seconds=HISTORY_CACHE_TTL_SECONDS,
+)
+# ローリング要約の状態（{'text': 要約文, 'covered': 要約済みメッセージ数}）
+summary_cache = SummaryCache(max_sessions=HISTORY_CACHE_MAX_SESSIONS)
+history_policy = HistoryPolicy(
+    token_budget=HISTORY_TOKEN_BUDGET,
+    keep_turns=HISTORY_KEEP_TURNS,
+    summary_batch_turns=HISTORY_SUMMARY_BATCH_TURNS,
+)
+
+
+def create_bedrock_model() -> BedrockModel:
+    """NPC会話用のBedrockModelを生成"""
+    return BedrockModel(
+        model_id=BEDROCK_MODEL,
+        region_name=AWS_REGION,
+        temperature=0.7,
+        max_tokens=500,
+    )
+
+
+def create_summary_model() -> BedrockModel:
+    """ローリング要約用のBedrockModelを生成（同じ履歴から同じ要約を得るため温度0）"""
+    return BedrockModel(
+        model_id=HISTORY_SUMMARY_MODEL,
+        region_name=AWS_REGION,
+        temperature=0.0,
+        max_tokens=500,
+    )
+
+
+# BedrockModelプール（bedrock-runtimeクライアントをリクエスト間で再利用）
+model_pool = BedrockModelPool(
+    factory=create_bedrock_model,
+    size=NPC_MODEL_POOL_SIZE,
+    acquire_timeout=NPC_MODEL_POOL_ACQUIRE_TIMEOUT,
+)
+# 要約用のプール（会話用のプールを要約で占有しないよう分ける。サイズは要約ワーカー数）
+summary_model_pool = BedrockModelPool(
+    factory=create_summary_model,
+    size=HISTORY_SUMMARY_WORKERS,
+    acquire_timeout=NPC_MODEL_POOL_ACQUIRE_TIMEOUT,
+)
+try:
+    model_pool.warm()
+except Exception as e:
+    logger.warning(f"Failed to pre-warm Bedrock model pool: {e}")
+
 
 # ========================================
 # AgentCore Memory 手動管理
 # ========================================
 
-def load_conversation_history(session_id: str, actor_id: str) -> List[Dict]:
-    """AgentCore Memoryから会話履歴を復元（Strands Agentsのmessages形式）"""
+def fetch_memory_events(session_id: str, actor_id: str) -> List[Dict]:
+    """AgentCore Memoryからセッションの全イベントを古い順に取得
+
+    要約済み件数（covered）を履歴の先頭からの位置で扱うため、全ページを読む。
+    取得失敗時は例外を送出する（空履歴と区別してキャッシュしないため）。
+    """
+    events = []
+    kwargs = dict(memoryId=AGENTCORE_MEMORY_ID, actorId=actor_id, sessionId=session_id)
+    while True:
+        resp = ac_client.list_events(**kwargs)
+        events.extend(resp.get('events', []))
+        next_token = resp.get('nextToken')
+        if not next_token:
+            break
+        kwargs['nextToken'] = next_token
+    return list(reversed(events))  # 古い順に
+
+
+def decode_conversation_messages(events: List[Dict]) -> List[Dict]:
+    """Memoryイベントから会話履歴を復元（Strands Agentsのmessages形式）"""
+    messages = []
+    for ev in events:
+        for p in ev.get('payload', []):
+            if 'conversational' in p:
+                role = p['conversational']['role'].lower()
+                text = p['conversational'].get('content', {}).get('text', '')
+                if text:
+                    messages.append({'role': role, 'content': [{'text': text}]})
+    return messages
+
+
+def decode_summary_state(events: List[Dict]) -> Optional[Dict[str, Any]]:
+    """Memoryイベントから最新のローリング要約を復元"""
+    state = None
+    for ev in events:
+        for p in ev.get('payload', []):
+            blob = p.get('blob')
+            if isinstance(blob, str):
+                try:
+                    blob = json.loads(blob)
+                except json.JSONDecodeError:
+                    continue
+            if isinstance(blob, dict) and 'summary' in blob:
+                state = {'text': blob.get('summary', ''), 'covered': int(blob.get('coveredMessages', 0))}
+    return state
+
+
+def fetch_conversation_history(session_id: str, actor_id: str) -> List[Dict]:
+    """AgentCore Memoryから会話履歴を復元し、ローリング要約があれば要約キャッシュに格納"""
+    events = fetch_memory_events(session_id, actor_id)
+    messages = decode_conversation_messages(events)
+    summary_state = decode_summary_state(events)
+    if summary_state:
+        summary_cache.put(session_id, actor_id, summary_state)
+    logger.info(f"Loaded {len(messages)} messages from Memory" + (
+        f" (summary covers {summary_state['covered']})" if summary_state else ""))
+    return messages
+
+
+def load_conversation_history(session_id: str, actor_id: str, expected_version: Optional[int] = None) -> List[Dict]:
+    """会話履歴を取得（キャッシュヒット時はMemoryを呼ばない）
+
+    Args:
+        expected_version: クライアントが把握している履歴メッセージ数（前ターンのレスポンスの historyVersion）。
+            未指定またはキャッシュと不一致の場合はMemoryから再読み込みする。
+    """
     if not ac_client or not AGENTCORE_MEMORY_ID:
         return []
+
+    cached = history_cache.get(session_id, actor_id, expected_version)
+    if cached is not None:
+        logger.info(f"Loaded {len(cached)} messages from history cache")
+        return cached
+
+    # バックグラウンド保存中のイベントがあればMemoryに反映されるまで待つ
+    if memory_writer and not memory_writer.wait_for_session(session_id, actor_id, MEMORY_WRITE_WAIT_SECONDS):
+        logger.warning(f"Pending Memory writes not flushed within {MEMORY_WRITE_WAIT_SECONDS}s (session={session_id})")
+
     try:
-        resp = ac_client.list_events(
-            memoryId=AGENTCORE_MEMORY_ID, actorId=actor_id, sessionId=session_id
-        )
-        messages = []
-        for ev in reversed(resp.get('events', [])):  # 古い順に
-            for p in ev.get('payload', []):
-                if 'conversational' in p:
-                    role = p['conversational']['role'].lower()
-                    text = p['conversational'].get('content', {}).get('text', '')
-                    if text:
-                        messages.append({'role': role, 'content': [{'text': text}]})
-        logger.info(f"Loaded {len(messages)} messages from Memory")
-        return messages
+        messages = fetch_conversation_history(session_id, actor_id)
     except Exception as e:
         logger.warning(f"Failed to load conversation history: {e}")
         return []
+    history_cache.put(session_id, actor_id, messages)
+    return messages
 
 
 def save_conversation_event(session_id: str, actor_id: str, role: str, text: str,
-                            slide_pages: List[int] = None) -> bool:
+                            slide_pages: List[int] = None, event_timestamp: float = None) -> bool:
     """会話イベントをAgentCore Memoryに保存（スライドメタデータ付き）
 
+    event_timestamp を省略した場合は保存時刻を使用する。
+    ライトビハインド保存ではターン処理時の時刻を渡し、イベント順序を保つ。
+
     Returns:
         bool: 保存成功時True、失敗またはMemory無効時False
     """
@@ -79,7 +261,7 @@ def save_conversation_event(session_id: str, actor_id: str, role: str, text: str
             memoryId=AGENTCORE_MEMORY_ID,
             actorId=actor_id,
             sessionId=session_id,
-            eventTimestamp=time.time(),
+            eventTimestamp=event_timestamp if event_timestamp is not None else time.time(),
             payload=[{'conversational': {'content': {'text': text}, 'role': role}}],
         )
         if slide_pages:
@@ -95,6 +277,57 @@ def save_conversation_event(session_id: str, actor_id: str, role: str, text: str
         return False
 
 
+def save_summary_event(session_id: str, actor_id: str, summary: str, covered: int,
+                       event_timestamp: float = None) -> bool:
+    """ローリング要約をAgentCore Memoryに保存
+
+    会話履歴の復元（conversationalペイロードのみ対象）に混ざらないよう、blobペイロードで保存する。
+
+    Returns:
+        bool: 保存成功時True、失敗またはMemory無効時False
+    """
+    if not ac_client or not AGENTCORE_MEMORY_ID:
+        return False
+    try:
+        ac_client.create_event(
+            memoryId=AGENTCORE_MEMORY_ID,
+            actorId=actor_id,
+            sessionId=session_id,
+            eventTimestamp=event_timestamp if event_timestamp is not None else time.time(),
+            payload=[{'blob': json.dumps({'summary': summary, 'coveredMessages': covered}, ensure_ascii=False)}],
+            metadata={'eventType': {'stringValue': 'rolling_summary'}},
+        )
+        logger.info(f"Saved rolling summary to Memory (covers {covered} messages)")
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to save summary to Memory: {e}")
+        return False
+
+
+def write_memory_event(session_id: str, actor_id: str, **event) -> bool:
+    """イベント種別に応じてMemoryへ保存（会話イベント / ローリング要約）"""
+    if 'summary' in event:
+        return save_summary_event(session_id, actor_id, **event)
+    return save_conversation_event(session_id, actor_id, **event)
+
+
+def _on_memory_write_failure(session_id: str, actor_id: str) -> None:
+    """バックグラウンド保存失敗時、Memoryと乖離した履歴キャッシュを破棄"""
+    history_cache.invalidate(session_id, actor_id)
+
+
+# Memoryライトビハインド（USER/ASSISTANTイベントをレスポンス返却後に保存）
+memory_writer = MemoryWriteBehind(
+    write_fn=write_memory_event,
+    max_queue_size=MEMORY_WRITE_QUEUE_SIZE,
+    workers=MEMORY_WRITE_WORKERS,
+    max_retries=MEMORY_WRITE_MAX_RETRIES,
+    on_failure=_on_memory_write_failure,
+) if (ac_client and MEMORY_WRITE_BEHIND) else None
+if memory_writer:
+    memory_writer.start()
+
+
 # ========================================
 # マルチモーダルメッセージ構築
 # ========================================
@@ -103,12 +336,52 @@ def save_conversation_event(session_id: str, actor_id: str, role: str, text: str
 MAX_SLIDES_PER_MESSAGE = 5       # 同時送信スライド数の上限
 MAX_IMAGE_SIZE = 5 * 1024 * 1024          # 1画像あたり5MB上限
 MAX_TOTAL_IMAGE_BYTES = 15 * 1024 * 1024  # 合計15MB上限
+# Bedrock Converse APIで送信可能なモデル入力用画像形式
+MODEL_IMAGE_FORMATS = ('jpeg', 'webp', 'png')
+
+
+# スライド画像キャッシュと並列取得用スレッドプール（プロセス全体で共有）
+slide_cache = SlideImageCache(
+    max_bytes=SLIDE_CACHE_MAX_BYTES,
+    revalidate_seconds=SLIDE_CACHE_REVALIDATE_SECONDS,
+)
+slide_fetch_executor = ThreadPoolExecutor(max_workers=MAX_SLIDES_PER_MESSAGE, thread_name_prefix='slide-fetch')
+
+
+def fetch_slide_images(image_keys: List[str]) -> List[Any]:
+    """スライド画像をキャッシュ経由で並列取得
+
+    Returns:
+        image_keysと同じ順序のリスト。要素は画像バイト列、取得失敗時は例外オブジェクト
+    """
+    def fetch(image_key: str) -> Any:
+        try:
+            return slide_cache.get_or_fetch(s3_client, SLIDE_BUCKET, image_key)
+        except Exception as e:
+            return e
+
+    return list(slide_fetch_executor.map(fetch, image_keys))
+
+
+def resolve_slide_image(slide: Dict[str, Any]) -> tuple:
+    """送信に使用するスライド画像のS3キーと形式を決定
+
+    slideConvertが生成したモデル入力用画像（modelImageKey）があれば優先し、
+    なければフルサイズPNG（imageKey）を使用する。
+    """
+    model_key = slide.get('modelImageKey', '')
+    model_format = slide.get('modelImageFormat', 'jpeg')
+    if model_key and model_format in MODEL_IMAGE_FORMATS:
+        return model_key, model_format
+    return slide.get('imageKey', ''), 'png'
 
 
 def build_multimodal_message(user_message: str, presented_slides: list) -> list:
     """スライド画像付きマルチモーダルメッセージを構築（S3から取得）
 
-    上限チェック:
+    画像はモデル入力用の縮小版を優先し、プロセス内キャッシュになければS3から並列取得する。
+
+    上限チェック（提示順に判定）:
       - 同時送信スライド数: MAX_SLIDES_PER_MESSAGE
       - 1画像あたりサイズ: MAX_IMAGE_SIZE
       - 合計画像サイズ: MAX_TOTAL_IMAGE_BYTES
@@ -125,41 +398,42 @@ def build_multimodal_message(user_message: str, presented_slides: list) -> list:
 
     total_image_bytes = 0
     if s3_client and SLIDE_BUCKET:
-        for slide in slides_to_process:
+        resolved = [(slide, *resolve_slide_image(slide)) for slide in slides_to_process]
+        resolved = [(slide, key, fmt) for slide, key, fmt in resolved if key]
+        fetched = fetch_slide_images([key for _, key, _ in resolved])
+
+        for (slide, _, image_format), image_bytes in zip(resolved, fetched):
             page_number = slide.get('pageNumber', '?')
-            image_key = slide.get('imageKey', '')
-            if image_key:
-                try:
-                    resp = s3_client.get_object(Bucket=SLIDE_BUCKET, Key=image_key)
-                    image_bytes = resp['Body'].read()
-                    image_size = len(image_bytes)
-
-                    # 1画像あたりのサイズ上限チェック
-                    if image_size > MAX_IMAGE_SIZE:
-                        logger.warning(
-                            f"スライド{page_number}の画像サイズが上限超過: "
-                            f"{image_size} bytes > {MAX_IMAGE_SIZE} bytes, スキップ"
-                        )
-                        content_blocks.append({'text': f'[スライド{page_number} - 画像サイズ超過のためスキップ]'})
-                        continue
-
-                    # 合計画像サイズの上限チェック
-                    if total_image_bytes + image_size > MAX_TOTAL_IMAGE_BYTES:
-                        logger.warning(
-                            f"スライド{page_number}追加で合計画像サイズが上限超過: "
-                            f"{total_image_bytes + image_size} bytes > {MAX_TOTAL_IMAGE_BYTES} bytes, スキップ"
-                        )
-                        content_blocks.append({'text': f'[スライド{page_number} - 合計サイズ超過のためスキップ]'})
-                        continue
-
-                    content_blocks.append({
-                        'image': {'format': 'png', 'source': {'bytes': image_bytes}}
-                    })
-                    content_blocks.append({'text': f'[スライド{page_number}]'})
-                    total_image_bytes += image_size
-                    logger.info(f"Slide {page_number} loaded ({image_size} bytes, total: {total_image_bytes} bytes)")
-                except Exception as e:
-                    logger.warning(f"Slide {page_number} load failed: {e}")
+            if isinstance(image_bytes, Exception):
+                logger.warning(f"Slide {page_number} load failed: {image_bytes}")
+                continue
+
+            image_size = len(image_bytes)
+
+            # 1画像あたりのサイズ上限チェック
+            if image_size > MAX_IMAGE_SIZE:
+                logger.warning(
+                    f"スライド{page_number}の画像サイズが上限超過: "
+                    f"{image_size} bytes > {MAX_IMAGE_SIZE} bytes, スキップ"
+                )
+                content_blocks.append({'text': f'[スライド{page_number} - 画像サイズ超過のためスキップ]'})
+                continue
+
+            # 合計画像サイズの上限チェック
+            if total_image_bytes + image_size > MAX_TOTAL_IMAGE_BYTES:
+                logger.warning(
+                    f"スライド{page_number}追加で合計画像サイズが上限超過: "
+                    f"{total_image_bytes + image_size} bytes > {MAX_TOTAL_IMAGE_BYTES} bytes, スキップ"
+                )
+                content_blocks.append({'text': f'[スライド{page_number} - 合計サイズ超過のためスキップ]'})
+                continue
+
+            content_blocks.append({
+                'image': {'format': image_format, 'source': {'bytes': image_bytes}}
+            })
+            content_blocks.append({'text': f'[スライド{page_number}]'})
+            total_image_bytes += image_size
+            logger.info(f"Slide {page_number} loaded ({image_size} bytes, total: {total_image_bytes} bytes)")
     content_blocks.append({'text': user_message})
     return content_blocks
 
@@ -194,88 +468,472 @@ def extract_response_text(result) -> str:
     return str(result)
 
 
+# ========================================
+# プロンプトキャッシュ
+# ========================================
+
+CACHE_POINT_BLOCK = {'cachePoint': {'type': 'default'}}
+
+# モデルIDに含まれる文字列ごとのキャッシュ可能な最小トークン数（先に一致したものを使う）
+PROMPT_CACHE_MIN_TOKENS_BY_MODEL = (
+    ('claude-haiku-4-5', 4096),
+    ('claude-opus-4-5', 4096),
+    ('claude-3-5-haiku', 2048),
+    ('claude-3-haiku', 2048),
+    ('claude-sonnet-4', 1024),
+    ('claude-opus-4', 1024),
+    ('claude-3-7-sonnet', 1024),
+)
+# 不明なモデルは最も大きい値として扱う（キャッシュされないcachePointを置かない）
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = 4096
+
+
+def resolve_prompt_cache_min_tokens(model_id: str) -> int:
+    """モデルIDからキャッシュ可能な最小トークン数を取得（PROMPT_CACHE_MIN_TOKENS 設定時はその値）"""
+    if PROMPT_CACHE_MIN_TOKENS_OVERRIDE:
+        return int(PROMPT_CACHE_MIN_TOKENS_OVERRIDE)
+    for fragment, min_tokens in PROMPT_CACHE_MIN_TOKENS_BY_MODEL:
+        if fragment in model_id:
+            return min_tokens
+    return DEFAULT_PROMPT_CACHE_MIN_TOKENS
+
+
+PROMPT_CACHE_MIN_TOKENS = resolve_prompt_cache_min_tokens(BEDROCK_MODEL)
+
+
+def build_cached_system_prompt(persona_section: str) -> List[Dict[str, Any]]:
+    """ペルソナ部分のシステムプロンプトを構築（最小キャッシュトークン数以上なら直後にcachePointを置く）
+
+    ペルソナ・指示はシナリオ内で不変のため、履歴が短いうちもこの部分はキャッシュヒットする。
+    最小トークン数に満たないcachePointはキャッシュされないため置かず、履歴末尾のcachePointに任せる。
+    """
+    if estimate_tokens(persona_section) < PROMPT_CACHE_MIN_TOKENS:
+        return [{'text': persona_section}]
+    return [{'text': persona_section}, dict(CACHE_POINT_BLOCK)]
+
+
+def add_history_cache_point(history_window: List[Dict]) -> None:
+    """履歴の末尾（前ターンまでの安定したプレフィックス）にcachePointを追加
+
+    次ターンでは同じプレフィックスの後にこのターンの発話が続くため、キャッシュを読み出せる。
+    history_window はリクエスト専用のコピーであり、Memoryやキャッシュには影響しない。
+    """
+    if history_window:
+        history_window[-1]['content'].append(dict(CACHE_POINT_BLOCK))
+
+
+def extract_usage(result) -> Optional[Dict[str, int]]:
+    """Strands Agentsの結果からトークン使用量（キャッシュ読み書き含む）を取得"""
+    metrics = getattr(result, 'metrics', None)
+    usage = getattr(metrics, 'accumulated_usage', None)
+    if not usage:
+        return None
+    return {
+        key: int(usage.get(key, 0) or 0)
+        for key in ('inputTokens', 'outputTokens', 'cacheReadInputTokens', 'cacheWriteInputTokens')
+    }
+
+
 # ========================================
 # メイン処理
 # ========================================
 
+def summarize_history(previous_summary: str, messages: List[Dict], language: str) -> str:
+    """古いターンを既存の要約に畳み込んだ新しい要約を生成（要約ワーカーで実行）"""
+    prompt = build_history_summary_prompt(previous_summary, messages, language)
+    with summary_model_pool.lease() as model:
+        summarizer = Agent(model=model, callback_handler=None)
+        return extract_response_text(summarizer(prompt)).strip()
+
+
+def save_rolling_summary(session_id: str, actor_id: str, state: Dict[str, Any]) -> None:
+    """更新したローリング要約をMemoryに保存（ライトビハインド有効時はキューに投入）"""
+    event = {'summary': state['text'], 'covered': state['covered'], 'event_timestamp': time.time()}
+    if memory_writer and memory_writer.submit(session_id, actor_id, [event]):
+        return
+    save_summary_event(session_id, actor_id, **event)
+
+
+# ローリング要約（要約の更新は応答返却後にバックグラウンドで行い、次のターンで使う）
+rolling_summarizer = RollingSummarizer(
+    summarize_fn=summarize_history,
+    cache=summary_cache,
+    policy=history_policy,
+    workers=HISTORY_SUMMARY_WORKERS,
+    on_update=save_rolling_summary,
+)
+
+
+def schedule_summary_refresh(turn: Dict[str, Any], npc_response: str, memory_state: Dict[str, Any]) -> None:
+    """このターンを含む履歴で要約の更新が必要ならバックグラウンドで開始
+
+    要約済み件数はMemory上の履歴の位置で表すため、ターンを保存できた（または保存待ちの）場合のみ行う。
+    """
+    if not HISTORY_WINDOW_ENABLED or 'historyVersion' not in memory_state:
+        return
+    history = turn['history'] + build_turn_messages(turn, npc_response)
+    rolling_summarizer.schedule(turn['session_id'], turn['actor_id'], history, turn['language'])
+
+
+def create_turn_agent(model: BedrockModel, persona_section: str, history_window: List[Dict]) -> Agent:
+    """システムプロンプト（ペルソナ部分）と履歴を注入したAgentを作成
+
+    感情状態などの可変部分は build_turn_content でこのターンの発話に添える。
+    """
+    system_prompt = build_cached_system_prompt(persona_section) if PROMPT_CACHE_ENABLED else persona_section
+    # Agentはリクエスト毎に生成し、システムプロンプトと履歴をこのターン専用に注入する
+    return Agent(model=model, system_prompt=system_prompt, messages=history_window)
+
+
+def build_turn_content(context_text: str, message_blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """会話状況のテキストを先頭に置いたこのターンの送信メッセージを構築
+
+    履歴末尾のcachePointより後ろに置くため、感情状態が変わっても履歴のキャッシュは無効にならない。
+    Memoryにはユーザーの発話のみを保存する。
+    """
+    return [{'text': context_text}, *message_blocks]
+
+
+def prepare_turn(payload: Dict[str, Any], model: BedrockModel,
+                 joint_scoring: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """1ターン分の呼び出しコンテキストを準備（プロンプト生成・履歴復元・Agent作成）
+
+    同期モードとストリーミングモードで共通の前処理。
+    model はプールから借りたもので、ターンの生成完了まで呼び出し側が保持する。
+    joint_scoring を指定すると、統合モード用のAgent（joint_agent）も作成する。
+    通常のAgentと履歴を共有しないため、統合モード失敗時は agent でそのまま再生成できる。
+    """
+    user_message = payload.get('message', 'こんにちは')
+    npc_info = payload.get('npcInfo', get_default_npc_info())
+    emotion_params = payload.get('emotionParams', get_default_emotion_params())
+    language = payload.get('language', 'ja')
+    session_id = payload.get('sessionId', '')
+    actor_id = payload.get('actorId', payload.get('userId', 'default_user'))
+    presented_slides = payload.get('presentedSlides', [])
+
+    logger.info(f"Session: {session_id}, Actor: {actor_id}, Message: {user_message[:50]}..., Slides: {len(presented_slides)}")
+
+    # 会話履歴をAgentCore Memoryから手動復元
+    history_version = payload.get('historyVersion')
+    history = load_conversation_history(
+        session_id, actor_id, int(history_version) if history_version is not None else None
+    )
+
+    # 直近ターンのみ原文で渡し、古いターンは要約に畳み込む（要約の更新はこのターンの応答後に行う）
+    history_window, conversation_summary = history, ''
+    if HISTORY_WINDOW_ENABLED and history:
+        history_window, conversation_summary = rolling_summarizer.window(session_id, actor_id, history)
+
+    # プロンプト生成（ペルソナはシステムプロンプト、スライドコンテキスト・会話要約はこのターンの発話に添える）
+    persona_section, state_section = build_npc_system_prompt_parts(
+        npc_info=npc_info,
+        emotion_params=emotion_params,
+        language=language,
+        presented_slides=presented_slides,
+        conversation_summary=conversation_summary,
+    )
+    if PROMPT_CACHE_ENABLED:
+        add_history_cache_point(history_window)
+
+    # エージェント作成（Session Managerなし、会話履歴はmessagesで渡す）
+    joint_agent = None
+    if joint_scoring:
+        joint_agent = create_turn_agent(model, persona_section, copy.deepcopy(history_window))
+    agent = create_turn_agent(model, persona_section, history_window)
+
+    # 送信メッセージ（スライドがあればマルチモーダル、構築失敗時はテキストのみ）
+    text_blocks = [{'text': user_message}]
+    message_blocks = text_blocks
+    if presented_slides:
+        try:
+            message_blocks = build_multimodal_message(user_message, presented_slides)
+            logger.info(f"Sending multimodal message with {len(presented_slides)} slides")
+        except Exception as mm_error:
+            logger.warning(f"Multimodal build failed, falling back to text: {mm_error}")
+    else:
+        logger.info(f"Sending text message: {user_message}")
+
+    turn_context = build_turn_context(state_section, language)
+    joint_message_content = None
+    if joint_agent:
+        joint_context = build_turn_context(state_section + build_joint_scoring_section(
+            joint_scoring, language, user_message, GOAL_PROMPT_MAX_GOALS
+        ), language)
+        joint_message_content = build_turn_content(joint_context, message_blocks)
+
+    return {
+        'agent': agent,
+        'joint_agent': joint_agent,
+        'message_content': build_turn_content(turn_context, message_blocks),
+        'joint_message_content': joint_message_content,
+        # マルチモーダル送信に失敗した場合のテキストのみの送信メッセージ（マルチモーダルでなければNone）
+        'text_message_content': (
+            build_turn_content(turn_context, text_blocks) if message_blocks is not text_blocks else None
+        ),
+        'user_message': user_message,
+        'session_id': session_id,
+        'actor_id': actor_id,
+        'presented_slides': presented_slides,
+        'language': language,
+        'history': history,
+        'history_version': len(history),
+    }
+
+
+def persist_turn(turn: Dict[str, Any], npc_response: str) -> Dict[str, Any]:
+    """ターンの発話をAgentCore Memoryに保存し、レスポンス用のMemory状態を返す
+
+    ライトビハインド有効時はキューに投入して即座に返り、memorySyncStatusは'pending'となる。
+    前ターンの保存結果は previousMemorySyncStatus として報告する。
+    キューが満杯の場合は同期保存にフォールバックする。
+    保存できた（または保存待ちの）場合は、このターンを含む履歴メッセージ数を historyVersion として返す。
+    """
+    presented_slides = turn['presented_slides']
+    slide_pages = [s.get('pageNumber') for s in presented_slides] if presented_slides else None
+    memory_enabled = bool(AGENTCORE_MEMORY_ID)
+
+    if not memory_enabled:
+        return {
+            'memoryEnabled': memory_enabled,
+            'memorySyncStatus': 'disabled',
+        }
+
+    session_id, actor_id = turn['session_id'], turn['actor_id']
+    now = time.time()
+    events = [
+        {'role': 'USER', 'text': turn['user_message'], 'slide_pages': slide_pages, 'event_timestamp': now},
+        # USERより後の時刻にして、Memory上の順序を保証する
+        {'role': 'ASSISTANT', 'text': npc_response, 'event_timestamp': now + 0.001},
+    ]
+
+    if memory_writer:
+        previous_status = memory_writer.last_status(session_id, actor_id)
+        if memory_writer.submit(session_id, actor_id, events):
+            # 保存は未完了だが、同一コンテナの次ターンのために先にキャッシュへ追記する
+            update_history_cache(turn, npc_response, True)
+            memory_state = {
+                'memoryEnabled': memory_enabled,
+                'memorySyncStatus': 'pending',
+                'historyVersion': turn['history_version'] + len(build_turn_messages(turn, npc_response)),
+            }
+            if previous_status:
+                memory_state['previousMemorySyncStatus'] = previous_status
+            return memory_state
+
+    saved = [write_memory_event(session_id, actor_id, **event) for event in events]
+    # 全て成功: 'ok', 1件以上失敗: 'partial_failure'
+    memory_sync_status = 'ok' if all(saved) else 'partial_failure'
+    update_history_cache(turn, npc_response, memory_sync_status == 'ok')
+
+    memory_state = {
+        'memoryEnabled': memory_enabled,
+        'memorySyncStatus': memory_sync_status,
+    }
+    if memory_sync_status == 'ok':
+        memory_state['historyVersion'] = turn['history_version'] + len(build_turn_messages(turn, npc_response))
+    return memory_state
+
+
+def build_turn_messages(turn: Dict[str, Any], npc_response: str) -> List[Dict]:
+    """Memoryに保存した内容（テキストのみ）と同じ履歴メッセージを構築
+
+    Memory復元時と同様、空テキストのメッセージは含めない。
+    """
+    return [
+        {'role': role, 'content': [{'text': text}]}
+        for role, text in (('user', turn['user_message']), ('assistant', npc_response))
+        if text
+    ]
+
+
+def update_history_cache(turn: Dict[str, Any], npc_response: str, saved: bool) -> None:
+    """保存結果に合わせて履歴キャッシュを更新
+
+    Memoryに保存した内容（テキストのみ）と同じメッセージを追記する。
+    保存に失敗した場合はMemoryと乖離しないようエントリを破棄する。
+    """
+    session_id, actor_id = turn['session_id'], turn['actor_id']
+    if not saved:
+        history_cache.invalidate(session_id, actor_id)
+        return
+    history_cache.append(
+        session_id, actor_id, build_turn_messages(turn, npc_response), base_version=turn['history_version']
+    )
+
+
+def build_success_response(turn: Dict[str, Any], npc_response: str, memory_state: Dict[str, Any],
+                           usage: Optional[Dict[str, int]] = None,
+                           scoring: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """成功レスポンスを構築（usageにはプロンプトキャッシュのヒット/書き込みトークン数を含む）
+
+    統合モードで生成したスコアリング結果は scoring（ScoringResultの各フィールド）として返す。
+    """
+    response = {
+        'success': True,
+        'message': npc_response,
+        'sessionId': turn['session_id'],
+        **memory_state,
+    }
+    if usage:
+        response['usage'] = usage
+    if scoring:
+        response['scoring'] = scoring
+    return response
+
+
+def build_error_response() -> Dict[str, Any]:
+    """エラーレスポンスを構築"""
+    return {
+        'success': False,
+        'error': 'AGENT_ERROR',
+        'message': '会話処理中にエラーが発生しました'
+    }
+
+
+def run_joint_turn(turn: Dict[str, Any]) -> Optional[tuple]:
+    """統合モードでNPC応答とスコアリング結果を1回の呼び出しで生成
+
+    Returns:
+        (NPC応答, スコアリング結果, usage)。構造化出力に失敗した場合はNone
+    """
+    try:
+        result = turn['joint_agent'](turn['joint_message_content'], structured_output_model=JointTurnResult)
+        joint_result: JointTurnResult = result.structured_output
+        npc_response = joint_result.response.strip() if joint_result else ''
+        if not npc_response:
+            raise ValueError('empty response in structured output')
+        return npc_response, joint_result.scoring.model_dump(), extract_usage(result)
+    except Exception as e:
+        logger.warning(f"Joint reply+scoring failed, falling back to reply only: {e}")
+        return None
+
+
 def handle_invocation(payload: Dict[str, Any]) -> Dict[str, Any]:
     """エージェント呼び出しを処理"""
     try:
         logger.info("NPC会話エージェント呼び出し")
+        joint_scoring = payload.get('jointScoring') if JOINT_SCORING_ENABLED else None
+        with model_pool.lease() as model:
+            turn = prepare_turn(payload, model, joint_scoring)
+            joint_output = run_joint_turn(turn) if turn['joint_agent'] else None
 
-        user_message = payload.get('message', 'こんにちは')
-        npc_info = payload.get('npcInfo', get_default_npc_info())
-        emotion_params = payload.get('emotionParams', get_default_emotion_params())
-        language = payload.get('language', 'ja')
-        session_id = payload.get('sessionId', '')
-        actor_id = payload.get('actorId', payload.get('userId', 'default_user'))
-        presented_slides = payload.get('presentedSlides', [])
-
-        logger.info(f"Session: {session_id}, Actor: {actor_id}, Message: {user_message[:50]}..., Slides: {len(presented_slides)}")
-
-        # システムプロンプト生成（スライドコンテキスト含む）
-        system_prompt = build_npc_system_prompt(
-            npc_info=npc_info,
-            emotion_params=emotion_params,
-            language=language,
-            presented_slides=presented_slides
-        )
+            if joint_output:
+                npc_response, scoring, usage = joint_output
+            else:
+                agent = turn['agent']
+                scoring = None
 
-        # 会話履歴をAgentCore Memoryから手動復元
-        history = load_conversation_history(session_id, actor_id)
+                # メッセージ送信
+                try:
+                    result = agent(turn['message_content'])
+                except Exception as mm_error:
+                    if turn['text_message_content'] is None:
+                        raise
+                    logger.warning(f"Multimodal failed, falling back to text: {mm_error}")
+                    result = agent(turn['text_message_content'])
 
-        # エージェント作成（Session Managerなし、会話履歴はmessagesで渡す）
-        model = BedrockModel(
-            model_id=BEDROCK_MODEL,
-            region_name=AWS_REGION,
-            temperature=0.7,
-            max_tokens=500,
-        )
-        agent = Agent(model=model, system_prompt=system_prompt, messages=history)
+                npc_response = extract_response_text(result)
+                usage = extract_usage(result)
 
-        # メッセージ送信
-        if presented_slides:
+        if scoring is not None:
+            # フロントエンド経由で realtime-scoring に渡されるため、改ざんを検出できるよう署名する
+            scoring = sign_scoring(turn['session_id'], payload.get('messageId', ''), turn['actor_id'], scoring)
+        logger.info(f"NPC応答生成完了: {len(npc_response)}文字, usage={usage}, jointScoring={scoring is not None}")
+
+        # AgentCore Memoryに手動保存（テキスト+スライドメタデータ）
+        memory_state = persist_turn(turn, npc_response)
+        schedule_summary_refresh(turn, npc_response, memory_state)
+        return build_success_response(turn, npc_response, memory_state, usage, scoring)
+
+    except Exception as e:
+        logger.error(f"NPC会話エージェントエラー: {e}", exc_info=True)
+        return build_error_response()
+
+
+# ========================================
+# ストリーミング処理
+# ========================================
+
+def format_sse_event(event: Dict[str, Any]) -> str:
+    """SSEのdata行を生成"""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def stream_invocation(payload: Dict[str, Any]) -> AsyncIterator[str]:
+    """エージェント呼び出しをストリーミングで処理（SSE）
+
+    Bedrockが生成したテキスト差分を {"type": "delta", "text": ...} として逐次送信し、
+    ストリーム終了後にMemoryへ保存してから {"type": "complete", "output": {...}} を送信する。
+    completeのoutputは同期モードのレスポンスと同じ形式。
+    """
+    try:
+        logger.info("NPC会話エージェント呼び出し（ストリーミング）")
+        # モデル確保・Memory読み込み・S3取得はブロッキングのためスレッドで実行
+        model = await asyncio.to_thread(model_pool.acquire)
+        try:
+            turn = await asyncio.to_thread(prepare_turn, payload, model)
+            agent = turn['agent']
+
+            chunks: List[str] = []
+            final_result = None
             try:
-                message_content = build_multimodal_message(user_message, presented_slides)
-                logger.info(f"Sending multimodal message with {len(presented_slides)} slides")
-                result = agent(message_content)
+                async for event in agent.stream_async(turn['message_content']):
+                    text = event.get('data') if isinstance(event, dict) else None
+                    if text:
+                        chunks.append(text)
+                        yield format_sse_event({'type': 'delta', 'text': text})
+                    elif isinstance(event, dict) and 'result' in event:
+                        final_result = event['result']
             except Exception as mm_error:
-                logger.warning(f"Multimodal failed, falling back to text: {mm_error}")
-                result = agent(user_message)
-        else:
-            logger.info(f"Sending text message: {user_message}")
-            result = agent(user_message)
+                # 差分送信前のマルチモーダル失敗時のみテキストでリトライ
+                if chunks or turn['text_message_content'] is None:
+                    raise
+                logger.warning(f"Multimodal stream failed, falling back to text: {mm_error}")
+                async for event in agent.stream_async(turn['text_message_content']):
+                    text = event.get('data') if isinstance(event, dict) else None
+                    if text:
+                        chunks.append(text)
+                        yield format_sse_event({'type': 'delta', 'text': text})
+                    elif isinstance(event, dict) and 'result' in event:
+                        final_result = event['result']
+        finally:
+            model_pool.release(model)
+
+        npc_response = ''.join(chunks)
+        usage = extract_usage(final_result)
+        logger.info(f"NPC応答ストリーミング完了: {len(npc_response)}文字, usage={usage}")
+
+        # ストリーム終了後にAgentCore Memoryへ保存
+        memory_state = await asyncio.to_thread(persist_turn, turn, npc_response)
+        schedule_summary_refresh(turn, npc_response, memory_state)
+        yield format_sse_event({
+            'type': 'complete',
+            'output': build_success_response(turn, npc_response, memory_state, usage),
+        })
 
-        npc_response = extract_response_text(result)
-        logger.info(f"NPC応答生成完了: {len(npc_response)}文字")
+    except Exception as e:
+        logger.error(f"NPC会話エージェントエラー（ストリーミング）: {e}", exc_info=True)
+        yield format_sse_event({'type': 'error', 'output': build_error_response()})
 
-        # AgentCore Memoryに手動保存（テキスト+スライドメタデータ）
-        slide_pages = [s.get('pageNumber') for s in presented_slides] if presented_slides else None
-        memory_enabled = bool(AGENTCORE_MEMORY_ID)
-
-        if memory_enabled:
-            user_saved = save_conversation_event(session_id, actor_id, 'USER', user_message, slide_pages)
-            assistant_saved = save_conversation_event(session_id, actor_id, 'ASSISTANT', npc_response)
-            # 両方成功: 'ok', 片方以上失敗: 'partial_failure'
-            memory_sync_status = 'ok' if (user_saved and assistant_saved) else 'partial_failure'
-        else:
-            memory_sync_status = 'disabled'
 
-        return {
-            'success': True,
-            'message': npc_response,
-            'sessionId': session_id,
-            'memoryEnabled': memory_enabled,
-            'memorySyncStatus': memory_sync_status,
-        }
+async def admitted_stream(payload: Dict[str, Any]) -> AsyncIterator[str]:
+    """ストリーミング処理の完了まで受付枠を保持する（admit済みであること）"""
+    started_at = time.monotonic()
+    try:
+        async for chunk in stream_invocation(payload):
+            yield chunk
+    finally:
+        admission.release(time.monotonic() - started_at)
 
-    except Exception as e:
-        logger.error(f"NPC会話エージェントエラー: {e}", exc_info=True)
-        return {
-            'success': False,
-            'error': 'AGENT_ERROR',
-            'message': '会話処理中にエラーが発生しました'
-        }
+
+def wants_streaming(request: Request, payload: Dict[str, Any]) -> bool:
+    """ストリーミングモードが要求されているか判定
+
+    ペイロードの "stream": true、またはAcceptヘッダーの text/event-stream で有効化する。
+    """
+    if payload.get('stream') is True:
+        return True
+    return 'text/event-stream' in request.headers.get('accept', '')
 
 
 @app.post("/invocations")
@@ -300,8 +958,13 @@ async def invoke_agent(request: Request):
             payload = {}
 
         logger.info(f"処理ペイロード: {json.dumps(payload, ensure_ascii=False, default=str)[:500]}")
-        result = handle_invocation(payload)
+        if wants_streaming(request, payload):
+            admission.admit()
+            return StreamingResponse(admitted_stream(payload), media_type="text/event-stream")
+        result = await idempotency.run(payload, lambda: admission.run(handle_invocation, payload))
         return {"output": result}
+    except AdmissionRejectedError as e:
+        return admission_rejected_response(e)
     except Exception as e:
         logger.error(f"Invocation error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -310,7 +973,24 @@ async def invoke_agent(request: Request):
 @app.get("/ping")
 async def ping():
     """ヘルスチェックエンドポイント"""
-    return {"status": "healthy", "memoryId": AGENTCORE_MEMORY_ID or "not_configured"}
+    return {
+        "status": "healthy",
+        "memoryId": AGENTCORE_MEMORY_ID or "not_configured",
+        "historyCache": history_cache.stats(),
+        "memoryWriter": memory_writer.stats() if memory_writer else None,
+        "slideCache": slide_cache.stats(),
+        "modelPool": model_pool.stats(),
+        "historySummary": rolling_summarizer.stats(),
+        "runtime": admission.stats(),
+        "idempotency": idempotency.stats(),
+    }
+
+
+@app.on_event("shutdown")
+def flush_memory_writes():
+    """コンテナ停止時に未保存のMemoryイベントを書き出す"""
+    if memory_writer and not memory_writer.flush(timeout=MEMORY_WRITE_WAIT_SECONDS):
+        logger.warning("Memory write-behind queue was not fully flushed before shutdown")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+"""
+NPC会話履歴のプロセス内キャッシュ
+
+AgentCore Memoryから復元したStrands Agentsのmessagesを
+(sessionId, actorId) 単位でLRU+TTL管理する。
+同一コンテナが連続ターンを処理する場合、Memoryへの list_events と
+全履歴の再デコードを省略できる。
+
+バージョンはキャッシュ中のメッセージ数。エージェントはターンごとに historyVersion として
+クライアントへ返し、クライアントは次のターンで送り返す。別コンテナでターンが進んだ場合は
+バージョンが一致しないため、キャッシュミスとして扱いMemoryから再読み込みさせる。
+バージョンが送られない場合も、他コンテナでの更新を検知できないためキャッシュは使わない。
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class ConversationHistoryCache:
+    """(sessionId, actorId) をキーとする会話履歴のLRU+TTLキャッシュ"""
+
+    def __init__(self, max_sessions: int = 256, ttl_seconds: float = 1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str, actor_id: str, expected_version: Optional[int]) -> Optional[List[Dict]]:
+        """キャッシュ済み履歴のコピーを取得
+
+        Args:
+            expected_version: クライアントが把握している履歴メッセージ数（不明な場合はNone）
+
+        Returns:
+            履歴のコピー。未キャッシュ・期限切れ・バージョン不明・バージョン不一致の場合はNone
+        """
+        key = (session_id, actor_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or expected_version is None:
+                self.misses += 1
+                return None
+
+            stored_at, messages = entry
+            expired = time.monotonic() - stored_at > self.ttl_seconds
+            mismatched = expected_version != len(messages)
+            if expired or mismatched:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Agentがmessagesを直接変更するため、キャッシュ本体は渡さない
+            return copy.deepcopy(messages)
+
+    def put(self, session_id: str, actor_id: str, messages: List[Dict]) -> None:
+        """Memoryから復元した履歴をキャッシュに格納"""
+        key = (session_id, actor_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(messages))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def append(self, session_id: str, actor_id: str, new_messages: List[Dict], base_version: int) -> bool:
+        """ターン完了後にメッセージを追記
+
+        キャッシュのバージョンが base_version と一致しない場合
+        （並行ターンや期限切れ）はエントリを破棄し、次回Memoryから再読み込みさせる。
+
+        Returns:
+            bool: 追記できた場合True
+        """
+        key = (session_id, actor_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+
+            _, messages = entry
+            if len(messages) != base_version:
+                del self._entries[key]
+                return False
+
+            messages.extend(copy.deepcopy(new_messages))
+            self._entries[key] = (time.monotonic(), messages)
+            self._entries.move_to_end(key)
+            return True
+
+    def invalidate(self, session_id: str, actor_id: str) -> None:
+        """エントリを破棄"""
+        with self._lock:
+            self._entries.pop((session_id, actor_id), None)
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュ統計を取得"""
+        with self._lock:
+            return {'sessions': len(self._entries), 'hits': self.hits, 'misses': self.misses}
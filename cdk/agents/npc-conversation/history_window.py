@@ -0,0 +1,222 @@
+"""
+NPC会話履歴のウィンドウ管理（トークン予算 + ローリング要約）
+
+直近 keep_turns ターンを原文のまま残し、それより古いターンは要約に畳み込む。
+要約は summary_batch_turns ターン分たまるごとにまとめて更新するため、
+要約生成のLLM呼び出しは毎ターンではなく数ターンに1回となる。
+原文部分がトークン予算を超える場合は、予算内に収まるまで古いターンを追加で畳み込む。
+
+要約状態は {'text': 要約文, 'covered': 要約済みメッセージ数} の辞書で表す。
+covered は会話履歴（古い順）の先頭からの件数。
+
+要約の更新（LLM呼び出し）はターンの応答を返した後に RollingSummarizer がバックグラウンドで行い、
+次のターンがその結果を使う。要約が間に合わない・失敗した場合は、要約済みの範囲を超えた
+古いターンを切り捨ててトークン予算を守る（要約は次の更新で追いつく）。
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """テキストのトークン数を概算
+
+    日本語などの非ASCII文字は1文字≒1トークン、ASCIIは4文字≒1トークンとして数える。
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_count = len(text) - non_ascii
+    return non_ascii + (ascii_count + 3) // 4
+
+
+def estimate_messages_tokens(messages: List[Dict]) -> int:
+    """Strands Agentsのmessages全体のトークン数を概算（テキストブロックのみ）"""
+    total = 0
+    for message in messages:
+        for block in message.get('content', []):
+            if isinstance(block, dict):
+                total += estimate_tokens(block.get('text', ''))
+    return total
+
+
+class HistoryPolicy:
+    """履歴ウィンドウの設定
+
+    Args:
+        token_budget: 原文で渡す履歴の概算トークン上限
+        keep_turns: 原文で残す直近ターン数（1ターン = user + assistant）
+        summary_batch_turns: 要約をまとめて更新するターン数
+    """
+
+    def __init__(self, token_budget: int = 4000, keep_turns: int = 10, summary_batch_turns: int = 4):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summary_batch_turns = summary_batch_turns
+
+
+def plan_summary_boundary(messages: List[Dict], covered: int, policy: HistoryPolicy) -> int:
+    """要約に畳み込むべき境界（新しいcovered）を計算
+
+    畳み込み不要な場合は covered をそのまま返す。
+    境界は常にuserメッセージの位置に揃え、原文部分がuserから始まるようにする。
+    """
+    covered = min(max(covered, 0), len(messages))
+    keep_messages = policy.keep_turns * 2
+    batch_messages = policy.summary_batch_turns * 2
+    verbatim = messages[covered:]
+
+    over_turns = len(verbatim) > keep_messages + batch_messages
+    over_budget = estimate_messages_tokens(verbatim) > policy.token_budget
+    if not over_turns and not over_budget:
+        return covered
+
+    boundary = max(covered, len(messages) - keep_messages)
+    # 予算超過時は直近1ターンを残すところまで古い方から畳み込む
+    while boundary < len(messages) - 2 and estimate_messages_tokens(messages[boundary:]) > policy.token_budget:
+        boundary += 2
+    while boundary < len(messages) and messages[boundary].get('role') != 'user':
+        boundary += 1
+    return boundary
+
+
+def select_history_window(messages: List[Dict], summary_state: Optional[Dict[str, Any]]) -> Tuple[List[Dict], str]:
+    """要約状態に基づき、原文で渡す履歴と要約文を取得"""
+    if not summary_state:
+        return messages, ''
+    covered = min(int(summary_state.get('covered', 0)), len(messages))
+    return messages[covered:], summary_state.get('text', '')
+
+
+class SummaryCache:
+    """(sessionId, actorId) ごとの要約状態を保持するLRU"""
+
+    def __init__(self, max_sessions: int = 256):
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, actor_id: str) -> Optional[Dict[str, Any]]:
+        key = (session_id, actor_id)
+        with self._lock:
+            state = self._entries.get(key)
+            if state is not None:
+                self._entries.move_to_end(key)
+                return dict(state)
+            return None
+
+    def put(self, session_id: str, actor_id: str, state: Dict[str, Any]) -> None:
+        key = (session_id, actor_id)
+        with self._lock:
+            self._entries[key] = dict(state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+
+class RollingSummarizer:
+    """ローリング要約の状態管理とバックグラウンド更新
+
+    Args:
+        summarize_fn: (既存の要約文, 畳み込むメッセージ, 言語) を受け取り新しい要約文を返す関数
+        cache: 要約状態のキャッシュ
+        policy: 履歴ウィンドウの設定
+        workers: 要約を生成するワーカースレッド数
+        on_update: 要約を更新したときに (session_id, actor_id, 要約状態) で呼ばれる（Memory保存用）
+    """
+
+    def __init__(
+        self,
+        summarize_fn: Callable[[str, List[Dict], str], str],
+        cache: SummaryCache,
+        policy: HistoryPolicy,
+        workers: int = 2,
+        on_update: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+    ):
+        self._summarize_fn = summarize_fn
+        self._cache = cache
+        self._policy = policy
+        self._on_update = on_update
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='history-summary')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self.updated = 0
+        self.failed = 0
+
+    def current_state(self, session_id: str, actor_id: str, history: List[Dict]) -> Dict[str, Any]:
+        """履歴に対して有効な要約状態を取得"""
+        state = self._cache.get(session_id, actor_id) or {'text': '', 'covered': 0}
+        if state['covered'] > len(history):
+            # 要約が履歴より新しい（履歴の再読み込み直後など）場合は作り直す
+            return {'text': '', 'covered': 0}
+        return state
+
+    def window(self, session_id: str, actor_id: str, history: List[Dict]) -> Tuple[List[Dict], str]:
+        """原文で渡す履歴と要約文を取得（LLMは呼ばない）
+
+        要約がまだ更新されていない場合は、畳み込むべき境界より古いターンを切り捨てる。
+        """
+        state = self.current_state(session_id, actor_id, history)
+        boundary = plan_summary_boundary(history, state['covered'], self._policy)
+        if boundary <= state['covered']:
+            return select_history_window(history, state)
+        logger.info(f"Rolling summary is behind ({state['covered']}/{boundary} messages), truncating history")
+        return history[boundary:], state['text']
+
+    def schedule(self, session_id: str, actor_id: str, history: List[Dict], language: str) -> Optional[Future]:
+        """要約の更新が必要ならバックグラウンドで開始
+
+        同じセッションの更新が実行中の場合は開始しない（次のターンで改めて判定する）。
+
+        Returns:
+            開始した更新のFuture。更新不要または実行中の場合はNone
+        """
+        state = self.current_state(session_id, actor_id, history)
+        boundary = plan_summary_boundary(history, state['covered'], self._policy)
+        if boundary <= state['covered']:
+            return None
+        key = (session_id, actor_id)
+        with self._lock:
+            if key in self._in_flight:
+                return None
+            self._in_flight.add(key)
+        messages = copy.deepcopy(history[state['covered']:boundary])
+        return self._executor.submit(self._refresh, key, state, messages, boundary, language)
+
+    def stats(self) -> Dict[str, int]:
+        """要約更新の統計を取得"""
+        with self._lock:
+            return {'inFlight': len(self._in_flight), 'updated': self.updated, 'failed': self.failed}
+
+    def _refresh(self, key: Tuple[str, str], state: Dict[str, Any], messages: List[Dict],
+                 boundary: int, language: str) -> Optional[Dict[str, Any]]:
+        session_id, actor_id = key
+        try:
+            text = self._summarize_fn(state['text'], messages, language)
+            if not text:
+                raise ValueError("empty summary")
+        except Exception as e:
+            logger.warning(f"Failed to update rolling summary (session={session_id}): {e}")
+            with self._lock:
+                self._in_flight.discard(key)
+                self.failed += 1
+            return None
+
+        new_state = {'text': text, 'covered': boundary}
+        self._cache.put(session_id, actor_id, new_state)
+        with self._lock:
+            self._in_flight.discard(key)
+            self.updated += 1
+        logger.info(f"Rolling summary updated: covers {boundary} messages (session={session_id})")
+        if self._on_update:
+            try:
+                self._on_update(session_id, actor_id, dict(new_state))
+            except Exception as e:
+                logger.warning(f"Failed to hand off rolling summary (session={session_id}): {e}")
+        return new_state
@@ -0,0 +1,174 @@
+"""
+AgentCore Memory 書き込みのライトビハインド処理
+
+NPC会話のUSER/ASSISTANTイベント保存をレスポンス返却後に
+バックグラウンドのワーカープール（既定4スレッド）で行う。キューは有界で、満杯の場合は
+submit() がFalseを返し、呼び出し側で同期保存にフォールバックする。
+
+ターンはセッションごとのキューに積み、処理待ちのセッションを順にワーカーへ割り当てる。
+1つのセッションを同時に処理するワーカーは1つだけなので、同一セッションのイベント順序は保たれ、
+再試行中のセッションが他のセッションの保存を止めることもない。
+保存結果はセッションごとに記録し、次ターンのレスポンスで報告する。
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWriteBehind:
+    """AgentCore Memoryへのイベント保存を非同期化するライター
+
+    Args:
+        write_fn: 1イベントを保存する関数。(session_id, actor_id, **event) を受け取り、成功時True
+        max_queue_size: 全セッション合計の保存待ちターン数の上限
+        workers: ワーカースレッド数
+        on_failure: リトライ上限後も保存に失敗したターンについて (session_id, actor_id) で呼ばれる
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[..., bool],
+        max_queue_size: int = 1000,
+        workers: int = 4,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        max_tracked_sessions: int = 1024,
+        on_failure: Optional[Callable[[str, str], None]] = None,
+    ):
+        self._write_fn = write_fn
+        self._on_failure = on_failure
+        self._max_queue_size = max_queue_size
+        self._workers = max(1, workers)
+        # セッションごとの保存待ちターンと、ワーカー割り当て待ちのセッション（各セッション高々1回）
+        self._session_queues: Dict[Tuple[str, str], "deque[List[Dict[str, Any]]]"] = {}
+        self._ready: "deque[Tuple[str, str]]" = deque()
+        self._queued = 0
+        self._max_retries = max_retries
+        self._retry_base_delay = retry_base_delay
+        self._max_tracked_sessions = max_tracked_sessions
+        self._statuses: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], int] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self.written = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """ワーカースレッドを起動"""
+        if self._threads:
+            return
+        for index in range(self._workers):
+            thread = threading.Thread(target=self._run, name=f'memory-write-behind-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, session_id: str, actor_id: str, events: List[Dict[str, Any]]) -> bool:
+        """1ターン分のイベントをキューに追加
+
+        Returns:
+            bool: キュー投入できた場合True（満杯時はFalse）
+        """
+        key = (session_id, actor_id)
+        with self._cond:
+            if self._queued >= self._max_queue_size:
+                logger.warning(f"Memory write queue is full, falling back to synchronous save (session={session_id})")
+                return False
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._queued += 1
+            session_queue = self._session_queues.get(key)
+            if session_queue is None:
+                # 処理中でも待機中でもないセッションだけをワーカーに割り当てる
+                self._session_queues[key] = deque([events])
+                self._ready.append(key)
+            else:
+                session_queue.append(events)
+            self._cond.notify_all()
+        return True
+
+    def last_status(self, session_id: str, actor_id: str) -> Optional[str]:
+        """直近に完了したターンの保存結果（'ok' / 'partial_failure'）を取得"""
+        with self._cond:
+            return self._statuses.get((session_id, actor_id))
+
+    def wait_for_session(self, session_id: str, actor_id: str, timeout: float) -> bool:
+        """セッションの未保存イベントがなくなるまで待機
+
+        Returns:
+            bool: タイムアウト前に保存が完了した場合True
+        """
+        key = (session_id, actor_id)
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending.get(key), timeout=timeout)
+
+    def flush(self, timeout: float) -> bool:
+        """全ての未保存イベントの保存完了を待機"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout=timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """ライター統計を取得"""
+        with self._cond:
+            return {
+                'queueDepth': self._queued,
+                'pendingSessions': len(self._pending),
+                'workers': len(self._threads),
+                'written': self.written,
+                'failed': self.failed,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._ready)
+                key = self._ready.popleft()
+                events = self._session_queues[key].popleft()
+                self._queued -= 1
+            session_id, actor_id = key
+            try:
+                all_saved = True
+                for event in events:
+                    if not self._write_with_retry(session_id, actor_id, event):
+                        all_saved = False
+                status = 'ok' if all_saved else 'partial_failure'
+                if not all_saved and self._on_failure:
+                    self._on_failure(session_id, actor_id)
+            except Exception as e:
+                logger.error(f"Memory write-behind error: {e}", exc_info=True)
+                status = 'partial_failure'
+            self._finish(key, status)
+
+    def _write_with_retry(self, session_id: str, actor_id: str, event: Dict[str, Any]) -> bool:
+        for attempt in range(self._max_retries + 1):
+            if self._write_fn(session_id, actor_id, **event):
+                with self._cond:
+                    self.written += 1
+                return True
+            if attempt < self._max_retries:
+                time.sleep(self._retry_base_delay * (2 ** attempt))
+        with self._cond:
+            self.failed += 1
+        logger.error(f"Memory event save failed after {self._max_retries} retries (session={session_id})")
+        return False
+
+    def _finish(self, key: Tuple[str, str], status: str) -> None:
+        with self._cond:
+            # セッションに次のターンが残っていれば再び割り当て待ちに戻す
+            if self._session_queues[key]:
+                self._ready.append(key)
+            else:
+                del self._session_queues[key]
+            remaining = self._pending.get(key, 0) - 1
+            if remaining > 0:
+                self._pending[key] = remaining
+            else:
+                self._pending.pop(key, None)
+            self._statuses[key] = status
+            self._statuses.move_to_end(key)
+            while len(self._statuses) > self._max_tracked_sessions:
+                self._statuses.popitem(last=False)
+            self._cond.notify_all()
@@ -0,0 +1,102 @@
+"""
+BedrockModelのプロセス内プール
+
+BedrockModelはインスタンスごとにbedrock-runtimeクライアント（コネクションプール）を持つため、
+リクエスト毎に生成するとクライアント構築とTLSハンドシェイクが毎ターン発生する。
+本プールは生成済みモデルを貸し出して再利用し、同時貸し出し数を size で制限する。
+
+Agent（systemPrompt・messagesを持つ可変オブジェクト）はリクエスト毎に生成し、
+貸し出し中のモデルは1リクエストのみが使用する。
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+
+class ModelPoolExhaustedError(Exception):
+    """タイムアウトまでにモデルを確保できなかった"""
+
+
+class BedrockModelPool:
+    """生成済みBedrockModelを貸し出す有界プール
+
+    Args:
+        factory: 新しいモデルを生成する関数
+        size: プールの最大サイズ（同時貸し出し数の上限）
+        acquire_timeout: 空きを待つ最大秒数
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 4, acquire_timeout: float = 30):
+        self._factory = factory
+        self._size = size
+        self._acquire_timeout = acquire_timeout
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._created = 0
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    def warm(self, count: int = None) -> None:
+        """起動時にモデルを事前生成"""
+        target = min(self._size, count if count is not None else self._size)
+        while True:
+            with self._lock:
+                if self._created >= target:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._factory())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def acquire(self) -> Any:
+        """モデルを借りる（空きがなければ acquire_timeout まで待機）"""
+        try:
+            model = self._idle.get_nowait()
+        except queue.Empty:
+            model = self._create_or_wait()
+        with self._lock:
+            self._in_use += 1
+        return model
+
+    def release(self, model: Any) -> None:
+        """モデルを返却"""
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(model)
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        """with文でモデルを借りて自動返却する"""
+        model = self.acquire()
+        try:
+            yield model
+        finally:
+            self.release(model)
+
+    def stats(self) -> Dict[str, int]:
+        """プール統計を取得"""
+        with self._lock:
+            return {'size': self._size, 'created': self._created, 'inUse': self._in_use}
+
+    def _create_or_wait(self) -> Any:
+        with self._lock:
+            can_create = self._created < self._size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self._acquire_timeout)
+        except queue.Empty:
+            raise ModelPoolExhaustedError(
+                f"No Bedrock model available within {self._acquire_timeout}s (pool size: {self._size})"
+            )
@@ -0,0 +1,16 @@
+"""
+NPC会話エージェント用Pydanticモデル定義
+
+統合モード（NPC応答とスコアリングを1回の呼び出しで生成）で
+Strands Agentsのstructured output機能に使用する出力スキーマを定義。
+"""
+
+from pydantic import BaseModel, Field
+
+from scoring_models import ScoringResult
+
+
+class JointTurnResult(BaseModel):
+    """NPC応答 + スコアリング結果モデル"""
+    response: str = Field(description="NPC（顧客）としての返答。話し言葉のみ")
+    scoring: ScoringResult = Field(description="営業担当者の最新発言に対するスコアリング結果")
@@ -1,33 +1,110 @@
 """
 NPC会話エージェント用プロンプト定義
+
+ペルソナ・指示セクションはシナリオ内で不変のため、npcInfoと言語をキーにメモ化し、
+ターンごとに変わる感情状態・スライド・会話要約のセクションのみを都度生成する。
+同じ入力に対して常にバイト単位で同一の文字列を返すため、プロンプトキャッシュの安定したプレフィックスになる。
+エージェントは可変セクションをシステムプロンプトではなく最新のユーザーターンに添える（build_turn_context）。
 """
 
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from scoring_prompts import apply_goal_statuses, build_scoring_rules, format_goals, select_goals_for_prompt
+
+# メモ化するペルソナセクションの最大件数（シナリオ×言語）
+PERSONA_CACHE_SIZE = 256
+
+# 読み取りはロックなし（dictの単一操作はGIL下でアトミック）、書き込みのみロックする
+_persona_cache: Dict[tuple, str] = {}
+_persona_cache_lock = threading.Lock()
 
 
 def build_npc_system_prompt(
     npc_info: Dict[str, Any],
     emotion_params: Dict[str, Any],
     language: str = 'ja',
-    presented_slides: list = None
+    presented_slides: list = None,
+    conversation_summary: str = ''
 ) -> str:
-    """NPC会話用のシステムプロンプトを生成"""
+    """NPC会話用のシステムプロンプトを生成
+
+    conversation_summary が指定された場合、履歴ウィンドウ外の古い会話の要約を末尾に追加する。
+    """
+    persona_section, state_section = build_npc_system_prompt_parts(
+        npc_info, emotion_params, language, presented_slides, conversation_summary
+    )
+    return persona_section + state_section
+
+
+def build_npc_system_prompt_parts(
+    npc_info: Dict[str, Any],
+    emotion_params: Dict[str, Any],
+    language: str = 'ja',
+    presented_slides: list = None,
+    conversation_summary: str = ''
+) -> Tuple[str, str]:
+    """NPC会話用のシステムプロンプトを不変部分と可変部分に分けて生成
+
+    Returns:
+        (ペルソナ・指示セクション, 感情状態・スライド・会話要約セクション)
+        前者はシナリオ内で不変のため、プロンプトキャッシュのキャッシュポイントを直後に置ける。
+    """
+    return (
+        get_persona_section(npc_info, language),
+        _build_state_section(emotion_params, language, presented_slides, conversation_summary),
+    )
+
+
+def get_persona_section(npc_info: Dict[str, Any], language: str = 'ja') -> str:
+    """ペルソナセクションを取得（npcInfoと言語ごとに1回だけ生成）"""
+    key = _persona_fields(npc_info, language)
+    try:
+        section = _persona_cache.get(key)
+    except TypeError:
+        # personalityに辞書等のハッシュ不可能な値が含まれる場合はメモ化しない
+        return _build_persona_section(npc_info, language)
+    if section is not None:
+        return section
+
+    section = _build_persona_section(npc_info, language)
+    with _persona_cache_lock:
+        # 上限到達時は最も古く登録したものから破棄（dictは挿入順を保持）
+        while len(_persona_cache) >= PERSONA_CACHE_SIZE:
+            _persona_cache.pop(next(iter(_persona_cache)))
+        _persona_cache[key] = section
+    return section
+
+
+def _persona_fields(npc_info: Dict[str, Any], language: str) -> tuple:
+    """ペルソナセクションの生成に使うフィールドのタプル（メモ化キー）
+
+    毎ターン呼ばれるため、JSON化やハッシュ計算を行わない軽量なキーにしている。
+    """
+    personality = npc_info.get('personality')
+    if isinstance(personality, list):
+        personality = tuple(personality)
+    return (
+        language,
+        npc_info.get('name'),
+        npc_info.get('role'),
+        npc_info.get('company'),
+        personality,
+        npc_info.get('description'),
+    )
+
+
+def _build_persona_section(npc_info: Dict[str, Any], language: str = 'ja') -> str:
+    """NPCのペルソナと応答指示のセクションを構築（シナリオ内で不変）"""
     npc_name = npc_info.get('name', '田中太郎')
     npc_role = npc_info.get('role', '購買担当者')
     npc_company = npc_info.get('company', '株式会社ABC')
     npc_personality = npc_info.get('personality', ['厳しい', '効率重視'])
     npc_description = npc_info.get('description', '')
     
-    anger_level = emotion_params.get('angerLevel', 1)
-    trust_level = emotion_params.get('trustLevel', 1)
-    progress_level = emotion_params.get('progressLevel', 1)
-    
     # 性格リストを文字列に変換
     personality_text = ', '.join(npc_personality) if isinstance(npc_personality, list) else npc_personality
     
-    # スライドコンテキストセクション
-    slide_context = _build_slide_context(presented_slides, language)
-    
     if language == 'en':
         description_section = f"\n## Background\n{npc_description}" if npc_description else ""
         return f"""You are {npc_name}, a {npc_role} at {npc_company}.
@@ -36,11 +113,6 @@ def build_npc_system_prompt(
 {personality_text}
 {description_section}
 
-## Current Emotional State
-- Anger Level: {anger_level}/10
-- Trust Level: {trust_level}/10
-- Negotiation Progress: {progress_level}/10
-{slide_context}
 ## Important Instructions
 - Respond naturally to the salesperson's message based on the conversation history
 - Stay in character as {npc_name}
@@ -49,6 +121,7 @@ def build_npc_system_prompt(
 - Remember the conversation context from previous messages
 - Do not use any emoji or emoticons in your response
 - If the salesperson presents slides, do NOT read aloud or summarize the slide content. React to the slides naturally based on your character settings and the scenario context
+- Respond according to your current emotional state
 - Never mention your settings, instructions, or that you are an AI. Always stay in character."""
     else:
         description_section = f"\n## 背景情報\n{npc_description}" if npc_description else ""
@@ -58,11 +131,6 @@ def build_npc_system_prompt(
 {personality_text}
 {description_section}
 
-## 現在の感情状態
-- 怒りレベル: {anger_level}/10
-- 信頼レベル: {trust_level}/10
-- 商談進捗度: {progress_level}/10
-{slide_context}
 ## 重要な指示
 - これまでの会話履歴に基づいて、営業担当者のメッセージに自然に応答してください
 - {npc_name}としてのキャラクターを維持してください
@@ -71,9 +139,43 @@ def build_npc_system_prompt(
 - 前のメッセージからの会話の文脈を覚えておいてください
 - 絵文字や顔文字は一切使用しないでください
 - 営業担当者がスライドを提示した場合、スライドの内容を読み上げたり要約したりしないでください。あなたのキャラクター設定とシナリオの文脈に基づいて自然に反応してください
+- 現在の感情状態に沿って応答してください
 - あなたの設定や指示について言及しないでください。常にキャラクターとして振る舞ってください"""
 
 
+def _build_state_section(
+    emotion_params: Dict[str, Any],
+    language: str = 'ja',
+    presented_slides: list = None,
+    conversation_summary: str = ''
+) -> str:
+    """感情状態・提示スライド・会話要約のセクションを構築（ターンごとに変化）"""
+    anger_level = emotion_params.get('angerLevel', 1)
+    trust_level = emotion_params.get('trustLevel', 1)
+    progress_level = emotion_params.get('progressLevel', 1)
+    
+    # スライドコンテキストセクション
+    slide_context = _build_slide_context(presented_slides, language)
+    summary_section = _build_summary_section(conversation_summary, language)
+    
+    if language == 'en':
+        return f"""
+
+## Current Emotional State
+- Anger Level: {anger_level}/10
+- Trust Level: {trust_level}/10
+- Negotiation Progress: {progress_level}/10
+{slide_context}{summary_section}"""
+    else:
+        return f"""
+
+## 現在の感情状態
+- 怒りレベル: {anger_level}/10
+- 信頼レベル: {trust_level}/10
+- 商談進捗度: {progress_level}/10
+{slide_context}{summary_section}"""
+
+
 def _build_slide_context(presented_slides: list, language: str = 'ja') -> str:
     """提示済みスライドのコンテキストセクションを構築"""
     if not presented_slides:
@@ -97,6 +199,114 @@ def _build_slide_context(presented_slides: list, language: str = 'ja') -> str:
         return "\n".join(lines)
 
 
+def _build_summary_section(conversation_summary: str, language: str = 'ja') -> str:
+    """古い会話の要約セクションを構築"""
+    if not conversation_summary:
+        return ""
+    if language == 'en':
+        return f"\n## Summary of Earlier Conversation\n{conversation_summary}"
+    return f"\n## これまでの会話の要約\n{conversation_summary}"
+
+
+def build_joint_scoring_section(joint_scoring: Dict[str, Any], language: str = 'ja',
+                                user_message: str = '', max_goals: Optional[int] = None) -> str:
+    """統合モード用のスコアリング指示セクションを構築
+
+    NPCとしての返答に加えて、営業担当者の最新発言のスコアリングを同時に出力させる。
+    現在のスコアは感情状態セクションの値を使う。
+    ゴールは達成済みを除外し、最新発言と関連の高い未達成ゴール（最大 max_goals 件）のみを含める。
+    """
+    goals = apply_goal_statuses(
+        [dict(goal) for goal in joint_scoring.get('goals', [])],
+        joint_scoring.get('goalStatuses', []),
+    )
+    goals_txt = format_goals(select_goals_for_prompt(goals, user_message, max_goals), language)
+    scenario_description = joint_scoring.get('scenarioDescription', '')
+
+    if language == 'en':
+        scenario_ctx = f"Scenario Context: {scenario_description}\n" if scenario_description else ""
+        return f"""
+
+## Scoring (in addition to your reply)
+Write your reply as the customer in the "response" field.
+In the "scoring" field, act as a sales conversation scoring engine: evaluate the salesperson's latest message and update the scores, starting from the Current Emotional State above.
+{scenario_ctx}
+Goals:
+{goals_txt}
+
+{build_scoring_rules(language)}"""
+    scenario_ctx = f"シナリオの背景: {scenario_description}\n" if scenario_description else ""
+    return f"""
+
+## スコアリング（返答と同時に出力）
+「response」フィールドには顧客としての返答を記述してください。
+「scoring」フィールドでは営業会話のスコアリングエンジンとして、営業担当者の最新発言を評価し、上記の現在の感情状態を起点にスコアを更新してください。
+{scenario_ctx}
+ゴール:
+{goals_txt}
+
+{build_scoring_rules(language)}"""
+
+
+def build_turn_context(state_section: str, language: str = 'ja') -> str:
+    """最新のユーザーターンの先頭に添える会話状況のテキストを構築
+
+    感情状態・スライド・会話要約（統合モードではスコアリング指示も）はターンごとに変わるため、
+    システムプロンプトや履歴のプレフィックスに含めず、このターンの発話の直前に置く。
+    """
+    heading = "## Salesperson's Message" if language == 'en' else "## 営業担当者のメッセージ"
+    return f"{state_section.strip()}\n\n{heading}"
+
+
+def build_history_summary_prompt(
+    previous_summary: str,
+    messages: List[Dict[str, Any]],
+    language: str = 'ja'
+) -> str:
+    """ローリング要約の更新用プロンプトを生成"""
+    lines = []
+    for message in messages:
+        text = ''.join(
+            block.get('text', '') for block in message.get('content', []) if isinstance(block, dict)
+        )
+        if language == 'en':
+            label = 'Salesperson' if message.get('role') == 'user' else 'Customer'
+        else:
+            label = '営業担当者' if message.get('role') == 'user' else '顧客'
+        lines.append(f"{label}: {text}")
+    transcript = "\n".join(lines)
+
+    if language == 'en':
+        previous = previous_summary or '(none)'
+        return f"""Update the summary of a sales conversation between a salesperson and a customer.
+
+## Current Summary
+{previous}
+
+## New Conversation to Add
+{transcript}
+
+## Instructions
+- Merge the new conversation into the current summary
+- Keep facts that matter for the rest of the negotiation: requirements, concerns, proposals, commitments, and the customer's attitude
+- Write at most 8 concise bullet points
+- Output only the summary"""
+    previous = previous_summary or '（なし）'
+    return f"""営業担当者と顧客の商談会話の要約を更新してください。
+
+## 現在の要約
+{previous}
+
+## 追加する会話
+{transcript}
+
+## 指示
+- 追加する会話の内容を現在の要約に統合してください
+- 以降の商談に必要な事実（要件、懸念点、提案内容、約束事項、顧客の態度）を残してください
+- 簡潔な箇条書き8項目以内で記述してください
+- 要約のみを出力してください"""
+
+
 def get_default_npc_info() -> Dict[str, Any]:
     """デフォルトのNPC情報を取得"""
     return {
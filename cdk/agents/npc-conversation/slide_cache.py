@@ -0,0 +1,93 @@
+"""
+スライド画像のプロセス内キャッシュ
+
+S3から取得したスライド画像バイト列を imageKey ごとに ETag と併せて保持する。
+合計バイト数で上限を設けたLRU。
+
+スライド変換Lambdaは同一キー（page_001.png 等）に上書き保存するため、
+キャッシュ登録から revalidate_seconds 経過後は If-None-Match 付きGETで
+ETagを再検証し、変更がなければ（304）キャッシュ済みバイト列を再利用する。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from botocore.exceptions import ClientError
+
+
+class SlideImageCache:
+    """(imageKey, ETag) 単位のスライド画像LRUキャッシュ（合計サイズ上限付き）"""
+
+    def __init__(self, max_bytes: int = 100 * 1024 * 1024, revalidate_seconds: float = 300):
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        # imageKey -> (etag, bytes, validated_at)
+        self._entries: "OrderedDict[str, Tuple[str, bytes, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fetch(self, s3_client, bucket: str, image_key: str) -> bytes:
+        """スライド画像を取得（キャッシュヒット時はS3 GETを省略）
+
+        S3エラーはそのまま送出する。
+        """
+        with self._lock:
+            entry = self._entries.get(image_key)
+            if entry is not None:
+                self._entries.move_to_end(image_key)
+
+        if entry is not None:
+            etag, image_bytes, validated_at = entry
+            if time.monotonic() - validated_at <= self.revalidate_seconds:
+                self._count(hit=True)
+                return image_bytes
+            try:
+                resp = s3_client.get_object(Bucket=bucket, Key=image_key, IfNoneMatch=etag)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+                    self._store(image_key, etag, image_bytes)
+                    self._count(hit=True)
+                    return image_bytes
+                raise
+        else:
+            resp = s3_client.get_object(Bucket=bucket, Key=image_key)
+
+        image_bytes = resp['Body'].read()
+        self._store(image_key, resp.get('ETag', ''), image_bytes)
+        self._count(hit=False)
+        return image_bytes
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュ統計を取得"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _store(self, image_key: str, etag: str, image_bytes: bytes) -> None:
+        # 上限の1/4を超える画像はキャッシュ全体を押し流すため保持しない
+        if len(image_bytes) > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(image_key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous[1])
+            self._entries[image_key] = (etag, image_bytes, time.monotonic())
+            self._total_bytes += len(image_bytes)
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
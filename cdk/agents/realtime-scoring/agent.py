@@ -8,20 +8,42 @@ AgentCore Memoryで会話履歴を取得し、メトリクス履歴を永続化
 重要: AgentCore Memory Session Managerを使用する場合、
 - 会話履歴はMemoryから自動的に取得される
 - フロントエンドからpreviousMessagesを送る必要はない
+
+NPC会話エージェントの統合モードでNPC応答と同時に生成されたスコア（precomputedScoring）を
+受け取った場合は、スコアリングのLLM呼び出しを省略し、コンプライアンスチェックとメトリクス保存のみ行う。
+precomputedScoring はNPC会話エージェントが (sessionId, messageId, actorId) に対して署名したもののみ受け入れる
+（scoring_signature.py 参照。署名なし・不一致の場合はLLMでスコアリングする）。
+
+SCORING_MODE=hybrid（サーバー側の環境変数のみで指定し、ペイロードでは切り替えない）では、LLMスコアリングを
+HYBRID_LLM_INTERVAL_TURNS ターンごと、またはローカル推定の確信度が低い発言に限定し、
+それ以外のターンは語彙ベースの感情差分推定（emotion_estimator.py）でスコアを更新する。
 """
 
 import json
 import os
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from decimal import Decimal
 from typing import Dict, Any, List, Optional
+
+import boto3
 from fastapi import FastAPI, HTTPException, Request
 
 from strands import Agent
 from strands.models import BedrockModel
 
 from prompts import build_scoring_prompt, get_default_scores
-from models import ScoringResult
-from compliance_check import check_compliance
+from scoring_models import ScoringResult
+from scoring_prompts import apply_goal_statuses, filter_goal_updates, select_goals_for_prompt
+from compliance_check import check_compliance, get_prefilter_stats, get_result_cache_stats
+from metrics_writer import MetricsWriteBehind
+from session_aggregate import SessionAggregateUpdater
+from emotion_estimator import EmotionDeltaEstimator, HybridScoringState, SCORE_KEYS
+from scoring_signature import verify_scoring
+from agent_runtime import AdmissionController, AdmissionRejectedError, admission_rejected_response
+from idempotency import IdempotentInvoker
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,10 +51,47 @@ logger = logging.getLogger(__name__)
 AWS_REGION = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', 'us-west-2'))
 BEDROCK_MODEL = os.environ.get('BEDROCK_MODEL_SCORING', 'global.anthropic.claude-haiku-4-5-20251001-v1:0')
 AGENTCORE_MEMORY_ID = os.environ.get('AGENTCORE_MEMORY_ID', '')
+SESSION_FEEDBACK_TABLE = os.environ.get('SESSION_FEEDBACK_TABLE')
+
+# メトリクス保存のライトビハインド設定（metrics_writer.py 参照）
+METRICS_WRITE_BEHIND = os.environ.get('METRICS_WRITE_BEHIND', 'true').lower() == 'true'
+METRICS_WRITE_QUEUE_SIZE = int(os.environ.get('METRICS_WRITE_QUEUE_SIZE', '1000'))
+METRICS_WRITE_MAX_RETRIES = int(os.environ.get('METRICS_WRITE_MAX_RETRIES', '5'))
+METRICS_FLUSH_TIMEOUT_SECONDS = float(os.environ.get('METRICS_FLUSH_TIMEOUT_SECONDS', '5'))
+# セッション集約アイテムの更新（session_aggregate.py 参照）
+METRICS_AGGREGATE_ENABLED = os.environ.get('METRICS_AGGREGATE_ENABLED', 'true').lower() == 'true'
+METRICS_AGGREGATE_EWMA_ALPHA = float(os.environ.get('METRICS_AGGREGATE_EWMA_ALPHA', '0.3'))
+
+# プロンプトに含める未達成ゴールの最大件数（最新発言との関連度順）
+GOAL_PROMPT_MAX_GOALS = int(os.environ.get('GOAL_PROMPT_MAX_GOALS', '5'))
+
+# スコアリングモード（llm: 毎ターンLLM / hybrid: ローカル推定とLLMの併用）
+SCORING_MODE = os.environ.get('SCORING_MODE', 'llm')
+HYBRID_LLM_INTERVAL_TURNS = int(os.environ.get('HYBRID_LLM_INTERVAL_TURNS', '4'))
+HYBRID_MIN_CONFIDENCE = float(os.environ.get('HYBRID_MIN_CONFIDENCE', '0.6'))
+EMOTION_LEXICON_PATH = os.environ.get('EMOTION_LEXICON_PATH', '')
+
+# コンプライアンスチェック（Guardrails）の待機上限秒数。超過時はスコアのみ返す
+COMPLIANCE_TIMEOUT_SECONDS = float(os.environ.get('COMPLIANCE_TIMEOUT_SECONDS', '3'))
 
 app = FastAPI(title="Realtime Scoring Agent", version="1.0.0")
 
+# Bedrock呼び出しをスレッドプールにオフロードし、同時受付数を制限する
+admission = AdmissionController.from_env('realtime-scoring', max_workers=8, max_queue=16, queue_timeout=20.0)
+# 再送されたターン（同じmessageId）は処理中なら合流、完了済みならリプレイする
+idempotency = IdempotentInvoker.from_env('realtime-scoring')
+
+# スコアリングと並行してコンプライアンスチェックを実行するためのプール
+compliance_executor = ThreadPoolExecutor(
+    max_workers=admission.max_workers, thread_name_prefix='compliance-check'
+)
+
 _memory_client = None
+_metrics_table = None
+
+# ハイブリッドモードのローカル推定器とセッションごとの状態
+emotion_estimator = EmotionDeltaEstimator.from_file(EMOTION_LEXICON_PATH) if EMOTION_LEXICON_PATH else EmotionDeltaEstimator()
+hybrid_state = HybridScoringState()
 
 
 def get_memory_client():
@@ -132,60 +191,197 @@ def get_conversation_history(session_id: str, actor_id: str, limit: int = 10) ->
         return []
 
 
+def get_metrics_table():
+    """メトリクス保存先のDynamoDB Tableを取得（プロセス内で1回だけ生成）"""
+    global _metrics_table
+    if _metrics_table is None and SESSION_FEEDBACK_TABLE:
+        _metrics_table = boto3.resource('dynamodb', region_name=AWS_REGION).Table(SESSION_FEEDBACK_TABLE)
+    return _metrics_table
+
+
+def build_metrics_item(session_id: str, actor_id: str, scores: Dict, analysis: str, message_count: int = 1, compliance_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """realtime-metrics アイテムを構築（コンプライアンス結果含む）"""
+    current_timestamp = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    ttl = int(time.time()) + (180 * 24 * 60 * 60)
+    
+    item = {
+        "sessionId": session_id,
+        "createdAt": current_timestamp,
+        "dataType": "realtime-metrics",
+        "messageNumber": message_count,
+        "angerLevel": Decimal(str(scores.get('angerLevel', 5))),
+        "trustLevel": Decimal(str(scores.get('trustLevel', 5))),
+        "progressLevel": Decimal(str(scores.get('progressLevel', 5))),
+        "analysis": analysis,
+        "actorId": actor_id,
+        "expireAt": ttl
+    }
+    
+    # コンプライアンス結果があれば追加（セッション後分析で読み取られる）
+    if compliance_result:
+        violations_for_dynamodb = []
+        for violation in compliance_result.get("violations", []):
+            violation_copy = violation.copy()
+            # confidenceフィールドをDecimalに変換
+            if "confidence" in violation_copy and isinstance(violation_copy["confidence"], float):
+                violation_copy["confidence"] = Decimal(str(violation_copy["confidence"]))
+            violations_for_dynamodb.append(violation_copy)
+        
+        item["complianceData"] = {
+            "score": Decimal(str(compliance_result.get("complianceScore", 100))),
+            "violations": violations_for_dynamodb,
+            "analysis": compliance_result.get("analysis", "")
+        }
+    return item
+
+
+# セッションごとの集約アイテム（最新スコア・最小/最大/EWMA・ターンごとのスコア）
+session_aggregate = SessionAggregateUpdater(
+    table_fn=get_metrics_table,
+    ewma_alpha=METRICS_AGGREGATE_EWMA_ALPHA,
+) if (SESSION_FEEDBACK_TABLE and METRICS_AGGREGATE_ENABLED) else None
+
+metrics_writer = MetricsWriteBehind(
+    table_fn=get_metrics_table,
+    max_queue_size=METRICS_WRITE_QUEUE_SIZE,
+    max_retries=METRICS_WRITE_MAX_RETRIES,
+    on_written=session_aggregate.update if session_aggregate else None,
+) if (SESSION_FEEDBACK_TABLE and METRICS_WRITE_BEHIND) else None
+if metrics_writer:
+    metrics_writer.start()
+
+
 def save_metrics_to_dynamodb(session_id: str, actor_id: str, scores: Dict, analysis: str, message_count: int = 1, compliance_result: Optional[Dict[str, Any]] = None):
-    """メトリクスをDynamoDBに保存（コンプライアンス結果含む）"""
-    table_name = os.environ.get('SESSION_FEEDBACK_TABLE')
-    if not table_name:
+    """メトリクスをDynamoDBに保存（コンプライアンス結果含む）
+    
+    ライトビハインド有効時はキューに投入してバックグラウンドでバッチ保存する。
+    """
+    if not SESSION_FEEDBACK_TABLE:
         logger.warning("SESSION_FEEDBACK_TABLE not set, skipping metrics save")
         return
     
     try:
-        import boto3
-        from datetime import datetime
-        from decimal import Decimal
-        import time
-        
-        dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
-        table = dynamodb.Table(table_name)
-        
-        current_timestamp = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-        ttl = int(time.time()) + (180 * 24 * 60 * 60)
-        
-        item = {
-            "sessionId": session_id,
-            "createdAt": current_timestamp,
-            "dataType": "realtime-metrics",
-            "messageNumber": message_count,
-            "angerLevel": Decimal(str(scores.get('angerLevel', 5))),
-            "trustLevel": Decimal(str(scores.get('trustLevel', 5))),
-            "progressLevel": Decimal(str(scores.get('progressLevel', 5))),
-            "analysis": analysis,
-            "actorId": actor_id,
-            "expireAt": ttl
-        }
-        
-        # コンプライアンス結果があれば追加（セッション後分析で読み取られる）
-        if compliance_result:
-            violations_for_dynamodb = []
-            for violation in compliance_result.get("violations", []):
-                violation_copy = violation.copy()
-                # confidenceフィールドをDecimalに変換
-                if "confidence" in violation_copy and isinstance(violation_copy["confidence"], float):
-                    violation_copy["confidence"] = Decimal(str(violation_copy["confidence"]))
-                violations_for_dynamodb.append(violation_copy)
-            
-            item["complianceData"] = {
-                "score": Decimal(str(compliance_result.get("complianceScore", 100))),
-                "violations": violations_for_dynamodb,
-                "analysis": compliance_result.get("analysis", "")
-            }
-        
-        table.put_item(Item=item)
+        item = build_metrics_item(session_id, actor_id, scores, analysis, message_count, compliance_result)
+        if metrics_writer and metrics_writer.submit(item):
+            return
+        get_metrics_table().put_item(Item=item)
         logger.info(f"Metrics saved to DynamoDB: session={session_id}, scores={scores}, has_compliance={'complianceData' in item}")
+        if session_aggregate:
+            session_aggregate.update(item)
     except Exception as e:
         logger.error(f"Failed to save metrics to DynamoDB: {e}")
 
 
+def run_scoring(prompt: str) -> Dict[str, Any]:
+    """Strands Agentでスコアリング（structured_output_model使用）"""
+    model = BedrockModel(
+        model_id=BEDROCK_MODEL,
+        region_name=AWS_REGION,
+        temperature=0.3,
+        # ScoringResult（スコア3 + analysis≤120字 + goalUpdates + 感情3 + サジェスト）の
+        # structured output を生成する。1024では出力途中でmax_tokens上限に達しAGENT_ERRORとなる事例があった。
+        # goalUpdatesは状態が変化したゴールのみ（差分）を返させるため、ゴール数に比例して伸びない。
+        max_tokens=1536,
+    )
+    # シンプルな1回の呼び出し（ツールなしでstructured outputのみ使用）
+    agent = Agent(model=model)
+    
+    # 正しいパラメータ名: structured_output_model
+    response = agent(prompt, structured_output_model=ScoringResult)
+    
+    # 正しい属性名: structured_output
+    scoring_result: ScoringResult = response.structured_output
+    return scoring_result.model_dump()
+
+
+def estimate_scoring_locally(session_id: str, payload: Dict[str, Any], language: str) -> Optional[Dict[str, Any]]:
+    """ハイブリッドモードでスコアをローカル推定（LLMで評価すべきターンはNone）
+
+    セッション最初のターン、前回のLLM評価から HYBRID_LLM_INTERVAL_TURNS ターン目、
+    推定の確信度が HYBRID_MIN_CONFIDENCE 未満の発言はLLMで評価する。
+    ゴール判定・分析コメント・サジェストはLLMでのみ生成する。ローカル推定のターンは
+    analysis を空（フロントエンドは直前の分析を表示し続ける）、suggestions を空にし、
+    前のターン向けのサジェストを再表示しない。NPC感情は直近のLLM評価結果を引き継ぐ。
+    """
+    state = hybrid_state.get(session_id) if session_id else None
+    if state is None or state['turnsSinceLlm'] + 1 >= HYBRID_LLM_INTERVAL_TURNS:
+        return None
+
+    deltas, confidence = emotion_estimator.estimate(payload.get('message', ''), language)
+    if confidence < HYBRID_MIN_CONFIDENCE:
+        return None
+
+    current = payload.get('currentScores') or get_default_scores()
+    scores = {
+        key: max(1, min(10, int(round(current.get(key, 1) + deltas[key] + state['bias'][key]))))
+        for key in SCORE_KEYS
+    }
+    last_result = state.get('lastResult', {})
+    npc_emotion = last_result.get('npcEmotion', 'neutral')
+    if scores['angerLevel'] >= 7:
+        npc_emotion = 'angry'
+    elif scores['trustLevel'] >= 8:
+        npc_emotion = 'happy'
+
+    hybrid_state.record_local(session_id)
+    return {
+        **scores,
+        'analysis': '',
+        'goalUpdates': [],
+        'npcEmotion': npc_emotion,
+        'npcEmotionIntensity': last_result.get('npcEmotionIntensity', 0.5),
+        'gesture': 'none',
+        'suggestions': [],
+    }
+
+
+def calibrate_estimator(session_id: str, payload: Dict[str, Any], language: str, result_dict: Dict[str, Any]) -> None:
+    """LLM評価結果とローカル推定の差分をセッションの補正値に反映"""
+    if not session_id:
+        return
+    current = payload.get('currentScores') or get_default_scores()
+    estimated, _ = emotion_estimator.estimate(payload.get('message', ''), language)
+    actual = {key: result_dict[key] - current.get(key, 1) for key in SCORE_KEYS}
+    hybrid_state.record_llm(session_id, estimated, actual, result_dict)
+
+
+def parse_precomputed_scoring(payload: Dict[str, Any], session_id: str, actor_id: str) -> Optional[Dict[str, Any]]:
+    """統合モードで生成済みのスコアリング結果の署名を検証（署名なし・不正な場合はNoneでLLMスコアリングへ）"""
+    return verify_scoring(session_id, payload.get('messageId', ''), actor_id, payload.get('precomputedScoring'))
+
+
+def run_compliance_check(user_message: str, session_id: str, scenario_id: str, language: str) -> Optional[Dict[str, Any]]:
+    """コンプライアンスチェックを実行（Bedrock Guardrails API、失敗時はNone）"""
+    try:
+        compliance_result = check_compliance(
+            user_message=user_message,
+            session_id=session_id,
+            scenario_id=scenario_id,
+            language=language
+        )
+        logger.info(f"Compliance check completed: score={compliance_result.get('complianceScore', 100)}, violations={len(compliance_result.get('violations', []))}")
+        return compliance_result
+    except Exception as compliance_error:
+        logger.error(f"Compliance check failed (non-blocking): {compliance_error}")
+        return None
+
+
+def wait_for_compliance(compliance_future, started_at: float) -> Optional[Dict[str, Any]]:
+    """並行実行中のコンプライアンスチェック結果を待機
+    
+    開始から COMPLIANCE_TIMEOUT_SECONDS を超えた場合は結果なし（None）としてスコアを優先する。
+    """
+    if compliance_future is None:
+        return None
+    remaining = max(0.0, COMPLIANCE_TIMEOUT_SECONDS - (time.monotonic() - started_at))
+    try:
+        return compliance_future.result(timeout=remaining)
+    except FutureTimeoutError:
+        compliance_future.cancel()
+        logger.warning(f"Compliance check timed out after {COMPLIANCE_TIMEOUT_SECONDS}s, returning scores without compliance result")
+        return None
+
+
 def handle_invocation(payload: Dict[str, Any]) -> Dict[str, Any]:
     """エージェント呼び出しを処理"""
     try:
@@ -200,48 +396,49 @@ def handle_invocation(payload: Dict[str, Any]) -> Dict[str, Any]:
             previous_messages = get_conversation_history(session_id, actor_id, limit=5)
             logger.info(f"Retrieved {len(previous_messages)} messages from AgentCore Memory")
         
-        # goalsにgoalStatusesの達成状態をマージ（LLMが現在の状態を正確に把握できるようにする）
-        goals = payload.get('goals', [])
-        goal_statuses = payload.get('goalStatuses', [])
-        if goal_statuses:
-            status_map = {s.get('goalId', ''): s for s in goal_statuses}
-            for goal in goals:
-                status = status_map.get(goal.get('id', ''))
-                if status:
-                    goal['achieved'] = status.get('achieved', False)
-        
-        prompt = build_scoring_prompt(
-            payload.get('message', ''),
-            previous_messages,
-            payload.get('currentScores', get_default_scores()),
-            goals,
-            language,
-            payload.get('scenarioDescription', '')
-        )
-        
-        logger.info(f"Building scoring prompt for session: {session_id}")
-        
-        # Strands Agentでスコアリング（structured_output_model使用）
-        model = BedrockModel(
-            model_id=BEDROCK_MODEL,
-            region_name=AWS_REGION,
-            temperature=0.3,
-            # ScoringResult（8フィールド: スコア3 + analysis≤120字 + goalUpdates + 感情3）の
-            # structured output と、AgentCore Memory から取得する会話履歴（最大5件）を併せて
-            # 生成するため、1024では出力途中でmax_tokens上限に達しAGENT_ERRORとなる事例があった。
-            # 兄弟エージェント（audio-analysis=2048, feedback-analysis=4096）と整合させ2048に設定。
-            # goalUpdatesがゴール数に比例して伸びるため、ゴール多数のシナリオでも余裕を持たせている。
-            max_tokens=2048,
-        )
-        # シンプルな1回の呼び出し（ツールなしでstructured outputのみ使用）
-        agent = Agent(model=model)
-        
-        # 正しいパラメータ名: structured_output_model
-        response = agent(prompt, structured_output_model=ScoringResult)
+        # コンプライアンスチェックはスコアリングと独立しているため並行実行する
+        user_message = payload.get('message', '')
+        compliance_future = None
+        if user_message:
+            compliance_future = compliance_executor.submit(
+                run_compliance_check, user_message, session_id, scenario_id, language
+            )
+        compliance_started = time.monotonic()
         
-        # 正しい属性名: structured_output
-        scoring_result: ScoringResult = response.structured_output
-        result_dict = scoring_result.model_dump()
+        # goalsにgoalStatusesの達成状態をマージ（LLMが現在の状態を正確に把握できるようにする）
+        goals = apply_goal_statuses(payload.get('goals', []), payload.get('goalStatuses', []))
+
+        # NPC会話エージェントの統合モードで生成済みのスコアがあればLLM呼び出しを省略
+        hybrid = SCORING_MODE == 'hybrid'
+        scoring_source = 'precomputed'
+        result_dict = parse_precomputed_scoring(payload, session_id, actor_id)
+        if result_dict is None and hybrid:
+            scoring_source = 'estimator'
+            result_dict = estimate_scoring_locally(session_id, payload, language)
+        if result_dict is not None:
+            logger.info(f"Scoring without LLM call: source={scoring_source} (session={session_id})")
+        else:
+            scoring_source = 'llm'
+            # 達成済みゴールを除外し、最新発言と関連の高い未達成ゴールのみを評価対象にする
+            prompt = build_scoring_prompt(
+                payload.get('message', ''),
+                previous_messages,
+                payload.get('currentScores', get_default_scores()),
+                select_goals_for_prompt(goals, user_message, GOAL_PROMPT_MAX_GOALS),
+                language,
+                payload.get('scenarioDescription', '')
+            )
+            
+            logger.info(f"Building scoring prompt for session: {session_id}")
+            
+            try:
+                result_dict = run_scoring(prompt)
+            except Exception:
+                if compliance_future:
+                    compliance_future.cancel()
+                raise
+            if hybrid:
+                calibrate_estimator(session_id, payload, language, result_dict)
         
         scores = {
             'angerLevel': result_dict['angerLevel'],
@@ -252,21 +449,7 @@ def handle_invocation(payload: Dict[str, Any]) -> Dict[str, Any]:
         
         logger.info(f"Scoring completed: {scores}")
         
-        # コンプライアンスチェックを実行（Bedrock Guardrails API）
-        compliance_result = None
-        user_message = payload.get('message', '')
-        if user_message:
-            try:
-                compliance_result = check_compliance(
-                    user_message=user_message,
-                    session_id=session_id,
-                    scenario_id=scenario_id,
-                    language=language
-                )
-                logger.info(f"Compliance check completed: score={compliance_result.get('complianceScore', 100)}, violations={len(compliance_result.get('violations', []))}")
-            except Exception as compliance_error:
-                logger.error(f"Compliance check failed (non-blocking): {compliance_error}")
-                compliance_result = None
+        compliance_result = wait_for_compliance(compliance_future, compliance_started)
         
         # メトリクスをDynamoDBに保存（コンプライアンス結果含む）
         message_count = len(previous_messages) + 1
@@ -277,10 +460,12 @@ def handle_invocation(payload: Dict[str, Any]) -> Dict[str, Any]:
             'success': True,
             'scores': scores,
             'analysis': analysis,
-            'goalUpdates': result_dict.get('goalUpdates', []),
+            # 状態が変化したゴールのみ（差分）を返し、クライアント側で現在の状態にマージする
+            'goalUpdates': filter_goal_updates(result_dict.get('goalUpdates', []), goals),
             'suggestions': result_dict.get('suggestions', []),
             'sessionId': session_id,
             'memoryEnabled': bool(AGENTCORE_MEMORY_ID),
+            'scoringSource': scoring_source,
         }
         
         # コンプライアンス結果をフロントエンドが期待する形式で追加
@@ -326,8 +511,10 @@ async def invoke_agent(request: Request):
         else:
             payload = {}
         
-        result = handle_invocation(payload)
+        result = await idempotency.run(payload, lambda: admission.run(handle_invocation, payload))
         return {"output": result}
+    except AdmissionRejectedError as e:
+        return admission_rejected_response(e)
     except Exception as e:
         logger.error(f"Invocation error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -336,7 +523,24 @@ async def invoke_agent(request: Request):
 @app.get("/ping")
 async def ping():
     """ヘルスチェックエンドポイント"""
-    return {"status": "healthy", "memoryId": AGENTCORE_MEMORY_ID or "not_configured"}
+    return {
+        "status": "healthy",
+        "memoryId": AGENTCORE_MEMORY_ID or "not_configured",
+        "runtime": admission.stats(),
+        "idempotency": idempotency.stats(),
+        "compliancePrefilter": get_prefilter_stats(),
+        "complianceResultCache": get_result_cache_stats(),
+        "metricsWriter": metrics_writer.stats() if metrics_writer else None,
+        "sessionAggregate": session_aggregate.stats() if session_aggregate else None,
+        "hybridScoring": {"mode": SCORING_MODE, **hybrid_state.stats()},
+    }
+
+
+@app.on_event("shutdown")
+def flush_metrics_writes():
+    """コンテナ停止時に未保存のメトリクスを書き出す"""
+    if metrics_writer and not metrics_writer.flush(timeout=METRICS_FLUSH_TIMEOUT_SECONDS):
+        logger.warning("Metrics write-behind queue was not fully flushed before shutdown")
 
 
 if __name__ == "__main__":
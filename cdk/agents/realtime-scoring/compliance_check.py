@@ -7,15 +7,25 @@ Amazon Bedrock Guardrails APIを使用して、ユーザーの発言が
 旧scoring Lambda (cdk/lambda/scoring/compliance_check.py) から移植。
 """
 
+import copy
+import hashlib
 import json
 import os
 import logging
-from typing import Dict, Any, List, Optional
+import random
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
 import boto3
 
+from compliance_prefilter import CompliancePrefilter, PREFILTER_MODES
+
 logger = logging.getLogger(__name__)
 
 AWS_REGION = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', 'us-west-2'))
@@ -25,6 +35,39 @@ _bedrock_runtime = None
 _ssm_client = None
 _dynamodb_resource = None
 _topic_definitions = None  # トピック定義キャッシュ
+_guardrails_config = None  # guardrails.json キャッシュ
+_prefilter = None  # ローカル事前フィルター
+_prefilter_unavailable = False  # guardrails.json がなく事前フィルターを構築できない
+
+# ローカル事前フィルター（compliance_prefilter.py 参照）
+PREFILTER_MODE = os.environ.get('COMPLIANCE_PREFILTER_MODE', 'shadow')
+if PREFILTER_MODE not in PREFILTER_MODES:
+    PREFILTER_MODE = 'shadow'
+PREFILTER_MAX_CLEAR_CHARS = int(os.environ.get('COMPLIANCE_PREFILTER_MAX_CLEAR_CHARS', '120'))
+PREFILTER_VERIFY_SAMPLE_RATE = float(os.environ.get('COMPLIANCE_PREFILTER_VERIFY_SAMPLE_RATE', '0.05'))
+
+# シナリオ → Guardrail解決結果のキャッシュ有効期間（秒）
+# 解決失敗（ARN未設定・DynamoDB/SSMエラー）は短いTTLで負キャッシュし、復旧後すぐ再取得できるようにする
+# シナリオのguardrail設定はシナリオAPI（別のLambda）で変更されるため、このプロセスから能動的に破棄する手段はない。
+# 変更はTTL経過後に反映される（即時反映が必要な場合は GUARDRAIL_CACHE_TTL_SECONDS を短くする）
+GUARDRAIL_CACHE_TTL_SECONDS = float(os.environ.get('GUARDRAIL_CACHE_TTL_SECONDS', '600'))
+GUARDRAIL_NEGATIVE_CACHE_TTL_SECONDS = float(os.environ.get('GUARDRAIL_NEGATIVE_CACHE_TTL_SECONDS', '60'))
+GUARDRAIL_CACHE_MAX_ENTRIES = 512
+
+# (scenarioId, environmentPrefix) -> (guardrail_info, expires_at)
+_guardrail_cache: Dict[tuple, tuple] = {}
+_guardrail_cache_lock = threading.Lock()
+
+# ApplyGuardrail の分析結果キャッシュ（言い直し・同じ定型句・フロントエンドの再試行で同じ発言が繰り返されるため）
+# キーは (Guardrail ARN, バージョン, 正規化した発言のハッシュ)。Guardrail更新時はバージョンが変わるためキーも変わる
+# DRAFT はバージョンを変えずに内容が更新されるため、古い判定を返さないようキャッシュしない
+COMPLIANCE_RESULT_CACHE_TTL_SECONDS = float(os.environ.get('COMPLIANCE_RESULT_CACHE_TTL_SECONDS', '900'))
+COMPLIANCE_RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('COMPLIANCE_RESULT_CACHE_MAX_ENTRIES', '2048'))
+
+# (guardrailArn, guardrailVersion, textHash) -> (result, expires_at)
+_result_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+_result_cache_counts = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
 
 
 def _get_bedrock_runtime():
@@ -48,32 +91,85 @@ def _get_dynamodb_resource():
     return _dynamodb_resource
 
 
-def _get_topic_definitions() -> Dict[str, str]:
-    """guardrails.json からトピック名 → definition のマッピングを取得（起動時に1回だけ読み込み）"""
-    global _topic_definitions
-    if _topic_definitions is not None:
-        return _topic_definitions
+def _get_guardrails_config() -> Dict[str, Any]:
+    """guardrails.json を読み込み（起動時に1回だけ、読み込み失敗時は空設定）
 
-    _topic_definitions = {}
+    guardrails.json は cdk/data/guardrails.json を cdk.json の app コマンドがこのディレクトリへコピーし、
+    Dockerfile でイメージに含める。
+    """
+    global _guardrails_config
+    if _guardrails_config is not None:
+        return _guardrails_config
+
+    _guardrails_config = {}
     try:
         guardrails_path = Path(__file__).parent / 'guardrails.json'
         with open(guardrails_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        for guardrail in data.get('guardrails', []):
-            for topic in guardrail.get('topics', []):
-                name = topic.get('name', '')
-                definition = topic.get('definition', '')
-                if name and definition:
-                    _topic_definitions[name] = definition
-        
-        logger.info(f"トピック定義を読み込みました: {len(_topic_definitions)}件")
+            _guardrails_config = json.load(f)
     except Exception as e:
         logger.error(f"guardrails.json の読み込みエラー: {e}")
 
+    return _guardrails_config
+
+
+def _get_topic_definitions() -> Dict[str, str]:
+    """guardrails.json からトピック名 → definition のマッピングを取得（起動時に1回だけ読み込み）"""
+    global _topic_definitions
+    if _topic_definitions is not None:
+        return _topic_definitions
+
+    _topic_definitions = {}
+    for guardrail in _get_guardrails_config().get('guardrails', []):
+        for topic in guardrail.get('topics', []):
+            name = topic.get('name', '')
+            definition = topic.get('definition', '')
+            if name and definition:
+                _topic_definitions[name] = definition
+
+    logger.info(f"トピック定義を読み込みました: {len(_topic_definitions)}件")
     return _topic_definitions
 
 
+def _get_prefilter() -> Optional[CompliancePrefilter]:
+    """ローカル事前フィルターを取得（guardrails.json から1回だけコンパイル）
+
+    guardrails.json が読み込めない・Guardrail定義が空の場合は、全発言が unknown_guardrail となり
+    事前フィルターが機能しないため、エラーを記録してNone（事前フィルター無効）を返す。
+    """
+    global _prefilter, _prefilter_unavailable
+    if _prefilter is None and not _prefilter_unavailable:
+        guardrails_config = _get_guardrails_config()
+        if not guardrails_config.get('guardrails'):
+            _prefilter_unavailable = True
+            logger.error(
+                f"guardrails.json のGuardrail定義がないため、コンプライアンス事前フィルターを無効化します (mode={PREFILTER_MODE})"
+            )
+            return None
+        _prefilter = CompliancePrefilter(guardrails_config, max_clear_chars=PREFILTER_MAX_CLEAR_CHARS)
+        logger.info(f"コンプライアンス事前フィルターを構築しました: mode={PREFILTER_MODE}, guardrails={_prefilter.guardrail_names}")
+    return _prefilter
+
+
+def get_prefilter_stats() -> Dict[str, Any]:
+    """事前フィルターの統計を取得（/ping 用）"""
+    if PREFILTER_MODE == 'off':
+        return {'mode': PREFILTER_MODE}
+    prefilter = _get_prefilter()
+    if prefilter is None:
+        return {'mode': PREFILTER_MODE, 'available': False}
+    return {'mode': PREFILTER_MODE, 'available': True, **prefilter.stats()}
+
+
+def get_result_cache_stats() -> Dict[str, Any]:
+    """分析結果キャッシュの統計を取得（/ping 用）"""
+    with _result_cache_lock:
+        counts = dict(_result_cache_counts)
+        counts['size'] = len(_result_cache)
+    lookups = counts['hits'] + counts['misses']
+    counts['hitRate'] = round(counts['hits'] / lookups, 3) if lookups else None
+    return counts
+
+
 def check_compliance(
     user_message: str,
     session_id: str,
@@ -108,8 +204,25 @@ def check_compliance(
             logger.warning("Guardrail ARN未設定。コンプライアンスチェックをスキップします。")
             return _create_default_result(session_id)
 
-        # Bedrock Guardrails APIで分析
-        result = _analyze_with_guardrail(user_message, guardrail_info)
+        # ローカル事前フィルターで明らかに安全な発言はGuardrails呼び出しを省略
+        suspicious = None
+        prefilter = _get_prefilter() if PREFILTER_MODE != 'off' else None
+        if prefilter is not None:
+            suspicious, reason = prefilter.screen(guardrail_info.get("guardrail_name", ""), user_message)
+            if PREFILTER_MODE == 'enforce' and not suspicious and random.random() >= PREFILTER_VERIFY_SAMPLE_RATE:
+                prefilter.record_skipped()
+                logger.debug(f"事前フィルターで安全と判定、Guardrailsを省略 (session={session_id})")
+                result = _create_default_result(session_id)
+                result["analysis"] = "コンプライアンス違反は検出されませんでした"
+                return result
+
+        # Bedrock Guardrails APIで分析（同じ発言の結果はキャッシュから返す）
+        result = _analyze_with_cache(user_message, guardrail_info)
+
+        if suspicious is not None:
+            prefilter.record_outcome(suspicious, bool(result.get("violations")))
+            if not suspicious and result.get("violations"):
+                logger.info(f"事前フィルターの見逃し: reason={reason}, violations={[v['rule_id'] for v in result['violations']]}")
 
         result["sessionId"] = session_id
         result["timestamp"] = int(datetime.now().timestamp() * 1000)
@@ -127,15 +240,44 @@ def check_compliance(
 
 
 def _load_scenario_guardrail(scenario_id: Optional[str], language: Optional[str] = 'ja') -> Dict[str, str]:
+    """
+    シナリオに対応するGuardrail情報を取得（TTLキャッシュ付き）
+
+    シナリオのguardrail設定は滅多に変わらないため、DynamoDB/SSMの参照結果を
+    (scenarioId, ENVIRONMENT_PREFIX) 単位でキャッシュする。
+    設定の変更は最大 GUARDRAIL_CACHE_TTL_SECONDS 遅れて反映される。
+    """
+    cache_key = (scenario_id or '', os.environ.get('ENVIRONMENT_PREFIX', ''))
+    now = time.monotonic()
+    with _guardrail_cache_lock:
+        cached = _guardrail_cache.get(cache_key)
+        if cached is not None and cached[1] > now:
+            return dict(cached[0])
+
+    guardrail_info, resolved = _resolve_scenario_guardrail(scenario_id, language)
+
+    ttl = GUARDRAIL_CACHE_TTL_SECONDS if resolved and guardrail_info.get("guardrail_arn") else GUARDRAIL_NEGATIVE_CACHE_TTL_SECONDS
+    with _guardrail_cache_lock:
+        if cache_key not in _guardrail_cache and len(_guardrail_cache) >= GUARDRAIL_CACHE_MAX_ENTRIES:
+            _guardrail_cache.pop(next(iter(_guardrail_cache)))
+        _guardrail_cache[cache_key] = (dict(guardrail_info), now + ttl)
+    return guardrail_info
+
+
+def _resolve_scenario_guardrail(scenario_id: Optional[str], language: Optional[str] = 'ja') -> Tuple[Dict[str, str], bool]:
     """
     シナリオに対応するGuardrail情報をParameter Storeから取得
 
     1. DynamoDBからシナリオのguardrailフィールドを確認
     2. なければデフォルト (GeneralCompliance) を使用
     3. Parameter StoreからARN/バージョンを取得
+
+    Returns:
+        (Guardrail情報, 参照エラーなく解決できたか)
     """
     default_guardrail_id = "GeneralCompliance"
     guardrail_id = default_guardrail_id
+    resolved = True
 
     # シナリオIDがあればDynamoDBからguardrail設定を取得
     if scenario_id:
@@ -155,6 +297,7 @@ def _load_scenario_guardrail(scenario_id: Optional[str], language: Optional[str]
                 logger.warning("SCENARIOS_TABLE_NAME 未設定")
         except Exception as e:
             logger.error(f"DynamoDBシナリオ取得エラー: {e}")
+            resolved = False
 
     # Parameter Storeからガードレール情報を取得
     base_parameter_prefix = '/aisalesroleplay/guardrails'
@@ -175,29 +318,80 @@ def _load_scenario_guardrail(scenario_id: Optional[str], language: Optional[str]
         else:
             prefixed_guardrail_id = f"{environment_prefix}{guardrail_id}" if environment_prefix else guardrail_id
 
-        # ARNを取得
+        # ARNとバージョンを1回のAPI呼び出しで取得
         arn_param = f"{parameter_prefix}/{prefixed_guardrail_id}/arn"
-        arn_response = ssm.get_parameter(Name=arn_param)
-        guardrail_arn = arn_response['Parameter']['Value']
-
-        # バージョンを取得
         version_param = f"{parameter_prefix}/{prefixed_guardrail_id}/version"
-        version_response = ssm.get_parameter(Name=version_param)
-        guardrail_version = version_response['Parameter']['Value']
+        params_response = ssm.get_parameters(Names=[arn_param, version_param])
+        values = {p['Name']: p['Value'] for p in params_response.get('Parameters', [])}
+        if params_response.get('InvalidParameters'):
+            logger.warning(f"Parameter Store に存在しないパラメータ: {params_response['InvalidParameters']}")
+        guardrail_arn = values.get(arn_param, '')
+        guardrail_version = values.get(version_param, 'DRAFT')
 
         if not guardrail_arn:
             logger.warning(f"Parameter Store から {guardrail_id} のARNが空です")
-            return {"guardrail_arn": "", "guardrail_version": "DRAFT"}
+            return {"guardrail_arn": "", "guardrail_version": "DRAFT"}, resolved
 
         logger.info(f"Guardrail取得完了: id={guardrail_id}, arn={guardrail_arn[:50]}...")
         return {
             "guardrail_arn": guardrail_arn,
-            "guardrail_version": guardrail_version
-        }
+            "guardrail_version": guardrail_version,
+            # 事前フィルターの照合に使う guardrails.json 上の名前（プレフィックスなし）
+            "guardrail_name": guardrail_id[len(environment_prefix):] if environment_prefix and guardrail_id.startswith(environment_prefix) else guardrail_id,
+        }, resolved
 
     except Exception as e:
         logger.error(f"Parameter Storeからのガードレール情報取得エラー: {e}")
-        return {"guardrail_arn": "", "guardrail_version": "DRAFT"}
+        return {"guardrail_arn": "", "guardrail_version": "DRAFT"}, False
+
+
+def _normalize_text(text: str) -> str:
+    """キャッシュキー用に発言を正規化（NFKC・前後空白除去・連続空白の圧縮）"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+def _analyze_with_cache(user_text: str, guardrail_info: Dict[str, str]) -> Dict[str, Any]:
+    """
+    _analyze_with_guardrail の結果をLRU+TTLでキャッシュして返す
+
+    ヒット時は結果のコピーを返し、違反の context は今回の発言で付け直す
+    （sessionId / timestamp は呼び出し側で付与する）。
+    DRAFT バージョンのGuardrailはキャッシュしない。
+    """
+    guardrail_version = guardrail_info.get("guardrail_version", "DRAFT")
+    if COMPLIANCE_RESULT_CACHE_MAX_ENTRIES <= 0 or guardrail_version == "DRAFT":
+        return _analyze_with_guardrail(user_text, guardrail_info)
+
+    text_hash = hashlib.sha256(_normalize_text(user_text).encode('utf-8')).hexdigest()
+    cache_key = (guardrail_info["guardrail_arn"], guardrail_version, text_hash)
+    now = time.monotonic()
+    with _result_cache_lock:
+        cached = _result_cache.get(cache_key)
+        if cached is not None and cached[1] > now:
+            _result_cache.move_to_end(cache_key)
+            _result_cache_counts['hits'] += 1
+            result = copy.deepcopy(cached[0])
+        else:
+            if cached is not None:
+                del _result_cache[cache_key]
+                _result_cache_counts['expired'] += 1
+            _result_cache_counts['misses'] += 1
+            result = None
+
+    if result is not None:
+        context = user_text[:100] + ('...' if len(user_text) > 100 else '')
+        for violation in result.get("violations", []):
+            violation['context'] = context
+        return result
+
+    result = _analyze_with_guardrail(user_text, guardrail_info)
+    with _result_cache_lock:
+        _result_cache[cache_key] = (copy.deepcopy(result), now + COMPLIANCE_RESULT_CACHE_TTL_SECONDS)
+        _result_cache.move_to_end(cache_key)
+        while len(_result_cache) > COMPLIANCE_RESULT_CACHE_MAX_ENTRIES:
+            _result_cache.popitem(last=False)
+            _result_cache_counts['evictions'] += 1
+    return result
 
 
 def _analyze_with_guardrail(user_text: str, guardrail_info: Dict[str, str]) -> Dict[str, Any]:
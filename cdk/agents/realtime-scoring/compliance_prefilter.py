@@ -0,0 +1,130 @@
+"""
+コンプライアンスチェックのローカル事前フィルター
+
+guardrails.json の禁止語句（exact / partial）・トピックキーワードと、
+Guardrailの機密情報ポリシー（EMAIL / PHONE）に相当する正規表現を
+Guardrailごとに1本の結合正規表現へコンパイルし、ApplyGuardrail を呼ぶ前に照合する。
+
+どれにもマッチせず十分に短い発言は「明らかに安全」とみなし、
+enforce モードでは Guardrails 呼び出しを省略する。
+コンテンツフィルター（HATE / INSULTS 等）やトピックの意味的な判定は
+ローカルでは再現できないため、shadow モードで Guardrails の判定と突き合わせて
+適合率・再現率を計測し、キーワードや文字数上限を調整する。
+
+モード:
+  - off: 事前フィルターを使わない
+  - shadow: 判定のみ行い、Guardrailsは常に呼び出す（計測用）
+  - enforce: 安全と判定した発言は Guardrails を省略する
+             （verify_sample_rate の割合だけ Guardrails でも検証し、計測を続ける）
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+PREFILTER_MODES = ('off', 'shadow', 'enforce')
+
+# Guardrailの機密情報ポリシー（EMAIL / PHONE）に相当するパターン
+PII_PATTERNS = [
+    r'[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}',
+    r'[0-9０-９][0-9０-９\-‐－ー\s]{8,}[0-9０-９]',
+]
+
+# ASCII語句は単語境界で照合（"never" が "nevertheless" にマッチしないように）
+_ASCII_WORD_PATTERN = r'(?<![A-Za-z0-9]){}(?![A-Za-z0-9])'
+
+
+def _term_pattern(term: str) -> str:
+    escaped = re.escape(term)
+    if term.isascii() and term[:1].isalnum():
+        return _ASCII_WORD_PATTERN.format(escaped)
+    return escaped
+
+
+def compile_matcher(terms: List[str]) -> Optional["re.Pattern[str]"]:
+    """語句リストを1本の結合正規表現にコンパイル（長い語句を優先）"""
+    unique_terms = sorted({t.strip() for t in terms if t and t.strip()}, key=len, reverse=True)
+    patterns = [_term_pattern(t) for t in unique_terms] + PII_PATTERNS
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
+
+class CompliancePrefilter:
+    """Guardrail名ごとの結合正規表現による事前判定と、Guardrails判定との突き合わせ統計
+
+    Args:
+        guardrails_config: guardrails.json の内容
+        max_clear_chars: 安全と判定できる発言の最大文字数（超える発言は常にGuardrailsへ）
+    """
+
+    def __init__(self, guardrails_config: Dict[str, Any], max_clear_chars: int = 120):
+        self.max_clear_chars = max_clear_chars
+        self._matchers: Dict[str, "re.Pattern[str]"] = {}
+        for guardrail in guardrails_config.get('guardrails', []):
+            name = guardrail.get('name', '')
+            if not name:
+                continue
+            word_filters = guardrail.get('wordFilters', {})
+            terms = list(word_filters.get('exact', [])) + list(word_filters.get('partial', []))
+            for topic in guardrail.get('topics', []):
+                terms.extend(topic.get('keywords', []))
+            self._matchers[name] = compile_matcher(terms)
+
+        self._lock = threading.Lock()
+        self._counts = {
+            'screened': 0,
+            'suspicious': 0,
+            'skipped': 0,
+            'truePositive': 0,
+            'falsePositive': 0,
+            'falseNegative': 0,
+            'trueNegative': 0,
+        }
+
+    @property
+    def guardrail_names(self) -> List[str]:
+        return list(self._matchers)
+
+    def screen(self, guardrail_name: str, text: str) -> Tuple[bool, str]:
+        """発言を事前判定
+
+        Returns:
+            (要Guardrails確認か, 理由)。理由は 'match' / 'too_long' / 'unknown_guardrail' / 'clear'
+        """
+        matcher = self._matchers.get(guardrail_name)
+        if matcher is None:
+            suspicious, reason = True, 'unknown_guardrail'
+        elif matcher.search(text):
+            suspicious, reason = True, 'match'
+        elif len(text) > self.max_clear_chars:
+            suspicious, reason = True, 'too_long'
+        else:
+            suspicious, reason = False, 'clear'
+
+        with self._lock:
+            self._counts['screened'] += 1
+            if suspicious:
+                self._counts['suspicious'] += 1
+        return suspicious, reason
+
+    def record_skipped(self) -> None:
+        """Guardrails呼び出しを省略したことを記録"""
+        with self._lock:
+            self._counts['skipped'] += 1
+
+    def record_outcome(self, suspicious: bool, violated: bool) -> None:
+        """事前判定とGuardrailsの判定結果を突き合わせて記録"""
+        if suspicious:
+            key = 'truePositive' if violated else 'falsePositive'
+        else:
+            key = 'falseNegative' if violated else 'trueNegative'
+        with self._lock:
+            self._counts[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """判定件数と適合率・再現率（Guardrails判定を正解とする）を取得"""
+        with self._lock:
+            counts = dict(self._counts)
+        tp, fp, fn = counts['truePositive'], counts['falsePositive'], counts['falseNegative']
+        counts['precision'] = round(tp / (tp + fp), 3) if tp + fp else None
+        counts['recall'] = round(tp / (tp + fn), 3) if tp + fn else None
+        return counts
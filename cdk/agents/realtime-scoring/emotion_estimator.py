@@ -0,0 +1,205 @@
+"""
+ハイブリッドスコアリング用のローカル感情差分推定
+
+営業担当者の発言から怒り・信頼・進捗の差分（-2〜+2）を語彙ベースで推定する。
+相づちや短い返答はLLMを呼ばずに推定し、一定ターンごと、または推定の確信度が
+低い発言（長文・肯定と否定が混在・語彙にヒットしない）ではLLMスコアリングを行う。
+
+LLMスコアリングの結果は、同じ発言に対する推定差分との誤差としてセッションごとに蓄積し（EWMA）、
+以降のローカル推定の補正に使う（キャリブレーション）。
+
+語彙は DEFAULT_LEXICON を既定とし、realtime-metrics の蓄積データからオフラインで
+調整した重みを EMOTION_LEXICON_PATH のJSON（DEFAULT_LEXICON と同じ形式）で差し替えられる。
+"""
+
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCORE_KEYS = ('angerLevel', 'trustLevel', 'progressLevel')
+
+# 語彙ごとの差分 (anger, trust, progress)
+DEFAULT_LEXICON: Dict[str, Dict[str, Tuple[int, int, int]]] = {
+    'ja': {
+        'ありがとう': (-1, 1, 0),
+        '恐れ入ります': (-1, 1, 0),
+        '申し訳': (-1, 1, 0),
+        'おっしゃる通り': (-1, 1, 0),
+        'ご懸念': (-1, 1, 0),
+        '確認させて': (0, 1, 0),
+        '具体的に': (0, 1, 1),
+        '実績': (0, 1, 1),
+        '事例': (0, 1, 1),
+        'お見積': (0, 0, 1),
+        '次回': (0, 0, 1),
+        'ご提案': (0, 0, 1),
+        '導入': (0, 0, 1),
+        'スケジュール': (0, 0, 1),
+        '絶対': (1, -1, 0),
+        '必ず': (1, -1, 0),
+        '今すぐ': (1, -1, 0),
+        '今日中': (1, -1, 0),
+        '他社': (1, -1, 0),
+        'とにかく': (1, -1, 0),
+        'しかし': (1, 0, 0),
+        '無理': (1, -1, -1),
+        'わかりません': (1, -1, 0),
+    },
+    'en': {
+        'thank': (-1, 1, 0),
+        'appreciate': (-1, 1, 0),
+        'sorry': (-1, 1, 0),
+        'understand your concern': (-1, 1, 0),
+        'let me confirm': (0, 1, 0),
+        'specifically': (0, 1, 1),
+        'case study': (0, 1, 1),
+        'track record': (0, 1, 1),
+        'quote': (0, 0, 1),
+        'next meeting': (0, 0, 1),
+        'proposal': (0, 0, 1),
+        'schedule': (0, 0, 1),
+        'guarantee': (1, -1, 0),
+        'definitely': (1, -1, 0),
+        'right now': (1, -1, 0),
+        'today only': (1, -1, 0),
+        'competitor': (1, -1, 0),
+        'anyway': (1, -1, 0),
+        'but': (1, 0, 0),
+        "don't know": (1, -1, 0),
+    },
+}
+
+# 差分なしで確信度高く推定できる相づち・短い返答
+ACKNOWLEDGEMENTS = {
+    'ja': ('はい', 'ええ', 'そうですね', 'なるほど', '承知しました', 'かしこまりました', 'わかりました'),
+    'en': ('yes', 'ok', 'okay', 'sure', 'i see', 'got it', 'right'),
+}
+
+ACKNOWLEDGEMENT_MAX_CHARS = 15
+# 語彙にヒットしない発言を確信度高く扱える最大文字数
+UNMATCHED_MAX_CHARS = 40
+# 推定でもこれ以上の文字数はLLMに回す
+LOCAL_MAX_CHARS = 120
+
+
+class EmotionDeltaEstimator:
+    """語彙ベースの感情差分推定器
+
+    Args:
+        lexicon: 言語 -> {語句: (anger, trust, progress)} の辞書
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, Dict[str, Any]]] = None):
+        # ASCII語句は単語境界で照合（"but" が "button" にマッチしないように）
+        self._patterns = {
+            language: [
+                (re.compile(rf'\b{re.escape(term.lower())}\b' if term.isascii() else re.escape(term.lower())), tuple(delta))
+                for term, delta in terms.items()
+            ]
+            for language, terms in (lexicon or DEFAULT_LEXICON).items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "EmotionDeltaEstimator":
+        """オフラインで調整した語彙JSONから生成（読み込み失敗時は既定の語彙）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to load emotion lexicon from {path}, using default: {e}")
+            return cls()
+
+    def estimate(self, text: str, language: str = 'ja') -> Tuple[Dict[str, int], float]:
+        """発言から差分と確信度（0.0〜1.0）を推定"""
+        normalized = (text or '').strip().lower()
+        zero = {key: 0 for key in SCORE_KEYS}
+        if not normalized:
+            return zero, 1.0
+
+        lang = 'en' if language == 'en' else 'ja'
+        if len(normalized) <= ACKNOWLEDGEMENT_MAX_CHARS and normalized.rstrip('。.!！、, ') in ACKNOWLEDGEMENTS[lang]:
+            return zero, 0.95
+        if len(normalized) > LOCAL_MAX_CHARS:
+            return zero, 0.0
+
+        totals = [0, 0, 0]
+        positive_hits = negative_hits = 0
+        for pattern, delta in self._patterns.get(lang, []):
+            if pattern.search(normalized):
+                for i in range(3):
+                    totals[i] += delta[i]
+                if delta[0] < 0 or delta[1] > 0:
+                    positive_hits += 1
+                if delta[0] > 0 or delta[1] < 0:
+                    negative_hits += 1
+
+        if positive_hits == 0 and negative_hits == 0:
+            confidence = 0.7 if len(normalized) <= UNMATCHED_MAX_CHARS else 0.3
+        elif positive_hits and negative_hits:
+            # 肯定と否定が混在する発言は文脈判断が必要
+            confidence = 0.3
+        else:
+            confidence = 0.8
+
+        deltas = {key: max(-2, min(2, totals[i])) for i, key in enumerate(SCORE_KEYS)}
+        return deltas, confidence
+
+
+class HybridScoringState:
+    """セッションごとのLLM呼び出し間隔と推定補正値を保持するLRU
+
+    Args:
+        max_sessions: 保持する最大セッション数
+        calibration_alpha: 推定誤差のEWMA係数
+    """
+
+    def __init__(self, max_sessions: int = 1024, calibration_alpha: float = 0.3):
+        self.max_sessions = max_sessions
+        self.calibration_alpha = calibration_alpha
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_turns = 0
+        self.llm_turns = 0
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """セッション状態のコピーを取得（LLM未実行のセッションはNone）"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            self._sessions.move_to_end(session_id)
+            return {**state, 'bias': dict(state['bias'])}
+
+    def record_local(self, session_id: str) -> None:
+        """ローカル推定で処理したターンを記録"""
+        with self._lock:
+            self.local_turns += 1
+            state = self._sessions.get(session_id)
+            if state is not None:
+                state['turnsSinceLlm'] += 1
+
+    def record_llm(self, session_id: str, estimated: Dict[str, int], actual: Dict[str, int],
+                   result: Dict[str, Any]) -> None:
+        """LLMスコアリング結果を記録し、推定誤差で補正値を更新"""
+        with self._lock:
+            self.llm_turns += 1
+            state = self._sessions.get(session_id) or {'bias': {key: 0.0 for key in SCORE_KEYS}}
+            for key in SCORE_KEYS:
+                error = actual.get(key, 0) - estimated.get(key, 0)
+                state['bias'][key] = (1 - self.calibration_alpha) * state['bias'][key] + self.calibration_alpha * error
+            state['turnsSinceLlm'] = 0
+            state['lastResult'] = result
+            self._sessions[session_id] = state
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """ローカル推定・LLMのターン数を取得"""
+        with self._lock:
+            return {'sessions': len(self._sessions), 'localTurns': self.local_turns, 'llmTurns': self.llm_turns}
@@ -0,0 +1,160 @@
+"""
+リアルタイムメトリクス保存のバックグラウンドフラッシャー
+
+スコアリング結果（realtime-metrics アイテム）をレスポンス返却後に
+バックグラウンドスレッドで DynamoDB に書き込む。
+キューに溜まったアイテムを batch_writer（BatchWriteItem）でまとめて保存し、
+失敗したバッチは指数バックオフで再試行する（少なくとも1回の書き込み）。
+アイテムのキー（sessionId + createdAt）はキュー投入時に確定しているため、
+再試行で同じアイテムが重複して書かれても上書きになるだけで件数は増えない。
+
+キューは有界で、満杯の場合は submit() がFalseを返し、呼び出し側で同期保存にフォールバックする。
+on_written を指定すると、保存できたアイテムごとにキュー投入順で呼び出す（セッション集約アイテムの更新用）。
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# BatchWriteItemの1リクエストあたりの上限
+BATCH_WRITE_MAX_ITEMS = 25
+
+
+class MetricsWriteBehind:
+    """DynamoDBへのメトリクス保存を非同期化・バッチ化するライター
+
+    Args:
+        table_fn: 保存先のDynamoDB Tableを返す関数（未設定時はNone）
+        max_queue_size: キューに保持する最大アイテム数
+        max_retries: バッチ保存の最大再試行回数
+        retry_base_delay: 再試行の初回待機秒数（指数バックオフ）
+        on_written: 保存できたアイテムごとに呼び出す関数
+    """
+
+    def __init__(
+        self,
+        table_fn: Callable[[], Any],
+        max_queue_size: int = 1000,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.5,
+        on_written: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self._table_fn = table_fn
+        self._on_written = on_written
+        # (item, enqueued_at)
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], float]]" = queue.Queue(maxsize=max_queue_size)
+        self._max_retries = max_retries
+        self._retry_base_delay = retry_base_delay
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def start(self) -> None:
+        """ワーカースレッドを起動"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='metrics-flusher', daemon=True)
+            self._thread.start()
+
+    def submit(self, item: Dict[str, Any]) -> bool:
+        """メトリクスアイテムをキューに追加
+
+        Returns:
+            bool: キュー投入できた場合True（満杯時はFalse）
+        """
+        with self._cond:
+            self._pending += 1
+        try:
+            self._queue.put_nowait((item, time.monotonic()))
+        except queue.Full:
+            self._done(1)
+            logger.warning(f"Metrics write queue is full, falling back to synchronous save (session={item.get('sessionId')})")
+            return False
+        return True
+
+    def flush(self, timeout: float) -> bool:
+        """全ての未保存アイテムの保存完了を待機"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """フラッシャー統計を取得（遅延はキュー投入から保存完了までのミリ秒）"""
+        with self._cond:
+            return {
+                'queueDepth': self._queue.qsize(),
+                'pending': self._pending,
+                'written': self.written,
+                'failed': self.failed,
+                'retries': self.retries,
+                'lastLagMs': round(self.last_lag_ms, 1),
+                'maxLagMs': round(self.max_lag_ms, 1),
+            }
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # 溜まっている分をまとめて取り出す
+            while len(batch) < BATCH_WRITE_MAX_ITEMS:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_with_retry(batch)
+            except Exception as e:
+                logger.error(f"Metrics flusher error: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                self._done(len(batch))
+
+    def _write_with_retry(self, batch: List[Tuple[Dict[str, Any], float]]) -> None:
+        for attempt in range(self._max_retries + 1):
+            try:
+                table = self._table_fn()
+                # batch_writer は未処理アイテム（UnprocessedItems）を自動で再送する
+                with table.batch_writer() as writer:
+                    for item, _ in batch:
+                        writer.put_item(Item=item)
+                self._record_success(batch)
+                return
+            except Exception as e:
+                if attempt >= self._max_retries:
+                    with self._cond:
+                        self.failed += len(batch)
+                    logger.error(
+                        f"Failed to save {len(batch)} metrics items after {self._max_retries} retries: {e}, "
+                        f"sessions={sorted({item.get('sessionId') for item, _ in batch})}"
+                    )
+                    return
+                with self._cond:
+                    self.retries += 1
+                logger.warning(f"Metrics batch save failed (attempt {attempt + 1}), retrying: {e}")
+                time.sleep(self._retry_base_delay * (2 ** attempt))
+
+    def _record_success(self, batch: List[Tuple[Dict[str, Any], float]]) -> None:
+        lag_ms = (time.monotonic() - min(enqueued_at for _, enqueued_at in batch)) * 1000
+        with self._cond:
+            self.written += len(batch)
+            self.last_lag_ms = lag_ms
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        logger.info(f"Metrics saved to DynamoDB: {len(batch)} items, lag={lag_ms:.0f}ms")
+        if self._on_written:
+            for item, _ in batch:
+                try:
+                    self._on_written(item)
+                except Exception as e:
+                    logger.error(f"Metrics post-write hook failed (session={item.get('sessionId')}): {e}")
+
+    def _done(self, count: int) -> None:
+        with self._cond:
+            self._pending -= count
+            self._cond.notify_all()
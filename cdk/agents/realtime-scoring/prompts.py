@@ -4,6 +4,8 @@
 
 from typing import Dict, Any, List
 
+from scoring_prompts import build_scoring_rules, format_goals
+
 
 def build_scoring_prompt(
     user_message: str,
@@ -38,40 +40,7 @@ Latest Message: {user_message}
 Goals:
 {goals_txt}
 
-Goal evaluation rules:
-- For goalUpdates, use the exact goalId shown in [ID: xxx] above
-- Do NOT invent your own IDs. Always use the provided IDs exactly as shown
-
-Rules for "analysis" field:
-- Write 1-2 SHORT sentences only (max 120 characters)
-- Format: "[Score change reason]. [One actionable tip]."
-- Example: "Good rapport building, trust +1. Try mentioning specific product benefits next."
-- Do NOT write long explanations, bullet points, or section headers
-- Do NOT repeat the scores or goal list in the analysis
-
-NPC Emotion Estimation:
-- Estimate the NPC's current emotional state based on the conversation context
-- npcEmotion: one of "happy", "angry", "sad", "relaxed", "neutral"
-- npcEmotionIntensity: 0.0 (very weak) to 1.0 (very strong)
-- Consider: NPC personality, conversation flow, user's attitude, and score changes
-
-NPC Gesture Estimation:
-- Estimate the appropriate gesture for the NPC based on the conversation context
-- gesture: "nod" (nodding), "headTilt" (head tilt), "none" (no gesture)
-- Nod: Use when NPC shows agreement, understanding, or empathy
-- Head tilt: Use when NPC shows doubt, confusion, or is thinking
-- None: Default when no gesture is needed
-- Do not add a gesture every time. Use them at a natural frequency.
-
-Reply Suggestions:
-- Generate suggested replies that the SALES rep (the user) could say next
-- Base them on the NPC's latest message and the conversation flow
-- IMPORTANT: Consider the scenario context and goal hints when generating suggestions
-- Prioritize suggestions that help achieve unachieved goals
-- suggestions: an array of about 3 SHORT reply candidates (each max 40 characters)
-- Give them DIFFERENT directions (e.g., assertive / empathetic / question) so the choice changes the metrics
-- Write them as natural first-person utterances the sales rep would say
-- Do NOT include quotation marks or numbering"""
+{build_scoring_rules(language)}"""
     else:
         scenario_ctx = f"\nシナリオの背景: {scenario_description}\n" if scenario_description else ""
         return f"""あなたは営業会話のスコアリングエンジンです。最新メッセージを評価しスコアを更新してください。
@@ -86,40 +55,7 @@ Reply Suggestions:
 ゴール:
 {goals_txt}
 
-ゴール判定ルール:
-- goalUpdatesのgoalIdには、上記ゴール一覧の[ID: xxx]に記載されたIDをそのまま使用すること
-- 自分でIDを作成しないこと。必ず提供されたIDを使用すること
-
-「analysis」フィールドのルール:
-- 1〜2文の短文のみ（最大120文字）
-- 形式: 「[スコア変動理由]。[次の一手のアドバイス]。」
-- 例: 「丁寧な挨拶で好印象。次は訪問目的を簡潔に伝えましょう。」
-- 長文の説明、箇条書き、見出しは禁止
-- スコアやゴール一覧をanalysisに繰り返さないこと
-
-NPC感情推定:
-- 会話の文脈からNPCの現在の感情状態を推定してください
-- npcEmotion: "happy", "angry", "sad", "relaxed", "neutral" のいずれか
-- npcEmotionIntensity: 0.0（非常に弱い）〜 1.0（非常に強い）
-- 考慮要素: NPCの性格、会話の流れ、ユーザーの態度、スコアの変化
-
-NPCジェスチャー推定:
-- 会話の文脈からNPCの適切なジェスチャーを推定してください
-- gesture: "nod"（うなずき）, "headTilt"（首かしげ）, "none"（なし） のいずれか
-- うなずき(nod): NPCが同意・理解・共感を示す場面で使用
-- 首かしげ(headTilt): NPCが疑問・困惑・考え中の場面で使用
-- なし(none): 特にジェスチャーが不要な場面（デフォルト）
-- 毎回ジェスチャーを付ける必要はありません。自然な頻度で使用してください
-
-返答候補（サジェスト）:
-- 営業担当者（ユーザー）が次に発言する返答候補を生成してください
-- NPCの直前の発言と会話の流れを踏まえること
-- 重要: シナリオの背景とゴールのヒントを考慮して提案を生成すること
-- 未達成のゴールの達成を助ける提案を優先すること
-- suggestions: 3件程度の短い返答候補の配列（各候補は最大40文字）
-- 各候補は異なる方向性（例: 強気 / 共感 / 質問）を持たせ、選択によってメトリクスが変化するようにすること
-- 営業担当者が実際に話す一人称の自然な発言として記述すること
-- 引用符や番号は付けないこと"""
+{build_scoring_rules(language)}"""
 
 
 def format_conversation_history(messages: List[Dict], language: str = 'ja') -> str:
@@ -140,37 +76,6 @@ def format_conversation_history(messages: List[Dict], language: str = 'ja') -> s
     return "\n".join(lines)
 
 
-def format_goals(goals: List[Dict], language: str = 'ja') -> str:
-    """ゴールをフォーマット（IDを含めてLLMが正確なgoalIdを返せるようにする）"""
-    if not goals:
-        return "（ゴールなし）" if language == 'ja' else "(No goals)"
-    
-    achieved_label = '達成' if language == 'ja' else 'Achieved'
-    not_achieved_label = '未達成' if language == 'ja' else 'Not achieved'
-    hints_label = 'ヒント' if language == 'ja' else 'Hints'
-    criteria_label = '達成基準' if language == 'ja' else 'Criteria'
-    
-    lines = []
-    for goal in goals:
-        goal_id = goal.get('id', '')
-        description = goal.get('description', '')
-        achieved = goal.get('achieved', False)
-        status = achieved_label if achieved else not_achieved_label
-        lines.append(f"- [ID: {goal_id}] {description}: {status}")
-        
-        # 達成基準を含める（未達成ゴールのみ、サジェスト品質向上のため）
-        criteria = goal.get('criteria', [])
-        if criteria and not achieved:
-            lines.append(f"  {criteria_label}: {'; '.join(criteria)}")
-        
-        # ヒントを含める（未達成ゴールのみ、サジェスト品質向上のため）
-        hints = goal.get('hints', [])
-        if hints and not achieved:
-            lines.append(f"  {hints_label}: {'; '.join(hints)}")
-    
-    return "\n".join(lines)
-
-
 def get_default_scores() -> Dict[str, int]:
     """デフォルトスコアを取得"""
     return {
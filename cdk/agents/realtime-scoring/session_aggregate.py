@@ -0,0 +1,197 @@
+"""
+セッション単位のリアルタイムメトリクス集約アイテム
+
+ターンごとの realtime-metrics アイテムに加えて、セッションごとに1件の集約アイテムを
+update_item で更新する。分析開始時（sessionAnalysis/start_handler）や分析結果API
+（sessions/analysis_results_handlers）は、パーティション全体を dataType でフィルタして
+クエリする代わりに、このアイテムを get_item で1回読むだけでよい。
+
+集約アイテム（sessionId + createdAt=AGGREGATE_SORT_KEY）:
+  - angerLevel / trustLevel / progressLevel / analysis: 最新ターンの値
+  - turnCount: スコアリングしたターン数
+  - minScores / maxScores / ewmaScores: 指標ごとの最小・最大・指数移動平均
+  - packedScores: ターンごとの (anger, trust, progress) を1バイトずつ詰めたBinary（3バイト/ターン）
+  - turns: ターンごとの {createdAt, analysis}（list_append で追記、packedScores と同じ順）
+  - complianceViolations: 検出されたコンプライアンス違反（turnIndex を付けて list_append で追記）
+
+読み取り側の展開は cdk/lambda/common/realtime_metrics_aggregate.py を参照。
+
+ソートキーは '#' で始まるため、降順クエリ（最新が先頭）ではタイムスタンプのアイテムより後に並ぶ。
+最小・最大・EWMAは旧値に依存するため、turnCount を条件にした楽観的排他で更新し、
+競合時は一貫性のある読み込みで最新状態を取り直して再試行する。
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_SORT_KEY = '#realtime-metrics-aggregate'
+AGGREGATE_DATA_TYPE = 'realtime-metrics-aggregate'
+SCORE_FIELDS = ('angerLevel', 'trustLevel', 'progressLevel')
+
+
+def pack_scores(turns: List[tuple]) -> bytes:
+    """ターンごとの (anger, trust, progress) をバイト列に詰める"""
+    return bytes(max(0, min(255, int(value))) for turn in turns for value in turn)
+
+
+def unpack_scores(packed: Any) -> List[tuple]:
+    """packedScores を (anger, trust, progress) のリストに展開"""
+    raw = bytes(packed or b'')
+    return [tuple(raw[i:i + 3]) for i in range(0, len(raw) - len(raw) % 3, 3)]
+
+
+class SessionAggregateUpdater:
+    """セッション集約アイテムの更新
+
+    Args:
+        table_fn: 保存先のDynamoDB Tableを返す関数
+        ewma_alpha: EWMAの平滑化係数
+        max_sessions: 直近の集約状態を保持する最大セッション数（読み込みの省略用）
+        max_attempts: 競合時の最大試行回数
+    """
+
+    def __init__(self, table_fn: Callable[[], Any], ewma_alpha: float = 0.3,
+                 max_sessions: int = 1024, max_attempts: int = 3):
+        self._table_fn = table_fn
+        self.ewma_alpha = ewma_alpha
+        self.max_sessions = max_sessions
+        self.max_attempts = max_attempts
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.updated = 0
+        self.conflicts = 0
+        self.failed = 0
+
+    def update(self, item: Dict[str, Any]) -> None:
+        """realtime-metrics アイテム1件分を集約アイテムに反映"""
+        session_id = item['sessionId']
+        with self._lock:
+            state = self._states.get(session_id)
+        table = self._table_fn()
+
+        for _ in range(self.max_attempts):
+            if state is None:
+                state = self._load_state(table, session_id)
+            new_state = self._next_state(state, item)
+            try:
+                self._write(table, item, state, new_state)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+                with self._lock:
+                    self.conflicts += 1
+                state = None
+                continue
+            with self._lock:
+                self.updated += 1
+                self._states[session_id] = new_state
+                self._states.move_to_end(session_id)
+                while len(self._states) > self.max_sessions:
+                    self._states.popitem(last=False)
+            return
+
+        with self._lock:
+            self.failed += 1
+            self._states.pop(session_id, None)
+        logger.error(f"Failed to update session aggregate after {self.max_attempts} attempts: session={session_id}")
+
+    def stats(self) -> Dict[str, int]:
+        """更新・競合・失敗件数を取得"""
+        with self._lock:
+            return {'updated': self.updated, 'conflicts': self.conflicts, 'failed': self.failed}
+
+    @staticmethod
+    def _load_state(table, session_id: str) -> Optional[Dict[str, Any]]:
+        response = table.get_item(
+            Key={'sessionId': session_id, 'createdAt': AGGREGATE_SORT_KEY},
+            ConsistentRead=True,
+        )
+        stored = response.get('Item')
+        if not stored:
+            return None
+        return {
+            'turnCount': int(stored.get('turnCount', 0)),
+            'minScores': {k: int(v) for k, v in stored.get('minScores', {}).items()},
+            'maxScores': {k: int(v) for k, v in stored.get('maxScores', {}).items()},
+            'ewmaScores': {k: float(v) for k, v in stored.get('ewmaScores', {}).items()},
+            'packedScores': bytes(stored.get('packedScores') or b''),
+        }
+
+    def _next_state(self, state: Optional[Dict[str, Any]], item: Dict[str, Any]) -> Dict[str, Any]:
+        scores = {field: int(item.get(field, 0)) for field in SCORE_FIELDS}
+        if state is None or state['turnCount'] == 0:
+            return {
+                'turnCount': 1,
+                'minScores': dict(scores),
+                'maxScores': dict(scores),
+                'ewmaScores': {field: float(value) for field, value in scores.items()},
+                'packedScores': pack_scores([tuple(scores.values())]),
+            }
+        alpha = self.ewma_alpha
+        return {
+            'turnCount': state['turnCount'] + 1,
+            'minScores': {f: min(state['minScores'].get(f, scores[f]), scores[f]) for f in SCORE_FIELDS},
+            'maxScores': {f: max(state['maxScores'].get(f, scores[f]), scores[f]) for f in SCORE_FIELDS},
+            'ewmaScores': {
+                f: (1 - alpha) * state['ewmaScores'].get(f, scores[f]) + alpha * scores[f] for f in SCORE_FIELDS
+            },
+            'packedScores': state['packedScores'] + pack_scores([tuple(scores.values())]),
+        }
+
+    @staticmethod
+    def _write(table, item: Dict[str, Any], state: Optional[Dict[str, Any]], new_state: Dict[str, Any]) -> None:
+        fields = {
+            'dataType': AGGREGATE_DATA_TYPE,
+            'angerLevel': item.get('angerLevel'),
+            'trustLevel': item.get('trustLevel'),
+            'progressLevel': item.get('progressLevel'),
+            'analysis': item.get('analysis', ''),
+            'messageNumber': item.get('messageNumber', new_state['turnCount']),
+            'updatedAt': item.get('createdAt'),
+            'actorId': item.get('actorId', ''),
+            'expireAt': item.get('expireAt'),
+            'turnCount': new_state['turnCount'],
+            'minScores': new_state['minScores'],
+            'maxScores': new_state['maxScores'],
+            'ewmaScores': {f: Decimal(str(round(v, 3))) for f, v in new_state['ewmaScores'].items()},
+            'packedScores': new_state['packedScores'],
+        }
+        names = {f'#{name}': name for name in fields}
+        values = {f':{name}': value for name, value in fields.items()}
+        assignments = [f'#{name} = :{name}' for name in fields]
+
+        # ターンごとの作成日時・分析コメント（packedScores の turnIndex 番目に対応）
+        turn_index = new_state['turnCount'] - 1
+        names['#turns'] = 'turns'
+        values[':empty'] = []
+        values[':turn'] = [{'createdAt': item.get('createdAt'), 'analysis': item.get('analysis', '')}]
+        assignments.append('#turns = list_append(if_not_exists(#turns, :empty), :turn)')
+
+        violations = (item.get('complianceData') or {}).get('violations') or []
+        if violations:
+            names['#complianceViolations'] = 'complianceViolations'
+            values[':violations'] = [{**violation, 'turnIndex': turn_index} for violation in violations]
+            assignments.append(
+                '#complianceViolations = list_append(if_not_exists(#complianceViolations, :empty), :violations)'
+            )
+
+        if state is None:
+            condition = 'attribute_not_exists(#turnCount)'
+        else:
+            condition = '#turnCount = :expectedTurnCount'
+            values[':expectedTurnCount'] = state['turnCount']
+
+        table.update_item(
+            Key={'sessionId': item['sessionId'], 'createdAt': AGGREGATE_SORT_KEY},
+            UpdateExpression='SET ' + ', '.join(assignments),
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
@@ -0,0 +1,17 @@
+"""
+エージェントのユニットテスト共通設定
+
+各エージェントのディレクトリはDockerイメージ内でフラットに配置されるため（/app）、
+テストでも common/ と各エージェントのディレクトリをモジュール検索パスに追加する。
+テスト対象は外部サービスに依存しないモジュール（名前がエージェント間で重複しないもの）に限る。
+"""
+
+import os
+import sys
+
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for name in ('common', 'realtime-scoring', 'npc-conversation'):
+    path = os.path.join(AGENTS_DIR, name)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,110 @@
+"""
+コンプライアンス事前フィルター（compliance_prefilter.py）のテスト
+
+- guardrails.json の禁止語句・トピックキーワード・PIIパターンにマッチした発言は要確認
+- 短くマッチしない発言は安全（clear）、長い発言と未知のGuardrailは要確認
+- Guardrailsの判定との突き合わせで適合率・再現率を計算する
+- guardrails.json がない場合は事前フィルターを無効化する（compliance_check.py）
+"""
+import json
+import os
+
+import pytest
+
+from compliance_prefilter import CompliancePrefilter
+
+GUARDRAILS_JSON = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'guardrails.json')
+
+
+@pytest.fixture
+def config():
+    return {
+        'guardrails': [
+            {
+                'name': 'TechnologyCompliance',
+                'wordFilters': {'exact': ['never', '100%'], 'partial': ['we guarantee']},
+                'topics': [{'name': 'exaggerated-claims', 'keywords': ['zero downtime', '絶対']}],
+            }
+        ]
+    }
+
+
+@pytest.fixture
+def prefilter(config):
+    return CompliancePrefilter(config, max_clear_chars=40)
+
+
+class TestScreen:
+    @pytest.mark.parametrize('text', [
+        'We guarantee the migration will finish on time',
+        'This plan has zero downtime',
+        'It is 100% safe',
+        'この製品なら絶対に安心です',
+        'You should NEVER worry',
+        'Please mail me at taro@example.com',
+        '電話番号は 090-1234-5678 です',
+    ])
+    def test_禁止語句_キーワード_PIIにマッチした発言は要確認(self, prefilter, text):
+        assert prefilter.screen('TechnologyCompliance', text) == (True, 'match')
+
+    def test_ASCII語句は単語境界で照合する(self, prefilter):
+        assert prefilter.screen('TechnologyCompliance', 'Nevertheless, thanks') == (False, 'clear')
+
+    def test_短くマッチしない発言は安全と判定する(self, prefilter):
+        assert prefilter.screen('TechnologyCompliance', 'ご説明ありがとうございます') == (False, 'clear')
+
+    def test_長い発言は要確認(self, prefilter):
+        text = 'ご検討いただきありがとうございます。' * 5
+        assert prefilter.screen('TechnologyCompliance', text) == (True, 'too_long')
+
+    def test_未知のGuardrailは要確認(self, prefilter):
+        assert prefilter.screen('UnknownCompliance', 'こんにちは') == (True, 'unknown_guardrail')
+
+    def test_guardrails_jsonの全Guardrailをコンパイルできる(self):
+        with open(GUARDRAILS_JSON, 'r', encoding='utf-8') as f:
+            guardrails_config = json.load(f)
+        prefilter = CompliancePrefilter(guardrails_config)
+        assert prefilter.guardrail_names == [g['name'] for g in guardrails_config['guardrails']]
+        assert prefilter.screen('TechnologyCompliance', 'We guarantee zero downtime')[1] == 'match'
+
+
+class TestStats:
+    def test_判定件数を数える(self, prefilter):
+        prefilter.screen('TechnologyCompliance', 'こんにちは')
+        prefilter.screen('TechnologyCompliance', 'we guarantee it')
+        prefilter.record_skipped()
+        stats = prefilter.stats()
+        assert (stats['screened'], stats['suspicious'], stats['skipped']) == (2, 1, 1)
+
+    def test_適合率と再現率をGuardrails判定を正解として計算する(self, prefilter):
+        outcomes = [
+            (True, True), (True, True), (True, True),  # truePositive
+            (True, False),  # falsePositive
+            (False, True),  # falseNegative
+            (False, False), (False, False),  # trueNegative
+        ]
+        for suspicious, violated in outcomes:
+            prefilter.record_outcome(suspicious, violated)
+        stats = prefilter.stats()
+        assert (stats['truePositive'], stats['falsePositive'], stats['falseNegative'], stats['trueNegative']) == (3, 1, 1, 2)
+        assert stats['precision'] == 0.75
+        assert stats['recall'] == 0.75
+
+    def test_突き合わせ前の適合率と再現率はNone(self, prefilter):
+        stats = prefilter.stats()
+        assert stats['precision'] is None
+        assert stats['recall'] is None
+
+
+class TestMissingConfig:
+    def test_guardrails_jsonがない場合は事前フィルターを無効化する(self, monkeypatch):
+        pytest.importorskip('boto3')
+        import compliance_check
+
+        monkeypatch.setattr(compliance_check, '_guardrails_config', {})
+        monkeypatch.setattr(compliance_check, '_prefilter', None)
+        monkeypatch.setattr(compliance_check, '_prefilter_unavailable', False)
+        monkeypatch.setattr(compliance_check, 'PREFILTER_MODE', 'enforce')
+
+        assert compliance_check._get_prefilter() is None
+        assert compliance_check.get_prefilter_stats() == {'mode': 'enforce', 'available': False}
@@ -0,0 +1,112 @@
+"""
+ApplyGuardrail の分析結果キャッシュ（compliance_check.py の _analyze_with_cache）のテスト
+
+- キーは (Guardrail ARN, バージョン, NFKC正規化した発言のハッシュ) で、全角・半角の違いは同じエントリになる
+- ヒット時は違反の context を今回の発言で付け直す
+- TTLを過ぎたエントリは再分析し、最大件数を超えると最も古いエントリを破棄する
+- DRAFT バージョンのGuardrailはキャッシュしない
+"""
+from collections import OrderedDict
+
+import pytest
+
+import compliance_check
+
+GUARDRAIL = {'guardrail_arn': 'arn:aws:bedrock:us-west-2:123456789012:guardrail/abc', 'guardrail_version': '3'}
+
+
+class FakeGuardrail:
+    """ApplyGuardrail の呼び出しを数え、発言を context に含む違反を1件返す"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, user_text, guardrail_info):
+        self.calls.append((user_text, guardrail_info['guardrail_version']))
+        return {
+            'complianceScore': 80,
+            'violations': [{'rule_id': 'word_guarantee', 'context': user_text}],
+            'analysis': '1件の違反',
+        }
+
+
+@pytest.fixture
+def guardrail(monkeypatch):
+    fake = FakeGuardrail()
+    monkeypatch.setattr(compliance_check, '_analyze_with_guardrail', fake)
+    monkeypatch.setattr(compliance_check, '_result_cache', OrderedDict())
+    monkeypatch.setattr(
+        compliance_check, '_result_cache_counts', {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+    )
+    return fake
+
+
+def analyze(text, guardrail_info=GUARDRAIL):
+    return compliance_check._analyze_with_cache(text, guardrail_info)
+
+
+class TestCacheKey:
+    def test_全角と半角の違いは同じエントリになる(self, guardrail):
+        analyze('１００％保証します')
+        analyze('100%保証します')
+        analyze('  100%保証します ')
+
+        assert len(guardrail.calls) == 1
+        assert compliance_check.get_result_cache_stats()['hits'] == 2
+
+    def test_Guardrailのバージョンが変わると再分析する(self, guardrail):
+        analyze('100%保証します')
+        analyze('100%保証します', {**GUARDRAIL, 'guardrail_version': '4'})
+
+        assert [version for _, version in guardrail.calls] == ['3', '4']
+
+    def test_DRAFTはキャッシュしない(self, guardrail):
+        draft = {**GUARDRAIL, 'guardrail_version': 'DRAFT'}
+        analyze('100%保証します', draft)
+        analyze('100%保証します', draft)
+
+        assert len(guardrail.calls) == 2
+        assert compliance_check.get_result_cache_stats()['size'] == 0
+
+
+class TestCacheHit:
+    def test_ヒット時は違反のcontextを今回の発言で付け直す(self, guardrail):
+        analyze('１００％保証します')
+
+        result = analyze('100%保証します')
+
+        assert result['violations'][0]['context'] == '100%保証します'
+
+    def test_長い発言のcontextは100文字で切り詰める(self, guardrail):
+        text = 'あ' * 120
+        analyze(text)
+
+        assert analyze(text)['violations'][0]['context'] == 'あ' * 100 + '...'
+
+    def test_返した結果を変更してもキャッシュは変わらない(self, guardrail):
+        analyze('100%保証します')['violations'].clear()
+
+        assert len(analyze('100%保証します')['violations']) == 1
+
+
+class TestCacheEviction:
+    def test_TTLを過ぎたエントリは再分析する(self, guardrail, monkeypatch):
+        monkeypatch.setattr(compliance_check, 'COMPLIANCE_RESULT_CACHE_TTL_SECONDS', 0)
+        analyze('100%保証します')
+        analyze('100%保証します')
+
+        assert len(guardrail.calls) == 2
+        assert compliance_check.get_result_cache_stats()['expired'] == 1
+
+    def test_最大件数を超えると最も古いエントリを破棄する(self, guardrail, monkeypatch):
+        monkeypatch.setattr(compliance_check, 'COMPLIANCE_RESULT_CACHE_MAX_ENTRIES', 2)
+        analyze('発言1')
+        analyze('発言2')
+        analyze('発言1')  # 発言1 を最近使用にする
+        analyze('発言3')
+
+        analyze('発言1')
+        analyze('発言2')
+
+        assert [text for text, _ in guardrail.calls] == ['発言1', '発言2', '発言3', '発言2']
+        assert compliance_check.get_result_cache_stats()['evictions'] == 2
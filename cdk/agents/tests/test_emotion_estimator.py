@@ -0,0 +1,109 @@
+"""
+ハイブリッドスコアリングのローカル推定（emotion_estimator.py）のテスト
+
+- 相づちは差分なし・高い確信度、長文や肯定と否定の混在は低い確信度になる
+- 語彙にヒットしない短い発言は中程度、長めの発言は低い確信度になる
+- LLM評価との誤差はEWMAで補正値に反映され、LLM評価でターン数がリセットされる
+"""
+import pytest
+
+from emotion_estimator import (
+    LOCAL_MAX_CHARS,
+    SCORE_KEYS,
+    UNMATCHED_MAX_CHARS,
+    EmotionDeltaEstimator,
+    HybridScoringState,
+)
+
+ZERO = {key: 0 for key in SCORE_KEYS}
+
+
+@pytest.fixture
+def estimator():
+    return EmotionDeltaEstimator()
+
+
+class TestEstimateConfidence:
+    @pytest.mark.parametrize('text, language', [('はい。', 'ja'), ('なるほど', 'ja'), ('OK!', 'en'), ('I see', 'en')])
+    def test_相づちは差分なしで確信度が高い(self, estimator, text, language):
+        assert estimator.estimate(text, language) == (ZERO, 0.95)
+
+    def test_空の発言は差分なしで確信度1(self, estimator):
+        assert estimator.estimate('   ', 'ja') == (ZERO, 1.0)
+
+    def test_長文はLLMに回す(self, estimator):
+        deltas, confidence = estimator.estimate('ありがとうございます' * (LOCAL_MAX_CHARS // 5), 'ja')
+        assert deltas == ZERO
+        assert confidence == 0.0
+
+    def test_肯定のみの発言は語彙の差分で確信度が高い(self, estimator):
+        deltas, confidence = estimator.estimate('具体的に導入事例をご提案します', 'ja')
+        assert deltas == {'angerLevel': 0, 'trustLevel': 2, 'progressLevel': 2}
+        assert confidence == 0.8
+
+    def test_肯定と否定が混在する発言は確信度が低い(self, estimator):
+        _, confidence = estimator.estimate('ありがとうございます。しかし他社の方が安いです', 'ja')
+        assert confidence == 0.3
+
+    def test_語彙にヒットしない発言は長さで確信度が変わる(self, estimator):
+        assert estimator.estimate('御社の業務について伺います', 'ja')[1] == 0.7
+        assert estimator.estimate('あ' * (UNMATCHED_MAX_CHARS + 1), 'ja')[1] == 0.3
+
+    def test_英語の語彙は単語境界で照合する(self, estimator):
+        assert estimator.estimate('Press the button to continue', 'en') == (ZERO, 0.7)
+        deltas, confidence = estimator.estimate('But that is not what I asked', 'en')
+        assert deltas['angerLevel'] == 1
+        assert confidence == 0.8
+
+    def test_差分は2で頭打ちになる(self, estimator):
+        deltas, _ = estimator.estimate('絶対に必ず今すぐ今日中にとにかく', 'ja')
+        assert deltas == {'angerLevel': 2, 'trustLevel': -2, 'progressLevel': 0}
+
+
+class TestHybridScoringStateCalibration:
+    def test_LLM評価前のセッションは状態を持たない(self):
+        state = HybridScoringState()
+        state.record_local('s1')
+
+        assert state.get('s1') is None
+        assert state.stats() == {'sessions': 0, 'localTurns': 1, 'llmTurns': 0}
+
+    def test_推定誤差をEWMAで補正値に反映する(self):
+        state = HybridScoringState(calibration_alpha=0.5)
+        estimated = {'angerLevel': 0, 'trustLevel': 1, 'progressLevel': 0}
+
+        state.record_llm('s1', estimated, {'angerLevel': 2, 'trustLevel': 1, 'progressLevel': -1}, {})
+        assert state.get('s1')['bias'] == {'angerLevel': 1.0, 'trustLevel': 0.0, 'progressLevel': -0.5}
+
+        state.record_llm('s1', estimated, {'angerLevel': 0, 'trustLevel': 3, 'progressLevel': -1}, {})
+        assert state.get('s1')['bias'] == {'angerLevel': 0.5, 'trustLevel': 1.0, 'progressLevel': -0.75}
+
+    def test_LLM評価でローカル推定のターン数をリセットする(self):
+        state = HybridScoringState()
+        state.record_llm('s1', ZERO, ZERO, {'npcEmotion': 'happy'})
+        state.record_local('s1')
+        state.record_local('s1')
+        assert state.get('s1')['turnsSinceLlm'] == 2
+
+        state.record_llm('s1', ZERO, ZERO, {'npcEmotion': 'neutral'})
+        snapshot = state.get('s1')
+        assert snapshot['turnsSinceLlm'] == 0
+        assert snapshot['lastResult'] == {'npcEmotion': 'neutral'}
+
+    def test_取得した状態を変更しても補正値は変わらない(self):
+        state = HybridScoringState()
+        state.record_llm('s1', ZERO, {'angerLevel': 1, 'trustLevel': 0, 'progressLevel': 0}, {})
+
+        state.get('s1')['bias']['angerLevel'] = 100
+        assert state.get('s1')['bias']['angerLevel'] == pytest.approx(0.3)
+
+    def test_最大セッション数を超えると最も古いセッションを破棄する(self):
+        state = HybridScoringState(max_sessions=2)
+        for session_id in ('s1', 's2'):
+            state.record_llm(session_id, ZERO, ZERO, {})
+        state.get('s1')  # s1 を最近使用にする
+        state.record_llm('s3', ZERO, ZERO, {})
+
+        assert state.get('s2') is None
+        assert state.get('s1') is not None
+        assert state.stats()['sessions'] == 2
@@ -0,0 +1,78 @@
+"""
+会話履歴キャッシュ（npc-conversation/history_cache.py）のテスト
+
+- クライアントが送り返した historyVersion とキャッシュのメッセージ数が一致する場合のみヒットする
+- 別コンテナでターンが進んだ（バージョン不一致）場合はエントリを破棄してMemoryから読み直させる
+- historyVersion が送られない場合はキャッシュを使わない
+"""
+from history_cache import ConversationHistoryCache
+
+
+def message(role, text):
+    return {'role': role, 'content': [{'text': text}]}
+
+
+HISTORY = [message('user', 'こんにちは'), message('assistant', 'いらっしゃいませ')]
+
+
+class TestVersionCheck:
+    def test_バージョンが一致すればヒットする(self):
+        cache = ConversationHistoryCache()
+        cache.put('s1', 'u1', HISTORY)
+
+        assert cache.get('s1', 'u1', 2) == HISTORY
+        assert cache.stats() == {'sessions': 1, 'hits': 1, 'misses': 0}
+
+    def test_バージョン不一致はミスとしてエントリを破棄する(self):
+        cache = ConversationHistoryCache()
+        cache.put('s1', 'u1', HISTORY)
+
+        # 別コンテナで1ターン進んだ（4メッセージ）
+        assert cache.get('s1', 'u1', 4) is None
+        assert cache.stats() == {'sessions': 0, 'hits': 0, 'misses': 1}
+        assert cache.get('s1', 'u1', 2) is None
+
+    def test_バージョン不明の場合はキャッシュを使わない(self):
+        cache = ConversationHistoryCache()
+        cache.put('s1', 'u1', HISTORY)
+
+        assert cache.get('s1', 'u1', None) is None
+        assert cache.stats()['misses'] == 1
+
+    def test_期限切れはミスになる(self):
+        cache = ConversationHistoryCache(ttl_seconds=-1)
+        cache.put('s1', 'u1', HISTORY)
+
+        assert cache.get('s1', 'u1', 2) is None
+
+    def test_取得した履歴を変更してもキャッシュに影響しない(self):
+        cache = ConversationHistoryCache()
+        cache.put('s1', 'u1', HISTORY)
+
+        cache.get('s1', 'u1', 2).append(message('user', '追加'))
+        assert cache.get('s1', 'u1', 2) == HISTORY
+
+
+class TestAppend:
+    def test_ターン完了後の追記でバージョンが進む(self):
+        cache = ConversationHistoryCache()
+        cache.put('s1', 'u1', HISTORY)
+
+        turn = [message('user', '価格は？'), message('assistant', '100万円です')]
+        assert cache.append('s1', 'u1', turn, base_version=2) is True
+        assert cache.get('s1', 'u1', 4) == HISTORY + turn
+
+    def test_ベースバージョンが異なる追記はエントリを破棄する(self):
+        cache = ConversationHistoryCache()
+        cache.put('s1', 'u1', HISTORY)
+
+        assert cache.append('s1', 'u1', [message('user', 'x')], base_version=0) is False
+        assert cache.stats()['sessions'] == 0
+
+    def test_最大セッション数を超えると古いエントリから破棄する(self):
+        cache = ConversationHistoryCache(max_sessions=1)
+        cache.put('s1', 'u1', HISTORY)
+        cache.put('s2', 'u1', HISTORY)
+
+        assert cache.get('s1', 'u1', 2) is None
+        assert cache.get('s2', 'u1', 2) == HISTORY
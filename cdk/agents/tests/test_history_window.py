@@ -0,0 +1,181 @@
+"""
+NPC会話履歴のウィンドウ管理（history_window.py）のテスト
+
+- 要約の境界は keep_turns・summary_batch_turns・トークン予算に従い、userメッセージに揃う
+- 要約済み件数が履歴より多い場合は要約を作り直す
+- 要約に失敗した場合は要約を更新せず、境界より古いターンを切り捨てて既存の要約を使う
+- SummaryCache は取得したコピーを変更しても影響せず、最大セッション数を超えると古い順に破棄する
+- 要約の更新はバックグラウンドで行い、同じセッションの更新中は重複して開始しない
+"""
+import threading
+
+import pytest
+
+from history_window import (
+    HistoryPolicy,
+    RollingSummarizer,
+    SummaryCache,
+    plan_summary_boundary,
+    select_history_window,
+)
+
+WAIT_SECONDS = 5
+
+
+def make_history(turns, text='はい'):
+    """user / assistant を交互に並べた履歴"""
+    messages = []
+    for turn in range(turns):
+        messages.append({'role': 'user', 'content': [{'text': f'{text}{turn}'}]})
+        messages.append({'role': 'assistant', 'content': [{'text': f'{text}{turn}'}]})
+    return messages
+
+
+class TestPlanSummaryBoundary:
+    def test_原文がkeep_turnsとバッチ以内なら畳み込まない(self):
+        policy = HistoryPolicy(token_budget=10000, keep_turns=2, summary_batch_turns=2)
+
+        assert plan_summary_boundary(make_history(4), 0, policy) == 0
+
+    def test_バッチ分を超えたらkeep_turnsを残して畳み込む(self):
+        policy = HistoryPolicy(token_budget=10000, keep_turns=2, summary_batch_turns=2)
+
+        assert plan_summary_boundary(make_history(5), 0, policy) == 6
+        assert plan_summary_boundary(make_history(7), 6, policy) == 6
+
+    def test_予算超過時は直近1ターンを残すまで畳み込む(self):
+        policy = HistoryPolicy(token_budget=25, keep_turns=10, summary_batch_turns=4)
+        history = make_history(3, text='あ' * 10)
+
+        assert plan_summary_boundary(history, 0, policy) == 4
+
+    def test_境界はuserメッセージに揃える(self):
+        policy = HistoryPolicy(token_budget=10000, keep_turns=2, summary_batch_turns=1)
+        history = make_history(4)
+        history.insert(6, {'role': 'assistant', 'content': [{'text': '続き'}]})
+
+        boundary = plan_summary_boundary(history, 0, policy)
+
+        assert boundary == 7
+        assert history[boundary]['role'] == 'user'
+
+    def test_要約済み件数が履歴より多い場合は履歴の長さに丸める(self):
+        policy = HistoryPolicy(token_budget=10000, keep_turns=2, summary_batch_turns=2)
+
+        assert plan_summary_boundary(make_history(2), 10, policy) == 4
+
+
+class TestSelectHistoryWindow:
+    def test_要約がなければ履歴全体を渡す(self):
+        history = make_history(3)
+
+        assert select_history_window(history, None) == (history, '')
+
+    def test_要約済みの範囲を除いた履歴と要約文を返す(self):
+        history = make_history(3)
+
+        window, summary = select_history_window(history, {'text': '要約', 'covered': 4})
+
+        assert window == history[4:]
+        assert summary == '要約'
+
+
+class TestSummaryCache:
+    def test_取得した状態を変更してもキャッシュは変わらない(self):
+        cache = SummaryCache()
+        cache.put('s1', 'user', {'text': '要約', 'covered': 2})
+
+        cache.get('s1', 'user')['covered'] = 100
+
+        assert cache.get('s1', 'user') == {'text': '要約', 'covered': 2}
+
+    def test_最大セッション数を超えると最も古いセッションを破棄する(self):
+        cache = SummaryCache(max_sessions=2)
+        cache.put('s1', 'user', {'text': '1', 'covered': 2})
+        cache.put('s2', 'user', {'text': '2', 'covered': 2})
+        cache.get('s1', 'user')  # s1 を最近使用にする
+        cache.put('s3', 'user', {'text': '3', 'covered': 2})
+
+        assert cache.get('s2', 'user') is None
+        assert cache.get('s1', 'user') is not None
+
+
+POLICY = HistoryPolicy(token_budget=10000, keep_turns=2, summary_batch_turns=2)
+
+
+@pytest.fixture
+def cache():
+    return SummaryCache()
+
+
+class TestRollingSummarizer:
+    def test_要約を更新して次のウィンドウで使う(self, cache):
+        calls, updates = [], []
+
+        def summarize(previous, messages, language):
+            calls.append((previous, len(messages), language))
+            return '新しい要約'
+
+        summarizer = RollingSummarizer(
+            summarize, cache, POLICY, on_update=lambda sid, aid, state: updates.append(state)
+        )
+        history = make_history(5)
+
+        future = summarizer.schedule('s1', 'user', history, 'ja')
+
+        assert future.result(timeout=WAIT_SECONDS) == {'text': '新しい要約', 'covered': 6}
+        assert calls == [('', 6, 'ja')]
+        assert updates == [{'text': '新しい要約', 'covered': 6}]
+        assert summarizer.window('s1', 'user', history) == (history[6:], '新しい要約')
+
+    def test_更新不要ならLLMを呼ばない(self, cache):
+        summarizer = RollingSummarizer(lambda *args: pytest.fail('summarize called'), cache, POLICY)
+
+        assert summarizer.schedule('s1', 'user', make_history(4), 'ja') is None
+
+    def test_要約に失敗した場合は境界より古いターンを切り捨てて既存の要約を使う(self, cache):
+        cache.put('s1', 'user', {'text': '前回の要約', 'covered': 2})
+
+        def summarize(previous, messages, language):
+            raise RuntimeError('Bedrock error')
+
+        summarizer = RollingSummarizer(summarize, cache, POLICY)
+        history = make_history(7)
+
+        assert summarizer.schedule('s1', 'user', history, 'ja').result(timeout=WAIT_SECONDS) is None
+        assert cache.get('s1', 'user') == {'text': '前回の要約', 'covered': 2}
+        assert summarizer.window('s1', 'user', history) == (history[10:], '前回の要約')
+        assert summarizer.stats()['failed'] == 1
+
+    def test_空の要約は失敗として扱う(self, cache):
+        summarizer = RollingSummarizer(lambda *args: '', cache, POLICY)
+
+        assert summarizer.schedule('s1', 'user', make_history(5), 'ja').result(timeout=WAIT_SECONDS) is None
+        assert cache.get('s1', 'user') is None
+
+    def test_要約済み件数が履歴より多い場合は要約を作り直す(self, cache):
+        cache.put('s1', 'user', {'text': '別の履歴の要約', 'covered': 20})
+        summarizer = RollingSummarizer(lambda *args: '要約', cache, POLICY)
+        history = make_history(3)
+
+        assert summarizer.current_state('s1', 'user', history) == {'text': '', 'covered': 0}
+        assert summarizer.window('s1', 'user', history) == (history, '')
+
+    def test_同じセッションの更新中は重複して開始しない(self, cache):
+        release = threading.Event()
+
+        def summarize(previous, messages, language):
+            release.wait(WAIT_SECONDS)
+            return '要約'
+
+        summarizer = RollingSummarizer(summarize, cache, POLICY)
+        history = make_history(5)
+
+        try:
+            first = summarizer.schedule('s1', 'user', history, 'ja')
+            assert summarizer.schedule('s1', 'user', history, 'ja') is None
+            assert summarizer.stats()['inFlight'] == 1
+        finally:
+            release.set()
+        first.result(timeout=WAIT_SECONDS)
+        assert summarizer.stats() == {'inFlight': 0, 'updated': 1, 'failed': 0}
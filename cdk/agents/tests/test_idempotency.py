@@ -0,0 +1,176 @@
+"""
+/invocations の冪等性キー（idempotency.py）のテスト
+
+- 処理中の重複リクエストは同じ結果を待ち、処理は1回だけ実行される
+- 完了済みのリクエストはTTL内ならリプレイし、期限切れ後は再実行する
+- 同じキーで内容の異なるペイロードはリプレイせずに処理する
+- 失敗レスポンスと例外はキャッシュせず、再送で再実行される
+"""
+import asyncio
+
+import pytest
+
+from idempotency import IdempotentInvoker
+
+PAYLOAD = {'sessionId': 's1', 'messageId': 'm1', 'message': 'こんにちは'}
+
+
+class Handler:
+    """呼び出し回数を数え、release されるまで完了しない処理"""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result if result is not None else {'success': True, 'message': '応答'}
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return {**self.result, 'call': call}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestCoalescing:
+    def test_処理中の重複リクエストは1回の処理結果を共有する(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test')
+            handler = Handler()
+            first = asyncio.create_task(invoker.run(dict(PAYLOAD), handler))
+            second = asyncio.create_task(invoker.run(dict(PAYLOAD), handler))
+            await asyncio.sleep(0)
+            assert invoker.stats()['inFlight'] == 1
+            handler.release.set()
+            return handler, invoker, await first, await second
+
+        handler, invoker, first, second = run(scenario())
+
+        assert handler.calls == 1
+        assert first == second == {'success': True, 'message': '応答', 'call': 1}
+        assert first is not second
+        assert invoker.stats()['coalesced'] == 1
+        assert invoker.stats()['inFlight'] == 0
+
+    def test_処理中の例外は待機中の重複リクエストにも伝わり次の再送で再実行する(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test')
+            handler = Handler(error=RuntimeError('Bedrock error'))
+            first = asyncio.create_task(invoker.run(dict(PAYLOAD), handler))
+            second = asyncio.create_task(invoker.run(dict(PAYLOAD), handler))
+            await asyncio.sleep(0)
+            handler.release.set()
+            errors = await asyncio.gather(first, second, return_exceptions=True)
+
+            handler.error = None
+            retried = await invoker.run(dict(PAYLOAD), handler)
+            return handler, errors, retried
+
+        handler, errors, retried = run(scenario())
+
+        assert all(isinstance(error, RuntimeError) for error in errors)
+        assert retried['call'] == 2
+        assert handler.calls == 2
+
+
+class TestReplay:
+    def test_完了済みのリクエストは処理せずにリプレイする(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test')
+            handler = Handler()
+            handler.release.set()
+            first = await invoker.run(dict(PAYLOAD), handler)
+            first['message'] = '書き換え'
+            replayed = await invoker.run(dict(PAYLOAD), handler)
+            return handler, invoker, replayed
+
+        handler, invoker, replayed = run(scenario())
+
+        assert handler.calls == 1
+        assert replayed == {'success': True, 'message': '応答', 'call': 1}
+        assert invoker.stats()['replayed'] == 1
+
+    def test_TTLを過ぎた結果はリプレイしない(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test', ttl_seconds=0)
+            handler = Handler()
+            handler.release.set()
+            await invoker.run(dict(PAYLOAD), handler)
+            return handler, await invoker.run(dict(PAYLOAD), handler)
+
+        handler, second = run(scenario())
+
+        assert handler.calls == 2
+        assert second['call'] == 2
+
+    def test_失敗レスポンスはキャッシュしない(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test')
+            handler = Handler(result={'success': False, 'message': 'エラー'})
+            handler.release.set()
+            await invoker.run(dict(PAYLOAD), handler)
+            await invoker.run(dict(PAYLOAD), handler)
+            return handler, invoker
+
+        handler, invoker = run(scenario())
+
+        assert handler.calls == 2
+        assert invoker.stats()['cached'] == 0
+
+    def test_キーのないリクエストは毎回処理する(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test')
+            handler = Handler()
+            handler.release.set()
+            payload = {'sessionId': 's1', 'message': 'こんにちは'}
+            await invoker.run(dict(payload), handler)
+            await invoker.run(dict(payload), handler)
+            return handler
+
+        assert run(scenario()).calls == 2
+
+
+class TestConflictingPayload:
+    def test_完了済みのキーで内容が異なるペイロードは処理する(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test')
+            handler = Handler()
+            handler.release.set()
+            await invoker.run(dict(PAYLOAD), handler)
+            conflicting = await invoker.run({**PAYLOAD, 'message': '別の発言'}, handler)
+            return handler, invoker, conflicting
+
+        handler, invoker, conflicting = run(scenario())
+
+        assert handler.calls == 2
+        assert conflicting['call'] == 2
+        assert invoker.stats()['mismatched'] == 1
+        assert invoker.stats()['replayed'] == 0
+
+    def test_処理中のキーで内容が異なるペイロードは合流しない(self):
+        async def scenario():
+            invoker = IdempotentInvoker('test')
+            handler = Handler()
+            first = asyncio.create_task(invoker.run(dict(PAYLOAD), handler))
+            await asyncio.sleep(0)
+            conflicting = asyncio.create_task(invoker.run({**PAYLOAD, 'message': '別の発言'}, handler))
+            await asyncio.sleep(0)
+            handler.release.set()
+            return handler, invoker, await first, await conflicting
+
+        handler, invoker, first, conflicting = run(scenario())
+
+        assert handler.calls == 2
+        assert {first['call'], conflicting['call']} == {1, 2}
+        assert invoker.stats()['coalesced'] == 0
+        assert invoker.stats()['mismatched'] == 1
+
+    @pytest.mark.parametrize('session_id', ['s2', ''])
+    def test_別セッションの同じmessageIdは別のキーになる(self, session_id):
+        invoker = IdempotentInvoker('test')
+        assert invoker.key_for(PAYLOAD) != invoker.key_for({**PAYLOAD, 'sessionId': session_id})
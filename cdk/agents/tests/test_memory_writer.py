@@ -0,0 +1,86 @@
+"""
+AgentCore Memory ライトビハインド（memory_writer.py）のテスト
+
+- 同一セッションのターンは投入順に保存される
+- 再試行中のセッションがあっても他のセッションの保存は止まらない
+- キューが満杯の場合は submit() がFalseを返し、保存待ちとして数えない
+- リトライ上限後も失敗したターンは partial_failure として記録し on_failure を呼ぶ
+"""
+import threading
+import time
+
+from memory_writer import MemoryWriteBehind
+
+WAIT_SECONDS = 5
+
+
+class TestMemoryWriteBehind:
+    def test_同一セッションのターンは投入順に保存する(self):
+        saved = []
+        lock = threading.Lock()
+
+        def write(session_id, actor_id, **event):
+            time.sleep(0.001)
+            with lock:
+                saved.append((session_id, event['turn']))
+            return True
+
+        writer = MemoryWriteBehind(write, workers=4)
+        writer.start()
+        for turn in range(20):
+            for session_id in ('s1', 's2', 's3'):
+                assert writer.submit(session_id, 'user', [{'turn': turn}])
+
+        assert writer.flush(timeout=WAIT_SECONDS)
+        for session_id in ('s1', 's2', 's3'):
+            assert [turn for sid, turn in saved if sid == session_id] == list(range(20))
+        assert writer.last_status('s1', 'user') == 'ok'
+        assert writer.stats()['written'] == 60
+
+    def test_保存が遅いセッションがあっても他のセッションを保存する(self):
+        release = threading.Event()
+
+        def write(session_id, actor_id, **event):
+            if session_id == 'slow':
+                release.wait(WAIT_SECONDS)
+            return True
+
+        writer = MemoryWriteBehind(write, workers=2)
+        writer.start()
+        writer.submit('slow', 'user', [{}])
+        writer.submit('fast', 'user', [{}])
+
+        try:
+            assert writer.wait_for_session('fast', 'user', timeout=WAIT_SECONDS)
+            assert writer.last_status('slow', 'user') is None
+        finally:
+            release.set()
+        assert writer.wait_for_session('slow', 'user', timeout=WAIT_SECONDS)
+
+    def test_キューが満杯の場合はFalseを返す(self):
+        writer = MemoryWriteBehind(lambda *args, **kwargs: True, max_queue_size=2)
+
+        assert writer.submit('s1', 'user', [{}])
+        assert writer.submit('s2', 'user', [{}])
+        assert not writer.submit('s3', 'user', [{}])
+        assert writer.stats()['queueDepth'] == 2
+        assert writer.wait_for_session('s3', 'user', timeout=0)
+
+        writer.start()
+        assert writer.flush(timeout=WAIT_SECONDS)
+        assert writer.stats()['queueDepth'] == 0
+
+    def test_保存に失敗したターンはpartial_failureとして記録する(self):
+        failures = []
+        writer = MemoryWriteBehind(
+            lambda session_id, actor_id, **event: not event.get('fail'),
+            max_retries=1, retry_base_delay=0,
+            on_failure=lambda session_id, actor_id: failures.append(session_id),
+        )
+        writer.start()
+        writer.submit('s1', 'user', [{}, {'fail': True}])
+
+        assert writer.wait_for_session('s1', 'user', timeout=WAIT_SECONDS)
+        assert writer.last_status('s1', 'user') == 'partial_failure'
+        assert failures == ['s1']
+        assert writer.stats()['failed'] == 1
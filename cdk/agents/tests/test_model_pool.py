@@ -0,0 +1,127 @@
+"""
+BedrockModelプール（model_pool.py）のテスト
+
+- 返却されたモデルは再利用し、同時貸し出し数は size を超えない
+- 空きがなければ返却を待ち、acquire_timeout までに空かなければ ModelPoolExhaustedError
+- lease() は処理中に例外が発生してもモデルを返却する
+- モデル生成に失敗した場合は生成数を戻し、次の acquire で再生成できる
+"""
+import threading
+import time
+
+import pytest
+
+from model_pool import BedrockModelPool, ModelPoolExhaustedError
+
+WAIT_SECONDS = 5
+
+
+class Factory:
+    """生成したモデル（連番）を数え、fail_next が立っていれば1回だけ失敗する"""
+
+    def __init__(self):
+        self.created = 0
+        self.fail_next = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self.fail_next:
+                self.fail_next = False
+                raise RuntimeError('client creation failed')
+            self.created += 1
+            return f'model-{self.created}'
+
+
+class TestAcquireRelease:
+    def test_返却されたモデルを再利用する(self):
+        factory = Factory()
+        pool = BedrockModelPool(factory, size=2)
+
+        model = pool.acquire()
+        pool.release(model)
+
+        assert pool.acquire() == model
+        assert factory.created == 1
+        assert pool.stats() == {'size': 2, 'created': 1, 'inUse': 1}
+
+    def test_warmはsizeまで事前生成する(self):
+        factory = Factory()
+        pool = BedrockModelPool(factory, size=3)
+
+        pool.warm()
+        pool.warm()
+
+        assert factory.created == 3
+        assert pool.stats()['inUse'] == 0
+
+    def test_空きがなければタイムアウトで例外(self):
+        pool = BedrockModelPool(Factory(), size=1, acquire_timeout=0.01)
+        pool.acquire()
+
+        with pytest.raises(ModelPoolExhaustedError):
+            pool.acquire()
+        assert pool.stats() == {'size': 1, 'created': 1, 'inUse': 1}
+
+    def test_空きを待っている間に返却されたモデルを借りる(self):
+        pool = BedrockModelPool(Factory(), size=1, acquire_timeout=WAIT_SECONDS)
+        model = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, args=(model,))
+        timer.start()
+
+        try:
+            assert pool.acquire() == model
+        finally:
+            timer.join()
+
+    def test_生成に失敗した場合は生成数を戻す(self):
+        factory = Factory()
+        factory.fail_next = True
+        pool = BedrockModelPool(factory, size=1, acquire_timeout=0.01)
+
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+        assert pool.stats() == {'size': 1, 'created': 0, 'inUse': 0}
+        assert pool.acquire() == 'model-1'
+
+
+class TestLease:
+    def test_例外が発生してもモデルを返却する(self):
+        pool = BedrockModelPool(Factory(), size=1, acquire_timeout=0.01)
+
+        with pytest.raises(ValueError):
+            with pool.lease():
+                raise ValueError('Bedrock error')
+
+        assert pool.stats()['inUse'] == 0
+        with pool.lease() as model:
+            assert model == 'model-1'
+
+    def test_同時貸し出し数はsizeを超えない(self):
+        factory = Factory()
+        pool = BedrockModelPool(factory, size=3, acquire_timeout=WAIT_SECONDS)
+        lock = threading.Lock()
+        in_use, peak, leased = set(), [0], []
+
+        def worker():
+            for _ in range(20):
+                with pool.lease() as model:
+                    with lock:
+                        assert model not in in_use
+                        in_use.add(model)
+                        peak[0] = max(peak[0], len(in_use))
+                        leased.append(model)
+                    time.sleep(0.001)
+                    with lock:
+                        in_use.discard(model)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(WAIT_SECONDS)
+
+        assert len(leased) == 160
+        assert peak[0] <= 3
+        assert factory.created == 3
+        assert pool.stats() == {'size': 3, 'created': 3, 'inUse': 0}
@@ -0,0 +1,58 @@
+"""
+NPC会話プロンプト（npc-conversation/prompts.py）のテスト
+
+- ペルソナ部分（システムプロンプト）は感情状態・スライド・会話要約によらず同一
+- 可変部分はこのターンの発話の直前に添える会話状況テキストになる
+"""
+from history_window import estimate_tokens
+from prompts import build_npc_system_prompt_parts, build_turn_context
+
+NPC_INFO = {
+    'name': '山田',
+    'role': '情報システム部長',
+    'company': '株式会社テスト',
+    'personality': ['慎重', '論理的'],
+    'description': 'コスト削減を重視している',
+}
+
+
+class TestPromptParts:
+    def test_ペルソナ部分は感情状態やスライドが変わっても同一(self):
+        persona1, state1 = build_npc_system_prompt_parts(
+            NPC_INFO, {'angerLevel': 1, 'trustLevel': 2, 'progressLevel': 3}, 'ja'
+        )
+        persona2, state2 = build_npc_system_prompt_parts(
+            NPC_INFO, {'angerLevel': 7, 'trustLevel': 5, 'progressLevel': 4}, 'ja',
+            presented_slides=[{'pageNumber': 2}], conversation_summary='価格の話をした',
+        )
+
+        assert persona1 == persona2
+        assert state1 != state2
+        assert '怒りレベル' not in persona1
+        assert '怒りレベル: 7/10' in state2
+        assert 'スライド2' in state2
+        assert '価格の話をした' in state2
+
+    def test_既定のペルソナ部分は最小キャッシュトークン数に満たない(self):
+        # 4096トークン未満のためシステムプロンプト直後のcachePointは置かれない
+        for language in ('ja', 'en'):
+            persona, _ = build_npc_system_prompt_parts(NPC_INFO, {}, language)
+            assert estimate_tokens(persona) < 4096
+
+
+class TestTurnContext:
+    def test_会話状況の後に営業担当者のメッセージの見出しを置く(self):
+        _, state = build_npc_system_prompt_parts(NPC_INFO, {'angerLevel': 3}, 'ja')
+
+        context = build_turn_context(state, 'ja')
+
+        assert context.startswith('## 現在の感情状態')
+        assert context.endswith('## 営業担当者のメッセージ')
+
+    def test_英語の見出し(self):
+        _, state = build_npc_system_prompt_parts(NPC_INFO, {}, 'en')
+
+        context = build_turn_context(state, 'en')
+
+        assert context.startswith('## Current Emotional State')
+        assert context.endswith("## Salesperson's Message")
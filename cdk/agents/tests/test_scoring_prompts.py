@@ -0,0 +1,60 @@
+"""
+スコアリング用のゴール選択・ゴール更新の絞り込み（scoring_prompts.py）のテスト
+
+- 達成済みのゴールはプロンプトに含めない
+- 未達成のゴールは最新発言との関連度順（同点は必須ゴール・定義順）に並べ、max_goals 件に絞る
+- 未知のゴールIDと、状態が変わらない（達成済みを再度達成など）更新は除外する
+"""
+from scoring_prompts import filter_goal_updates, select_goals_for_prompt
+
+GOALS = [
+    {'id': 'g1', 'description': '予算を確認する', 'criteria': ['年間予算の金額を聞き出す']},
+    {'id': 'g2', 'description': '導入時期を確認する', 'hints': ['稼働開始の希望を聞く']},
+    {'id': 'g3', 'description': '決裁者を確認する', 'isRequired': True},
+    {'id': 'g4', 'description': '課題をヒアリングする', 'achieved': True},
+]
+
+
+def ids(goals):
+    return [goal['id'] for goal in goals]
+
+
+class TestSelectGoalsForPrompt:
+    def test_達成済みのゴールは除外する(self):
+        assert 'g4' not in ids(select_goals_for_prompt(GOALS, '課題をヒアリングさせてください'))
+
+    def test_最新発言と関連するゴールを先に並べる(self):
+        assert ids(select_goals_for_prompt(GOALS, '導入時期と稼働開始のご希望はありますか')) == ['g2', 'g3', 'g1']
+
+    def test_関連度が同じ場合は必須ゴールを優先し定義順に並べる(self):
+        assert ids(select_goals_for_prompt(GOALS, 'よろしくお願いします')) == ['g3', 'g1', 'g2']
+
+    def test_max_goals件に絞る(self):
+        assert ids(select_goals_for_prompt(GOALS, 'ご予算の金額を教えてください', max_goals=2)) == ['g1', 'g3']
+
+    def test_max_goals未指定なら未達成のゴールをすべて返す(self):
+        assert len(select_goals_for_prompt(GOALS, '', max_goals=None)) == 3
+
+    def test_英語の発言は単語で照合する(self):
+        goals = [
+            {'id': 'e1', 'description': 'Confirm the decision maker'},
+            {'id': 'e2', 'description': 'Confirm the budget'},
+        ]
+
+        assert ids(select_goals_for_prompt(goals, 'What budget do you have?')) == ['e2', 'e1']
+
+
+class TestFilterGoalUpdates:
+    def test_状態が変わった更新のみ残す(self):
+        updates = [
+            {'goalId': 'g1', 'achieved': True, 'reason': '予算を確認'},
+            {'goalId': 'g2', 'achieved': False, 'reason': None},
+        ]
+
+        assert filter_goal_updates(updates, GOALS) == [updates[0]]
+
+    def test_未知のゴールIDは除外する(self):
+        assert filter_goal_updates([{'goalId': 'unknown', 'achieved': True}], GOALS) == []
+
+    def test_達成済みのゴールの達成更新は除外する(self):
+        assert filter_goal_updates([{'goalId': 'g4', 'achieved': True}], GOALS) == []
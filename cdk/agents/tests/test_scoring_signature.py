@@ -0,0 +1,72 @@
+"""
+統合モードのスコアリング結果の署名（scoring_signature.py）のテスト
+
+- npc-conversation が署名した結果は、JSONの往復後も realtime-scoring で検証できる
+- 署名なし・改ざん・別のターン（sessionId / messageId / actorId）の結果は受け入れない
+- 署名鍵がない場合は署名も検証もしない
+"""
+import json
+
+import pytest
+
+import scoring_signature
+
+SCORING = {
+    'angerLevel': 3, 'trustLevel': 6, 'progressLevel': 4,
+    'analysis': '具体的な事例で信頼が上がった。次は予算を確認する。',
+    'goalUpdates': [{'goalId': 'g1', 'achieved': True, 'reason': '事例を提示'}],
+    'npcEmotion': 'happy', 'npcEmotionIntensity': 0.7, 'gesture': 'nod',
+    'suggestions': ['ご予算感を伺えますか？'],
+}
+TURN = ('s1', 'm1', 'user-1')
+
+
+@pytest.fixture(autouse=True)
+def signing_key(monkeypatch):
+    monkeypatch.setattr(scoring_signature, '_signing_key', b'test-key')
+
+
+def roundtrip(value):
+    """フロントエンド経由（JSONの往復）で渡された値"""
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+class TestScoringSignature:
+    def test_署名した結果はJSONの往復後も検証できる(self):
+        signed = scoring_signature.sign_scoring(*TURN, SCORING)
+
+        verified = scoring_signature.verify_scoring(*TURN, roundtrip(signed))
+
+        assert verified['goalUpdates'] == SCORING['goalUpdates']
+        assert verified['trustLevel'] == 6
+        assert 'signature' not in verified
+
+    def test_署名のない結果は受け入れない(self):
+        assert scoring_signature.verify_scoring(*TURN, dict(SCORING)) is None
+
+    @pytest.mark.parametrize('field, value', [
+        ('trustLevel', 10),
+        ('goalUpdates', [{'goalId': 'g2', 'achieved': True, 'reason': None}]),
+    ])
+    def test_改ざんされた結果は受け入れない(self, field, value):
+        signed = roundtrip(scoring_signature.sign_scoring(*TURN, SCORING))
+        signed[field] = value
+
+        assert scoring_signature.verify_scoring(*TURN, signed) is None
+
+    @pytest.mark.parametrize('turn', [('s2', 'm1', 'user-1'), ('s1', 'm2', 'user-1'), ('s1', 'm1', 'user-2')])
+    def test_別のターンで署名された結果は受け入れない(self, turn):
+        signed = scoring_signature.sign_scoring(*TURN, SCORING)
+
+        assert scoring_signature.verify_scoring(*turn, roundtrip(signed)) is None
+
+    def test_messageIdがなければ署名しない(self):
+        assert scoring_signature.sign_scoring('s1', '', 'user-1', SCORING) is None
+
+    def test_署名鍵がなければ署名も検証もしない(self, monkeypatch):
+        signed = scoring_signature.sign_scoring(*TURN, SCORING)
+        monkeypatch.setattr(scoring_signature, '_signing_key', None)
+        monkeypatch.setattr(scoring_signature, 'JOINT_SCORING_SECRET_ARN', '')
+
+        assert scoring_signature.sign_scoring(*TURN, SCORING) is None
+        assert scoring_signature.verify_scoring(*TURN, roundtrip(signed)) is None
@@ -0,0 +1,129 @@
+"""
+セッション集約アイテムの更新（session_aggregate.py）のテスト
+
+- 初回は attribute_not_exists、以降は turnCount を条件にした楽観的排他で更新する
+- 競合（ConditionalCheckFailedException）時は一貫性のある読み込みで最新状態を取り直して再試行する
+- ターンごとの作成日時・分析コメントと、turnIndex 付きのコンプライアンス違反を追記する
+"""
+from decimal import Decimal
+
+from botocore.exceptions import ClientError
+
+from session_aggregate import AGGREGATE_SORT_KEY, SessionAggregateUpdater, unpack_scores
+
+
+def conditional_check_failed():
+    return ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+
+
+class FakeTable:
+    """update_item の条件式（turnCount）を評価するテーブル"""
+
+    def __init__(self):
+        self.item = None
+        self.updates = []
+        self.get_calls = 0
+
+    def get_item(self, Key, ConsistentRead=False):
+        assert Key == {'sessionId': 's1', 'createdAt': AGGREGATE_SORT_KEY}
+        assert ConsistentRead
+        self.get_calls += 1
+        return {'Item': dict(self.item)} if self.item else {}
+
+    def update_item(self, Key, UpdateExpression, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues):
+        self.updates.append((ConditionExpression, ExpressionAttributeValues))
+        if ConditionExpression == 'attribute_not_exists(#turnCount)':
+            if self.item is not None:
+                raise conditional_check_failed()
+        elif self.item is None or self.item['turnCount'] != ExpressionAttributeValues[':expectedTurnCount']:
+            raise conditional_check_failed()
+
+        item = dict(self.item or {})
+        for name, value in ExpressionAttributeValues.items():
+            field = name[1:]
+            if field in ('turnCount', 'minScores', 'maxScores', 'ewmaScores', 'packedScores', 'updatedAt', 'analysis'):
+                item[field] = value
+        item['turns'] = list(item.get('turns', [])) + ExpressionAttributeValues[':turn']
+        if ':violations' in ExpressionAttributeValues:
+            item['complianceViolations'] = list(item.get('complianceViolations', [])) + ExpressionAttributeValues[':violations']
+        self.item = item
+
+
+def metrics_item(created_at, anger, trust, progress, analysis='', violations=None):
+    item = {
+        'sessionId': 's1',
+        'createdAt': created_at,
+        'angerLevel': Decimal(anger),
+        'trustLevel': Decimal(trust),
+        'progressLevel': Decimal(progress),
+        'analysis': analysis,
+    }
+    if violations:
+        item['complianceData'] = {'violations': violations}
+    return item
+
+
+class TestConditionalUpdate:
+    def test_初回はattribute_not_exists_以降はturnCountを条件に更新する(self):
+        table = FakeTable()
+        updater = SessionAggregateUpdater(lambda: table)
+
+        updater.update(metrics_item('t1', 1, 5, 2))
+        updater.update(metrics_item('t2', 3, 6, 4))
+
+        assert table.updates[0][0] == 'attribute_not_exists(#turnCount)'
+        assert table.updates[1][0] == '#turnCount = :expectedTurnCount'
+        assert table.updates[1][1][':expectedTurnCount'] == 1
+        assert table.item['turnCount'] == 2
+        assert unpack_scores(table.item['packedScores']) == [(1, 5, 2), (3, 6, 4)]
+        assert updater.stats() == {'updated': 2, 'conflicts': 0, 'failed': 0}
+        # 2回目は保持している状態を使い、読み込みは初回のみ
+        assert table.get_calls == 1
+
+    def test_他コンテナの更新と競合した場合は最新状態を読み直して再試行する(self):
+        table = FakeTable()
+        updater = SessionAggregateUpdater(lambda: table)
+        other = SessionAggregateUpdater(lambda: table)
+
+        updater.update(metrics_item('t1', 1, 5, 2))
+        other._states.clear()
+        other.update(metrics_item('t2', 3, 6, 4))  # 他コンテナが2ターン目を書き込む
+        updater.update(metrics_item('t3', 7, 2, 8))  # 保持している turnCount=1 は古い
+
+        assert updater.stats() == {'updated': 2, 'conflicts': 1, 'failed': 0}
+        assert table.item['turnCount'] == 3
+        assert unpack_scores(table.item['packedScores']) == [(1, 5, 2), (3, 6, 4), (7, 2, 8)]
+        assert table.item['minScores']['angerLevel'] == 1
+        assert table.item['maxScores']['angerLevel'] == 7
+
+    def test_競合が続く場合は最大試行回数で諦める(self):
+        class AlwaysConflictTable(FakeTable):
+            def update_item(self, **kwargs):
+                raise conditional_check_failed()
+
+        table = AlwaysConflictTable()
+        updater = SessionAggregateUpdater(lambda: table, max_attempts=3)
+        updater.update(metrics_item('t1', 1, 5, 2))
+
+        assert updater.stats() == {'updated': 0, 'conflicts': 3, 'failed': 1}
+
+
+class TestTurnDetails:
+    def test_ターンごとの作成日時_分析コメントとturnIndex付きの違反を追記する(self):
+        table = FakeTable()
+        updater = SessionAggregateUpdater(lambda: table)
+
+        updater.update(metrics_item('t1', 1, 5, 2, analysis='a1', violations=[{'rule_id': 'r1'}]))
+        updater.update(metrics_item('t2', 3, 6, 4, analysis='a2'))
+        updater.update(metrics_item('t3', 7, 2, 8, analysis='a3', violations=[{'rule_id': 'r2'}, {'rule_id': 'r3'}]))
+
+        assert table.item['turns'] == [
+            {'createdAt': 't1', 'analysis': 'a1'},
+            {'createdAt': 't2', 'analysis': 'a2'},
+            {'createdAt': 't3', 'analysis': 'a3'},
+        ]
+        assert table.item['complianceViolations'] == [
+            {'rule_id': 'r1', 'turnIndex': 0},
+            {'rule_id': 'r2', 'turnIndex': 2},
+            {'rule_id': 'r3', 'turnIndex': 2},
+        ]
@@ -0,0 +1,131 @@
+"""
+スライド画像キャッシュ（slide_cache.py）のテスト
+
+- 再検証間隔内はS3を呼ばずにキャッシュ済みのバイト列を返す
+- 再検証間隔を過ぎると If-None-Match 付きGETで再検証し、304ならバイト列を再利用、ETagが変われば置き換える
+- 304以外のS3エラーはそのまま送出する
+- 合計サイズの上限を超えると古い順に破棄し、上限の1/4を超える画像は保持しない
+"""
+import io
+
+import pytest
+from botocore.exceptions import ClientError
+
+import slide_cache
+from slide_cache import SlideImageCache
+
+BUCKET = 'slides'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeS3:
+    """imageKey -> (ETag, バイト列) を返し、If-None-Match が一致すれば304を送出する"""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        self.calls.append((Key, IfNoneMatch))
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        etag, body = self.objects[Key]
+        if IfNoneMatch == etag:
+            raise ClientError({'Error': {'Code': '304', 'Message': 'Not Modified'}}, 'GetObject')
+        return {'ETag': etag, 'Body': io.BytesIO(body)}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(slide_cache, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def s3():
+    fake = FakeS3()
+    fake.objects['page_001.png'] = ('"v1"', b'image-v1')
+    return fake
+
+
+class TestRevalidation:
+    def test_再検証間隔内はS3を呼ばない(self, clock, s3):
+        cache = SlideImageCache(revalidate_seconds=300)
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+        clock.now += 300
+
+        assert cache.get_or_fetch(s3, BUCKET, 'page_001.png') == b'image-v1'
+        assert s3.calls == [('page_001.png', None)]
+        assert cache.stats()['hits'] == 1
+
+    def test_間隔を過ぎて304ならキャッシュ済みのバイト列を返す(self, clock, s3):
+        cache = SlideImageCache(revalidate_seconds=300)
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+        clock.now += 301
+
+        assert cache.get_or_fetch(s3, BUCKET, 'page_001.png') == b'image-v1'
+        assert s3.calls[-1] == ('page_001.png', '"v1"')
+        assert cache.stats()['hits'] == 1
+
+        # 再検証した時点から次の間隔が始まる
+        clock.now += 300
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+        assert len(s3.calls) == 2
+
+    def test_ETagが変わっていれば新しいバイト列に置き換える(self, clock, s3):
+        cache = SlideImageCache(revalidate_seconds=300)
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+        s3.objects['page_001.png'] = ('"v2"', b'image-v2-updated')
+        clock.now += 301
+
+        assert cache.get_or_fetch(s3, BUCKET, 'page_001.png') == b'image-v2-updated'
+        assert cache.stats() == {'entries': 1, 'bytes': len(b'image-v2-updated'), 'hits': 0, 'misses': 2}
+
+        clock.now += 301
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+        assert s3.calls[-1] == ('page_001.png', '"v2"')
+
+    def test_304以外のS3エラーは送出する(self, clock, s3):
+        cache = SlideImageCache(revalidate_seconds=300)
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+        del s3.objects['page_001.png']
+        clock.now += 301
+
+        with pytest.raises(ClientError):
+            cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+
+
+class TestSizeLimit:
+    def test_合計サイズの上限を超えると古い順に破棄する(self, clock, s3):
+        cache = SlideImageCache(max_bytes=40)
+        for index in range(1, 6):
+            s3.objects[f'page_00{index}.png'] = (f'"{index}"', b'x' * 10)
+        for index in range(1, 5):
+            cache.get_or_fetch(s3, BUCKET, f'page_00{index}.png')
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')  # page_001 を最近使用にする
+
+        cache.get_or_fetch(s3, BUCKET, 'page_005.png')
+        cache.get_or_fetch(s3, BUCKET, 'page_001.png')
+        cache.get_or_fetch(s3, BUCKET, 'page_002.png')
+
+        assert s3.calls.count(('page_001.png', None)) == 1
+        assert s3.calls.count(('page_002.png', None)) == 2
+        assert cache.stats()['bytes'] == 40
+
+    def test_上限の1_4を超える画像は保持しない(self, clock, s3):
+        cache = SlideImageCache(max_bytes=32)
+        s3.objects['large.png'] = ('"l"', b'x' * 9)
+
+        cache.get_or_fetch(s3, BUCKET, 'large.png')
+        cache.get_or_fetch(s3, BUCKET, 'large.png')
+
+        assert len(s3.calls) == 2
+        assert cache.stats()['entries'] == 0
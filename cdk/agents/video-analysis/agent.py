@@ -20,6 +20,7 @@ from pydantic import ValidationError
 
 from prompts import get_video_analysis_prompt, create_default_video_analysis
 from models import VideoAnalysisResult
+from agent_runtime import AdmissionController, AdmissionRejectedError, admission_rejected_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,6 +31,9 @@ AWS_REGION = os.environ.get('AWS_REGION', os.environ.get('AWS_DEFAULT_REGION', '
 
 app = FastAPI(title="Video Analysis Agent", version="1.0.0")
 
+# Bedrock呼び出しをスレッドプールにオフロードし、同時受付数を制限する
+admission = AdmissionController.from_env('video-analysis', max_workers=2, max_queue=4, queue_timeout=120.0)
+
 
 def parse_json_response(response_text: str) -> Dict[str, Any]:
     """JSONレスポンスをパース"""
@@ -178,8 +182,10 @@ async def invoke_agent(request: Request):
         else:
             payload = {}
         
-        result = handle_invocation(payload)
+        result = await admission.run(handle_invocation, payload)
         return {"output": result}
+    except AdmissionRejectedError as e:
+        return admission_rejected_response(e)
     except Exception as e:
         logger.error(f"Invocation error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -188,7 +194,7 @@ async def invoke_agent(request: Request):
 @app.get("/ping")
 async def ping():
     """ヘルスチェックエンドポイント"""
-    return {"status": "healthy"}
+    return {"status": "healthy", "runtime": admission.stats()}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""
+一覧APIのページネーション（署名付きnextTokenと読み込み予算内でのページ充填）
+
+scenarios（シナリオ一覧）と sessions（セッション一覧）の両Lambdaが共通レイヤー経由で使用する。
+
+nextToken は {'v', 'plan', 'key'} のJSONに HMAC-SHA256 署名を付けた不透明な文字列。
+plan にはクエリ条件（取得元・フィルタ・ユーザーID）を入れ、別条件でのトークン再利用を拒否する。
+署名鍵は PAGINATION_TOKEN_SECRET_ARN のシークレットで、未設定の場合はトークンを発行・検証しない。
+
+環境変数:
+- PAGINATION_TOKEN_SECRET_ARN: nextToken署名鍵のSecrets Manager ARN
+- LIST_PAGE_MAX_READ_UNITS / LIST_PAGE_MAX_MILLIS: 1ページを埋めるための読み込み予算（RCU / ミリ秒）
+- LIST_PAGE_READ_SIZE: FilterExpressionがある場合の1回あたりの読み込み件数
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import boto3
+
+PAGINATION_TOKEN_SECRET_ARN = os.environ.get('PAGINATION_TOKEN_SECRET_ARN')
+
+LIST_PAGE_MAX_READ_UNITS = float(os.environ.get('LIST_PAGE_MAX_READ_UNITS', '50'))
+LIST_PAGE_MAX_MILLIS = int(os.environ.get('LIST_PAGE_MAX_MILLIS', '2000'))
+LIST_PAGE_READ_SIZE = int(os.environ.get('LIST_PAGE_READ_SIZE', '100'))
+
+TOKEN_VERSION = 1
+
+_pagination_key: Optional[bytes] = None
+_pagination_key_lock = threading.Lock()
+
+
+class PaginationTokenError(ValueError):
+    """形式不正・署名不一致・別条件で発行されたnextToken"""
+
+
+def get_pagination_key() -> bytes:
+    """
+    ページネーショントークンの署名鍵を取得（Secrets Managerから1回だけ読み込む）
+
+    Raises:
+        RuntimeError: PAGINATION_TOKEN_SECRET_ARN が設定されていない場合
+    """
+    global _pagination_key
+    if _pagination_key is None:
+        with _pagination_key_lock:
+            if _pagination_key is None:
+                if not PAGINATION_TOKEN_SECRET_ARN:
+                    # 推測可能な鍵で署名するとトークンを偽造できるため、鍵がなければ発行も検証もしない
+                    raise RuntimeError("PAGINATION_TOKEN_SECRET_ARN環境変数が設定されていません")
+                secret = boto3.client('secretsmanager').get_secret_value(
+                    SecretId=PAGINATION_TOKEN_SECRET_ARN
+                )['SecretString']
+                _pagination_key = secret.encode('utf-8')
+    return _pagination_key
+
+
+def _json_default(value: Any) -> Any:
+    """開始キーに含まれるDecimal（数値キー）をJSONの数値に変換"""
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    raise TypeError(f"JSONに変換できない値です: {type(value).__name__}")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def encode_page_token(plan: str, last_key: Dict[str, Any]) -> str:
+    """
+    次ページの開始キーを署名付きの不透明なページネーショントークンに変換する
+
+    Args:
+        plan: クエリ条件（取得元・フィルタ・ユーザーID）。別条件でのトークン再利用を防ぐ
+        last_key: 次ページの開始キー
+    """
+    payload = json.dumps(
+        {'v': TOKEN_VERSION, 'plan': plan, 'key': last_key},
+        separators=(',', ':'), ensure_ascii=False, default=_json_default
+    ).encode('utf-8')
+    signature = hmac.new(get_pagination_key(), payload, hashlib.sha256).digest()
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def decode_page_token(token: str, plan: str) -> Dict[str, Any]:
+    """
+    ページネーショントークンを検証して次ページの開始キーを取得する
+
+    Raises:
+        PaginationTokenError: 形式不正・署名不一致・別条件で発行されたトークンの場合
+    """
+    try:
+        encoded_payload, encoded_signature = token.split('.', 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except Exception as e:
+        raise PaginationTokenError(f"トークンの形式が不正です: {e}")
+
+    expected = hmac.new(get_pagination_key(), payload, hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise PaginationTokenError("トークンの署名が一致しません")
+
+    data = json.loads(payload)
+    if data.get('v') != TOKEN_VERSION or data.get('plan') != plan or not isinstance(data.get('key'), dict):
+        raise PaginationTokenError("トークンのクエリ条件が一致しません")
+    return data['key']
+
+
+def fill_page(read_fn: Callable[..., Dict[str, Any]], read_params: Dict[str, Any], limit: int,
+              key_names: List[str]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]], float]:
+    """
+    FilterExpressionで間引かれても、limit件に達するまでクエリ・スキャンを読み進める
+
+    DynamoDBのLimitはフィルタ適用前の評価件数のため、1回の読み込みでは
+    ページが不足したり空になったりする。読み込み予算（LIST_PAGE_MAX_READ_UNITS /
+    LIST_PAGE_MAX_MILLIS）を使い切った場合は、その時点の件数で返す。
+
+    Args:
+        read_fn: table.query または table.scan
+        read_params: クエリ・スキャンのパラメータ（Limitは本関数で設定）
+        limit: 1ページの件数
+        key_names: 開始キーを構成する属性名（テーブルキー + インデックスキー）
+
+    Returns:
+        tuple: (アイテムのリスト, 次ページの開始キー（なければNone）, 消費RCU)
+    """
+    params = dict(read_params, ReturnConsumedCapacity='TOTAL')
+    has_filter = 'FilterExpression' in params
+    started = time.monotonic()
+    consumed = 0.0
+    items: List[Dict[str, Any]] = []
+
+    while True:
+        remaining = limit - len(items)
+        # フィルタなしの場合は必要な件数だけ読む
+        params['Limit'] = max(remaining, LIST_PAGE_READ_SIZE) if has_filter else remaining
+        response = read_fn(**params)
+        consumed += float((response.get('ConsumedCapacity') or {}).get('CapacityUnits', 0))
+        page = response.get('Items', [])
+
+        if len(page) > remaining:
+            # 読みすぎた分は返さず、最後に返したアイテムのキーから次ページを始める
+            items.extend(page[:remaining])
+            return items, {name: items[-1][name] for name in key_names}, consumed
+
+        items.extend(page)
+        last_key = response.get('LastEvaluatedKey')
+        elapsed_ms = (time.monotonic() - started) * 1000
+        if (last_key is None or len(items) >= limit
+                or consumed >= LIST_PAGE_MAX_READ_UNITS or elapsed_ms >= LIST_PAGE_MAX_MILLIS):
+            return items, last_key, consumed
+        params['ExclusiveStartKey'] = last_key
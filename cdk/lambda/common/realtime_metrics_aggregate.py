@@ -0,0 +1,97 @@
+"""
+リアルタイムメトリクスのセッション集約アイテムの読み取り
+
+realtime-scoring エージェント（cdk/agents/realtime-scoring/session_aggregate.py）が
+セッションごとに1件更新する集約アイテムを、ターンごとの realtime-metrics 形式に展開する。
+sessions（分析結果API）と sessionAnalysis（分析開始）の両Lambdaが共通レイヤー経由で使用する。
+
+集約アイテムのソートキーは '#' で始まるため、タイムスタンプのソートキーより前に並ぶ。
+final-feedback はセッション終了後に作成されるため、最新ターンの作成日時（updatedAt）より後の
+ソートキー範囲だけをクエリすればよく、ターンごとの realtime-metrics アイテムは読まない。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+
+AGGREGATE_SORT_KEY = '#realtime-metrics-aggregate'
+
+
+def get_realtime_metrics_aggregate(feedback_table, session_id: str) -> Optional[Dict[str, Any]]:
+    """セッション集約アイテムを取得（集約アイテムのない旧セッションはNone）"""
+    response = feedback_table.get_item(Key={'sessionId': session_id, 'createdAt': AGGREGATE_SORT_KEY})
+    return response.get('Item')
+
+
+def expand_realtime_metrics_aggregate(aggregate: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    集約アイテムをターンごとの realtime-metrics 形式のリスト（古い順）に展開
+
+    packedScores は (怒り, 信頼, 進捗) を1バイトずつ詰めたBinary（3バイト/ターン）。
+    turns（ターンごとの作成日時・分析コメント）は packedScores の末尾のターンに対応させる
+    （集約アイテムの途中から turns を記録し始めたセッションでも、新しいターンの対応はずれない）。
+    turns のない旧形式の集約アイテムは、最新ターンにのみ作成日時・分析コメントを設定する。
+    コンプライアンス違反は turnIndex のターンに付与する（turnIndex のない違反は最新ターン）。
+    """
+    packed = aggregate.get('packedScores')
+    raw = bytes(packed.value if hasattr(packed, 'value') else (packed or b''))
+    metrics = [
+        {
+            'dataType': 'realtime-metrics',
+            'createdAt': '',
+            'messageNumber': index + 1,
+            'angerLevel': raw[offset],
+            'trustLevel': raw[offset + 1],
+            'progressLevel': raw[offset + 2],
+            'analysis': '',
+        }
+        for index, offset in enumerate(range(0, len(raw) - len(raw) % 3, 3))
+    ]
+    if not metrics:
+        return metrics
+
+    turns = list(aggregate.get('turns') or [])[-len(metrics):]
+    if turns:
+        for metric, turn in zip(metrics[len(metrics) - len(turns):], turns):
+            metric['createdAt'] = turn.get('createdAt', '')
+            metric['analysis'] = turn.get('analysis', '')
+    else:
+        metrics[-1]['createdAt'] = aggregate.get('updatedAt', '')
+        metrics[-1]['analysis'] = aggregate.get('analysis', '')
+
+    for violation in aggregate.get('complianceViolations') or []:
+        turn_index = violation.get('turnIndex')
+        if turn_index is None or not 0 <= int(turn_index) < len(metrics):
+            turn_index = len(metrics) - 1
+        metric = metrics[int(turn_index)]
+        metric.setdefault('complianceData', {'violations': []})['violations'].append(
+            {k: v for k, v in violation.items() if k != 'turnIndex'}
+        )
+    return metrics
+
+
+def query_final_feedback(feedback_table, session_id: str, after: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    最新の final-feedback を取得
+
+    Args:
+        feedback_table: セッションフィードバックテーブル
+        session_id: セッションID
+        after: このソートキーより後だけを読む（集約アイテムの updatedAt = 最新ターンの作成日時）
+    """
+    key_condition = Key('sessionId').eq(session_id)
+    if after:
+        key_condition = key_condition & Key('createdAt').gt(after)
+    params = {
+        'KeyConditionExpression': key_condition,
+        'FilterExpression': Attr('dataType').eq('final-feedback'),
+        'ScanIndexForward': False,  # 降順ソート（最新が先頭）
+    }
+    while True:
+        response = feedback_table.query(**params)
+        items = response.get('Items', [])
+        if items:
+            return items[0]
+        if 'LastEvaluatedKey' not in response:
+            return None
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
@@ -0,0 +1,11 @@
+"""
+共通レイヤー（cdk/lambda/common）のテスト設定
+"""
+
+import os
+import sys
+
+COMMON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
@@ -0,0 +1,163 @@
+"""
+一覧APIのページネーション（pagination.py）のテスト
+
+- nextToken は署名を検証し、改ざん・別条件のトークンを拒否する
+- 署名鍵（PAGINATION_TOKEN_SECRET_ARN）が未設定の場合はトークンを発行・検証しない
+- fill_page は読みすぎた分を返さず、最後に返したアイテムのキーから次ページを始める
+- 読み込み予算（RCU / ミリ秒）を使い切った時点の件数で返す
+"""
+import base64
+import json
+from decimal import Decimal
+
+import pytest
+
+import pagination
+from pagination import PaginationTokenError, decode_page_token, encode_page_token, fill_page
+
+
+@pytest.fixture(autouse=True)
+def signing_key(monkeypatch):
+    monkeypatch.setattr(pagination, '_pagination_key', b'test-key')
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+class TestPageToken:
+    def test_発行したトークンから開始キーを取り出せる(self):
+        key = {'userId': 'u1', 'sessionId': 's1', 'completedAt': Decimal('1700000000')}
+
+        token = encode_page_token('completed|u1', key)
+
+        assert decode_page_token(token, 'completed|u1') == {**key, 'completedAt': 1700000000}
+
+    def test_ペイロードを改ざんしたトークンは拒否する(self):
+        token = encode_page_token('owner|u1', {'scenarioId': 'a'})
+        _, signature = token.split('.')
+        forged = json.dumps({'v': 1, 'plan': 'owner|u1', 'key': {'scenarioId': 'z'}}, separators=(',', ':'))
+
+        with pytest.raises(PaginationTokenError):
+            decode_page_token(f"{b64(forged.encode('utf-8'))}.{signature}", 'owner|u1')
+
+    def test_別の鍵で署名したトークンは拒否する(self, monkeypatch):
+        token = encode_page_token('owner|u1', {'scenarioId': 'a'})
+        monkeypatch.setattr(pagination, '_pagination_key', b'rotated-key')
+
+        with pytest.raises(PaginationTokenError):
+            decode_page_token(token, 'owner|u1')
+
+    def test_別条件で発行されたトークンは拒否する(self):
+        token = encode_page_token('owner|u1', {'scenarioId': 'a'})
+
+        with pytest.raises(PaginationTokenError):
+            decode_page_token(token, 'owner|u2')
+
+    @pytest.mark.parametrize('token', ['', 'no-separator', '!!!.???'])
+    def test_形式不正なトークンは拒否する(self, token):
+        with pytest.raises(PaginationTokenError):
+            decode_page_token(token, 'owner|u1')
+
+    def test_署名鍵が未設定ならトークンを発行も検証もしない(self, monkeypatch):
+        monkeypatch.setattr(pagination, '_pagination_key', None)
+        monkeypatch.setattr(pagination, 'PAGINATION_TOKEN_SECRET_ARN', None)
+
+        with pytest.raises(RuntimeError):
+            encode_page_token('owner|u1', {'scenarioId': 'a'})
+        with pytest.raises(RuntimeError):
+            decode_page_token('e30.e30', 'owner|u1')
+
+
+class FakeReader:
+    """Limit件ずつ読み、FilterExpressionの代わりに keep で間引くクエリ"""
+
+    def __init__(self, total, keep=lambda n: True, units_per_read=1.0):
+        self.rows = [{'pk': 'p', 'sk': f"{n:03d}"} for n in range(total)]
+        self.keep = keep
+        self.units_per_read = units_per_read
+        self.calls = []
+
+    def __call__(self, **params):
+        self.calls.append(dict(params))
+        start = 0
+        if 'ExclusiveStartKey' in params:
+            start = int(params['ExclusiveStartKey']['sk']) + 1
+        evaluated = self.rows[start:start + params['Limit']]
+        response = {
+            'Items': [row for row in evaluated if self.keep(int(row['sk']))],
+            'ConsumedCapacity': {'CapacityUnits': self.units_per_read},
+        }
+        if start + params['Limit'] < len(self.rows):
+            response['LastEvaluatedKey'] = dict(evaluated[-1])
+        return response
+
+
+class TestFillPage:
+    def test_フィルタなしは必要な件数だけ読む(self):
+        reader = FakeReader(50)
+
+        items, last_key, consumed = fill_page(reader, {}, 10, ['pk', 'sk'])
+
+        assert len(items) == 10
+        assert last_key == {'pk': 'p', 'sk': '009'}
+        assert reader.calls[0]['Limit'] == 10
+        assert reader.calls[0]['ReturnConsumedCapacity'] == 'TOTAL'
+        assert consumed == 1.0
+
+    def test_フィルタで間引かれてもlimit件まで読み進める(self, monkeypatch):
+        monkeypatch.setattr(pagination, 'LIST_PAGE_READ_SIZE', 10)
+        reader = FakeReader(100, keep=lambda n: n % 5 == 0)
+
+        items, last_key, _ = fill_page(reader, {'FilterExpression': 'x'}, 4, ['pk', 'sk'])
+
+        assert [item['sk'] for item in items] == ['000', '005', '010', '015']
+        assert len(reader.calls) == 2
+        # ちょうどlimit件で読み終えた場合は、最後に評価したキーから続ける
+        assert last_key == {'pk': 'p', 'sk': '019'}
+
+    def test_読みすぎた分は返さず最後に返したアイテムのキーから次ページを始める(self, monkeypatch):
+        monkeypatch.setattr(pagination, 'LIST_PAGE_READ_SIZE', 100)
+        reader = FakeReader(100, keep=lambda n: n % 2 == 0)
+
+        items, last_key, _ = fill_page(reader, {'FilterExpression': 'x'}, 3, ['pk', 'sk'])
+
+        # 1回の読み込みで50件ヒットするが、3件だけ返す
+        assert [item['sk'] for item in items] == ['000', '002', '004']
+        assert last_key == {'pk': 'p', 'sk': '004'}
+
+        # 次ページは取りこぼしなく 006 から始まる
+        following, _, _ = fill_page(reader, {'FilterExpression': 'x', 'ExclusiveStartKey': last_key}, 3, ['pk', 'sk'])
+        assert [item['sk'] for item in following] == ['006', '008', '010']
+
+    def test_RCU予算を使い切ったら不足したまま返す(self, monkeypatch):
+        monkeypatch.setattr(pagination, 'LIST_PAGE_READ_SIZE', 10)
+        monkeypatch.setattr(pagination, 'LIST_PAGE_MAX_READ_UNITS', 3)
+        reader = FakeReader(100, keep=lambda n: False, units_per_read=1.5)
+
+        items, last_key, consumed = fill_page(reader, {'FilterExpression': 'x'}, 5, ['pk', 'sk'])
+
+        assert items == []
+        assert len(reader.calls) == 2
+        assert consumed == 3.0
+        # 続きから読めるよう、最後に評価したキーを返す
+        assert last_key == {'pk': 'p', 'sk': '019'}
+
+    def test_時間予算を使い切ったら不足したまま返す(self, monkeypatch):
+        monkeypatch.setattr(pagination, 'LIST_PAGE_READ_SIZE', 10)
+        monkeypatch.setattr(pagination, 'LIST_PAGE_MAX_MILLIS', 0)
+        reader = FakeReader(100, keep=lambda n: n == 3)
+
+        items, last_key, _ = fill_page(reader, {'FilterExpression': 'x'}, 5, ['pk', 'sk'])
+
+        assert [item['sk'] for item in items] == ['003']
+        assert len(reader.calls) == 1
+        assert last_key == {'pk': 'p', 'sk': '009'}
+
+    def test_最後まで読んだら次ページの開始キーはNone(self):
+        reader = FakeReader(3)
+
+        items, last_key, _ = fill_page(reader, {}, 10, ['pk', 'sk'])
+
+        assert len(items) == 3
+        assert last_key is None
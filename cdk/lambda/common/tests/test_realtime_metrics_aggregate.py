@@ -0,0 +1,111 @@
+"""
+リアルタイムメトリクス集約アイテムの展開（realtime_metrics_aggregate.py）のテスト
+
+- packedScores をターンごとのスコアに展開し、turns の作成日時・分析コメントを各ターンに設定する
+- コンプライアンス違反は turnIndex のターンに付与する
+- turns のない旧形式は最新ターンにのみ分析コメントを設定する
+- final-feedback は最新ターンより後のソートキー範囲だけをクエリする
+"""
+import pytest
+
+from realtime_metrics_aggregate import expand_realtime_metrics_aggregate, query_final_feedback
+
+
+def make_aggregate(**extra):
+    aggregate = {
+        'packedScores': bytes([1, 5, 2, 3, 6, 4, 7, 2, 8]),
+        'updatedAt': '2025-01-01T00:03:00.000Z',
+        'analysis': 'turn3',
+    }
+    aggregate.update(extra)
+    return aggregate
+
+
+class TestExpand:
+    def test_ターンごとのスコア_作成日時_分析コメントを展開する(self):
+        turns = [
+            {'createdAt': '2025-01-01T00:01:00.000Z', 'analysis': 'turn1'},
+            {'createdAt': '2025-01-01T00:02:00.000Z', 'analysis': 'turn2'},
+            {'createdAt': '2025-01-01T00:03:00.000Z', 'analysis': 'turn3'},
+        ]
+        metrics = expand_realtime_metrics_aggregate(make_aggregate(turns=turns))
+
+        assert [(m['messageNumber'], m['angerLevel'], m['trustLevel'], m['progressLevel']) for m in metrics] == [
+            (1, 1, 5, 2), (2, 3, 6, 4), (3, 7, 2, 8)
+        ]
+        assert [m['analysis'] for m in metrics] == ['turn1', 'turn2', 'turn3']
+        assert [m['createdAt'] for m in metrics] == [t['createdAt'] for t in turns]
+        assert all(m['dataType'] == 'realtime-metrics' for m in metrics)
+
+    def test_コンプライアンス違反はturnIndexのターンに付与する(self):
+        violations = [
+            {'rule_id': 'r1', 'severity': 'high', 'turnIndex': 0},
+            {'rule_id': 'r2', 'severity': 'low', 'turnIndex': 2},
+            {'rule_id': 'r3', 'severity': 'low', 'turnIndex': 0},
+        ]
+        metrics = expand_realtime_metrics_aggregate(make_aggregate(complianceViolations=violations))
+
+        assert [v['rule_id'] for v in metrics[0]['complianceData']['violations']] == ['r1', 'r3']
+        assert 'complianceData' not in metrics[1]
+        assert metrics[2]['complianceData']['violations'] == [{'rule_id': 'r2', 'severity': 'low'}]
+
+    def test_turnIndexのない違反は最新ターンに付与する(self):
+        metrics = expand_realtime_metrics_aggregate(make_aggregate(complianceViolations=[{'rule_id': 'r1'}]))
+        assert metrics[-1]['complianceData']['violations'] == [{'rule_id': 'r1'}]
+
+    def test_turnsのない旧形式は最新ターンにのみ分析コメントを設定する(self):
+        metrics = expand_realtime_metrics_aggregate(make_aggregate())
+        assert [m['analysis'] for m in metrics] == ['', '', 'turn3']
+        assert [m['createdAt'] for m in metrics] == ['', '', '2025-01-01T00:03:00.000Z']
+
+    def test_途中から記録したturnsは末尾のターンに対応させる(self):
+        metrics = expand_realtime_metrics_aggregate(make_aggregate(turns=[{'createdAt': 't3', 'analysis': 'turn3'}]))
+        assert [m['analysis'] for m in metrics] == ['', '', 'turn3']
+
+    def test_Binary型のpackedScoresも展開できる(self):
+        class Binary:
+            def __init__(self, value):
+                self.value = value
+
+        metrics = expand_realtime_metrics_aggregate(make_aggregate(packedScores=Binary(bytes([1, 2, 3]))))
+        assert (metrics[0]['angerLevel'], metrics[0]['trustLevel'], metrics[0]['progressLevel']) == (1, 2, 3)
+
+    def test_スコアがない場合は空リスト(self):
+        assert expand_realtime_metrics_aggregate({'packedScores': b''}) == []
+
+
+class FakeTable:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = []
+
+    def query(self, **params):
+        self.calls.append(params)
+        return self.pages.pop(0)
+
+
+class TestQueryFinalFeedback:
+    def test_最新ターンより後のソートキー範囲だけをクエリする(self):
+        table = FakeTable([{'Items': [{'dataType': 'final-feedback', 'createdAt': 'b'}]}])
+
+        item = query_final_feedback(table, 'session-1', after='2025-01-01T00:03:00.000Z')
+
+        assert item['createdAt'] == 'b'
+        condition = table.calls[0]['KeyConditionExpression'].get_expression()
+        assert condition['operator'] == 'AND'
+        range_condition = condition['values'][1].get_expression()
+        assert range_condition['operator'] == '>'
+        assert range_condition['values'][1] == '2025-01-01T00:03:00.000Z'
+        assert table.calls[0]['ScanIndexForward'] is False
+
+    def test_フィルタで空のページは次のページを読む(self):
+        table = FakeTable([
+            {'Items': [], 'LastEvaluatedKey': {'sessionId': 'session-1', 'createdAt': 'x'}},
+            {'Items': [{'dataType': 'final-feedback', 'createdAt': 'a'}]},
+        ])
+
+        assert query_final_feedback(table, 'session-1')['createdAt'] == 'a'
+        assert table.calls[1]['ExclusiveStartKey'] == {'sessionId': 'session-1', 'createdAt': 'x'}
+
+    def test_final_feedbackがない場合はNone(self):
+        assert query_final_feedback(FakeTable([{'Items': []}]), 'session-1') is None
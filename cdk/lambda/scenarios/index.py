@@ -10,29 +10,44 @@
 - シナリオ削除 (/scenarios/{scenarioId}) - DELETE
 - シナリオ共有設定 (/scenarios/{scenarioId}/share) - POST
 - PDFおよびメタデータファイルアップロード用署名付きURL発行 (/scenarios/{scenarioId}/pdf-upload-url) - POST
+- シナリオインポート (/scenarios/import) - POST
+- シナリオインポートジョブ (/scenarios/import/jobs, /scenarios/import/jobs/{jobId}, /scenarios/import/jobs/{jobId}/start)
 
 環境変数:
 - SCENARIOS_TABLE: シナリオ情報を格納するDynamoDBテーブル名
+- SCENARIO_SHARES_TABLE: 共有メンバーシップ（userId + scenarioId）を格納するDynamoDBテーブル名
+- SCENARIO_OWNER_INDEX_ENABLED: OwnerIndex がデプロイ済みの場合 'true'（インデックス経由の一覧取得を有効にする）
+- PAGINATION_TOKEN_SECRET_ARN: nextToken署名鍵のSecrets Manager ARN（共通レイヤーの pagination.py が使用）
+- SCENARIO_CACHE_TTL_SECONDS: 公開シナリオ詳細をコンテナ内で保持する秒数（他コンテナでの更新はこの秒数まで反映が遅れる）
+- IMPORT_SYNC_MAX_SCENARIOS: /scenarios/import で同期インポートできる最大シナリオ数
 - PDF_BUCKET: PDF保存用S3バケット名
 """
 
+import heapq
 import json
 import os
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.config import Config
 import uuid
 import time
 import urllib.parse
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 from aws_lambda_powertools import Logger
-from aws_lambda_powertools.event_handler import APIGatewayRestResolver, CORSConfig
+from aws_lambda_powertools.event_handler import APIGatewayRestResolver, CORSConfig, Response
 from aws_lambda_powertools.logging import correlation_paths
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools.event_handler.exceptions import (
     InternalServerError, NotFoundError, BadRequestError
 )
 
+import pagination
+from pagination import PaginationTokenError, encode_page_token, fill_page
+from scenario_cache import ScenarioCache, etag_matches, list_etag, scenario_etag
+from scenario_cards import build_scenario_card, card_projection
+from scenario_import import import_scenarios_batch
+
 # Powertools ロガー設定
 logger = Logger(service="scenarios-api")
 
@@ -49,6 +64,39 @@ app = APIGatewayRestResolver(cors=cors_config)
 
 # 環境変数
 SCENARIOS_TABLE = os.environ.get('SCENARIOS_TABLE')
+SCENARIO_SHARES_TABLE = os.environ.get('SCENARIO_SHARES_TABLE')
+SCENARIO_OWNER_INDEX_ENABLED = os.environ.get('SCENARIO_OWNER_INDEX_ENABLED', 'false').lower() == 'true'
+
+# 共有メンバーシップのバックフィル完了マーカー（cdk/scripts/backfill_scenario_shares.py が最後に書き込む）
+SHARES_BACKFILL_MARKER_KEY = {'userId': '#backfill', 'scenarioId': '#complete'}
+# バックフィル未完了の場合にマーカーを再確認する間隔（秒）
+SHARES_BACKFILL_RECHECK_SECONDS = 60
+
+# 公開シナリオ詳細のコンテナ内キャッシュ（TTL秒・最大件数）とCache-Controlヘッダー
+SCENARIO_CACHE_TTL_SECONDS = float(os.environ.get('SCENARIO_CACHE_TTL_SECONDS', '30'))
+SCENARIO_CACHE_MAX_ENTRIES = int(os.environ.get('SCENARIO_CACHE_MAX_ENTRIES', '256'))
+SCENARIO_CACHE_CONTROL = 'private, no-cache'
+
+# シナリオのrevisionを1増やす更新式（ExpressionAttributeNames / Values と合わせて使う）
+REVISION_INCREMENT = '#revision = if_not_exists(#revision, :revisionZero) + :revisionOne'
+REVISION_NAMES = {'#revision': 'revision'}
+REVISION_VALUES = {':revisionZero': 0, ':revisionOne': 1}
+
+# インポート: 同期APIの最大シナリオ数と、非同期ジョブの入力ファイル上限・保存先プレフィックス
+IMPORT_SYNC_MAX_SCENARIOS = int(os.environ.get('IMPORT_SYNC_MAX_SCENARIOS', '200'))
+IMPORT_JOB_MAX_BYTES = 20 * 1024 * 1024
+IMPORT_JOB_PREFIX = 'imports'
+# ジョブ進捗（status.json）を書き込む最短間隔（秒）
+IMPORT_JOB_PROGRESS_INTERVAL = 2.0
+# インポートジョブを処理するワーカーLambda関数名（API用とは別関数でタイムアウトを長く設定）
+IMPORT_JOB_FUNCTION = os.environ.get('IMPORT_JOB_FUNCTION', '')
+# QUEUEDのまま処理が始まらないジョブを失敗とみなすまでの秒数（ワーカーの非同期イベント最大保持時間に合わせる）
+IMPORT_JOB_QUEUE_TIMEOUT_SECONDS = int(os.environ.get('IMPORT_JOB_QUEUE_TIMEOUT_SECONDS', '900'))
+# 実行期限（deadline）を過ぎたジョブを失敗とみなすまでの猶予（秒）
+IMPORT_JOB_DEADLINE_GRACE_SECONDS = 60
+# ワーカーの残り実行時間がこれを下回ったら処理を打ち切り、ジョブを失敗として記録する（ミリ秒）
+IMPORT_JOB_STOP_MARGIN_MS = 30 * 1000
+
 PDF_BUCKET = os.environ.get('PDF_BUCKET')
 SLIDE_BUCKET = os.environ.get('SLIDE_BUCKET')
 KNOWLEDGE_BASE_ID = os.environ.get('KNOWLEDGE_BASE_ID')
@@ -88,23 +136,38 @@ else:
 # Bedrock Agentクライアント（Knowledge Base ingestion用）
 bedrock_agent_client = boto3.client('bedrock-agent') if KNOWLEDGE_BASE_ID else None
 
-# Lambda呼び出し用クライアント（スライド変換トリガー用）
+# Lambda呼び出し用クライアント（スライド変換トリガー・インポートジョブのワーカー呼び出し用）
 SLIDE_CONVERT_FUNCTION = os.environ.get('SLIDE_CONVERT_FUNCTION', '')
-lambda_invoke_client = boto3.client('lambda') if SLIDE_CONVERT_FUNCTION else None
+lambda_invoke_client = boto3.client('lambda')
+
+# シナリオ一覧用のGSI（パーティションキー + scenarioId）
+VISIBILITY_INDEX = 'VisibilityIndex'
+OWNER_INDEX = 'OwnerIndex'
 
 scenarios_table = None
+scenario_shares_table = None
+_shares_backfill_complete = False
+_shares_backfill_checked_at = None
+scenario_cache = ScenarioCache(SCENARIO_CACHE_MAX_ENTRIES, SCENARIO_CACHE_TTL_SECONDS)
 
 def init_tables():
     """
     DynamoDBテーブルのリソースを初期化
     """
-    global scenarios_table
+    global scenarios_table, scenario_shares_table
     
     if SCENARIOS_TABLE:
         scenarios_table = dynamodb.Table(SCENARIOS_TABLE)
         logger.info(f"DynamoDBテーブルを初期化しました: {SCENARIOS_TABLE}")
     else:
         logger.error("SCENARIOS_TABLE環境変数が設定されていません")
+    
+    if SCENARIO_SHARES_TABLE:
+        scenario_shares_table = dynamodb.Table(SCENARIO_SHARES_TABLE)
+        logger.info(f"DynamoDBテーブルを初期化しました: {SCENARIO_SHARES_TABLE}")
+    else:
+        # 共有メンバーシップテーブルがない場合、フィルタなしの一覧はスキャンで取得する
+        logger.warning("SCENARIO_SHARES_TABLE環境変数が設定されていません")
 
 # テーブルの初期化
 init_tables()
@@ -616,6 +679,263 @@ def delete_scenario_slide_files(scenario_id: str) -> tuple:
     return deleted_files, failed_deletions
 
 
+def get_share_members(scenario_item: dict) -> set:
+    """
+    シナリオの共有先ユーザーIDを取得（visibilityが'shared'の場合のみ）
+    """
+    if not scenario_item or scenario_item.get('visibility') != 'shared':
+        return set()
+    return set(scenario_item.get('sharedWithUsers') or [])
+
+
+def sync_scenario_shares(scenario_id: str, old_members: set, new_members: set) -> None:
+    """
+    共有メンバーシップテーブルをシナリオの共有設定に合わせて更新する
+    
+    一覧取得で「自分に共有されたシナリオ」をクエリできるように、
+    共有先ユーザーごとに (userId, scenarioId) のアイテムを保持する。
+    
+    Args:
+        scenario_id: シナリオID
+        old_members: 更新前の共有先ユーザーID
+        new_members: 更新後の共有先ユーザーID
+    
+    シナリオ本体の書き込み後に呼ばれるため、失敗してもエラーにはせずログに残す。
+    共有されたシナリオの一覧は取得時にシナリオ側の共有設定も確認するため、
+    削除漏れは表示に影響しない。追加漏れはバックフィルスクリプトの再実行で補える。
+    """
+    if not scenario_shares_table or old_members == new_members:
+        return
+    
+    try:
+        with scenario_shares_table.batch_writer() as batch:
+            for member in old_members - new_members:
+                batch.delete_item(Key={'userId': member, 'scenarioId': scenario_id})
+            for member in new_members - old_members:
+                batch.put_item(Item={'userId': member, 'scenarioId': scenario_id})
+    except Exception as e:
+        logger.error(f"共有メンバーシップの更新に失敗しました（バックフィルで再同期してください）: {scenario_id}, {e}")
+        return
+    logger.info(f"共有メンバーシップを更新: {scenario_id}, 追加={len(new_members - old_members)}, 削除={len(old_members - new_members)}")
+
+
+def list_indexes_ready() -> bool:
+    """
+    フィルタなしのシナリオ一覧をインデックスから取得できるかを判定する
+    
+    OwnerIndex がデプロイ済みで、既存の共有シナリオのメンバーシップのバックフィルが
+    完了している場合のみ True を返す。それまではスキャンで一覧を取得する。
+    完了マーカーは見つかるまで SHARES_BACKFILL_RECHECK_SECONDS ごとに確認する。
+    """
+    global _shares_backfill_complete, _shares_backfill_checked_at
+    
+    if not scenario_shares_table or not SCENARIO_OWNER_INDEX_ENABLED:
+        return False
+    if _shares_backfill_complete:
+        return True
+    
+    now = time.monotonic()
+    if _shares_backfill_checked_at is not None and now - _shares_backfill_checked_at < SHARES_BACKFILL_RECHECK_SECONDS:
+        return False
+    _shares_backfill_checked_at = now
+    
+    try:
+        response = scenario_shares_table.get_item(Key=SHARES_BACKFILL_MARKER_KEY)
+        _shares_backfill_complete = 'Item' in response
+    except Exception as e:
+        logger.warning(f"共有メンバーシップのバックフィル完了マーカーを確認できません: {e}")
+    if not _shares_backfill_complete:
+        logger.info("共有メンバーシップのバックフィルが未完了のため、シナリオ一覧はスキャンで取得します")
+    return _shares_backfill_complete
+
+
+def conditional_json_response(body: dict, etag: str) -> Response:
+    """
+    ETag・Cache-Control付きのJSONレスポンスを生成（If-None-Matchが一致すれば304）
+    """
+    headers = {'ETag': etag, 'Cache-Control': SCENARIO_CACHE_CONTROL}
+    if etag_matches(get_if_none_match(), etag):
+        return Response(status_code=304, headers=headers, body='')
+    return Response(
+        status_code=200,
+        content_type='application/json',
+        body=json.dumps(convert_decimal_to_json_serializable(body), ensure_ascii=False),
+        headers=headers,
+    )
+
+
+def get_if_none_match():
+    """リクエストの If-None-Match ヘッダーを取得"""
+    return app.current_event.headers.get('If-None-Match')
+
+
+def check_scenario_read_access(item: dict, user_id: str) -> None:
+    """
+    シナリオの閲覧権限をチェック（visibility・createdBy・sharedWithUsers のみ参照）
+    
+    Raises:
+        BadRequestError: 閲覧権限がない場合
+    """
+    visibility = item.get('visibility', 'public')  # デフォルトは公開
+    
+    if visibility == 'private' and item.get('createdBy') != user_id:
+        # 非公開シナリオは作成者のみアクセス可能
+        raise BadRequestError("このシナリオへのアクセス権がありません")
+    elif visibility == 'shared':
+        # 共有シナリオは、作成者または共有先ユーザーのみアクセス可能
+        shared_with_users = item.get('sharedWithUsers', [])
+        if item.get('createdBy') != user_id and user_id not in shared_with_users:
+            raise BadRequestError("このシナリオへのアクセス権がありません")
+
+
+def decode_page_token(token: str, plan: str) -> dict:
+    """
+    ページネーショントークンを検証して次ページの開始キーを取得
+    
+    Raises:
+        BadRequestError: 形式不正・署名不一致・別条件で発行されたトークンの場合
+    """
+    try:
+        return pagination.decode_page_token(token, plan)
+    except PaginationTokenError as e:
+        logger.warning(f"不正なページネーショントークン: {e}")
+        raise BadRequestError("無効なnextTokenです")
+
+
+def query_index_in_order(index_name: str, key_name: str, key_value: str, after: str = None,
+                         filter_condition=None, page_size: int = 20):
+    """
+    GSIをscenarioIdの昇順でクエリし、afterより後のアイテムを順に返すジェネレーター
+    """
+    key_condition = Key(key_name).eq(key_value)
+    if after:
+        key_condition = key_condition & Key('scenarioId').gt(after)
+    
+    query_kwargs = {
+        'IndexName': index_name,
+        'KeyConditionExpression': key_condition,
+        'Limit': page_size,
+        **card_projection(),
+    }
+    if filter_condition is not None:
+        query_kwargs['FilterExpression'] = filter_condition
+    
+    while True:
+        response = scenarios_table.query(**query_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def query_shared_scenarios_in_order(user_id: str, after: str = None, difficulty: str = None,
+                                    page_size: int = 20):
+    """
+    ユーザーに共有されたシナリオをscenarioIdの昇順で返すジェネレーター
+    
+    共有メンバーシップテーブルからscenarioIdを取得し、BatchGetItemでシナリオ本体を読む。
+    メンバーシップが古い場合に備えて、シナリオ側の共有設定も確認する。
+    """
+    key_condition = Key('userId').eq(user_id)
+    if after:
+        key_condition = key_condition & Key('scenarioId').gt(after)
+    query_kwargs = {'KeyConditionExpression': key_condition, 'Limit': page_size}
+    
+    while True:
+        response = scenario_shares_table.query(**query_kwargs)
+        scenario_ids = [item['scenarioId'] for item in response.get('Items', [])]
+        
+        # BatchGetItemは1リクエスト100キーまで
+        fetched = {}
+        for start in range(0, len(scenario_ids), 100):
+            request_items = {
+                SCENARIOS_TABLE: {
+                    'Keys': [{'scenarioId': sid} for sid in scenario_ids[start:start + 100]],
+                    # 共有設定の確認用に sharedWithUsers も取得
+                    **card_projection(('sharedWithUsers',)),
+                }
+            }
+            while request_items:
+                batch_response = dynamodb.batch_get_item(RequestItems=request_items)
+                for item in batch_response.get('Responses', {}).get(SCENARIOS_TABLE, []):
+                    fetched[item['scenarioId']] = item
+                request_items = batch_response.get('UnprocessedKeys') or None
+        
+        for scenario_id in scenario_ids:
+            item = fetched.get(scenario_id)
+            if not item or user_id not in get_share_members(item):
+                continue
+            if difficulty and item.get('difficulty') != difficulty:
+                continue
+            yield item
+        
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def list_scenarios_from_indexes(user_id: str, visibility: str, difficulty: str, limit: int,
+                                next_token: str = None) -> tuple:
+    """
+    フィルタなしのシナリオ一覧をインデックスから取得する
+    
+    閲覧可能なシナリオの取得元ごとにscenarioId順のクエリを行い、マージして重複を除く:
+    - 公開シナリオ: VisibilityIndex (visibility = 'public')
+    - 自分のシナリオ: OwnerIndex (createdBy = user_id)
+    - 共有されたシナリオ: 共有メンバーシップテーブル (userId = user_id)
+    
+    Returns:
+        tuple: (シナリオアイテムのリスト, 次ページトークン)
+    """
+    difficulty_condition = Attr('difficulty').eq(difficulty) if difficulty else None
+    
+    def with_difficulty(condition):
+        if difficulty_condition is None:
+            return condition
+        return difficulty_condition if condition is None else condition & difficulty_condition
+    
+    # 取得元の組み合わせ（visibilityパラメータ・認証状態ごと）
+    if visibility == 'public' or not user_id:
+        source_names = ['public']
+    elif visibility in ('private', 'shared'):
+        source_names = ['owner'] + (['shares'] if visibility == 'shared' else [])
+    else:
+        source_names = ['public', 'owner', 'shares']
+    
+    plan = f"index|{'+'.join(source_names)}|{visibility or 'all'}|{difficulty or ''}|{user_id or ''}"
+    after = decode_page_token(next_token, plan).get('scenarioId') if next_token else None
+    page_size = limit + 1
+    
+    sources = []
+    for source_name in source_names:
+        if source_name == 'public':
+            sources.append(query_index_in_order(
+                VISIBILITY_INDEX, 'visibility', 'public', after, with_difficulty(None), page_size
+            ))
+        elif source_name == 'owner':
+            owner_condition = Attr('visibility').eq(visibility) if visibility in ('private', 'shared') else None
+            sources.append(query_index_in_order(
+                OWNER_INDEX, 'createdBy', user_id, after, with_difficulty(owner_condition), page_size
+            ))
+        else:
+            sources.append(query_shared_scenarios_in_order(user_id, after, difficulty, page_size))
+    
+    items = []
+    has_more = False
+    for item in heapq.merge(*sources, key=lambda scenario: scenario['scenarioId']):
+        # 公開かつ自分のシナリオなど、複数の取得元に現れるアイテムは1件にする
+        if items and items[-1]['scenarioId'] == item['scenarioId']:
+            continue
+        if len(items) == limit:
+            has_more = True
+            break
+        items.append(item)
+    
+    token = encode_page_token(plan, {'scenarioId': items[-1]['scenarioId']}) if has_more else None
+    logger.info(f"インデックス経由のシナリオ一覧取得: plan={plan}, 件数={len(items)}, 次ページ有無={has_more}")
+    return items, token
+
+
 @app.get("/scenarios")
 def get_scenarios():
     """
@@ -654,6 +974,11 @@ def get_scenarios():
             limit = 20  # デフォルト値に設定
         
         if scenarios_table:
+            # 次ページトークン（署名付き）と、その元になる開始キー
+            page_token = None
+            last_key = None
+            plan = None
+            
             # カテゴリと難易度の両方が指定されている場合
             if category and difficulty:
                 # CategoryIndexを使用してクエリ
@@ -664,14 +989,18 @@ def get_scenarios():
                         ':cat': category,
                         ':diff': difficulty
                     },
-                    'Limit': limit
+                    **card_projection()
                 }
+                plan = f"category|{category}|{difficulty}"
                 
                 # ページネーショントークンの追加
                 if next_token:
-                    query_params['ExclusiveStartKey'] = json.loads(next_token)
+                    query_params['ExclusiveStartKey'] = decode_page_token(next_token, plan)
                     
-                response = scenarios_table.query(**query_params)
+                items, last_key, _ = fill_page(
+                    scenarios_table.query, query_params, limit, ['scenarioId', 'category', 'difficulty']
+                )
+                response = {'Items': items}
                 
             # カテゴリのみが指定されている場合
             elif category:
@@ -682,23 +1011,34 @@ def get_scenarios():
                     'ExpressionAttributeValues': {
                         ':cat': category
                     },
-                    'Limit': limit
+                    **card_projection()
                 }
+                plan = f"category|{category}|"
                 
                 # ページネーショントークンの追加
                 if next_token:
-                    query_params['ExclusiveStartKey'] = json.loads(next_token)
+                    query_params['ExclusiveStartKey'] = decode_page_token(next_token, plan)
                     
-                response = scenarios_table.query(**query_params)
+                items, last_key, _ = fill_page(
+                    scenarios_table.query, query_params, limit, ['scenarioId', 'category', 'difficulty']
+                )
+                response = {'Items': items}
+                
+            # フィルタなしの場合は公開・所有者・共有のインデックスから取得
+            elif list_indexes_ready():
+                logger.info(f"ユーザーID: {user_id}, 難易度: {difficulty}, 公開設定: {visibility}")
+                items, page_token = list_scenarios_from_indexes(
+                    user_id, visibility, difficulty, limit, next_token
+                )
+                response = {'Items': items}
                 
-            # フィルタなしの場合はスキャン
+            # インデックス・共有メンバーシップの準備ができていない場合はスキャン
             else:
                 logger.info("フィルタなしのシナリオ一覧取得を実行")
                 logger.info(f"ユーザーID: {user_id}, 難易度: {difficulty}, 公開設定: {visibility}, 共有含む: {include_shared}")
                 
-                scan_params = {
-                    'Limit': limit
-                }
+                scan_params = card_projection()
+                plan = f"scan|{visibility or 'all'}|{difficulty or ''}|{user_id or ''}"
                 
                 filter_expressions = []
                 expression_attribute_values = {}
@@ -742,100 +1082,39 @@ def get_scenarios():
                 
                 # ページネーショントークンの追加
                 if next_token:
-                    scan_params['ExclusiveStartKey'] = json.loads(next_token)
+                    scan_params['ExclusiveStartKey'] = decode_page_token(next_token, plan)
                 
                 logger.info(f"DynamoDB scanパラメータ: {scan_params}")
-                response = scenarios_table.scan(**scan_params)
-                logger.info(f"DynamoDB scanレスポンス: 件数={len(response.get('Items', []))}, LastEvaluatedKey={response.get('LastEvaluatedKey') is not None}")
+                items, last_key, consumed = fill_page(scenarios_table.scan, scan_params, limit, ['scenarioId'])
+                response = {'Items': items}
+                logger.info(f"DynamoDB scanレスポンス: 件数={len(items)}, 消費RCU={consumed}, 次ページ有無={last_key is not None}")
             
             # レスポンス用のシナリオリストを作成
-            scenarios = []
-            for item in response.get('Items', []):
-                # レスポンス用に必要なフィールドを抽出（完全版）
-                scenario = {
-                    'scenarioId': item.get('scenarioId'),
-                    'title': item.get('title'),
-                    'description': item.get('description'),
-                    'difficulty': item.get('difficulty'),
-                    'category': item.get('category')
-                }
-                
-                # 初期メッセージを追加
-                if 'initialMessage' in item:
-                    scenario['initialMessage'] = item.get('initialMessage')
-                    
-                # 言語設定を追加
-                if 'language' in item:
-                    scenario['language'] = item.get('language')
-                
-                # NPC情報を完全に追加
-                if 'npc' in item:
-                    scenario['npcInfo'] = {
-                        'id': item['npc'].get('id'),
-                        'name': item['npc'].get('name'),
-                        'role': item['npc'].get('role'),
-                        'company': item['npc'].get('company'),
-                        'personality': item['npc'].get('personality', []),
-                        'avatar': item['npc'].get('avatar'),
-                        'description': item['npc'].get('description')
-                    }
-                
-                # goals情報を追加
-                if 'goals' in item:
-                    scenario['goals'] = item['goals']
-                
-                # objectives情報を追加
-                if 'objectives' in item:
-                    scenario['objectives'] = item['objectives']
-                
-                # initialMetrics情報を追加
-                if 'initialMetrics' in item:
-                    scenario['initialMetrics'] = item['initialMetrics']
-                
-                # 業界情報（industry）を追加
-                if 'industry' in item:
-                    scenario['industry'] = item['industry']
-                
-                # オーナー情報を追加（フロントエンドでのオーナー判定用）
-                if 'createdBy' in item:
-                    scenario['createdBy'] = item.get('createdBy')
-                
-                # カスタムシナリオフラグを追加
-                if 'isCustom' in item:
-                    scenario['isCustom'] = item.get('isCustom')
-                
-                # 公開設定を追加
-                if 'visibility' in item:
-                    scenario['visibility'] = item.get('visibility')
-                
-                # 作成日時・更新日時を追加
-                if 'createdAt' in item:
-                    scenario['createdAt'] = item.get('createdAt')
-                if 'updatedAt' in item:
-                    scenario['updatedAt'] = item.get('updatedAt')
-                
-                scenarios.append(scenario)
+            scenarios = [build_scenario_card(item) for item in response.get('Items', [])]
             
             # 次ページのトークン
-            next_token = None
-            if 'LastEvaluatedKey' in response:
-                next_token = json.dumps(response['LastEvaluatedKey'])
+            next_token = page_token
+            if last_key:
+                next_token = encode_page_token(plan, last_key)
             
             result = {
                 'scenarios': scenarios,
                 'nextToken': next_token
             }
+            etag = list_etag(response.get('Items', []), next_token)
             
             # デバッグ用: オーナー情報が含まれているシナリオの数をログ出力
             scenarios_with_owner = [s for s in scenarios if 'createdBy' in s]
             custom_scenarios = [s for s in scenarios if s.get('isCustom')]
             logger.info(f"シナリオ一覧取得結果: シナリオ数={len(scenarios)}, オーナー情報有り={len(scenarios_with_owner)}, カスタムシナリオ={len(custom_scenarios)}, 次ページトークン有無={next_token is not None}")
             
-            return result
+            return conditional_json_response(result, etag)
         else:
             logger.error("シナリオテーブル未定義", extra={"table_name": SCENARIOS_TABLE})
             raise InternalServerError("システムエラーが発生しました")
             
+    except BadRequestError:
+        raise
     except Exception as e:
         logger.exception("シナリオ一覧取得エラー", extra={"error": str(e)})
         raise InternalServerError(f"シナリオ一覧の取得中にエラーが発生しました: {str(e)}")
@@ -859,19 +1138,32 @@ def get_scenario(scenario_id: str):
         # 認証情報からユーザーIDを取得
         user_id = get_user_id_from_token()
         
-        # シナリオ情報の取得
+        # シナリオ情報の取得（公開シナリオはTTL内ならテーブルを読まずにキャッシュから返す）
         if scenarios_table:
-            response = scenarios_table.get_item(
-                Key={
-                    'scenarioId': scenario_id
-                }
-            )
-            
-            # シナリオが存在するかチェック
-            if 'Item' not in response:
-                raise NotFoundError(f"シナリオが見つかりません: {scenario_id}")
-            
-            item = response['Item']
+            item = scenario_cache.get(scenario_id)
+            if item is None:
+                response = scenarios_table.get_item(
+                    Key={
+                        'scenarioId': scenario_id
+                    }
+                )
+                
+                # シナリオが存在するかチェック
+                if 'Item' not in response:
+                    raise NotFoundError(f"シナリオが見つかりません: {scenario_id}")
+                
+                item = response['Item']
+                scenario_cache.put(item)
+            
+            # 条件付きリクエストはアクセス権を確認した上で、ETagが一致すれば304を返す
+            etag = scenario_etag(item)
+            if etag_matches(get_if_none_match(), etag):
+                check_scenario_read_access(item, user_id)
+                return Response(
+                    status_code=304,
+                    headers={'ETag': etag, 'Cache-Control': SCENARIO_CACHE_CONTROL},
+                    body='',
+                )
             
             # initialMessageフィールドがitemに含まれている場合、それをシナリオに追加
             if 'initialMessage' in item:
@@ -885,17 +1177,8 @@ def get_scenario(scenario_id: str):
             logger.info(f"シナリオ詳細取得: scenarioId={scenario_id}, createdBy={scenario.get('createdBy')}, isCustom={scenario.get('isCustom')}")
             
             # アクセス権チェック
-            visibility = scenario.get('visibility', 'public')  # デフォルトは公開
-            
-            if visibility == 'private' and scenario.get('createdBy') != user_id:
-                # 非公開シナリオは作成者のみアクセス可能
-                raise BadRequestError("このシナリオへのアクセス権がありません")
-            elif visibility == 'shared':
-                # 共有シナリオは、作成者または共有先ユーザーのみアクセス可能
-                shared_with_users = scenario.get('sharedWithUsers', [])
-                if scenario.get('createdBy') != user_id and user_id not in shared_with_users:
-                    raise BadRequestError("このシナリオへのアクセス権がありません")
-            return scenario
+            check_scenario_read_access(scenario, user_id)
+            return conditional_json_response(scenario, etag)
         else:
             logger.error("シナリオテーブル未定義", extra={"table_name": SCENARIOS_TABLE})
             raise InternalServerError("システムエラーが発生しました")
@@ -996,7 +1279,8 @@ def create_scenario():
             "guardrail": body["guardrail"],
             "initialMessage": body["initialMessage"],
             "createdAt": current_time,
-            "updatedAt": current_time
+            "updatedAt": current_time,
+            "revision": 1
         }
         
         # PDFファイル情報があれば追加（最大5件まで）
@@ -1015,7 +1299,7 @@ def create_scenario():
                 scenario_data[field] = body[field]
         
         # boolean型フィールドの追加（False値も保存する必要があるため別処理）
-        boolean_fields = ["enableAvatar", "suggestionEnabled"]
+        boolean_fields = ["enableAvatar", "suggestionEnabled", "jointScoringEnabled"]
         for field in boolean_fields:
             if field in body and isinstance(body[field], bool):
                 scenario_data[field] = body[field]
@@ -1039,6 +1323,7 @@ def create_scenario():
                     scenario_data["presentationFile"] = relocated_presentation
             
             scenarios_table.put_item(Item=scenario_data)
+            sync_scenario_shares(scenario_id, set(), get_share_members(scenario_data))
             
             # Knowledge Base ingestion jobを開始
             ingestion_result = start_knowledge_base_ingestion()
@@ -1139,9 +1424,9 @@ def update_scenario(scenario_id: str):
             current_time = datetime.utcnow().isoformat() + 'Z'
             
             # 更新用のシナリオデータを構築
-            set_expressions = ["updatedAt = :updatedAt"]
+            set_expressions = ["updatedAt = :updatedAt", REVISION_INCREMENT]
             remove_expressions = []
-            expression_attribute_values = {":updatedAt": current_time}
+            expression_attribute_values = {":updatedAt": current_time, **REVISION_VALUES}
             
             # 更新可能なフィールドを処理（フィールド名のマッピング）
             field_mappings = {
@@ -1162,6 +1447,7 @@ def update_scenario(scenario_id: str):
                 "avatarId": "avatarId",  # アバターID
                 "enableAvatar": "enableAvatar",  # アバター表示On/Off
                 "suggestionEnabled": "suggestionEnabled",  # サジェスト返答ボタンの有効/無効
+                "jointScoringEnabled": "jointScoringEnabled",  # NPC応答とスコアリングの統合モード
                 "initialSuggestions": "initialSuggestions",  # 初回サジェスト返答候補
                 "presentationFile": "presentationFile"  # 提案資料情報
             }
@@ -1214,11 +1500,14 @@ def update_scenario(scenario_id: str):
             response = scenarios_table.update_item(
                 Key={"scenarioId": scenario_id},
                 UpdateExpression=update_expression,
+                ExpressionAttributeNames=REVISION_NAMES,
                 ExpressionAttributeValues=expression_attribute_values,
                 ReturnValues="ALL_NEW"
             )
             
             updated_scenario = response.get("Attributes", {})
+            scenario_cache.invalidate(scenario_id)
+            sync_scenario_shares(scenario_id, get_share_members(existing_scenario), get_share_members(updated_scenario))
             
             # Knowledge Base ingestion jobを開始
             ingestion_result = start_knowledge_base_ingestion()
@@ -1316,6 +1605,8 @@ def delete_scenario(scenario_id: str):
             scenarios_table.delete_item(
                 Key={"scenarioId": scenario_id}
             )
+            scenario_cache.invalidate(scenario_id)
+            sync_scenario_shares(scenario_id, get_share_members(existing_scenario), set())
             
             # 削除結果のサマリーを作成
             deletion_summary = {
@@ -1408,10 +1699,11 @@ def set_scenario_sharing(scenario_id: str):
             current_time = int(time.time())
             
             # 更新式の準備
-            update_expression = "SET visibility = :visibility, updatedAt = :updatedAt"
+            update_expression = f"SET visibility = :visibility, updatedAt = :updatedAt, {REVISION_INCREMENT}"
             expression_attribute_values = {
                 ":visibility": visibility,
-                ":updatedAt": current_time
+                ":updatedAt": current_time,
+                **REVISION_VALUES
             }
             
             # 共有設定の処理
@@ -1423,17 +1715,20 @@ def set_scenario_sharing(scenario_id: str):
                 expression_attribute_values[":sharedWithUsers"] = body["sharedWithUsers"]
             else:
                 # 共有設定を解除する場合はフィールドを削除
-                update_expression = "SET visibility = :visibility, updatedAt = :updatedAt REMOVE sharedWithUsers"
+                update_expression += " REMOVE sharedWithUsers"
             
             # DynamoDBを更新
             response = scenarios_table.update_item(
                 Key={"scenarioId": scenario_id},
                 UpdateExpression=update_expression,
+                ExpressionAttributeNames=REVISION_NAMES,
                 ExpressionAttributeValues=expression_attribute_values,
                 ReturnValues="ALL_NEW"
             )
             
             updated_scenario = response.get("Attributes", {})
+            scenario_cache.invalidate(scenario_id)
+            sync_scenario_shares(scenario_id, get_share_members(existing_scenario), get_share_members(updated_scenario))
             
             # 成功レスポンス
             return {
@@ -1549,7 +1844,8 @@ def import_scenarios():
     - scenarios: インポートするシナリオのリスト
     - npcs: インポートするNPCのリスト
     
-    注意: 既存のシナリオIDと重複する場合はエラーになります
+    注意: 元のシナリオIDが既に存在するシナリオはスキップされます
+    IMPORT_SYNC_MAX_SCENARIOS を超える件数は /scenarios/import/jobs（非同期ジョブ）を使用してください
     
     Returns:
         dict: インポート結果
@@ -1557,9 +1853,9 @@ def import_scenarios():
     try:
         logger.info("シナリオインポート処理を開始")
         
-        # リクエストボディからデータを取得
+        # リクエストボディからデータを取得（DynamoDBはfloatを保存できないため小数はDecimalで読み込む）
         try:
-            body = app.current_event.json_body
+            body = json.loads(app.current_event.body or 'null', parse_float=Decimal)
         except (json.JSONDecodeError, TypeError) as e:
             logger.error(f"JSONパースエラー: {str(e)}")
             raise BadRequestError("無効なJSONリクエストです")
@@ -1573,7 +1869,7 @@ def import_scenarios():
             raise BadRequestError("認証されていないユーザーです")
         
         # 必須フィールドの検証
-        if 'scenarios' not in body or not isinstance(body['scenarios'], list):
+        if not isinstance(body, dict) or not isinstance(body.get('scenarios'), list):
             raise BadRequestError("scenariosフィールドが必要です")
         
         scenarios_to_import = body['scenarios']
@@ -1581,107 +1877,19 @@ def import_scenarios():
         
         logger.info(f"インポート対象: シナリオ数={len(scenarios_to_import)}, NPC数={len(npcs_to_import)}")
         
+        if len(scenarios_to_import) > IMPORT_SYNC_MAX_SCENARIOS:
+            raise BadRequestError(
+                f"一度にインポートできるシナリオは{IMPORT_SYNC_MAX_SCENARIOS}件までです。"
+                "それ以上はインポートジョブを使用してください"
+            )
+        
         if scenarios_table:
-            imported_scenarios = []
-            skipped_scenarios = []
-            errors = []
-            
-            current_time = datetime.utcnow().isoformat() + 'Z'
-            
-            for scenario_data in scenarios_to_import:
-                try:
-                    # 必須フィールドの検証
-                    required_fields = ['title', 'description', 'difficulty', 'category']
-                    for field in required_fields:
-                        if field not in scenario_data:
-                            raise ValueError(f"必須フィールド '{field}' が不足しています")
-                    
-                    # 新しいシナリオIDを生成（重複を避けるため）
-                    original_scenario_id = scenario_data.get('scenarioId')
-                    new_scenario_id = str(uuid.uuid4())
-                    
-                    # 既存のシナリオIDをチェック
-                    if original_scenario_id:
-                        existing_response = scenarios_table.get_item(
-                            Key={'scenarioId': original_scenario_id}
-                        )
-                        if 'Item' in existing_response:
-                            skipped_scenarios.append({
-                                'originalId': original_scenario_id,
-                                'title': scenario_data.get('title'),
-                                'reason': 'シナリオが既に存在します'
-                            })
-                            continue
-                    
-                    # インポート用のシナリオデータを構築
-                    import_scenario = {
-                        'scenarioId': new_scenario_id,
-                        'title': scenario_data['title'],
-                        'description': scenario_data['description'],
-                        'difficulty': scenario_data['difficulty'],
-                        'category': scenario_data['category'],
-                        'createdBy': user_id,  # インポートしたユーザーを作成者に設定
-                        'isCustom': True,
-                        'visibility': 'private',  # インポートしたシナリオはデフォルトで非公開
-                        'createdAt': current_time,
-                        'updatedAt': current_time
-                    }
-                    
-                    # オプションフィールドをコピー（DynamoDBの実際のデータ構造に基づく）
-                    optional_fields = [
-                        'language', 'initialMessage', 'goals', 'initialMetrics', 
-                        'objectives', 'industry', 'guardrail', 'maxTurns', 'tags',
-                        'version', 'sharedWithUsers'
-                    ]
-                    for field in optional_fields:
-                        if field in scenario_data:
-                            import_scenario[field] = scenario_data[field]
-                    
-                    # 特別な処理が必要なフィールド
-                    # visibilityの処理（元のデータがpublicでもインポート時はprivateに設定）
-                    if 'visibility' in scenario_data:
-                        # セキュリティのため、インポート時は常にprivateに設定
-                        import_scenario['visibility'] = 'private'
-                    
-                    # sharedWithUsersは空配列に設定（セキュリティのため）
-                    import_scenario['sharedWithUsers'] = []
-                    
-                    # NPC情報をコピー
-                    if 'npc' in scenario_data:
-                        import_scenario['npc'] = scenario_data['npc']
-                    elif 'npcInfo' in scenario_data:
-                        import_scenario['npc'] = scenario_data['npcInfo']
-                    
-                    # DynamoDBに保存
-                    scenarios_table.put_item(Item=import_scenario)
-                    
-                    imported_scenarios.append({
-                        'originalId': original_scenario_id,
-                        'newId': new_scenario_id,
-                        'title': scenario_data['title']
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"シナリオインポートエラー: {str(e)}")
-                    errors.append({
-                        'scenario': scenario_data.get('title', 'Unknown'),
-                        'error': str(e)
-                    })
-            
-            # インポート結果
-            result = {
-                'message': 'シナリオインポートが完了しました',
-                'imported': len(imported_scenarios),
-                'skipped': len(skipped_scenarios),
-                'errors': len(errors),
-                'details': {
-                    'importedScenarios': imported_scenarios,
-                    'skippedScenarios': skipped_scenarios,
-                    'errors': errors
-                }
-            }
+            result = import_scenarios_batch(
+                dynamodb, SCENARIOS_TABLE, scenarios_to_import, user_id,
+                datetime.utcnow().isoformat() + 'Z'
+            )
             
-            logger.info(f"インポート完了: 成功={len(imported_scenarios)}, スキップ={len(skipped_scenarios)}, エラー={len(errors)}")
+            logger.info(f"インポート完了: 成功={result['imported']}, スキップ={result['skipped']}, エラー={result['errors']}")
             
             return result
         else:
@@ -1695,6 +1903,241 @@ def import_scenarios():
         raise InternalServerError(f"シナリオインポート中にエラーが発生しました: {str(e)}")
 
 
+def import_job_key(user_id: str, job_id: str, name: str) -> str:
+    """
+    インポートジョブのS3キーを生成（jobIdはUUID形式のみ受け付ける）
+    """
+    try:
+        job_id = str(uuid.UUID(job_id))
+    except (ValueError, TypeError):
+        raise BadRequestError("無効なジョブIDです")
+    return f"{IMPORT_JOB_PREFIX}/{user_id}/{job_id}/{name}"
+
+
+def get_import_job_status(user_id: str, job_id: str) -> dict:
+    """
+    インポートジョブの状態（status.json）を取得
+    """
+    try:
+        response = s3_client.get_object(Bucket=PDF_BUCKET, Key=import_job_key(user_id, job_id, 'status.json'))
+    except s3_client.exceptions.NoSuchKey:
+        raise NotFoundError(f"インポートジョブが見つかりません: {job_id}")
+    return json.loads(response['Body'].read())
+
+
+def put_import_job_status(user_id: str, job_id: str, status: dict) -> dict:
+    """
+    インポートジョブの状態（status.json）を保存
+    """
+    status = {**status, 'updatedAt': datetime.utcnow().isoformat() + 'Z'}
+    s3_client.put_object(
+        Bucket=PDF_BUCKET,
+        Key=import_job_key(user_id, job_id, 'status.json'),
+        Body=json.dumps(convert_decimal_to_json_serializable(status), ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json'
+    )
+    return status
+
+
+def expire_import_job(user_id: str, job_id: str, status: dict) -> dict:
+    """
+    実行期限（deadline）を過ぎても QUEUED / RUNNING のままのジョブを FAILED にする
+
+    ワーカーがLambdaのタイムアウトで強制終了した場合や、非同期イベントが破棄された場合は
+    ジョブの状態が更新されないため、状態取得時に期限を確認して失敗として記録する。
+    """
+    if status.get('status') not in ('QUEUED', 'RUNNING') or not status.get('deadline'):
+        return status
+
+    deadline = datetime.fromisoformat(status['deadline'].rstrip('Z'))
+    if datetime.utcnow() < deadline + timedelta(seconds=IMPORT_JOB_DEADLINE_GRACE_SECONDS):
+        return status
+
+    logger.warning(f"インポートジョブが期限内に完了しませんでした: jobId={job_id}, status={status.get('status')}")
+    return put_import_job_status(user_id, job_id, {
+        **status,
+        'status': 'FAILED',
+        'error': 'インポートジョブが時間内に完了しませんでした。保存済みのシナリオは一覧で確認してください',
+    })
+
+
+# シナリオインポートジョブ作成API
+@app.post("/scenarios/import/jobs")
+def create_import_job():
+    """
+    件数の多いインポートファイル用の非同期インポートジョブを作成
+    
+    インポートファイル（/scenarios/import と同じ形式のJSON）をアップロードする署名付きPOST URLを発行する。
+    アップロード後に /scenarios/import/jobs/{jobId}/start でジョブを開始し、
+    /scenarios/import/jobs/{jobId} で状態をポーリングする。
+    
+    Returns:
+        dict: jobId・uploadUrl・formData・key
+    """
+    if not PDF_BUCKET:
+        raise InternalServerError("PDF保存用のS3バケットが設定されていません")
+    
+    user_id = get_user_id_from_token()
+    if not user_id:
+        raise BadRequestError("認証されていないユーザーです")
+    
+    job_id = str(uuid.uuid4())
+    source_key = import_job_key(user_id, job_id, 'source.json')
+    
+    try:
+        post_data = s3_client.generate_presigned_post(
+            Bucket=PDF_BUCKET,
+            Key=source_key,
+            Fields={
+                'Content-Type': 'application/json'
+            },
+            Conditions=[
+                ['content-length-range', 1, IMPORT_JOB_MAX_BYTES],
+                {'Content-Type': 'application/json'}
+            ],
+            ExpiresIn=300  # 5分
+        )
+        status = put_import_job_status(user_id, job_id, {
+            'jobId': job_id,
+            'status': 'WAITING_UPLOAD',
+            'createdAt': datetime.utcnow().isoformat() + 'Z'
+        })
+        
+        logger.info(f"インポートジョブ作成: jobId={job_id}, userId={user_id}")
+        
+        return {
+            "jobId": job_id,
+            "status": status['status'],
+            "uploadUrl": post_data['url'],
+            "formData": post_data['fields'],
+            "key": source_key
+        }
+    except Exception as e:
+        logger.error(f"インポートジョブ作成エラー: {str(e)}")
+        raise InternalServerError("インポートジョブの作成に失敗しました")
+
+
+# シナリオインポートジョブ開始API
+@app.post("/scenarios/import/jobs/<job_id>/start")
+def start_import_job(job_id: str):
+    """
+    アップロード済みのインポートファイルの処理をバックグラウンドで開始
+    
+    ワーカーLambda（IMPORT_JOB_FUNCTION）を非同期（InvocationType=Event）で呼び出し、
+    process_import_job で処理する。
+    """
+    if not PDF_BUCKET:
+        raise InternalServerError("PDF保存用のS3バケットが設定されていません")
+    if not IMPORT_JOB_FUNCTION:
+        raise InternalServerError("IMPORT_JOB_FUNCTION環境変数が設定されていません")
+    
+    user_id = get_user_id_from_token()
+    if not user_id:
+        raise BadRequestError("認証されていないユーザーです")
+    
+    status = get_import_job_status(user_id, job_id)
+    if status.get('status') != 'WAITING_UPLOAD':
+        raise BadRequestError(f"インポートジョブは既に開始されています: {status.get('status')}")
+    
+    try:
+        s3_client.head_object(Bucket=PDF_BUCKET, Key=import_job_key(user_id, job_id, 'source.json'))
+    except Exception:
+        raise BadRequestError("インポートファイルがアップロードされていません")
+    
+    try:
+        queued_deadline = datetime.utcnow() + timedelta(seconds=IMPORT_JOB_QUEUE_TIMEOUT_SECONDS)
+        status = put_import_job_status(user_id, job_id, {
+            **status, 'status': 'QUEUED', 'deadline': queued_deadline.isoformat() + 'Z'
+        })
+        lambda_invoke_client.invoke(
+            FunctionName=IMPORT_JOB_FUNCTION,
+            InvocationType='Event',  # 非同期呼び出し
+            Payload=json.dumps({'scenarioImportJob': {'userId': user_id, 'jobId': job_id}}),
+        )
+        logger.info(f"インポートジョブ開始: jobId={job_id}, userId={user_id}")
+        return status
+    except Exception as e:
+        logger.error(f"インポートジョブ開始エラー: {str(e)}")
+        put_import_job_status(user_id, job_id, {**status, 'status': 'FAILED', 'error': 'ジョブの開始に失敗しました'})
+        raise InternalServerError("インポートジョブの開始に失敗しました")
+
+
+# シナリオインポートジョブ状態取得API
+@app.get("/scenarios/import/jobs/<job_id>")
+def get_import_job(job_id: str):
+    """
+    インポートジョブの状態を取得
+    
+    status: WAITING_UPLOAD / QUEUED / RUNNING / COMPLETED / FAILED
+    RUNNING中は processed / total（保存済み件数 / 保存対象件数）、COMPLETED後は result を返す。
+    deadline を過ぎても完了していないジョブは FAILED として返す。
+    """
+    if not PDF_BUCKET:
+        raise InternalServerError("PDF保存用のS3バケットが設定されていません")
+    
+    user_id = get_user_id_from_token()
+    if not user_id:
+        raise BadRequestError("認証されていないユーザーです")
+    
+    return expire_import_job(user_id, job_id, get_import_job_status(user_id, job_id))
+
+
+def process_import_job(user_id: str, job_id: str, context: LambdaContext) -> None:
+    """
+    インポートジョブをバックグラウンドで処理（start_import_job からワーカーLambdaへの非同期呼び出し）
+    
+    新しいscenarioIdは jobId とファイル内の位置から決まるため、再実行しても重複して作成されない。
+    ワーカーの残り実行時間を deadline として記録し、残り時間が少なくなったら処理を打ち切る。
+    """
+    status = expire_import_job(user_id, job_id, get_import_job_status(user_id, job_id))
+    if status.get('status') != 'QUEUED':
+        logger.warning(f"インポートジョブは処理待ちではありません: jobId={job_id}, status={status.get('status')}")
+        return
+    
+    deadline = datetime.utcnow() + timedelta(milliseconds=context.get_remaining_time_in_millis())
+    status = put_import_job_status(user_id, job_id, {
+        **status, 'status': 'RUNNING', 'processed': 0, 'deadline': deadline.isoformat() + 'Z'
+    })
+    source_key = import_job_key(user_id, job_id, 'source.json')
+    
+    try:
+        response = s3_client.get_object(Bucket=PDF_BUCKET, Key=source_key)
+        try:
+            body = json.loads(response['Body'].read(), parse_float=Decimal)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ValueError("インポートファイルが有効なJSONではありません")
+        if not isinstance(body, dict) or not isinstance(body.get('scenarios'), list):
+            raise ValueError("scenariosフィールドが必要です")
+        
+        last_progress_at = time.monotonic()
+        
+        def on_progress(processed: int, total: int) -> None:
+            nonlocal status, last_progress_at
+            if context.get_remaining_time_in_millis() < IMPORT_JOB_STOP_MARGIN_MS:
+                raise TimeoutError(
+                    f"処理時間の上限に達したため中断しました（{processed} / {total}件保存済み）"
+                )
+            if time.monotonic() - last_progress_at < IMPORT_JOB_PROGRESS_INTERVAL:
+                return
+            last_progress_at = time.monotonic()
+            status = put_import_job_status(user_id, job_id, {**status, 'processed': processed, 'total': total})
+        
+        result = import_scenarios_batch(
+            dynamodb, SCENARIOS_TABLE, body['scenarios'], user_id,
+            datetime.utcnow().isoformat() + 'Z',
+            id_factory=lambda index: str(uuid.uuid5(uuid.NAMESPACE_URL, f"{job_id}/{index}")),
+            on_progress=on_progress
+        )
+        put_import_job_status(user_id, job_id, {**status, 'status': 'COMPLETED', 'result': result})
+        logger.info(f"インポートジョブ完了: jobId={job_id}, 成功={result['imported']}, スキップ={result['skipped']}, エラー={result['errors']}")
+    except Exception as e:
+        logger.exception(f"インポートジョブエラー: jobId={job_id}")
+        message = str(e) if isinstance(e, (ValueError, TimeoutError)) else "インポート処理中にエラーが発生しました"
+        put_import_job_status(user_id, job_id, {**status, 'status': 'FAILED', 'error': message})
+    finally:
+        s3_client.delete_object(Bucket=PDF_BUCKET, Key=source_key)
+
+
 @app.post("/scenarios/<scenario_id>/pdf-upload-url")
 def generate_pdf_upload_url(scenario_id: str):
     """
@@ -1955,8 +2398,11 @@ def delete_presentation(scenario_id: str):
         if scenarios_table:
             scenarios_table.update_item(
                 Key={'scenarioId': scenario_id},
-                UpdateExpression='REMOVE presentationFile',
+                UpdateExpression=f'SET {REVISION_INCREMENT} REMOVE presentationFile',
+                ExpressionAttributeNames=REVISION_NAMES,
+                ExpressionAttributeValues=REVISION_VALUES,
             )
+            scenario_cache.invalidate(scenario_id)
 
         return {"success": True, "message": "提案資料を削除しました"}
     except Exception as e:
@@ -2076,17 +2522,20 @@ def trigger_slide_conversion(scenario_id: str):
             try:
                 scenarios_table.update_item(
                     Key={'scenarioId': scenario_id},
-                    UpdateExpression='SET presentationFile = :pf',
+                    UpdateExpression=f'SET presentationFile = :pf, {REVISION_INCREMENT}',
                     ConditionExpression='attribute_exists(scenarioId) AND attribute_exists(title)',
+                    ExpressionAttributeNames=REVISION_NAMES,
                     ExpressionAttributeValues={
                         ':pf': {
                             'key': pdf_key,
                             'fileName': body.get('fileName', 'presentation.pdf'),
                             'contentType': 'application/pdf',
                             'status': 'uploading',
-                        }
+                        },
+                        **REVISION_VALUES
                     },
                 )
+                scenario_cache.invalidate(scenario_id)
             except Exception as update_err:
                 # シナリオ未作成の場合はスキップ（ゴーストレコード防止）
                 logger.info(f"シナリオ {scenario_id} のpresentationFile更新をスキップ（未作成の可能性）: {update_err}")
@@ -2149,3 +2598,20 @@ def lambda_handler(event: dict, context: LambdaContext) -> dict:
             "statusCode": 500,
             "body": json.dumps({"message": "内部サーバーエラーが発生しました"})
         }
+
+
+@logger.inject_lambda_context
+def import_job_handler(event: dict, context: LambdaContext) -> dict:
+    """
+    インポートジョブ用ワーカーLambda関数のエントリーポイント
+    
+    start_import_job から {'scenarioImportJob': {'userId', 'jobId'}} で非同期に呼び出される。
+    API用の関数とはタイムアウトを分けるため、同じコードを別のLambda関数としてデプロイする。
+    """
+    if scenarios_table is None:
+        logger.warning("DynamoDBテーブルが初期化されていません。再初期化を試みます")
+        init_tables()
+    
+    job = event['scenarioImportJob']
+    process_import_job(job['userId'], job['jobId'], context)
+    return {"statusCode": 200}
@@ -0,0 +1,91 @@
+"""
+シナリオ取得APIのETagと公開シナリオのLRUキャッシュ
+
+シナリオアイテムは更新のたびに revision（数値）を1ずつ増やす。
+ETagは scenarioId・revision・updatedAt から生成し、If-None-Match が一致すれば304を返す。
+一覧のETagは返却するシナリオの (scenarioId, revision, updatedAt) と nextToken から生成する。
+
+公開シナリオ（アクセス判定がユーザーに依存しない）の詳細はコンテナ内のLRUに保持し、
+TTL内はテーブルを読まずに返す（射影読み込みでもアイテム全体のサイズで課金されるため）。
+同じコンテナでの更新・削除は invalidate で即座に反映する。他のコンテナや slideConvert Lambda
+による更新・非公開化・削除は最大TTL（SCENARIO_CACHE_TTL_SECONDS、既定30秒）遅れて反映される。
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def scenario_etag(item: Dict[str, Any]) -> str:
+    """シナリオ詳細のETagを生成"""
+    version = f"{item.get('scenarioId')}:{item.get('revision', 0)}:{item.get('updatedAt', '')}"
+    return f'"{hashlib.sha256(version.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def list_etag(items: List[Dict[str, Any]], next_token: Optional[str]) -> str:
+    """シナリオ一覧のETagを生成"""
+    versions = [[item.get('scenarioId'), str(item.get('revision', 0)), str(item.get('updatedAt', ''))] for item in items]
+    digest = hashlib.sha256(json.dumps([versions, next_token], separators=(',', ':')).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match ヘッダーがETagに一致するか（弱いETag・複数指定・* に対応）"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or any(value.removeprefix('W/') == etag for value in candidates)
+
+
+class ScenarioCache:
+    """公開シナリオ詳細のLRU（TTL付き）
+
+    Args:
+        max_entries: 保持する最大シナリオ数
+        ttl_seconds: エントリを保持する秒数（他コンテナでの更新が反映されるまでの最大遅延）
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # scenarioId -> (item, expires_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, scenario_id: str) -> Optional[Dict[str, Any]]:
+        """キャッシュ済みのシナリオアイテムのコピーを取得（未キャッシュ・期限切れはNone）"""
+        with self._lock:
+            entry = self._entries.get(scenario_id)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(scenario_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(scenario_id)
+            self.hits += 1
+            return copy.deepcopy(entry[0])
+
+    def put(self, item: Dict[str, Any]) -> None:
+        """公開シナリオのみキャッシュする"""
+        if item.get('visibility', 'public') != 'public':
+            return
+        with self._lock:
+            self._entries[item['scenarioId']] = (copy.deepcopy(item), time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(item['scenarioId'])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, scenario_id: str) -> None:
+        """更新・削除したシナリオをキャッシュから除く"""
+        with self._lock:
+            self._entries.pop(scenario_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミス件数を取得"""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,82 @@
+"""
+シナリオ一覧（カード表示）用の属性とレスポンス変換
+
+一覧APIはシナリオ本体のうち pdfFiles・presentationFile（slides配列）・guardrail などを読まず、
+カード表示に必要な属性だけを ProjectionExpression で取得する。
+VisibilityIndex / OwnerIndex もこの属性だけを射影する（INCLUDE）ため、
+インデックス経由の一覧取得ではRCUも射影後のサイズで課金される。
+
+属性を追加する場合は lib/constructs/storage/database-tables.ts の
+SCENARIO_CARD_ATTRIBUTES も合わせて更新すること。
+"""
+
+# カード表示と一覧のETag（revision）に必要な属性
+SCENARIO_CARD_ATTRIBUTES = (
+    'scenarioId', 'title', 'description', 'difficulty', 'category',
+    'initialMessage', 'language', 'npc', 'goals', 'objectives', 'initialMetrics', 'industry',
+    'createdBy', 'isCustom', 'visibility', 'createdAt', 'updatedAt', 'revision',
+)
+
+
+def card_projection(extra_attributes: tuple = ()) -> dict:
+    """
+    カード属性を取得する ProjectionExpression / ExpressionAttributeNames を生成
+
+    予約語（language, description 等）を避けるため、すべての属性をプレースホルダーで指定する。
+
+    Args:
+        extra_attributes: カード属性に加えて取得する属性（アクセス判定用など）
+    """
+    names = {f'#card{i}': name for i, name in enumerate(SCENARIO_CARD_ATTRIBUTES + tuple(extra_attributes))}
+    return {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+
+
+def build_scenario_card(item: dict) -> dict:
+    """
+    シナリオアイテムを一覧レスポンス用のカードに変換
+    """
+    scenario = {
+        'scenarioId': item.get('scenarioId'),
+        'title': item.get('title'),
+        'description': item.get('description'),
+        'difficulty': item.get('difficulty'),
+        'category': item.get('category')
+    }
+
+    # 初期メッセージを追加
+    if 'initialMessage' in item:
+        scenario['initialMessage'] = item.get('initialMessage')
+
+    # 言語設定を追加
+    if 'language' in item:
+        scenario['language'] = item.get('language')
+
+    # NPC情報を完全に追加
+    if 'npc' in item:
+        scenario['npcInfo'] = {
+            'id': item['npc'].get('id'),
+            'name': item['npc'].get('name'),
+            'role': item['npc'].get('role'),
+            'company': item['npc'].get('company'),
+            'personality': item['npc'].get('personality', []),
+            'avatar': item['npc'].get('avatar'),
+            'description': item['npc'].get('description')
+        }
+
+    # goals・objectives・initialMetrics・業界情報を追加
+    for field in ('goals', 'objectives', 'initialMetrics', 'industry'):
+        if field in item:
+            scenario[field] = item[field]
+
+    # オーナー情報・カスタムシナリオフラグ・公開設定を追加（フロントエンドでのオーナー判定用）
+    for field in ('createdBy', 'isCustom', 'visibility'):
+        if field in item:
+            scenario[field] = item.get(field)
+
+    # 作成日時・更新日時を追加
+    if 'createdAt' in item:
+        scenario['createdAt'] = item.get('createdAt')
+    if 'updatedAt' in item:
+        scenario['updatedAt'] = item.get('updatedAt')
+
+    return scenario
@@ -0,0 +1,232 @@
+"""
+シナリオの一括インポート
+
+インポートファイルのシナリオを次の3段階で保存する。
+  1. 全シナリオを先に検証し、保存用アイテムを組み立てる（不正なシナリオはエラーとして記録）
+  2. 元のscenarioIdが既に存在するかを BatchGetItem（100件単位）でまとめて確認する
+  3. 新規シナリオを BatchWriteItem（25件単位）で保存し、UnprocessedItems は指数バックオフで再送する
+
+BatchWriteItem はバッチ内に1件でも不正なアイテム（サイズ超過など）があるとバッチ全体が
+ValidationException になるため、その場合はバッチ内のアイテムを1件ずつ put_item して原因を特定する。
+
+件数の多いファイルは非同期ジョブ（index.py の /scenarios/import/jobs）で処理する。
+ジョブの入力と状態は PDF_BUCKET の imports/{userId}/{jobId}/ に保存する。
+"""
+
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+# BatchGetItem / BatchWriteItem の1リクエストあたりの上限
+BATCH_GET_MAX_KEYS = 100
+BATCH_WRITE_MAX_ITEMS = 25
+
+REQUIRED_FIELDS = ('title', 'description', 'difficulty', 'category')
+
+# 元データからそのままコピーするフィールド（DynamoDBの実際のデータ構造に基づく）
+OPTIONAL_FIELDS = (
+    'language', 'initialMessage', 'goals', 'initialMetrics',
+    'objectives', 'industry', 'guardrail', 'maxTurns', 'tags', 'version',
+)
+
+
+def build_import_item(scenario_data: Any, user_id: str, scenario_id: str, current_time: str) -> Dict[str, Any]:
+    """
+    インポートするシナリオを検証し、保存用アイテムを組み立てる
+
+    Raises:
+        ValueError: 必須フィールドが不足している場合
+    """
+    if not isinstance(scenario_data, dict):
+        raise ValueError("シナリオはオブジェクトである必要があります")
+    for field in REQUIRED_FIELDS:
+        if field not in scenario_data:
+            raise ValueError(f"必須フィールド '{field}' が不足しています")
+
+    item = {
+        'scenarioId': scenario_id,
+        'title': scenario_data['title'],
+        'description': scenario_data['description'],
+        'difficulty': scenario_data['difficulty'],
+        'category': scenario_data['category'],
+        'createdBy': user_id,  # インポートしたユーザーを作成者に設定
+        'isCustom': True,
+        # セキュリティのため、元のデータがpublicでもインポート時は常にprivateに設定し、共有も引き継がない
+        'visibility': 'private',
+        'sharedWithUsers': [],
+        'createdAt': current_time,
+        'updatedAt': current_time,
+        'revision': 1
+    }
+    for field in OPTIONAL_FIELDS:
+        if field in scenario_data:
+            item[field] = scenario_data[field]
+
+    # NPC情報をコピー
+    if 'npc' in scenario_data:
+        item['npc'] = scenario_data['npc']
+    elif 'npcInfo' in scenario_data:
+        item['npc'] = scenario_data['npcInfo']
+
+    return item
+
+
+def find_existing_ids(dynamodb, table_name: str, scenario_ids: List[str],
+                      max_attempts: int = 5, retry_base_delay: float = 0.1) -> set:
+    """
+    BatchGetItem で既に存在するscenarioIdを取得
+
+    Args:
+        dynamodb: boto3 DynamoDB ServiceResource
+        table_name: シナリオテーブル名
+        scenario_ids: 確認するscenarioId（重複可）
+        max_attempts: UnprocessedKeys の最大試行回数
+        retry_base_delay: 再試行の初回待機秒数（指数バックオフ）
+
+    Raises:
+        RuntimeError: 再試行しても確認できないキーが残った場合
+    """
+    unique_ids = list(dict.fromkeys(scenario_ids))
+    existing = set()
+
+    for start in range(0, len(unique_ids), BATCH_GET_MAX_KEYS):
+        request = {
+            table_name: {
+                'Keys': [{'scenarioId': sid} for sid in unique_ids[start:start + BATCH_GET_MAX_KEYS]],
+                'ProjectionExpression': 'scenarioId',
+            }
+        }
+        for attempt in range(max_attempts):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            existing.update(item['scenarioId'] for item in response.get('Responses', {}).get(table_name, []))
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            time.sleep(retry_base_delay * (2 ** attempt))
+        else:
+            raise RuntimeError("既存シナリオの確認中に未処理のキーが残りました")
+
+    return existing
+
+
+def batch_put_items(dynamodb, table_name: str, items: List[Dict[str, Any]],
+                    max_attempts: int = 5, retry_base_delay: float = 0.1,
+                    on_progress: Optional[Callable[[int], None]] = None) -> List[Dict[str, Any]]:
+    """
+    BatchWriteItem でアイテムを25件ずつ保存
+
+    Args:
+        dynamodb: boto3 DynamoDB ServiceResource
+        table_name: シナリオテーブル名
+        items: 保存するアイテム
+        max_attempts: UnprocessedItems の最大試行回数
+        retry_base_delay: 再試行の初回待機秒数（指数バックオフ）
+        on_progress: バッチごとに処理済み件数を渡して呼び出す関数
+
+    Returns:
+        List[dict]: 保存できなかったアイテムとエラー（{'item': ..., 'error': ...}）
+    """
+    failed = []
+    processed = 0
+
+    for start in range(0, len(items), BATCH_WRITE_MAX_ITEMS):
+        chunk = items[start:start + BATCH_WRITE_MAX_ITEMS]
+        try:
+            unprocessed = _write_chunk(dynamodb, table_name, chunk, max_attempts, retry_base_delay)
+            failed.extend({'item': item, 'error': "書き込みが再試行の上限に達しました"} for item in unprocessed)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ValidationException':
+                raise
+            # バッチ内の不正なアイテムを特定するため1件ずつ保存する
+            table = dynamodb.Table(table_name)
+            for item in chunk:
+                try:
+                    table.put_item(Item=item)
+                except ClientError as item_error:
+                    failed.append({'item': item, 'error': str(item_error)})
+
+        processed += len(chunk)
+        if on_progress:
+            on_progress(processed)
+
+    return failed
+
+
+def _write_chunk(dynamodb, table_name: str, chunk: List[Dict[str, Any]],
+                 max_attempts: int, retry_base_delay: float) -> List[Dict[str, Any]]:
+    """25件以下のアイテムを保存し、再試行しても未処理のまま残ったアイテムを返す"""
+    request = {table_name: [{'PutRequest': {'Item': item}} for item in chunk]}
+    for attempt in range(max_attempts):
+        response = dynamodb.batch_write_item(RequestItems=request)
+        request = response.get('UnprocessedItems') or {}
+        if not request:
+            return []
+        if attempt + 1 < max_attempts:
+            time.sleep(retry_base_delay * (2 ** attempt))
+    return [entry['PutRequest']['Item'] for entry in request.get(table_name, [])]
+
+
+def import_scenarios_batch(dynamodb, table_name: str, scenarios: List[Any], user_id: str, current_time: str,
+                           id_factory: Callable[[int], str] = lambda index: str(uuid.uuid4()),
+                           on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    シナリオのリストを一括インポート
+
+    Args:
+        dynamodb: boto3 DynamoDB ServiceResource
+        table_name: シナリオテーブル名
+        scenarios: インポートファイルの scenarios
+        user_id: インポートしたユーザーID（作成者）
+        current_time: createdAt / updatedAt に設定する日時
+        id_factory: ファイル内の位置から新しいscenarioIdを生成する関数
+        on_progress: (保存済み件数, 保存対象件数) を渡して呼び出す関数
+
+    Returns:
+        dict: インポート結果（件数と details）
+    """
+    errors = []
+    candidates = []
+
+    # 1. 全シナリオを先に検証
+    for index, scenario_data in enumerate(scenarios):
+        try:
+            item = build_import_item(scenario_data, user_id, id_factory(index), current_time)
+        except ValueError as e:
+            title = scenario_data.get('title', 'Unknown') if isinstance(scenario_data, dict) else 'Unknown'
+            errors.append({'scenario': title, 'error': str(e)})
+            continue
+        original_id = scenario_data.get('scenarioId')
+        candidates.append((original_id if isinstance(original_id, str) else None, item))
+
+    # 2. 元のscenarioIdが既に存在するシナリオはスキップ
+    existing_ids = find_existing_ids(dynamodb, table_name, [oid for oid, _ in candidates if oid])
+    skipped_scenarios = [
+        {'originalId': oid, 'title': item['title'], 'reason': 'シナリオが既に存在します'}
+        for oid, item in candidates if oid in existing_ids
+    ]
+    to_write = [(oid, item) for oid, item in candidates if oid not in existing_ids]
+
+    # 3. 25件ずつ保存
+    progress = (lambda written: on_progress(written, len(to_write))) if on_progress else None
+    failed = batch_put_items(dynamodb, table_name, [item for _, item in to_write], on_progress=progress)
+    failed_ids = {entry['item']['scenarioId'] for entry in failed}
+    errors.extend({'scenario': entry['item']['title'], 'error': entry['error']} for entry in failed)
+
+    imported_scenarios = [
+        {'originalId': oid, 'newId': item['scenarioId'], 'title': item['title']}
+        for oid, item in to_write if item['scenarioId'] not in failed_ids
+    ]
+
+    return {
+        'message': 'シナリオインポートが完了しました',
+        'imported': len(imported_scenarios),
+        'skipped': len(skipped_scenarios),
+        'errors': len(errors),
+        'details': {
+            'importedScenarios': imported_scenarios,
+            'skippedScenarios': skipped_scenarios,
+            'errors': errors
+        }
+    }
@@ -0,0 +1,32 @@
+"""
+シナリオ管理Lambda（cdk/lambda/scenarios）のテスト設定
+
+index.py は他のLambdaと同名のため、一意なモジュール名で読み込む。
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCENARIOS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 共通レイヤー（デプロイ時は /opt/python に展開される）
+COMMON_DIR = os.path.join(os.path.dirname(SCENARIOS_DIR), 'common')
+
+for path in (SCENARIOS_DIR, COMMON_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope='session')
+def scenarios_index():
+    """テーブル名だけを設定して scenarios/index.py を読み込む（AWSへの接続は各テストでスタブする）"""
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('SCENARIOS_TABLE', 'test-Scenarios')
+    os.environ.setdefault('SCENARIO_SHARES_TABLE', 'test-ScenarioShares')
+
+    spec = importlib.util.spec_from_file_location('scenarios_index', os.path.join(SCENARIOS_DIR, 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
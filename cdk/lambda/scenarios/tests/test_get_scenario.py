@@ -0,0 +1,156 @@
+"""
+シナリオ詳細取得API（GET /scenarios/{scenarioId}）のテスト
+
+- キャッシュ済みの公開シナリオはTTL内ならテーブルを読まずに返す
+- 他のコンテナでの更新はTTL経過後に、同じコンテナでの更新は無効化で即座に反映する
+- If-None-Match が一致すれば304を返し、キャッシュがなくてもテーブルの読み込みは1回だけ
+"""
+import json
+import time
+
+import pytest
+
+import scenario_cache
+
+PUBLIC_ITEM = {
+    'scenarioId': 's1', 'revision': 1, 'updatedAt': '2026-01-01T00:00:00',
+    'visibility': 'public', 'createdBy': 'owner', 'title': '初版',
+}
+
+
+class FakeScenariosTable:
+    def __init__(self, item):
+        self.item = item
+        self.calls = 0
+
+    def get_item(self, **kwargs):
+        self.calls += 1
+        if self.item is None:
+            return {}
+        return {'Item': dict(self.item)}
+
+
+@pytest.fixture
+def api(scenarios_index, monkeypatch):
+    table = FakeScenariosTable(dict(PUBLIC_ITEM))
+    monkeypatch.setattr(scenarios_index, 'scenarios_table', table)
+    monkeypatch.setattr(scenarios_index, 'scenario_cache', scenarios_index.ScenarioCache())
+
+    def get(user_id='user-1', if_none_match=None):
+        headers = {'x-user-id': user_id}
+        if if_none_match:
+            headers['If-None-Match'] = if_none_match
+        event = {
+            'httpMethod': 'GET',
+            'path': '/scenarios/s1',
+            'resource': '/scenarios/{scenarioId}',
+            'pathParameters': {'scenarioId': 's1'},
+            'headers': headers,
+            'requestContext': {},
+        }
+        response = scenarios_index.app.resolve(event, {})
+        headers = {name: values[0] for name, values in (response.get('multiValueHeaders') or {}).items()}
+        return response['statusCode'], headers, response['body']
+
+    return table, get
+
+
+class TestCache:
+    def test_初回は本体を読みキャッシュする(self, api):
+        table, get = api
+
+        status, headers, body = get()
+
+        assert status == 200
+        assert json.loads(body)['title'] == '初版'
+        assert table.calls == 1
+        assert headers['ETag']
+
+    def test_キャッシュヒットではテーブルを読まない(self, api):
+        table, get = api
+        get()
+
+        status, _, body = get()
+
+        assert status == 200
+        assert json.loads(body)['title'] == '初版'
+        assert table.calls == 1
+
+    def test_他で更新された場合はTTL経過後に読み直す(self, api, monkeypatch):
+        table, get = api
+        get()
+        table.item = {**PUBLIC_ITEM, 'revision': 2, 'title': '第2版'}
+        assert json.loads(get()[2])['title'] == '初版'
+
+        now = time.monotonic()
+        monkeypatch.setattr(scenario_cache.time, 'monotonic', lambda: now + 31)
+        status, _, body = get()
+
+        assert status == 200
+        assert json.loads(body)['title'] == '第2版'
+        assert table.calls == 2
+
+    def test_非公開にされたシナリオはキャッシュ失効後に作成者以外に返さない(self, api, scenarios_index):
+        table, get = api
+        get()
+        table.item = {**PUBLIC_ITEM, 'revision': 2, 'visibility': 'private'}
+        scenarios_index.scenario_cache.invalidate('s1')
+
+        status, _, _ = get(user_id='user-1')
+
+        assert status == 400
+
+    def test_削除された場合は404(self, api, scenarios_index):
+        table, get = api
+        get()
+        table.item = None
+        scenarios_index.scenario_cache.invalidate('s1')
+
+        status, _, _ = get()
+
+        assert status == 404
+
+
+class TestConditionalRequest:
+    def test_キャッシュヒットでETagが一致すればテーブルを読まずに304(self, api):
+        table, get = api
+        etag = get()[1]['ETag']
+
+        status, headers, body = get(if_none_match=etag)
+
+        assert status == 304
+        assert headers['ETag'] == etag
+        assert not body
+        assert table.calls == 1
+
+    def test_キャッシュがなければ1回だけ読んで304(self, api, scenarios_index):
+        table, get = api
+        etag = get()[1]['ETag']
+        scenarios_index.scenario_cache.invalidate('s1')
+
+        status, _, _ = get(if_none_match=etag)
+
+        assert status == 304
+        assert table.calls == 2
+
+    def test_ETagが古ければ200で最新を返す(self, api, scenarios_index):
+        table, get = api
+        etag = get()[1]['ETag']
+        table.item = {**PUBLIC_ITEM, 'revision': 2, 'title': '第2版'}
+        scenarios_index.scenario_cache.invalidate('s1')
+
+        status, headers, body = get(if_none_match=etag)
+
+        assert status == 200
+        assert headers['ETag'] != etag
+        assert json.loads(body)['title'] == '第2版'
+        assert table.calls == 2
+
+    def test_アクセス権がなければETagが一致しても304を返さない(self, api):
+        table, get = api
+        table.item = {**PUBLIC_ITEM, 'visibility': 'private'}
+        etag = get(user_id='owner')[1]['ETag']
+
+        status, _, _ = get(user_id='user-1', if_none_match=etag)
+
+        assert status == 400
@@ -0,0 +1,147 @@
+"""
+インデックス経由のシナリオ一覧取得（list_scenarios_from_indexes）のテスト
+
+- 公開・所有者・共有の取得元をscenarioId順にマージし、重複を1件にする
+- nextToken の scenarioId より後から各取得元を読み直す
+- OwnerIndex とバックフィル完了マーカーが揃うまではスキャンで一覧を取得する
+- 共有メンバーシップの同期に失敗してもシナリオの保存は失敗させない
+"""
+import pytest
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+
+import pagination
+
+
+PUBLIC = [{'scenarioId': 'a'}, {'scenarioId': 'c'}, {'scenarioId': 'e'}]
+OWNER = [{'scenarioId': 'b'}, {'scenarioId': 'c'}, {'scenarioId': 'f'}]
+SHARED = [{'scenarioId': 'd'}, {'scenarioId': 'e'}]
+
+
+@pytest.fixture
+def index(scenarios_index, monkeypatch):
+    """取得元のクエリをスタブし、呼び出し時の after を記録する"""
+    calls = []
+
+    def stub_query_index(index_name, key_name, key_value, after=None, filter_condition=None, page_size=20):
+        calls.append((index_name, key_value, after))
+        source = PUBLIC if index_name == scenarios_index.VISIBILITY_INDEX else OWNER
+        return iter([item for item in source if after is None or item['scenarioId'] > after])
+
+    def stub_query_shared(user_id, after=None, difficulty=None, page_size=20):
+        calls.append(('shares', user_id, after))
+        return iter([item for item in SHARED if after is None or item['scenarioId'] > after])
+
+    monkeypatch.setattr(scenarios_index, 'query_index_in_order', stub_query_index)
+    monkeypatch.setattr(scenarios_index, 'query_shared_scenarios_in_order', stub_query_shared)
+    monkeypatch.setattr(pagination, '_pagination_key', b'test-key')
+    scenarios_index.calls = calls
+    return scenarios_index
+
+
+def ids(items):
+    return [item['scenarioId'] for item in items]
+
+
+class TestMerge:
+    def test_取得元をscenarioId順にマージして重複を除く(self, index):
+        items, token = index.list_scenarios_from_indexes('user-1', None, None, 10)
+
+        assert ids(items) == ['a', 'b', 'c', 'd', 'e', 'f']
+        assert token is None
+        assert [call[0] for call in index.calls] == [index.VISIBILITY_INDEX, index.OWNER_INDEX, 'shares']
+
+    def test_未認証の場合は公開シナリオのみ(self, index):
+        items, _ = index.list_scenarios_from_indexes(None, None, None, 10)
+
+        assert ids(items) == ['a', 'c', 'e']
+        assert [call[0] for call in index.calls] == [index.VISIBILITY_INDEX]
+
+    def test_visibility_sharedは所有者と共有の取得元を読む(self, index):
+        items, _ = index.list_scenarios_from_indexes('user-1', 'shared', None, 10)
+
+        assert ids(items) == ['b', 'c', 'd', 'e', 'f']
+        assert [call[0] for call in index.calls] == [index.OWNER_INDEX, 'shares']
+
+
+class TestNextToken:
+    def test_nextTokenの続きから全件を重複なく取得できる(self, index):
+        first, token = index.list_scenarios_from_indexes('user-1', None, None, 3)
+        assert ids(first) == ['a', 'b', 'c']
+        assert token is not None
+
+        index.calls.clear()
+        second, token = index.list_scenarios_from_indexes('user-1', None, None, 3, token)
+        assert ids(second) == ['d', 'e', 'f']
+        assert token is None
+        assert all(call[2] == 'c' for call in index.calls)
+
+    def test_件数ちょうどで終わる場合は次ページトークンを返さない(self, index):
+        items, token = index.list_scenarios_from_indexes('user-1', None, None, 6)
+
+        assert len(items) == 6
+        assert token is None
+
+    def test_別条件で発行されたトークンは拒否する(self, index):
+        _, token = index.list_scenarios_from_indexes('user-1', None, None, 3)
+
+        with pytest.raises(BadRequestError):
+            index.list_scenarios_from_indexes('user-2', None, None, 3, token)
+
+
+class FakeSharesTable:
+    def __init__(self, marker=False, fail_writes=False):
+        self.marker = marker
+        self.fail_writes = fail_writes
+        self.get_calls = 0
+
+    def get_item(self, Key):
+        self.get_calls += 1
+        return {'Item': dict(Key)} if self.marker else {}
+
+    def batch_writer(self):
+        if self.fail_writes:
+            raise RuntimeError('throttled')
+        raise AssertionError('not expected')
+
+
+class TestListIndexesReady:
+    @pytest.fixture(autouse=True)
+    def reset_state(self, scenarios_index, monkeypatch):
+        monkeypatch.setattr(scenarios_index, '_shares_backfill_complete', False)
+        monkeypatch.setattr(scenarios_index, '_shares_backfill_checked_at', None)
+        monkeypatch.setattr(scenarios_index, 'SCENARIO_OWNER_INDEX_ENABLED', True)
+
+    def test_OwnerIndexが無効ならスキャンを使う(self, scenarios_index, monkeypatch):
+        monkeypatch.setattr(scenarios_index, 'SCENARIO_OWNER_INDEX_ENABLED', False)
+        table = FakeSharesTable(marker=True)
+        monkeypatch.setattr(scenarios_index, 'scenario_shares_table', table)
+
+        assert scenarios_index.list_indexes_ready() is False
+        assert table.get_calls == 0
+
+    def test_バックフィル完了マーカーがあればインデックスを使う(self, scenarios_index, monkeypatch):
+        table = FakeSharesTable(marker=True)
+        monkeypatch.setattr(scenarios_index, 'scenario_shares_table', table)
+
+        assert scenarios_index.list_indexes_ready() is True
+        assert scenarios_index.list_indexes_ready() is True
+        assert table.get_calls == 1
+
+    def test_マーカーがない間は再確認間隔ごとにだけ確認する(self, scenarios_index, monkeypatch):
+        table = FakeSharesTable(marker=False)
+        monkeypatch.setattr(scenarios_index, 'scenario_shares_table', table)
+
+        assert scenarios_index.list_indexes_ready() is False
+        table.marker = True
+        assert scenarios_index.list_indexes_ready() is False
+        assert table.get_calls == 1
+
+        monkeypatch.setattr(scenarios_index, 'SHARES_BACKFILL_RECHECK_SECONDS', 0)
+        assert scenarios_index.list_indexes_ready() is True
+
+
+class TestSyncScenarioShares:
+    def test_同期に失敗しても例外を送出しない(self, scenarios_index, monkeypatch):
+        monkeypatch.setattr(scenarios_index, 'scenario_shares_table', FakeSharesTable(fail_writes=True))
+
+        scenarios_index.sync_scenario_shares('s1', set(), {'user-2'})
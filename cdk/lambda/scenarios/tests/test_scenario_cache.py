@@ -0,0 +1,63 @@
+"""
+シナリオのETagとキャッシュ（scenario_cache.py）のテスト
+
+- If-None-Match は弱いETag・複数指定・* に対応する
+- revision / updatedAt が変わるとETagが変わる
+- キャッシュは公開シナリオのみ保持し、TTLを過ぎたエントリや無効化したエントリは返さない
+"""
+from scenario_cache import ScenarioCache, etag_matches, list_etag, scenario_etag
+
+ITEM = {'scenarioId': 's1', 'revision': 3, 'updatedAt': '2026-01-01T00:00:00', 'visibility': 'public', 'title': 't'}
+
+
+class TestEtagMatches:
+    def test_完全一致(self):
+        etag = scenario_etag(ITEM)
+        assert etag_matches(etag, etag)
+
+    def test_弱いETagと複数指定(self):
+        etag = scenario_etag(ITEM)
+        assert etag_matches(f'"other", W/{etag}', etag)
+
+    def test_アスタリスクは常に一致(self):
+        assert etag_matches('*', scenario_etag(ITEM))
+
+    def test_ヘッダーなし_不一致(self):
+        etag = scenario_etag(ITEM)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('', etag)
+        assert not etag_matches('"other"', etag)
+
+
+class TestEtag:
+    def test_revisionかupdatedAtが変わるとETagが変わる(self):
+        etag = scenario_etag(ITEM)
+        assert scenario_etag({**ITEM, 'revision': 4}) != etag
+        assert scenario_etag({**ITEM, 'updatedAt': '2026-01-02T00:00:00'}) != etag
+        assert scenario_etag({**ITEM, 'title': '変更'}) == etag
+
+    def test_一覧のETagはnextTokenも含む(self):
+        assert list_etag([ITEM], None) != list_etag([ITEM], 'token')
+
+
+class TestCache:
+    def test_公開シナリオのみキャッシュする(self):
+        cache = ScenarioCache()
+        cache.put({**ITEM, 'scenarioId': 'private', 'visibility': 'private'})
+        cache.put(ITEM)
+
+        assert cache.get('private') is None
+        assert cache.get('s1') == ITEM
+
+    def test_TTLを過ぎたエントリは返さない(self):
+        cache = ScenarioCache(ttl_seconds=0)
+        cache.put(ITEM)
+
+        assert cache.get('s1') is None
+
+    def test_無効化したエントリは返さない(self):
+        cache = ScenarioCache()
+        cache.put(ITEM)
+        cache.invalidate('s1')
+
+        assert cache.get('s1') is None
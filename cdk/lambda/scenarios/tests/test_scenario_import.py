@@ -0,0 +1,198 @@
+"""
+シナリオ一括インポート（scenario_import.py）とインポートジョブの期限のテスト
+
+- BatchGetItem の UnprocessedKeys は再送し、上限に達したらエラーにする
+- BatchWriteItem の UnprocessedItems は再送し、上限に達したアイテムはエラーとして記録する
+- ValidationException のバッチは1件ずつ保存し、不正なアイテムだけをエラーにする
+- 期限を過ぎても QUEUED / RUNNING のままのジョブは FAILED として返す
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from botocore.exceptions import ClientError
+
+import scenario_import
+
+TABLE = 'test-Scenarios'
+
+
+def validation_error(message='Item size has exceeded the maximum allowed size'):
+    return ClientError({'Error': {'Code': 'ValidationException', 'Message': message}}, 'BatchWriteItem')
+
+
+def scenario(title, **extra):
+    return {'title': title, 'description': 'd', 'difficulty': 'beginner', 'category': 'c', **extra}
+
+
+class FakeTable:
+    def __init__(self, dynamodb):
+        self.dynamodb = dynamodb
+
+    def put_item(self, Item):
+        if Item['title'] in self.dynamodb.invalid_titles:
+            raise validation_error()
+        self.dynamodb.stored[Item['scenarioId']] = Item
+
+
+class FakeDynamoDB:
+    """
+    DynamoDB ServiceResource のスタブ
+
+    unprocessed_get / unprocessed_write に指定した回数だけ、リクエストの先頭1件を未処理として返す。
+    invalid_titles のアイテムを含むバッチは ValidationException になる。
+    """
+
+    def __init__(self, existing=(), unprocessed_get=0, unprocessed_write=0, invalid_titles=()):
+        self.existing = set(existing)
+        self.unprocessed_get = unprocessed_get
+        self.unprocessed_write = unprocessed_write
+        self.invalid_titles = set(invalid_titles)
+        self.stored = {}
+        self.get_calls = 0
+        self.write_calls = 0
+
+    def batch_get_item(self, RequestItems):
+        self.get_calls += 1
+        keys = RequestItems[TABLE]['Keys']
+        unprocessed = {}
+        if self.unprocessed_get > 0:
+            self.unprocessed_get -= 1
+            unprocessed = {TABLE: {**RequestItems[TABLE], 'Keys': keys[:1]}}
+            keys = keys[1:]
+        found = [{'scenarioId': key['scenarioId']} for key in keys if key['scenarioId'] in self.existing]
+        return {'Responses': {TABLE: found}, 'UnprocessedKeys': unprocessed}
+
+    def batch_write_item(self, RequestItems):
+        self.write_calls += 1
+        requests = RequestItems[TABLE]
+        if any(entry['PutRequest']['Item']['title'] in self.invalid_titles for entry in requests):
+            raise validation_error()
+        unprocessed = {}
+        if self.unprocessed_write > 0:
+            self.unprocessed_write -= 1
+            unprocessed = {TABLE: requests[:1]}
+            requests = requests[1:]
+        for entry in requests:
+            item = entry['PutRequest']['Item']
+            self.stored[item['scenarioId']] = item
+        return {'UnprocessedItems': unprocessed}
+
+    def Table(self, name):
+        assert name == TABLE
+        return FakeTable(self)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(scenario_import.time, 'sleep', lambda seconds: None)
+
+
+class TestFindExistingIds:
+    def test_未処理のキーを再送して既存IDを確認する(self):
+        dynamodb = FakeDynamoDB(existing={'a', 'c'}, unprocessed_get=2)
+
+        existing = scenario_import.find_existing_ids(dynamodb, TABLE, ['a', 'b', 'c', 'a'])
+
+        assert existing == {'a', 'c'}
+        assert dynamodb.get_calls == 3
+
+    def test_再試行しても未処理のキーが残ればエラー(self):
+        dynamodb = FakeDynamoDB(existing={'a'}, unprocessed_get=10)
+
+        with pytest.raises(RuntimeError):
+            scenario_import.find_existing_ids(dynamodb, TABLE, ['a', 'b'], max_attempts=3)
+        assert dynamodb.get_calls == 3
+
+
+class TestBatchPutItems:
+    def items(self, count):
+        return [{'scenarioId': f's{i:03d}', 'title': f't{i}'} for i in range(count)]
+
+    def test_未処理のアイテムを再送して全件保存する(self):
+        dynamodb = FakeDynamoDB(unprocessed_write=2)
+        progress = []
+
+        failed = scenario_import.batch_put_items(dynamodb, TABLE, self.items(30), on_progress=progress.append)
+
+        assert failed == []
+        assert len(dynamodb.stored) == 30
+        assert progress == [25, 30]
+
+    def test_再試行の上限に達したアイテムはエラーとして返す(self):
+        dynamodb = FakeDynamoDB(unprocessed_write=10)
+
+        failed = scenario_import.batch_put_items(dynamodb, TABLE, self.items(3), max_attempts=3)
+
+        assert [entry['item']['scenarioId'] for entry in failed] == ['s000']
+        assert set(dynamodb.stored) == {'s001', 's002'}
+        assert dynamodb.write_calls == 3
+
+    def test_ValidationExceptionのバッチは1件ずつ保存して不正なアイテムだけを記録する(self):
+        dynamodb = FakeDynamoDB(invalid_titles={'t1'})
+
+        failed = scenario_import.batch_put_items(dynamodb, TABLE, self.items(3))
+
+        assert [entry['item']['scenarioId'] for entry in failed] == ['s001']
+        assert 'ValidationException' in failed[0]['error']
+        assert set(dynamodb.stored) == {'s000', 's002'}
+
+    def test_ValidationException以外のエラーはそのまま送出する(self):
+        class ThrottledDynamoDB(FakeDynamoDB):
+            def batch_write_item(self, RequestItems):
+                raise ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'BatchWriteItem')
+
+        with pytest.raises(ClientError):
+            scenario_import.batch_put_items(ThrottledDynamoDB(), TABLE, self.items(1))
+
+
+class TestImportScenariosBatch:
+    def test_既存のシナリオをスキップし不正なシナリオをエラーにする(self):
+        dynamodb = FakeDynamoDB(existing={'old-1'}, unprocessed_get=1, unprocessed_write=1,
+                                invalid_titles={'大きすぎる'})
+        scenarios = [
+            scenario('既存', scenarioId='old-1'),
+            scenario('新規', scenarioId='old-2'),
+            {'title': '必須不足'},
+            scenario('大きすぎる'),
+        ]
+
+        result = scenario_import.import_scenarios_batch(
+            dynamodb, TABLE, scenarios, 'user-1', '2026-01-01T00:00:00Z',
+            id_factory=lambda index: f'new-{index}'
+        )
+
+        assert result['imported'] == 1
+        assert result['skipped'] == 1
+        assert result['errors'] == 2
+        assert result['details']['importedScenarios'] == [{'originalId': 'old-2', 'newId': 'new-1', 'title': '新規'}]
+        assert set(dynamodb.stored) == {'new-1'}
+        assert dynamodb.stored['new-1']['visibility'] == 'private'
+
+
+class TestExpireImportJob:
+    @pytest.fixture
+    def saved(self, scenarios_index, monkeypatch):
+        saved = []
+        monkeypatch.setattr(scenarios_index, 'put_import_job_status',
+                            lambda user_id, job_id, status: saved.append(status) or status)
+        return saved
+
+    def deadline(self, seconds):
+        return (datetime.utcnow() + timedelta(seconds=seconds)).isoformat() + 'Z'
+
+    def test_期限を過ぎたRUNNINGのジョブはFAILEDになる(self, scenarios_index, saved):
+        status = {'jobId': 'j1', 'status': 'RUNNING', 'processed': 50, 'deadline': self.deadline(-3600)}
+
+        result = scenarios_index.expire_import_job('user-1', 'j1', status)
+
+        assert result['status'] == 'FAILED'
+        assert result['processed'] == 50
+        assert saved == [result]
+
+    def test_期限前や完了済みのジョブはそのまま返す(self, scenarios_index, saved):
+        running = {'jobId': 'j1', 'status': 'RUNNING', 'deadline': self.deadline(600)}
+        completed = {'jobId': 'j1', 'status': 'COMPLETED', 'deadline': self.deadline(-3600)}
+
+        assert scenarios_index.expire_import_job('user-1', 'j1', running) is running
+        assert scenarios_index.expire_import_job('user-1', 'j1', completed) is completed
+        assert saved == []
@@ -17,6 +17,9 @@ from typing import Dict, Any, List
 from decimal import Decimal
 from datetime import datetime
 
+# 共通レイヤー（cdk/lambda/common）
+from realtime_metrics_aggregate import expand_realtime_metrics_aggregate, get_realtime_metrics_aggregate
+
 # ロガー設定
 logger = Logger(service="session-analysis-start")
 
@@ -377,9 +380,21 @@ def get_messages_from_agentcore_memory(session_id: str, actor_id: str = "default
 
 
 def get_realtime_metrics(session_id: str) -> list:
-    """リアルタイムメトリクスを取得"""
+    """リアルタイムメトリクスを取得（新しい順）
+    
+    realtime-scoring エージェントが更新するセッション集約アイテムがあれば get_item 1回で取得し、
+    ターンごとのスコア・分析コメント・作成日時・コンプライアンス違反を展開する
+    （共通レイヤーの realtime_metrics_aggregate.py 参照）。
+    集約アイテムのない旧セッションはパーティションをクエリする。
+    """
     feedback_table = dynamodb.Table(SESSION_FEEDBACK_TABLE)
     
+    aggregate = get_realtime_metrics_aggregate(feedback_table, session_id)
+    if aggregate:
+        metrics = expand_realtime_metrics_aggregate(aggregate)
+        metrics.reverse()
+        return metrics
+    
     response = feedback_table.query(
         KeyConditionExpression=boto3.dynamodb.conditions.Key("sessionId").eq(session_id),
         FilterExpression=boto3.dynamodb.conditions.Attr("dataType").eq("realtime-metrics"),
@@ -22,6 +22,10 @@ import boto3.dynamodb.conditions
 from utils import get_user_id_from_event, sessions_table, messages_table, scenarios_table, dynamodb
 
 from realtime_scoring import calculate_realtime_scores
+# 共通レイヤー（cdk/lambda/common）
+from realtime_metrics_aggregate import (
+    expand_realtime_metrics_aggregate, get_realtime_metrics_aggregate, query_final_feedback
+)
 from datetime import datetime
 from decimal import Decimal
 
@@ -791,27 +795,43 @@ def register_analysis_results_routes(app: APIGatewayRestResolver):
                 "messages_count": len(messages)
             })
             
-            # フィードバックデータをDynamoDBから取得（Step Functionsで生成済み）
-            feedback_response = feedback_table.query(
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('sessionId').eq(session_id),
-                ScanIndexForward=False  # 降順ソート（最新が先頭）
-            )
-            
-            feedback_items = feedback_response.get('Items', [])
-            
-            # フィードバックデータを分類
-            # ScanIndexForward=Falseで降順ソート済みのため、最初に見つかったfinal-feedbackが最新
-            final_feedback = None
-            dynamodb_realtime_metrics = []
+            # リアルタイムメトリクスはセッション集約アイテム（get_item 1回）から取得し、
+            # final-feedbackは最新ターンより後のソートキー範囲だけをクエリする。
+            # 集約アイテムのない旧セッションは全件を取得して分類する
+            try:
+                realtime_aggregate = get_realtime_metrics_aggregate(feedback_table, session_id)
+            except Exception as e:
+                logger.warning("リアルタイムメトリクス集約アイテム取得エラー", extra={
+                    "session_id": session_id,
+                    "error": str(e)
+                })
+                realtime_aggregate = None
             
-            for item in feedback_items:
-                data_type = item.get('dataType')
+            # フィードバックデータをDynamoDBから取得（Step Functionsで生成済み）
+            if realtime_aggregate:
+                final_feedback = query_final_feedback(
+                    feedback_table, session_id, after=realtime_aggregate.get('updatedAt')
+                )
+                dynamodb_realtime_metrics = expand_realtime_metrics_aggregate(realtime_aggregate)
+            else:
+                feedback_response = feedback_table.query(
+                    KeyConditionExpression=boto3.dynamodb.conditions.Key('sessionId').eq(session_id),
+                    ScanIndexForward=False  # 降順ソート（最新が先頭）
+                )
                 
-                if data_type == 'final-feedback':
-                    if final_feedback is None:
-                        final_feedback = item
-                elif data_type == 'realtime-metrics':
-                    dynamodb_realtime_metrics.append(item)
+                # フィードバックデータを分類
+                # ScanIndexForward=Falseで降順ソート済みのため、最初に見つかったfinal-feedbackが最新
+                final_feedback = None
+                dynamodb_realtime_metrics = []
+                
+                for item in feedback_response.get('Items', []):
+                    data_type = item.get('dataType')
+                    
+                    if data_type == 'final-feedback':
+                        if final_feedback is None:
+                            final_feedback = item
+                    elif data_type == 'realtime-metrics':
+                        dynamodb_realtime_metrics.append(item)
             
             # コンプライアンス違反データを抽出（DynamoDBのメトリクスから）
             compliance_violations = []
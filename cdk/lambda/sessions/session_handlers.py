@@ -4,7 +4,6 @@
 セッション一覧取得、セッション詳細取得、セッション作成などの機能を提供します。
 """
 
-import json
 import uuid
 from datetime import datetime, timedelta
 from aws_lambda_powertools import Logger
@@ -13,6 +12,7 @@ from aws_lambda_powertools.event_handler.exceptions import (
     InternalServerError, NotFoundError, BadRequestError
 )
 
+from pagination import encode_page_token, decode_page_token, fill_page
 from utils import get_user_id_from_event, sessions_table, SESSIONS_TABLE
 
 # ロガー設定
@@ -64,24 +64,21 @@ def register_session_routes(app: APIGatewayRestResolver):
             next_token = query_params.get('nextToken')
             scenario_id = query_params.get('scenarioId')
             
-            # クエリ実行用のパラメータ
-            dynamo_query_params = {}
-            
             # 特定のシナリオによるフィルタリング
             if scenario_id:
-                if sessions_table:
-                    # ScenarioSessionsIndexを使用
-                    dynamo_query_params = {
-                        'IndexName': 'ScenarioSessionsIndex',
-                        'KeyConditionExpression': 'scenarioId = :sid',
-                        'ExpressionAttributeValues': {
-                            ':sid': scenario_id,
-                            ':uid': user_id
-                        },
-                        'FilterExpression': 'userId = :uid',
-                        'Limit': limit,
-                        'ScanIndexForward': False  # 降順（最新のセッションから）
-                    }
+                # ScenarioSessionsIndexを使用（他ユーザーのセッションはフィルタで除外）
+                dynamo_query_params = {
+                    'IndexName': 'ScenarioSessionsIndex',
+                    'KeyConditionExpression': 'scenarioId = :sid',
+                    'ExpressionAttributeValues': {
+                        ':sid': scenario_id,
+                        ':uid': user_id
+                    },
+                    'FilterExpression': 'userId = :uid',
+                    'ScanIndexForward': False  # 降順（最新のセッションから）
+                }
+                key_names = ['scenarioId', 'createdAt', 'userId', 'sessionId']
+                plan = f"scenario|{user_id}|{scenario_id}"
             else:
                 # UserCompletedSessionsIndex GSIを使用して完了セッションを時刻降順で取得
                 dynamo_query_params = {
@@ -90,16 +87,17 @@ def register_session_routes(app: APIGatewayRestResolver):
                     'ExpressionAttributeValues': {
                         ':uid': user_id
                     },
-                    'Limit': limit,
                     'ScanIndexForward': False  # 降順（最新の完了セッションから）
                 }
+                key_names = ['userId', 'completedAt', 'sessionId']
+                plan = f"completed|{user_id}"
             
             # ページネーショントークンの追加
             if next_token:
                 try:
-                    dynamo_query_params['ExclusiveStartKey'] = json.loads(next_token)
-                except (json.JSONDecodeError, TypeError) as json_error:
-                    logger.error("無効なnextTokenパラメータ", extra={"error": str(json_error), "nextToken": next_token})
+                    dynamo_query_params['ExclusiveStartKey'] = decode_page_token(next_token, plan)
+                except (ValueError, TypeError) as token_error:
+                    logger.error("無効なnextTokenパラメータ", extra={"error": str(token_error), "nextToken": next_token})
                     raise BadRequestError("無効なページネーショントークンです")
             
             # DynamoDBテーブルが存在するか確認
@@ -107,12 +105,13 @@ def register_session_routes(app: APIGatewayRestResolver):
                 logger.error("セッションテーブル未定義", extra={"table_name": SESSIONS_TABLE})
                 raise InternalServerError("システムエラーが発生しました")
                 
-            # DynamoDBクエリの実行
-            response = sessions_table.query(**dynamo_query_params)
+            # limit件に達するまでDynamoDBクエリを実行
+            items, last_key, consumed = fill_page(sessions_table.query, dynamo_query_params, limit, key_names)
+            logger.debug(f"セッション一覧取得: 件数={len(items)}, 消費RCU={consumed}, 次ページ有無={last_key is not None}")
             
             # レスポンス用のセッションリストを作成
             sessions = []
-            for item in response.get('Items', []):
+            for item in items:
                 # レスポンス用に必要なフィールドだけを抽出
                 session = {
                     'sessionId': item.get('sessionId'),
@@ -134,9 +133,7 @@ def register_session_routes(app: APIGatewayRestResolver):
                 sessions.append(session)
             
             # 次ページのトークン
-            next_token = None
-            if 'LastEvaluatedKey' in response:
-                next_token = json.dumps(response['LastEvaluatedKey'])
+            next_token = encode_page_token(plan, last_key) if last_key else None
             
             return {
                 'sessions': sessions,
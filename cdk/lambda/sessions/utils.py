@@ -5,6 +5,7 @@
 """
 
 import os
+import time
 import boto3
 from decimal import Decimal
 from aws_lambda_powertools import Logger
@@ -218,4 +219,4 @@ def calculate_ttl(hours: int = 24) -> int:
     return int(time.time()) + (hours * 3600)
 
 # テーブルの初期化
-init_tables()
\ No newline at end of file
+init_tables()
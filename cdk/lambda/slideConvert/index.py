@@ -4,6 +4,11 @@ PDF→スライド画像変換Lambda
 S3イベントトリガーまたはAPI呼び出しで起動し、
 PDFの各ページをPNG画像に変換してS3に保存する。
 変換完了後、DynamoDBのシナリオテーブルにスライド情報を更新する。
+
+各ページについて以下の3種類を生成する:
+  - フルサイズPNG（画面表示用）
+  - サムネイルPNG
+  - モデル入力用画像（長辺をMODEL_IMAGE_MAX_EDGEに縮小したJPEG/WebP、NPC会話エージェントが優先使用）
 """
 
 import json
@@ -25,6 +30,16 @@ SCENARIOS_TABLE = os.environ.get('SCENARIOS_TABLE', '')
 CONVERT_DPI = 150
 # サムネイルサイズ（幅, 高さ）
 THUMBNAIL_SIZE = (320, 240)
+# モデル入力用画像の長辺上限（px）。Claudeはこれを超える画像を内部で縮小するため、超過分は転送・処理コストのみ増える
+MODEL_IMAGE_MAX_EDGE = int(os.environ.get('MODEL_IMAGE_MAX_EDGE', '1568'))
+# モデル入力用画像の形式（jpeg / webp）と品質
+MODEL_IMAGE_FORMAT = os.environ.get('MODEL_IMAGE_FORMAT', 'jpeg').lower()
+MODEL_IMAGE_QUALITY = int(os.environ.get('MODEL_IMAGE_QUALITY', '85'))
+# 形式ごとの (Pillow形式名, 拡張子, Content-Type)
+MODEL_IMAGE_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+}
 # PDFマジックバイト
 PDF_MAGIC_BYTES = b'%PDF'
 # ページ数上限
@@ -131,10 +146,15 @@ def lambda_handler(event, context):
                     ExtraArgs={'ContentType': 'image/png'},
                 )
 
+                # モデル入力用画像（縮小+非可逆圧縮）
+                model_key, model_format = _upload_model_image(img, scenario_id, page_num, tmp_dir)
+
                 slides.append({
                     'pageNumber': page_num,
                     'imageKey': img_key,
                     'thumbnailKey': thumb_key,
+                    'modelImageKey': model_key,
+                    'modelImageFormat': model_format,
                 })
 
                 logger.info(f"Uploaded page {page_num}/{total_pages}")
@@ -167,6 +187,28 @@ def lambda_handler(event, context):
         return _error_response(500, 'PDF変換処理中にエラーが発生しました')
 
 
+def _upload_model_image(img, scenario_id: str, page_num: int, tmp_dir: str):
+    """モデル入力用のスライド画像を生成してS3にアップロード
+
+    Returns:
+        (S3キー, Bedrock Converse APIの画像形式名)
+    """
+    model_format = MODEL_IMAGE_FORMAT if MODEL_IMAGE_FORMAT in MODEL_IMAGE_FORMATS else 'jpeg'
+    pil_format, extension, content_type = MODEL_IMAGE_FORMATS[model_format]
+
+    model_img = img.convert('RGB')
+    model_img.thumbnail((MODEL_IMAGE_MAX_EDGE, MODEL_IMAGE_MAX_EDGE))
+    model_key = f"presentations/{scenario_id}/model/page_{page_num:03d}.{extension}"
+    model_path = os.path.join(tmp_dir, f"model_{page_num}.{extension}")
+    model_img.save(model_path, pil_format, quality=MODEL_IMAGE_QUALITY)
+    s3_client.upload_file(
+        model_path, SLIDE_BUCKET, model_key,
+        ExtraArgs={'ContentType': content_type},
+    )
+    del model_img
+    return model_key, model_format
+
+
 def _get_table():
     """DynamoDB Tableリソースを取得（遅延初期化対応）"""
     global scenarios_table
@@ -181,10 +223,10 @@ def _update_scenario_presentation_status(scenario_id: str, status: str):
         table = _get_table()
         table.update_item(
             Key={'scenarioId': scenario_id},
-            UpdateExpression='SET presentationFile.#s = :status',
+            UpdateExpression='SET presentationFile.#s = :status, #revision = if_not_exists(#revision, :zero) + :one',
             ConditionExpression='attribute_exists(scenarioId) AND attribute_exists(title)',
-            ExpressionAttributeNames={'#s': 'status'},
-            ExpressionAttributeValues={':status': status},
+            ExpressionAttributeNames={'#s': 'status', '#revision': 'revision'},
+            ExpressionAttributeValues={':status': status, ':zero': 0, ':one': 1},
         )
     except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
         logger.info(f"シナリオ {scenario_id} はまだ作成されていないため、ステータス更新をスキップ")
@@ -198,13 +240,19 @@ def _update_scenario_slides(scenario_id: str, total_pages: int, slides: list):
     try:
         table.update_item(
             Key={'scenarioId': scenario_id},
-            UpdateExpression='SET presentationFile.totalPages = :tp, presentationFile.slides = :sl, presentationFile.#s = :status',
+            UpdateExpression=(
+                'SET presentationFile.totalPages = :tp, presentationFile.slides = :sl, presentationFile.#s = :status, '
+                '#revision = if_not_exists(#revision, :zero) + :one'
+            ),
             ConditionExpression='attribute_exists(scenarioId) AND attribute_exists(title)',
-            ExpressionAttributeNames={'#s': 'status'},
+            # シナリオAPIのETagを変えるためrevisionも更新
+            ExpressionAttributeNames={'#s': 'status', '#revision': 'revision'},
             ExpressionAttributeValues={
                 ':tp': total_pages,
                 ':sl': slides,
                 ':status': 'ready',
+                ':zero': 0,
+                ':one': 1,
             },
         )
         logger.info(f"Updated scenario {scenario_id} with {total_pages} slides")
@@ -6,9 +6,13 @@ import * as agentcore from '@aws-cdk/aws-bedrock-agentcore-alpha';
 import * as ecr_assets from 'aws-cdk-lib/aws-ecr-assets';
 import { aws_logs as mixinLogs } from '@aws-cdk/mixins-preview';
 import { mixins as bedrockagentcoreMixins } from '@aws-cdk/mixins-preview/aws-bedrockagentcore';
+import * as fs from 'fs';
 import * as path from 'path';
 import { Construct } from 'constructs';
 
+// エージェント間で共有するPythonモジュールのディレクトリ名（agentsディレクトリ直下）
+const AGENT_COMMON_DIR = 'common';
+
 export interface AgentCoreRuntimeProps {
   envId: string;
   resourceNamePrefix: string;
@@ -52,12 +56,22 @@ export class AgentCoreRuntime extends Construct {
       )
       : agentcore.RuntimeAuthorizerConfiguration.usingIAM();
 
+    // ビルドコンテキストはagentsディレクトリ（共通モジュールを含めるため）
+    // 他エージェントのディレクトリは除外し、無関係な変更でイメージが再ビルドされないようにする
+    const agentsRootPath = path.dirname(props.agentCodePath);
+    const agentDirName = path.basename(props.agentCodePath);
+    const excludedAgentDirs = fs.readdirSync(agentsRootPath, { withFileTypes: true })
+      .filter((entry) => entry.isDirectory() && entry.name !== agentDirName && entry.name !== AGENT_COMMON_DIR)
+      .map((entry) => entry.name);
+
     // AgentCore Runtime (L2 Construct)
     const runtime = new agentcore.Runtime(this, 'Runtime', {
       runtimeName: runtimeName,
       description: props.description,
-      agentRuntimeArtifact: agentcore.AgentRuntimeArtifact.fromAsset(props.agentCodePath, {
+      agentRuntimeArtifact: agentcore.AgentRuntimeArtifact.fromAsset(agentsRootPath, {
         platform: ecr_assets.Platform.LINUX_ARM64, // arm64プラットフォームを明示的に指定
+        file: path.join(agentDirName, 'Dockerfile'),
+        exclude: excludedAgentDirs,
       }),
       authorizerConfiguration,
       environmentVariables: {
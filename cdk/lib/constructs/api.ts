@@ -3,8 +3,11 @@ import { Construct } from 'constructs';
 import * as cognito from 'aws-cdk-lib/aws-cognito';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as s3 from 'aws-cdk-lib/aws-s3';
+import * as secretsmanager from 'aws-cdk-lib/aws-secretsmanager';
 import { NodejsFunction } from 'aws-cdk-lib/aws-lambda-nodejs';
 import { Runtime, Architecture } from 'aws-cdk-lib/aws-lambda';
+import { PythonLayerVersion } from '@aws-cdk/aws-lambda-python-alpha';
+import * as path from 'path';
 import { ApiGatewayConstruct } from './api/api-gateway';
 import { AudioStorageConstruct } from './storage/audio-storage';
 import { VideoStorageConstruct } from './storage/video-storage';
@@ -115,6 +118,27 @@ export class Api extends Construct {
     // プロップスから渡されたBedrockモデル設定を使用（フラット化済み）
     const bedrockModels = props.bedrockModels;
 
+    // Python Lambda間で共有するモジュール（cdk/lambda/common）のレイヤー
+    const commonLayer = new PythonLayerVersion(this, 'CommonPythonLayer', {
+      entry: path.join(__dirname, '../../lambda/common'),
+      compatibleRuntimes: [Runtime.PYTHON_3_13],
+      compatibleArchitectures: [Architecture.ARM_64],
+      description: 'Python Lambda共通モジュール（リアルタイムメトリクス集約・ページネーション）',
+      bundling: {
+        assetExcludes: ['tests'],
+      },
+    });
+
+    // 一覧APIのページネーショントークン（nextToken）署名用の鍵
+    const paginationTokenSecret = new secretsmanager.Secret(this, 'PaginationTokenSecret', {
+      description: 'シナリオ・セッション一覧APIのnextToken署名鍵',
+      generateSecretString: {
+        passwordLength: 64,
+        excludePunctuation: true,
+      },
+      removalPolicy: cdk.RemovalPolicy.DESTROY, // 開発環境用設定（本番環境では注意）
+    });
+
     // セッション管理Lambda関数
     this.sessionLambda = new SessionLambdaConstruct(this, 'SessionLambda', {
       sessionsTableName: this.databaseTables.sessionsTable.tableName,
@@ -125,11 +149,17 @@ export class Api extends Construct {
       videoBucketName: this.videoStorage.bucket.bucketName,
       sessionFeedbackTableName: this.databaseTables.sessionFeedbackTable.tableName,
       agentCoreMemoryId: props.agentCoreMemoryId,
+      paginationTokenSecret,
+      commonLayer,
     });
 
     // シナリオ管理Lambda関数
     this.scenarioLambda = new ScenarioLambdaConstruct(this, 'ScenarioLambda', {
       scenariosTable: this.databaseTables.scenariosTable,
+      scenarioSharesTable: this.databaseTables.scenarioSharesTable,
+      scenarioOwnerIndexEnabled: this.databaseTables.scenarioOwnerIndexEnabled,
+      paginationTokenSecret,
+      commonLayer,
       pdfBucket: props.pdfStorageBucket,
       slideBucket: props.slideStorageBucket,
       knowledgeBaseId: props.knowledgeBaseId,
@@ -256,6 +286,7 @@ export class Api extends Construct {
         reference: bedrockModels.scoring
       },
       agentCoreMemoryId: props.agentCoreMemoryId,
+      commonLayer,
     });
 
     // セッション分析Step Functionsを作成
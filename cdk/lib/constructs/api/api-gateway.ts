@@ -371,6 +371,39 @@ export class ApiGatewayConstruct extends Construct {
       }
     );
 
+    // POST /scenarios/import/jobs - シナリオインポートジョブ作成（アップロードURL発行）
+    const importJobsResource = importResource.addResource('jobs');
+    importJobsResource.addMethod(
+      'POST',
+      new apigateway.LambdaIntegration(props.scenarioFunction),
+      {
+        authorizer: auth,
+        authorizationType: apigateway.AuthorizationType.COGNITO,
+      }
+    );
+
+    // GET /scenarios/import/jobs/{job_id} - シナリオインポートジョブ状態取得
+    const importJobResource = importJobsResource.addResource('{job_id}');
+    importJobResource.addMethod(
+      'GET',
+      new apigateway.LambdaIntegration(props.scenarioFunction),
+      {
+        authorizer: auth,
+        authorizationType: apigateway.AuthorizationType.COGNITO,
+      }
+    );
+
+    // POST /scenarios/import/jobs/{job_id}/start - シナリオインポートジョブ開始
+    const importJobStartResource = importJobResource.addResource('start');
+    importJobStartResource.addMethod(
+      'POST',
+      new apigateway.LambdaIntegration(props.scenarioFunction),
+      {
+        authorizer: auth,
+        authorizationType: apigateway.AuthorizationType.COGNITO,
+      }
+    );
+
     // POST /scenarios/{scenario_id}/presentation-upload-url - 提案資料アップロード
     const presentationUploadResource = scenarioDetailResource.addResource('presentation-upload-url');
     presentationUploadResource.addMethod(
@@ -4,6 +4,7 @@ import * as lambda from 'aws-cdk-lib/aws-lambda';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
 import * as s3 from 'aws-cdk-lib/aws-s3';
+import * as secretsmanager from 'aws-cdk-lib/aws-secretsmanager';
 import { PythonFunction } from '@aws-cdk/aws-lambda-python-alpha';
 import * as path from 'path';
 
@@ -16,6 +17,17 @@ export interface ScenarioLambdaConstructProps {
    */
   scenariosTable: dynamodb.ITable;
 
+  /**
+   * シナリオ共有メンバーシップテーブル
+   */
+  scenarioSharesTable: dynamodb.ITable;
+
+  /**
+   * シナリオテーブルの OwnerIndex がデプロイ済みか
+   * （共有メンバーシップのバックフィル完了後、フィルタなしの一覧をインデックスから取得する）
+   */
+  scenarioOwnerIndexEnabled?: boolean;
+
   /**
    * PDF保存用S3バケット名
    */
@@ -30,6 +42,16 @@ export interface ScenarioLambdaConstructProps {
    * knowledgeBaseId ID
    */
   knowledgeBaseId: string
+
+  /**
+   * 一覧APIのページネーショントークン署名鍵（未設定の場合、次ページのある一覧はエラーになる）
+   */
+  paginationTokenSecret: secretsmanager.ISecret;
+
+  /**
+   * Python Lambda共通モジュール（cdk/lambda/common）のレイヤー
+   */
+  commonLayer: lambda.ILayerVersion;
 }
 
 /**
@@ -41,9 +63,44 @@ export class ScenarioLambdaConstruct extends Construct {
    */
   public readonly function: PythonFunction;
 
+  /**
+   * シナリオインポートジョブのワーカーLambda関数
+   */
+  public readonly importJobFunction: PythonFunction;
+
   constructor(scope: Construct, id: string, props: ScenarioLambdaConstructProps) {
     super(scope, id);
 
+    // インポートジョブのワーカーLambda関数の作成
+    // API用の関数と同じコードを別関数としてデプロイし、タイムアウトだけを長く設定する
+    this.importJobFunction = new PythonFunction(this, 'ImportJobFunction', {
+      runtime: lambda.Runtime.PYTHON_3_13,
+      architecture: lambda.Architecture.ARM_64,
+      entry: path.join(__dirname, '../../../lambda/scenarios'),
+      index: 'index.py',
+      handler: 'import_job_handler',
+      layers: [props.commonLayer],
+      timeout: cdk.Duration.minutes(15),
+      memorySize: 512,
+      environment: {
+        SCENARIOS_TABLE: props.scenariosTable.tableName,
+        SCENARIO_SHARES_TABLE: props.scenarioSharesTable.tableName,
+        PDF_BUCKET: props.pdfBucket.bucketName,
+        POWERTOOLS_LOG_LEVEL: "INFO",
+      },
+      description: 'シナリオインポートジョブ処理Lambda関数',
+    });
+
+    props.scenariosTable.grantReadWriteData(this.importJobFunction)
+    props.pdfBucket.grantReadWrite(this.importJobFunction)
+
+    // 失敗したジョブは状態をFAILEDにして終了するため再試行しない
+    // 処理が始まらないまま残ったイベントは IMPORT_JOB_QUEUE_TIMEOUT_SECONDS で破棄する（QUEUEDのジョブはFAILEDになる）
+    this.importJobFunction.configureAsyncInvoke({
+      retryAttempts: 0,
+      maxEventAge: cdk.Duration.seconds(900),
+    });
+
     // シナリオ管理Lambda関数の作成
     // PythonFunctionを使用して依存関係を自動的にインストール
     this.function = new PythonFunction(this, 'Function', {
@@ -52,10 +109,14 @@ export class ScenarioLambdaConstruct extends Construct {
       entry: path.join(__dirname, '../../../lambda/scenarios'),
       index: 'index.py',
       handler: 'lambda_handler',
+      layers: [props.commonLayer],
       timeout: cdk.Duration.seconds(30),
       memorySize: 512,
       environment: {
         SCENARIOS_TABLE: props.scenariosTable.tableName,
+        // シナリオ共有メンバーシップテーブル名
+        SCENARIO_SHARES_TABLE: props.scenarioSharesTable.tableName,
+        SCENARIO_OWNER_INDEX_ENABLED: String(props.scenarioOwnerIndexEnabled ?? false),
         // PDF保存用S3バケット名
         PDF_BUCKET: props.pdfBucket.bucketName,
         // スライド画像保存用S3バケット名
@@ -64,13 +125,23 @@ export class ScenarioLambdaConstruct extends Construct {
         POWERTOOLS_LOG_LEVEL: "DEBUG",
         // Knowledge Base ID
         KNOWLEDGE_BASE_ID: props.knowledgeBaseId,
+        // ページネーショントークン署名鍵
+        PAGINATION_TOKEN_SECRET_ARN: props.paginationTokenSecret.secretArn,
+        // インポートジョブのワーカーLambda関数名
+        IMPORT_JOB_FUNCTION: this.importJobFunction.functionName,
+        IMPORT_JOB_QUEUE_TIMEOUT_SECONDS: '900',
       },
       description: 'シナリオ管理API実装Lambda関数',
     });
 
     props.scenariosTable.grantReadWriteData(this.function)
+    props.scenarioSharesTable.grantReadWriteData(this.function)
     props.pdfBucket.grantReadWrite(this.function)
     props.slideBucket.grantReadWrite(this.function)
+    props.paginationTokenSecret.grantRead(this.function)
+
+    // インポートジョブのワーカー呼び出し権限を付与
+    this.importJobFunction.grantInvoke(this.function)
 
     // Bedrockアクセス権限を付与（フィードバック生成用）
     this.function.addToRolePolicy(
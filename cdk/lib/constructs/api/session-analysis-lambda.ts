@@ -33,6 +33,8 @@ export interface SessionAnalysisLambdaConstructProps {
   };
   /** AgentCore Memory ID */
   agentCoreMemoryId?: string;
+  /** Python Lambda共通モジュール（cdk/lambda/common）のレイヤー */
+  commonLayer: lambda.ILayerVersion;
 }
 
 /**
@@ -51,10 +53,14 @@ export class SessionAnalysisLambdaConstruct extends Construct {
   public readonly saveFunction: PythonFunction;
   /** API用Lambda関数 */
   public readonly apiFunction: PythonFunction;
+  /** 全関数に追加するレイヤー */
+  private readonly layers: lambda.ILayerVersion[];
 
   constructor(scope: Construct, id: string, props: SessionAnalysisLambdaConstructProps) {
     super(scope, id);
 
+    this.layers = [props.commonLayer];
+
     // 共通環境変数
     // Cross-region inference profileを使用するため、MODEL_REGIONは不要
     const commonEnvironment = {
@@ -151,6 +157,7 @@ export class SessionAnalysisLambdaConstruct extends Construct {
       entry: path.join(__dirname, '../../../lambda/sessionAnalysis'),
       index: options.indexFile,
       handler: 'lambda_handler',
+      layers: this.layers,
       role: lambdaExecutionRole,
       description: options.description,
       timeout: options.timeout,
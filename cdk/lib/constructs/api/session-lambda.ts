@@ -2,6 +2,7 @@ import * as cdk from 'aws-cdk-lib';
 import { Construct } from 'constructs';
 import * as lambda from 'aws-cdk-lib/aws-lambda';
 import * as iam from 'aws-cdk-lib/aws-iam';
+import * as secretsmanager from 'aws-cdk-lib/aws-secretsmanager';
 import { PythonFunction } from '@aws-cdk/aws-lambda-python-alpha';
 import * as path from 'path';
 import { BedrockModelsConfig } from '../../types/bedrock-models';
@@ -47,6 +48,16 @@ export interface SessionLambdaConstructProps {
    * AgentCore Memory ID（会話履歴・メトリクス取得用）
    */
   agentCoreMemoryId?: string;
+
+  /**
+   * 一覧APIのページネーショントークン署名鍵（未設定の場合、次ページのある一覧はエラーになる）
+   */
+  paginationTokenSecret: secretsmanager.ISecret;
+
+  /**
+   * Python Lambda共通モジュール（cdk/lambda/common）のレイヤー
+   */
+  commonLayer: lambda.ILayerVersion;
 }
 
 /**
@@ -69,6 +80,7 @@ export class SessionLambdaConstruct extends Construct {
       entry: path.join(__dirname, '../../../lambda/sessions'),
       index: 'index.py',
       handler: 'lambda_handler',
+      layers: [props.commonLayer],
       timeout: cdk.Duration.minutes(15), // ビデオ分析処理時間を考慮（Bedrock APIの応答時間含む）
       memorySize: 1024, // Base64エンコード処理とBedrock API呼び出しのため（512MBから増加）
       reservedConcurrentExecutions: 10, // Bedrock APIの制限を考慮した同時実行数制限（過負荷防止）
@@ -94,11 +106,15 @@ export class SessionLambdaConstruct extends Construct {
         // セッションフィードバックテーブル
         ...(props.sessionFeedbackTableName && { SESSION_FEEDBACK_TABLE: props.sessionFeedbackTableName }),
         // AgentCore Memory ID（会話履歴・メトリクス取得用）
-        ...(props.agentCoreMemoryId && { AGENTCORE_MEMORY_ID: props.agentCoreMemoryId })
+        ...(props.agentCoreMemoryId && { AGENTCORE_MEMORY_ID: props.agentCoreMemoryId }),
+        // ページネーショントークン署名鍵
+        PAGINATION_TOKEN_SECRET_ARN: props.paginationTokenSecret.secretArn
       },
       description: 'セッション履歴管理API実装Lambda関数',
     });
 
+    props.paginationTokenSecret.grantRead(this.function);
+
     // Lambda関数にDynamoDBテーブルへのアクセス権限を付与
     const dynamodbResources = [
       `arn:aws:dynamodb:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:table/${props.scenariosTableName}`,
@@ -2,8 +2,28 @@ import * as cdk from 'aws-cdk-lib';
 import { Construct } from 'constructs';
 import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
 
+/**
+ * シナリオ一覧（カード表示）に必要な属性
+ * lambda/scenarios/scenario_cards.py の SCENARIO_CARD_ATTRIBUTES と揃えること
+ */
+const SCENARIO_CARD_ATTRIBUTES = [
+  'scenarioId', 'title', 'description', 'difficulty', 'category',
+  'initialMessage', 'language', 'npc', 'goals', 'objectives', 'initialMetrics', 'industry',
+  'createdBy', 'isCustom', 'visibility', 'createdAt', 'updatedAt', 'revision',
+];
+
+/** インデックスのキー属性を除いたカード属性（INCLUDE射影用） */
+const cardAttributesExcept = (...keys: string[]) =>
+  SCENARIO_CARD_ATTRIBUTES.filter((name) => !keys.includes(name));
+
 export interface DatabaseTablesProps {
   resourceNamePrefix?: string; // リソース名のプレフィックス
+  /**
+   * シナリオテーブルに OwnerIndex を作成するか（デフォルト: false）
+   * CloudFormationは1回の更新でGSIを1つしか追加できないため、既存スタックでは
+   * VisibilityIndex をデプロイした後に有効にして再デプロイする
+   */
+  scenarioOwnerIndexEnabled?: boolean;
 }
 
 /**
@@ -13,6 +33,12 @@ export class DatabaseTables extends Construct {
   /** シナリオテーブル */
   public readonly scenariosTable: dynamodb.Table;
 
+  /** シナリオ共有メンバーシップテーブル */
+  public readonly scenarioSharesTable: dynamodb.Table;
+
+  /** シナリオテーブルの OwnerIndex を作成したか */
+  public readonly scenarioOwnerIndexEnabled: boolean;
+
   /** セッションテーブル */
   public readonly sessionsTable: dynamodb.Table;
 
@@ -26,6 +52,7 @@ export class DatabaseTables extends Construct {
     super(scope, id);
 
     const prefix = props?.resourceNamePrefix || '';
+    this.scenarioOwnerIndexEnabled = props?.scenarioOwnerIndexEnabled ?? false;
 
     // シナリオテーブル
     this.scenariosTable = new dynamodb.Table(this, 'ScenariosTable', {
@@ -38,6 +65,55 @@ export class DatabaseTables extends Construct {
       removalPolicy: cdk.RemovalPolicy.DESTROY, // 開発環境用設定（本番環境では注意）
     });
 
+    // 公開シナリオ一覧用のGSI（visibility = 'public' をscenarioId順に取得、カード属性のみ射影）
+    // 注意: 既存スタックへの反映時、CloudFormationは1回の更新でGSIを1つしか追加できないため、
+    // OwnerIndex はコンテキスト scenarioOwnerIndexEnabled で2回目のデプロイに分ける
+    this.scenariosTable.addGlobalSecondaryIndex({
+      indexName: 'VisibilityIndex',
+      partitionKey: {
+        name: 'visibility',
+        type: dynamodb.AttributeType.STRING
+      },
+      sortKey: {
+        name: 'scenarioId',
+        type: dynamodb.AttributeType.STRING
+      },
+      projectionType: dynamodb.ProjectionType.INCLUDE,
+      nonKeyAttributes: cardAttributesExcept('visibility', 'scenarioId')
+    });
+
+    // 自分のシナリオ一覧用のGSI（createdBy をscenarioId順に取得、カード属性のみ射影）
+    if (this.scenarioOwnerIndexEnabled) {
+      this.scenariosTable.addGlobalSecondaryIndex({
+        indexName: 'OwnerIndex',
+        partitionKey: {
+          name: 'createdBy',
+          type: dynamodb.AttributeType.STRING
+        },
+        sortKey: {
+          name: 'scenarioId',
+          type: dynamodb.AttributeType.STRING
+        },
+        projectionType: dynamodb.ProjectionType.INCLUDE,
+        nonKeyAttributes: cardAttributesExcept('createdBy', 'scenarioId')
+      });
+    }
+
+    // シナリオ共有メンバーシップテーブル（共有先ユーザーごとに共有されたシナリオを取得）
+    this.scenarioSharesTable = new dynamodb.Table(this, 'ScenarioSharesTable', {
+      tableName: `${prefix}AISalesRolePlay-ScenarioShares`,
+      partitionKey: {
+        name: 'userId',
+        type: dynamodb.AttributeType.STRING,
+      },
+      sortKey: {
+        name: 'scenarioId',
+        type: dynamodb.AttributeType.STRING,
+      },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      removalPolicy: cdk.RemovalPolicy.DESTROY, // 開発環境用設定（本番環境では注意）
+    });
+
     // セッションテーブル
     this.sessionsTable = new dynamodb.Table(this, 'SessionsTable', {
       tableName: `${prefix}AISalesRolePlay-Sessions`,
@@ -41,6 +41,13 @@ export class PdfStorageConstruct extends Construct {
           expiration: cdk.Duration.days(1),
           enabled: true,
         },
+        {
+          // シナリオインポートジョブの入力ファイル・状態
+          id: 'DeleteImportJobs',
+          prefix: 'imports/',
+          expiration: cdk.Duration.days(7),
+          enabled: true,
+        },
       ],
     });
 
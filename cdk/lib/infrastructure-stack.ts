@@ -6,6 +6,7 @@ import { Api } from './constructs/api';
 import { CommonWebAcl } from './constructs/common-web-acl';
 import { Web } from './constructs/web';
 import * as cognito from 'aws-cdk-lib/aws-cognito';
+import * as secretsmanager from 'aws-cdk-lib/aws-secretsmanager';
 import { DatabaseTables } from './constructs/storage/database-tables';
 import { GuardrailsConstruct } from './constructs/guardrails';
 import { PdfStorageConstruct } from './constructs/storage/pdf-storage';
@@ -84,7 +85,8 @@ export class InfrastructureStack extends cdk.Stack {
 
     // データベーステーブルを作成
     const databaseTables = new DatabaseTables(this, 'DatabaseTables', {
-      resourceNamePrefix: resourcePrefix
+      resourceNamePrefix: resourcePrefix,
+      scenarioOwnerIndexEnabled: config.scenarioOwnerIndexEnabled ?? false
     });
 
     // Guardrailsをデプロイ
@@ -123,6 +125,23 @@ export class InfrastructureStack extends cdk.Stack {
     // AgentCore Runtime - Strands Agent移行
     // ========================================
 
+    // 統合モードのスコアリング結果の署名鍵
+    // （NPC会話エージェントが署名し、リアルタイムスコアリングエージェントが検証する）
+    const jointScoringSecret = new secretsmanager.Secret(this, 'JointScoringSecret', {
+      description: 'NPC会話エージェントが生成したスコアリング結果の署名鍵',
+      generateSecretString: {
+        passwordLength: 64,
+        excludePunctuation: true,
+      },
+      removalPolicy: cdk.RemovalPolicy.DESTROY, // 開発環境用設定（本番環境では注意）
+    });
+    const jointScoringSecretReadPolicy = new cdk.aws_iam.PolicyStatement({
+      sid: 'JointScoringSecretRead',
+      effect: cdk.aws_iam.Effect.ALLOW,
+      actions: ['secretsmanager:GetSecretValue'],
+      resources: [jointScoringSecret.secretArn],
+    });
+
     // NPC会話エージェント（フロントエンド直接呼び出し - JWT認証）
     this.npcConversationAgent = new AgentCoreRuntime(this, 'NpcConversationAgent', {
       envId: envId,
@@ -138,8 +157,10 @@ export class InfrastructureStack extends cdk.Stack {
       additionalEnvironmentVariables: {
         BEDROCK_MODEL_CONVERSATION: props!.bedrockModels.conversation,
         SLIDE_BUCKET: slideStorage.bucket.bucketName,
+        JOINT_SCORING_SECRET_ARN: jointScoringSecret.secretArn,
       },
       additionalPolicies: [
+        jointScoringSecretReadPolicy,
         new cdk.aws_iam.PolicyStatement({
           sid: 'SlideStorageReadAccess',
           effect: cdk.aws_iam.Effect.ALLOW,
@@ -166,12 +187,14 @@ export class InfrastructureStack extends cdk.Stack {
         SCENARIOS_TABLE_NAME: databaseTables.scenariosTable.tableName,
         BEDROCK_MODEL_SCORING: props!.bedrockModels.scoring,
         ENVIRONMENT_PREFIX: resourcePrefix,
+        JOINT_SCORING_SECRET_ARN: jointScoringSecret.secretArn,
       },
       additionalPolicies: [
+        jointScoringSecretReadPolicy,
         new cdk.aws_iam.PolicyStatement({
           sid: 'DynamoDBSessionFeedbackAccess',
           effect: cdk.aws_iam.Effect.ALLOW,
-          actions: ['dynamodb:PutItem', 'dynamodb:GetItem', 'dynamodb:Query'],
+          actions: ['dynamodb:PutItem', 'dynamodb:BatchWriteItem', 'dynamodb:UpdateItem', 'dynamodb:GetItem', 'dynamodb:Query'],
           resources: [databaseTables.sessionFeedbackTable.tableArn],
         }),
         new cdk.aws_iam.PolicyStatement({
@@ -183,7 +206,7 @@ export class InfrastructureStack extends cdk.Stack {
         new cdk.aws_iam.PolicyStatement({
           sid: 'SSMGuardrailParameterAccess',
           effect: cdk.aws_iam.Effect.ALLOW,
-          actions: ['ssm:GetParameter'],
+          actions: ['ssm:GetParameter', 'ssm:GetParameters'],
           resources: [`arn:aws:ssm:${this.region}:${this.account}:parameter/aisalesroleplay/guardrails/*`],
         }),
         new cdk.aws_iam.PolicyStatement({
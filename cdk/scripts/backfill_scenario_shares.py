@@ -0,0 +1,83 @@
+"""
+シナリオ共有メンバーシップのバックフィル
+
+ScenarioShares テーブル導入前に共有されたシナリオ（visibility = 'shared'）をスキャンし、
+共有先ユーザーごとのメンバーシップ (userId, scenarioId) を書き込む。
+最後に完了マーカーを書き込み、シナリオAPIはマーカーを確認してから
+フィルタなしの一覧取得をスキャンからインデックス経由に切り替える。
+
+既存のメンバーシップは上書きするだけなので、何度実行しても問題ない。
+共有メンバーシップの同期に失敗したログが出た場合も再実行で補える。
+
+使い方:
+    python scripts/backfill_scenario_shares.py \\
+        --scenarios-table {prefix}AISalesRolePlay-Scenarios \\
+        --shares-table {prefix}AISalesRolePlay-ScenarioShares [--region ap-northeast-1] [--dry-run]
+"""
+
+import argparse
+import sys
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+
+# lambda/scenarios/index.py の SHARES_BACKFILL_MARKER_KEY と揃えること
+SHARES_BACKFILL_MARKER_KEY = {'userId': '#backfill', 'scenarioId': '#complete'}
+
+
+def iter_shared_scenarios(scenarios_table):
+    """visibility = 'shared' のシナリオ（scenarioId と共有先のみ）を順に返す"""
+    scan_kwargs = {
+        'FilterExpression': Attr('visibility').eq('shared'),
+        'ProjectionExpression': 'scenarioId, sharedWithUsers',
+    }
+    while True:
+        response = scenarios_table.scan(**scan_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def backfill(scenarios_table, shares_table, dry_run: bool = False) -> dict:
+    """
+    共有シナリオのメンバーシップを書き込み、完了マーカーを書き込む
+
+    Returns:
+        dict: 処理したシナリオ数と書き込んだメンバーシップ数
+    """
+    scenarios = 0
+    memberships = 0
+
+    with shares_table.batch_writer() as batch:
+        for item in iter_shared_scenarios(scenarios_table):
+            scenarios += 1
+            for user_id in set(item.get('sharedWithUsers') or []):
+                memberships += 1
+                if not dry_run:
+                    batch.put_item(Item={'userId': user_id, 'scenarioId': item['scenarioId']})
+
+    if not dry_run:
+        shares_table.put_item(Item=dict(SHARES_BACKFILL_MARKER_KEY))
+    return {'scenarios': scenarios, 'memberships': memberships}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='シナリオ共有メンバーシップのバックフィル')
+    parser.add_argument('--scenarios-table', required=True, help='シナリオテーブル名')
+    parser.add_argument('--shares-table', required=True, help='シナリオ共有メンバーシップテーブル名')
+    parser.add_argument('--region', help='AWSリージョン')
+    parser.add_argument('--dry-run', action='store_true', help='書き込まずに件数だけ表示する')
+    args = parser.parse_args(argv)
+
+    dynamodb = boto3.resource('dynamodb', region_name=args.region)
+    result = backfill(
+        dynamodb.Table(args.scenarios_table), dynamodb.Table(args.shares_table), dry_run=args.dry_run
+    )
+    suffix = '（dry-run: 書き込みなし）' if args.dry_run else '、完了マーカーを書き込みました'
+    print(f"共有シナリオ {result['scenarios']} 件、メンバーシップ {result['memberships']} 件{suffix}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+シナリオ一覧のカード射影によるサイズ・RCUの比較
+
+data/scenarios.json のシナリオに提案資料（slides配列）とPDFファイル情報を付けたアイテムについて、
+1ページあたりの DynamoDB 読み込みサイズ・RCU（結果整合性読み込み）とレスポンスサイズを、
+アイテム全体を読む場合とカード属性だけを射影する場合で比較する。
+RCUが減るのはカード属性だけを射影したGSI（VisibilityIndex / OwnerIndex）経由の読み込みで、
+テーブルへのScan・BatchGetItemはLambdaが受け取るサイズ（readBytes）だけが減る。
+アイテムサイズは DynamoDB のサイズ計算規則に基づく概算。
+
+実行方法（cdk ディレクトリで）:
+    python scripts/bench/bench_list_projection.py [--page-size 20] [--slides 100] [--pdf-files 3]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from decimal import Decimal
+
+CDK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+# デプロイ対象のLambdaディレクトリに置かないため、scenario_cards.py の場所をモジュール検索パスに追加する
+sys.path.insert(0, os.path.join(CDK_DIR, 'lambda', 'scenarios'))
+
+from scenario_cards import SCENARIO_CARD_ATTRIBUTES, build_scenario_card  # noqa: E402
+
+SCENARIOS_JSON = os.path.join(CDK_DIR, 'data', 'scenarios.json')
+
+
+def attribute_size(value) -> int:
+    """属性値のサイズ（バイト）を概算"""
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (int, float, Decimal)):
+        digits = len(str(value).replace('-', '').replace('.', '').lstrip('0')) or 1
+        return math.ceil(digits / 2) + 1
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode('utf-8')) + attribute_size(v) + 1 for k, v in value.items())
+    if isinstance(value, list):
+        return 3 + sum(attribute_size(v) + 1 for v in value)
+    return len(bytes(value))
+
+
+def item_size(item: dict) -> int:
+    """アイテムのサイズ（属性名 + 属性値）を概算"""
+    return sum(len(name.encode('utf-8')) + attribute_size(value) for name, value in item.items())
+
+
+def make_items(slides: int, pdf_files: int) -> list:
+    """シードデータのシナリオを、提案資料・PDF付きのテーブルアイテムに変換"""
+    with open(SCENARIOS_JSON, 'r', encoding='utf-8') as f:
+        seeds = json.load(f)['scenarios']
+
+    items = []
+    for seed in seeds:
+        scenario_id = seed['id']
+        item = {k: v for k, v in seed.items() if k != 'id'}
+        item.update({
+            'scenarioId': scenario_id,
+            'createdBy': 'system',
+            'isCustom': False,
+            'createdAt': '2025-01-01T00:00:00.000000Z',
+            'updatedAt': '2025-01-01T00:00:00.000000Z',
+            'pdfFiles': [
+                {
+                    'key': f'scenarios/{scenario_id}/agent/document_{i}.pdf',
+                    'fileName': f'document_{i}.pdf',
+                    'contentType': 'application/pdf',
+                    'fileSize': 1048576,
+                    'uploadedAt': '2025-01-01T00:00:00.000000Z',
+                }
+                for i in range(pdf_files)
+            ],
+            'presentationFile': {
+                'key': f'presentations/{scenario_id}/original.pdf',
+                'fileName': 'proposal.pdf',
+                'status': 'ready',
+                'totalPages': slides,
+                'slides': [
+                    {
+                        'pageNumber': page,
+                        'imageKey': f'presentations/{scenario_id}/slides/page_{page:03d}.png',
+                        'thumbnailKey': f'presentations/{scenario_id}/thumbnails/page_{page:03d}.png',
+                        'modelImageKey': f'presentations/{scenario_id}/model/page_{page:03d}.webp',
+                        'modelImageFormat': 'webp',
+                    }
+                    for page in range(1, slides + 1)
+                ],
+            },
+        })
+        items.append(item)
+    return items
+
+
+def page_stats(items: list, full_items: list) -> dict:
+    """1ページ分のアイテムの読み込みサイズ・RCUとレスポンスサイズ
+
+    Args:
+        items: Lambdaが受け取るアイテム（射影後）
+        full_items: テーブル上のアイテム全体
+    """
+    total = sum(item_size(item) for item in items)
+    response = json.dumps({'scenarios': [build_scenario_card(item) for item in items]}, ensure_ascii=False)
+    return {
+        'readBytes': total,
+        # GSIのQueryは射影済みアイテムの合計サイズを4KB単位で切り上げ（結果整合性は0.5倍）
+        'indexQueryRcu': math.ceil(total / 4096) * 0.5,
+        # テーブルへのScan/BatchGetItemはProjectionExpressionを指定してもアイテム全体のサイズで課金
+        'tableScanRcu': math.ceil(sum(item_size(item) for item in full_items) / 4096) * 0.5,
+        'batchGetRcu': sum(math.ceil(item_size(item) / 4096) * 0.5 for item in full_items),
+        'responseBytes': len(response.encode('utf-8')),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--slides', type=int, default=100)
+    parser.add_argument('--pdf-files', type=int, default=3)
+    args = parser.parse_args()
+
+    seeds = make_items(args.slides, args.pdf_files)
+    full_items = [seeds[i % len(seeds)] for i in range(args.page_size)]
+    card_items = [{k: v for k, v in item.items() if k in SCENARIO_CARD_ATTRIBUTES} for item in full_items]
+
+    full = page_stats(full_items, full_items)
+    card = page_stats(card_items, full_items)
+    print(f"page size: {args.page_size}, slides: {args.slides}, pdf files: {args.pdf_files}")
+    print(f"{'':>14} | {'full item':>10} | {'card':>10} | {'ratio':>6}")
+    for key in ('readBytes', 'indexQueryRcu', 'tableScanRcu', 'batchGetRcu', 'responseBytes'):
+        ratio = card[key] / full[key] if full[key] else 0
+        print(f"{key:>14} | {full[key]:>10} | {card[key]:>10} | {ratio:>6.2f}")
+
+
+if __name__ == '__main__':
+    main()
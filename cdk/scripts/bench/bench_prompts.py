@@ -0,0 +1,88 @@
+"""
+NPCシステムプロンプト生成のマイクロベンチマーク
+
+メモ化なし（毎回ペルソナを生成）とメモ化あり（ペルソナをキャッシュし可変部分のみ生成）の
+1呼び出しあたりのコストを、スレッド並行数を変えて計測する。
+
+実行方法（cdk ディレクトリで）:
+    python scripts/bench/bench_prompts.py [--calls 20000] [--scenarios 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# デプロイ対象のエージェントディレクトリに置かないため、Dockerイメージと同じく
+# common/ と npc-conversation/ をモジュール検索パスに追加する
+AGENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'agents')
+for name in ('common', 'npc-conversation'):
+    sys.path.insert(0, os.path.join(AGENTS_DIR, name))
+
+from prompts import (  # noqa: E402
+    _build_persona_section, _build_state_section, build_npc_system_prompt_parts,
+)
+
+
+def build_uncached(npc_info, emotion_params, language, presented_slides):
+    """メモ化前と同等の生成（ペルソナを毎回生成）"""
+    return (
+        _build_persona_section(npc_info, language),
+        _build_state_section(emotion_params, language, presented_slides),
+    )
+
+
+def make_inputs(scenarios: int):
+    """シナリオ数分のNPC情報と、ターンごとに変化する感情・スライドを生成"""
+    npc_infos = [
+        {
+            'name': f'担当者{i}',
+            'role': '購買担当者',
+            'company': f'株式会社サンプル{i}',
+            'personality': ['厳しい', '効率重視', 'データ重視'],
+            'description': '中堅製造業の購買部門で10年の経験を持つ。' * 10,
+        }
+        for i in range(scenarios)
+    ]
+    emotions = [
+        {'angerLevel': a, 'trustLevel': t, 'progressLevel': p}
+        for a in range(1, 4) for t in range(1, 4) for p in range(1, 4)
+    ]
+    slides = [None, [{'pageNumber': 1}, {'pageNumber': 2}]]
+    return npc_infos, emotions, slides
+
+
+def run(builder, calls: int, concurrency: int, inputs) -> float:
+    """builderを calls 回呼び出し、1呼び出しあたりの平均マイクロ秒を返す"""
+    npc_infos, emotions, slides = inputs
+
+    def call(i: int):
+        builder(npc_infos[i % len(npc_infos)], emotions[i % len(emotions)], 'ja', slides[i % len(slides)])
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        for i in range(calls):
+            call(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(call, range(calls)))
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--scenarios', type=int, default=20)
+    args = parser.parse_args()
+
+    inputs = make_inputs(args.scenarios)
+    print(f"{'concurrency':>11} | {'uncached us/call':>16} | {'memoized us/call':>16}")
+    for concurrency in (1, 4, 16, 64):
+        uncached = run(build_uncached, args.calls, concurrency, inputs)
+        memoized = run(build_npc_system_prompt_parts, args.calls, concurrency, inputs)
+        print(f"{concurrency:>11} | {uncached:>16.2f} | {memoized:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
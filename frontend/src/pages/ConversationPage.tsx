@@ -168,6 +168,8 @@ const ConversationPage: React.FC = () => {
   const slideImagesRef = useRef<SlideImageInfo[]>([]);
   // suggestionEnabledをrefで管理（sendMessageの依存配列から除外するため）
   const suggestionEnabledRef = useRef<boolean>(false);
+  // NPC応答とスコアリングの統合モード（シナリオ設定、会話中は変化しないためrefのみ）
+  const jointScoringEnabledRef = useRef<boolean>(false);
 
   // userInputの変更をrefに同期
   useEffect(() => {
@@ -373,6 +375,8 @@ const ConversationPage: React.FC = () => {
             setSuggestionEnabled(scenarioInfo.suggestionEnabled ?? false);
             // シナリオの初回サジェスト返答候補を読み込み（未設定時は空配列）
             setInitialSuggestions(scenarioInfo.initialSuggestions ?? []);
+            // NPC応答とスコアリングの統合モード設定を読み込み（未設定時はfalse）
+            jointScoringEnabledRef.current = scenarioInfo.jointScoringEnabled ?? false;
 
             // シナリオNPCの音声モデルIDを設定（アバターAPI取得前に即座に設定）
             // アバター詳細APIの完了を待つとvoiceId設定が遅延し、
@@ -405,6 +409,8 @@ const ConversationPage: React.FC = () => {
                   setSlideImages(slidesResponse.slides.map(s => ({
                     pageNumber: s.pageNumber,
                     imageKey: s.imageKey,
+                    modelImageKey: s.modelImageKey,
+                    modelImageFormat: s.modelImageFormat,
                     imageUrl: s.imageUrl,
                     thumbnailUrl: s.thumbnailUrl,
                   })));
@@ -731,11 +737,23 @@ const ConversationPage: React.FC = () => {
             presentedSlidePagesRef.current.length > 0
               ? slideImagesRef.current
                 .filter(s => presentedSlidePagesRef.current.includes(s.pageNumber))
-                .map(s => ({ pageNumber: s.pageNumber, imageKey: s.imageKey }))
+                .map(s => ({
+                  pageNumber: s.pageNumber,
+                  imageKey: s.imageKey,
+                  ...(s.modelImageKey ? { modelImageKey: s.modelImageKey, modelImageFormat: s.modelImageFormat } : {}),
+                }))
+              : undefined,
+            // 統合モード: NPC応答と同時にスコアリングも生成（失敗時はscoringなしで返り、通常のスコアリングにフォールバック）
+            jointScoringEnabledRef.current
+              ? {
+                goals: goalsRef.current,
+                goalStatuses: goalStatusesRef.current,
+                scenarioDescription: String(scenario.description || ""),
+              }
               : undefined,
           );
 
-          const { response } = result;
+          const { response, scoring: precomputedScoring } = result;
 
           // フロントエンドで生成されたセッションIDを使用
           const activeSessionId = sessionId;
@@ -841,6 +859,10 @@ const ConversationPage: React.FC = () => {
                 },
                 // シナリオの説明文を渡す（サジェスト品質向上のため）
                 String(scenario.description || ""),
+                // 統合モードで生成済みのスコア（コンプライアンスチェックとメトリクス保存のみ行われる）
+                precomputedScoring,
+                // 冪等性キー（再送時はエージェント側で同じ結果が返る）
+                String(messageId),
               );
 
               // コンプライアンスチェック結果の確認
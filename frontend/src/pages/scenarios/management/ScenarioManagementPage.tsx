@@ -50,6 +50,10 @@ const ScenarioManagementPage: React.FC = () => {
   const [deleteDialogOpen, setDeleteDialogOpen] = useState<boolean>(false);
   const [successMessage, setSuccessMessage] = useState<string | null>(null);
   const [importing, setImporting] = useState<boolean>(false);
+  const [importProgress, setImportProgress] = useState<{
+    processed: number;
+    total: number;
+  } | null>(null);
   const [exporting, setExporting] = useState<string | null>(null);
   const [currentUserId, setCurrentUserId] = useState<string | null>(null);
   const [isAdmin, setIsAdmin] = useState<boolean>(false);
@@ -177,7 +181,9 @@ const ScenarioManagementPage: React.FC = () => {
           const jsonData = JSON.parse(content);
 
           // APIを使ってインポート
-          await apiService.importScenarios(jsonData);
+          await apiService.importScenarios(jsonData, (processed, total) =>
+            setImportProgress({ processed, total }),
+          );
 
           setSuccessMessage(t("scenarios.management.importSuccess"));
 
@@ -189,6 +195,7 @@ const ScenarioManagementPage: React.FC = () => {
         }
 
         setImporting(false);
+        setImportProgress(null);
       };
 
       reader.onerror = () => {
@@ -311,7 +318,9 @@ const ScenarioManagementPage: React.FC = () => {
               sx={{ mr: 2 }}
             >
               {importing
-                ? t("common.processing")
+                ? importProgress
+                  ? t("scenarios.management.importProgress", importProgress)
+                  : t("common.processing")
                 : t("scenarios.management.importButton")}
             </Button>
           </label>
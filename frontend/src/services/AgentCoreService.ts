@@ -9,7 +9,7 @@
  */
 import { getCurrentUser, fetchAuthSession } from "aws-amplify/auth";
 import type { Message, NPC, Goal, GoalStatus } from "../types/index";
-import type { ComplianceCheck } from "../types/api";
+import type { ComplianceCheck, JointScoringResult } from "../types/api";
 import { transformComplianceCheck } from "../utils/apiTransformers";
 import { mergeGoalStatus, serializeGoalStatus } from "../utils/goalUtils";
 
@@ -23,6 +23,20 @@ const AWS_REGION = import.meta.env.VITE_AWS_REGION || 'us-west-2';
 const NPC_CONVERSATION_RUNTIME_ARN = import.meta.env.VITE_AGENTCORE_NPC_CONVERSATION_ARN || import.meta.env.VITE_NPC_CONVERSATION_RUNTIME_ARN || '';
 const REALTIME_SCORING_RUNTIME_ARN = import.meta.env.VITE_AGENTCORE_REALTIME_SCORING_ARN || import.meta.env.VITE_REALTIME_SCORING_RUNTIME_ARN || '';
 
+/**
+ * エージェントに送るゴール定義を構築（スコアリング・統合モード共通）
+ */
+function serializeGoals(goals: Goal[]) {
+  return goals.map(goal => ({
+    id: goal.id,
+    description: goal.description || "",
+    priority: typeof goal.priority === "number" ? goal.priority : 3,
+    criteria: Array.isArray(goal.criteria) ? goal.criteria : [],
+    hints: Array.isArray(goal.hints) ? goal.hints : [],
+    isRequired: Boolean(goal.isRequired)
+  }));
+}
+
 // AgentCore Data Plane エンドポイント
 const AGENTCORE_ENDPOINT = `https://bedrock-agentcore.${AWS_REGION}.amazonaws.com`;
 
@@ -53,6 +67,12 @@ class AgentCoreUnauthorizedError extends Error {
 export class AgentCoreService {
   private static instance: AgentCoreService;
 
+  /**
+   * セッションごとの会話履歴バージョン（NPC会話エージェントが返すhistoryVersion）
+   * 次のターンで送り返し、別コンテナで履歴が進んだ場合にエージェント側の履歴キャッシュを無効にさせる
+   */
+  private historyVersions = new Map<string, number>();
+
   private constructor() { }
 
   /**
@@ -302,8 +322,14 @@ export class AgentCoreService {
     },
     scenarioId?: string,
     language?: string,
-    presentedSlides?: Array<{ pageNumber: number; imageKey: string }>,
-  ): Promise<{ response: string; sessionId: string; messageId: string }> {
+    presentedSlides?: Array<{ pageNumber: number; imageKey: string; modelImageKey?: string; modelImageFormat?: string }>,
+    // 指定時はNPC応答と同時にスコアリング結果（scoring）も生成する統合モードで呼び出す
+    jointScoring?: {
+      goals: Goal[];
+      goalStatuses: GoalStatus[];
+      scenarioDescription?: string;
+    },
+  ): Promise<{ response: string; sessionId: string; messageId: string; scoring?: JointScoringResult }> {
     if (!this.isAvailable()) {
       throw new Error('AgentCore Runtimeが利用できません');
     }
@@ -322,6 +348,7 @@ export class AgentCoreService {
     }
 
     // 会話履歴はAgentCore Memoryで管理されるため、previousMessagesは送信しない
+    const historyVersion = this.historyVersions.get(currentSessionId);
     const payload = {
       action: 'conversation',
       message,
@@ -335,6 +362,7 @@ export class AgentCoreService {
       },
       sessionId: currentSessionId,
       messageId: currentMessageId,
+      ...(historyVersion !== undefined ? { historyVersion } : {}),
       ...(scenarioId ? { scenarioId } : {}),
       ...(emotionParams ? {
         emotionParams: {
@@ -345,6 +373,13 @@ export class AgentCoreService {
       } : {}),
       ...(language ? { language } : {}),
       ...(presentedSlides && presentedSlides.length > 0 ? { presentedSlides } : {}),
+      ...(jointScoring ? {
+        jointScoring: {
+          goals: serializeGoals(jointScoring.goals),
+          goalStatuses: jointScoring.goalStatuses.map(status => serializeGoalStatus(status)),
+          ...(jointScoring.scenarioDescription ? { scenarioDescription: jointScoring.scenarioDescription } : {}),
+        },
+      } : {}),
     };
 
     try {
@@ -353,6 +388,8 @@ export class AgentCoreService {
         response?: string;
         sessionId?: string;
         messageId?: string;
+        scoring?: JointScoringResult;
+        historyVersion?: number;
         error?: string;
       }>(NPC_CONVERSATION_RUNTIME_ARN, currentSessionId, payload);
 
@@ -360,13 +397,22 @@ export class AgentCoreService {
         throw new Error(result.error);
       }
 
+      // 保存に失敗したターンなどでhistoryVersionが返らない場合は送らない（エージェントはMemoryから再読み込みする）
+      if (typeof result.historyVersion === 'number') {
+        this.historyVersions.set(currentSessionId, result.historyVersion);
+      } else {
+        this.historyVersions.delete(currentSessionId);
+      }
+
       return {
         response: result.message || result.response || '',
         sessionId: result.sessionId || currentSessionId,
         messageId: result.messageId || currentMessageId,
+        ...(result.scoring ? { scoring: result.scoring } : {}),
       };
     } catch (error) {
       console.error("NPC会話エージェント呼び出しエラー:", error);
+      this.historyVersions.delete(currentSessionId);
       return {
         response: "申し訳ありません、応答の生成中にエラーが発生しました。少し経ってからもう一度お試しください。",
         sessionId: currentSessionId,
@@ -394,7 +440,11 @@ export class AgentCoreService {
       trustLevel: number;
       progressLevel: number;
     },
-    scenarioDescription?: string
+    scenarioDescription?: string,
+    // NPC会話エージェントの統合モードで生成済みのスコア（指定時はスコアリングのモデル呼び出しを省略）
+    precomputedScoring?: JointScoringResult,
+    // 再送時に同じ値を送ることで、エージェント側で処理の合流・結果のリプレイが行われる
+    messageId?: string,
   ): Promise<{
     scores?: {
       angerLevel: number;
@@ -441,18 +491,13 @@ export class AgentCoreService {
         goalStatuses: goalStatuses.map(status => serializeGoalStatus(status))
       } : {}),
       ...(goals ? {
-        goals: goals.map(goal => ({
-          id: goal.id,
-          description: goal.description || "",
-          priority: typeof goal.priority === "number" ? goal.priority : 3,
-          criteria: Array.isArray(goal.criteria) ? goal.criteria : [],
-          hints: Array.isArray(goal.hints) ? goal.hints : [],
-          isRequired: Boolean(goal.isRequired)
-        }))
+        goals: serializeGoals(goals)
       } : {}),
       ...(scenarioId ? { scenarioId } : {}),
       ...(language ? { language } : {}),
       ...(scenarioDescription ? { scenarioDescription } : {}),
+      ...(precomputedScoring ? { precomputedScoring } : {}),
+      ...(messageId ? { messageId } : {}),
     };
 
     try {
@@ -13,7 +13,9 @@ import type {
   ComplianceCheck,
   ScenarioExportData,
   ImportResponse,
+  ImportJobStatus,
   SessionCompleteDataResponse,
+  JointScoringResult,
 } from "../types/api";
 import { AgentCoreService } from "./AgentCoreService";
 import { serializeGoalStatus } from "../utils/goalUtils";
@@ -23,6 +25,18 @@ import {
   transformComplianceViolation,
 } from "../utils/apiTransformers";
 
+/**
+ * 同期インポート（/scenarios/import）できる最大シナリオ数
+ * これを超えるファイルはインポートジョブで処理する（バックエンドの IMPORT_SYNC_MAX_SCENARIOS と合わせる）
+ */
+const IMPORT_SYNC_MAX_SCENARIOS = 200;
+
+/**
+ * インポートジョブの状態をポーリングする間隔（ミリ秒）と最大待機時間
+ */
+const IMPORT_JOB_POLL_INTERVAL_MS = 2000;
+const IMPORT_JOB_POLL_TIMEOUT_MS = 10 * 60 * 1000;
+
 /**
  * API通信サービス - Amazon Bedrockとの通信を処理
  */
@@ -312,7 +326,9 @@ export class ApiService {
    * @param emotionParams 感情パラメータ（怒りレベル、信頼レベル、進捗レベル）
    * @param scenarioId シナリオID
    * @param language 言語設定（"ja", "en"など）
-   * @returns NPCの応答
+   * @param presentedSlides 提示中のスライド（オプション）
+   * @param jointScoring 指定時はNPC応答と同時にスコアリング結果を生成する統合モード（オプション）
+   * @returns NPCの応答（統合モードで生成できた場合はscoringを含む）
    */
   public async chatWithNPC(
     message: string,
@@ -327,8 +343,13 @@ export class ApiService {
     },
     scenarioId?: string,
     language?: string,
-    presentedSlides?: Array<{ pageNumber: number; imageKey: string }>,
-  ): Promise<{ response: string; sessionId: string; messageId: string }> {
+    presentedSlides?: Array<{ pageNumber: number; imageKey: string; modelImageKey?: string; modelImageFormat?: string }>,
+    jointScoring?: {
+      goals: Goal[];
+      goalStatuses: GoalStatus[];
+      scenarioDescription?: string;
+    },
+  ): Promise<{ response: string; sessionId: string; messageId: string; scoring?: JointScoringResult }> {
     try {
       // AgentCore Runtimeを使用（会話履歴はAgentCore Memoryで管理）
       const agentCoreService = AgentCoreService.getInstance();
@@ -346,6 +367,7 @@ export class ApiService {
         scenarioId,
         language,
         presentedSlides,
+        jointScoring,
       );
     } catch (error: unknown) {
       console.error("NPCとの会話中にエラーが発生:", error);
@@ -374,6 +396,8 @@ export class ApiService {
    * @param scenarioId シナリオID（コンプライアンスチェック用）
    * @param language 言語設定（オプション）
    * @param currentScores 現在のスコア（オプション）
+   * @param scenarioDescription シナリオの説明文（オプション）
+   * @param precomputedScoring 統合モードで生成済みのスコア（指定時はスコアリングのモデル呼び出しを省略）
    * @returns メトリクスとゴール状態を含むオブジェクト
    */
   public async getRealtimeEvaluation(
@@ -390,6 +414,8 @@ export class ApiService {
       progressLevel: number;
     },
     scenarioDescription?: string,
+    precomputedScoring?: JointScoringResult,
+    messageId?: string,
   ): Promise<{
     scores?: {
       angerLevel: number;
@@ -421,6 +447,8 @@ export class ApiService {
         language,
         currentScores,
         scenarioDescription,
+        precomputedScoring,
+        messageId,
       );
     } catch (error) {
       console.error("リアルタイム評価API呼び出しエラー:", error);
@@ -950,6 +978,8 @@ export class ApiService {
     slides: Array<{
       pageNumber: number;
       imageKey: string;
+      modelImageKey?: string;
+      modelImageFormat?: string;
       imageUrl: string;
       thumbnailUrl?: string;
     }>;
@@ -1008,12 +1038,20 @@ export class ApiService {
   /**
    * シナリオをインポートする
    * @param scenarioData インポートするシナリオデータ (npcsとscenariosを含むオブジェクト)
+   * @param onProgress インポートジョブの進捗（保存済み件数・保存対象件数）の通知先
    * @returns インポート結果のレスポンス
    */
   public async importScenarios(
     scenarioData: ScenarioExportData,
+    onProgress?: (processed: number, total: number) => void,
   ): Promise<ImportResponse> {
     try {
+      // 件数の多いファイルはインポートジョブで処理
+      if ((scenarioData.scenarios?.length ?? 0) > IMPORT_SYNC_MAX_SCENARIOS) {
+        const job = await this.runImportJob(scenarioData, onProgress);
+        return transformImportResponse(job.result as ImportResponse);
+      }
+
       // API呼び出し
       const rawResponse = await this.apiPost<ImportResponse>(
         "/scenarios/import",
@@ -1032,6 +1070,62 @@ export class ApiService {
     }
   }
 
+  /**
+   * インポートジョブでシナリオをインポートする
+   * インポートファイルをS3にアップロードし、バックグラウンド処理の完了までポーリングする
+   * @param scenarioData インポートするシナリオデータ
+   * @param onProgress 進捗（保存済み件数・保存対象件数）の通知先
+   * @returns 完了したインポートジョブ
+   */
+  public async runImportJob(
+    scenarioData: ScenarioExportData,
+    onProgress?: (processed: number, total: number) => void,
+  ): Promise<ImportJobStatus> {
+    const job = await this.apiPost<{
+      jobId: string;
+      uploadUrl: string;
+      formData: Record<string, string>;
+    }>("/scenarios/import/jobs", {});
+
+    await this.uploadFile(
+      job.uploadUrl,
+      job.formData,
+      JSON.stringify(scenarioData),
+      "application/json",
+    );
+    await this.apiPost<ImportJobStatus>(
+      `/scenarios/import/jobs/${job.jobId}/start`,
+      {},
+    );
+
+    const deadline = Date.now() + IMPORT_JOB_POLL_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+      await new Promise((resolve) =>
+        setTimeout(resolve, IMPORT_JOB_POLL_INTERVAL_MS),
+      );
+      const status = await this.getImportJob(job.jobId);
+      if (status.status === "COMPLETED") {
+        return status;
+      }
+      if (status.status === "FAILED") {
+        throw new Error(status.error || "インポートジョブが失敗しました");
+      }
+      if (onProgress && status.total !== undefined) {
+        onProgress(status.processed ?? 0, status.total);
+      }
+    }
+    throw new Error("インポートジョブがタイムアウトしました");
+  }
+
+  /**
+   * インポートジョブの状態を取得する
+   * @param jobId インポートジョブID
+   * @returns インポートジョブの状態
+   */
+  public async getImportJob(jobId: string): Promise<ImportJobStatus> {
+    return this.apiGet<ImportJobStatus>(`/scenarios/import/jobs/${jobId}`);
+  }
+
   /**
    * シナリオを作成する
    * @param scenarioData 作成するシナリオデータ
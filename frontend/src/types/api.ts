@@ -320,6 +320,10 @@ export type PdfFileInfo = FileInfo;
 export interface SlideImageInfo {
   pageNumber: number;
   imageKey: string;
+  /** モデル入力用に縮小・圧縮した画像のS3キー（NPC会話エージェントが優先使用） */
+  modelImageKey?: string;
+  /** モデル入力用画像の形式（jpeg / webp） */
+  modelImageFormat?: string;
   imageUrl?: string;
   thumbnailUrl?: string;
 }
@@ -333,6 +337,28 @@ export interface PresentationFileInfo extends FileInfo {
   status?: PresentationStatus;
 }
 
+/**
+ * NPC会話エージェントの統合モードで応答と同時に生成されたスコアリング結果
+ * （realtime-scoringエージェントのScoringResultと同形式）
+ */
+export interface JointScoringResult {
+  angerLevel: number;
+  trustLevel: number;
+  progressLevel: number;
+  analysis: string;
+  goalUpdates: Array<{
+    goalId: string;
+    achieved: boolean;
+    reason?: string | null;
+  }>;
+  npcEmotion?: string | null;
+  npcEmotionIntensity?: number | null;
+  gesture?: string | null;
+  suggestions?: string[];
+  // NPC会話エージェントの署名（リアルタイムスコアリングエージェントが検証するため、そのまま渡す）
+  signature?: string;
+}
+
 // ============================================================
 // シナリオ関連
 // ============================================================
@@ -381,6 +407,8 @@ export interface ScenarioInfo {
   suggestionEnabled?: boolean;
   /** 商談開始時に表示する初回サジェスト返答候補（ユーザー初回入力前用） */
   initialSuggestions?: string[];
+  /** NPC応答とリアルタイムスコアリングを1回のモデル呼び出しで生成する（未設定時はfalse） */
+  jointScoringEnabled?: boolean;
 }
 
 // ============================================================
@@ -582,6 +610,34 @@ export interface ImportResponse {
   };
 }
 
+/**
+ * シナリオインポートジョブの状態
+ */
+export type ImportJobState =
+  | "WAITING_UPLOAD"
+  | "QUEUED"
+  | "RUNNING"
+  | "COMPLETED"
+  | "FAILED";
+
+/**
+ * シナリオインポートジョブ（件数の多いファイルの非同期インポート）の型
+ */
+export interface ImportJobStatus {
+  jobId: string;
+  status: ImportJobState;
+  createdAt: string;
+  updatedAt: string;
+  /** 保存済み件数（RUNNING中） */
+  processed?: number;
+  /** 保存対象件数（RUNNING中） */
+  total?: number;
+  /** インポート結果（COMPLETED後） */
+  result?: ImportResponse;
+  /** エラーメッセージ（FAILED時） */
+  error?: string;
+}
+
 // ============================================================
 // セッション完全データ（DynamoDB生データ対応）
 // ============================================================
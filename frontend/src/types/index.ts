@@ -31,6 +31,7 @@ export interface Scenario {
   enableAvatar?: boolean; // アバター表示On/Off（未設定時はfalse）
   suggestionEnabled?: boolean; // サジェスト返答ボタンの有効/無効（未設定時はfalse）
   initialSuggestions?: string[]; // 商談開始時に表示する初回サジェスト返答候補
+  jointScoringEnabled?: boolean; // NPC応答とスコアリングを1回のモデル呼び出しで生成（未設定時はfalse）
 }
 
 // 拡張メトリクス（詳細スコア付き）